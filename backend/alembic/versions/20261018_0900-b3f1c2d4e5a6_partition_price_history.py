@@ -0,0 +1,158 @@
+"""Partition price_history by month on recorded_at
+
+Converts price_history into a PostgreSQL range-partitioned table with one
+partition per month, so old snapshots can be removed by dropping a partition
+instead of a large DELETE. Existing rows are copied into the new partitions.
+
+The primary key becomes (id, recorded_at) because PostgreSQL requires the
+partition key to be part of every unique constraint. The id sequence is kept.
+
+Revision ID: b3f1c2d4e5a6
+Revises:
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3f1c2d4e5a6'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+COLUMNS = """
+    id INTEGER NOT NULL DEFAULT nextval('price_history_id_seq'),
+    route_id VARCHAR(100) NOT NULL,
+    departure_port VARCHAR(50) NOT NULL,
+    arrival_port VARCHAR(50) NOT NULL,
+    operator VARCHAR(50),
+    recorded_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+    departure_date DATE NOT NULL,
+    days_until_departure INTEGER,
+    price_adult FLOAT NOT NULL,
+    price_child FLOAT,
+    price_infant FLOAT,
+    price_vehicle FLOAT,
+    lowest_price FLOAT NOT NULL,
+    highest_price FLOAT,
+    average_price FLOAT,
+    available_passengers INTEGER,
+    available_vehicles INTEGER,
+    num_ferries INTEGER,
+    is_weekend BOOLEAN,
+    is_holiday BOOLEAN,
+    day_of_week INTEGER
+"""
+
+COLUMN_NAMES = (
+    "id, route_id, departure_port, arrival_port, operator, recorded_at, "
+    "departure_date, days_until_departure, price_adult, price_child, "
+    "price_infant, price_vehicle, lowest_price, highest_price, average_price, "
+    "available_passengers, available_vehicles, num_ferries, is_weekend, "
+    "is_holiday, day_of_week"
+)
+
+INDEXES = [
+    ("ix_price_history_id", "id"),
+    ("ix_price_history_route_id", "route_id"),
+    ("ix_price_history_recorded_at", "recorded_at"),
+    ("ix_price_history_departure_date", "departure_date"),
+    ("idx_price_history_route_date", "route_id, departure_date"),
+    ("idx_price_history_recorded", "recorded_at"),
+    ("idx_price_history_route_recorded", "route_id, recorded_at"),
+]
+
+# Partitions created ahead of the current month (matches the maintenance task)
+MONTHS_AHEAD = 3
+
+
+def _add_months(day: date, months: int) -> date:
+    index = day.year * 12 + (day.month - 1) + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _rename_indexes(suffix_from: str, suffix_to: str) -> None:
+    for name, _ in INDEXES:
+        op.execute(f"ALTER INDEX IF EXISTS {name}{suffix_from} RENAME TO {name}{suffix_to}")
+    op.execute(f"ALTER INDEX IF EXISTS price_history_pkey{suffix_from} RENAME TO price_history_pkey{suffix_to}")
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        # Native partitioning is PostgreSQL-only; other databases keep the plain table
+        return
+
+    # Keep the id sequence alive when the legacy table is dropped
+    op.execute("ALTER SEQUENCE price_history_id_seq OWNED BY NONE")
+    op.execute("ALTER TABLE price_history RENAME TO price_history_legacy")
+    _rename_indexes("", "_legacy")
+
+    op.execute(f"""
+        CREATE TABLE price_history (
+            {COLUMNS},
+            CONSTRAINT price_history_pkey PRIMARY KEY (id, recorded_at)
+        ) PARTITION BY RANGE (recorded_at)
+    """)
+
+    # One partition per month from the oldest snapshot up to MONTHS_AHEAD ahead
+    oldest = bind.execute(sa.text("SELECT min(recorded_at) FROM price_history_legacy")).scalar()
+    this_month = date.today().replace(day=1)
+    month = oldest.date().replace(day=1) if oldest else this_month
+    last_month = _add_months(this_month, MONTHS_AHEAD)
+
+    while month <= last_month:
+        next_month = _add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE price_history_y{month.year}m{month.month:02d} "
+            f"PARTITION OF price_history "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{next_month.isoformat()}')"
+        )
+        month = next_month
+
+    # Catch-all for rows outside the pre-created range
+    op.execute("CREATE TABLE price_history_default PARTITION OF price_history DEFAULT")
+
+    op.execute(
+        f"INSERT INTO price_history ({COLUMN_NAMES}) "
+        f"SELECT {COLUMN_NAMES} FROM price_history_legacy"
+    )
+    op.execute("DROP TABLE price_history_legacy")
+    op.execute("ALTER SEQUENCE price_history_id_seq OWNED BY price_history.id")
+
+    # Indexes on the parent cascade to every current and future partition
+    for name, columns in INDEXES:
+        op.execute(f"CREATE INDEX {name} ON price_history ({columns})")
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    op.execute("ALTER SEQUENCE price_history_id_seq OWNED BY NONE")
+    op.execute("ALTER TABLE price_history RENAME TO price_history_partitioned")
+    _rename_indexes("", "_partitioned")
+
+    op.execute(f"""
+        CREATE TABLE price_history (
+            {COLUMNS},
+            CONSTRAINT price_history_pkey PRIMARY KEY (id)
+        )
+    """)
+    op.execute(
+        f"INSERT INTO price_history ({COLUMN_NAMES}) "
+        f"SELECT {COLUMN_NAMES} FROM price_history_partitioned"
+    )
+
+    # Dropping the parent drops every partition with it
+    op.execute("DROP TABLE price_history_partitioned")
+    op.execute("ALTER SEQUENCE price_history_id_seq OWNED BY price_history.id")
+
+    for name, columns in INDEXES:
+        op.execute(f"CREATE INDEX {name} ON price_history ({columns})")
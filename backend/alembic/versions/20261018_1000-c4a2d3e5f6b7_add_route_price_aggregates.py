@@ -0,0 +1,52 @@
+"""Add route_price_aggregates
+
+Rolling per-route price aggregates updated incrementally by the price
+snapshot task and rebuilt daily from price_history.
+
+Revision ID: c4a2d3e5f6b7
+Revises: b3f1c2d4e5a6
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4a2d3e5f6b7'
+down_revision = 'b3f1c2d4e5a6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'route_price_aggregates',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('route_id', sa.String(length=100), nullable=False),
+        sa.Column('snapshot_count', sa.Integer(), nullable=False),
+        sa.Column('price_count', sa.Integer(), nullable=False),
+        sa.Column('price_sum', sa.Float(), nullable=False),
+        sa.Column('price_sum_sq', sa.Float(), nullable=False),
+        sa.Column('min_price', sa.Float(), nullable=True),
+        sa.Column('max_price', sa.Float(), nullable=True),
+        sa.Column('min_price_date', sa.Date(), nullable=True),
+        sa.Column('max_price_date', sa.Date(), nullable=True),
+        sa.Column('weekday_buckets', sa.JSON(), nullable=True),
+        sa.Column('lead_time_buckets', sa.JSON(), nullable=True),
+        sa.Column('daily_buckets', sa.JSON(), nullable=True),
+        sa.Column('recent_snapshots', sa.JSON(), nullable=True),
+        sa.Column('last_price', sa.Float(), nullable=True),
+        sa.Column('last_recorded_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('rebuilt_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_route_price_aggregates_id', 'route_price_aggregates', ['id'])
+    op.create_index('ix_route_price_aggregates_route_id', 'route_price_aggregates', ['route_id'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_route_price_aggregates_route_id', table_name='route_price_aggregates')
+    op.drop_index('ix_route_price_aggregates_id', table_name='route_price_aggregates')
+    op.drop_table('route_price_aggregates')
@@ -0,0 +1,53 @@
+"""Claim booking reminders with a unique row per reminder
+
+The reminder scan now claims each (booking, reminder type, journey) with
+INSERT ... ON CONFLICT DO NOTHING and schedules the send for the exact
+reminder time, so idx_booking_reminder_unique becomes unique and a
+scheduled_for column records when the send is due. Duplicate rows left by
+earlier failed attempts are removed first, keeping a successful one.
+
+Revision ID: d5b3e4f6a7c8
+Revises: c4a2d3e5f6b7
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5b3e4f6a7c8'
+down_revision = 'c4a2d3e5f6b7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('booking_reminders', sa.Column('scheduled_for', sa.DateTime(timezone=True), nullable=True))
+
+    op.execute("""
+        DELETE FROM booking_reminders a
+        USING booking_reminders b
+        WHERE a.booking_id = b.booking_id
+          AND a.reminder_type = b.reminder_type
+          AND a.journey_type = b.journey_type
+          AND (a.success < b.success OR (a.success = b.success AND a.id < b.id))
+    """)
+
+    op.drop_index('idx_booking_reminder_unique', table_name='booking_reminders', if_exists=True)
+    op.create_index(
+        'idx_booking_reminder_unique',
+        'booking_reminders',
+        ['booking_id', 'reminder_type', 'journey_type'],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_booking_reminder_unique', table_name='booking_reminders')
+    op.create_index(
+        'idx_booking_reminder_unique',
+        'booking_reminders',
+        ['booking_id', 'reminder_type', 'journey_type'],
+    )
+    op.drop_column('booking_reminders', 'scheduled_for')
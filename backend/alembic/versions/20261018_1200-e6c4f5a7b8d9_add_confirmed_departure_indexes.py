@@ -0,0 +1,40 @@
+"""Add partial indexes on confirmed bookings' departure times
+
+complete_past_bookings_task moves CONFIRMED bookings to COMPLETED with a
+set-based UPDATE on departure_time / return_departure_time; these partial
+indexes keep that scan to the (small) set of confirmed bookings.
+
+Revision ID: e6c4f5a7b8d9
+Revises: d5b3e4f6a7c8
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e6c4f5a7b8d9'
+down_revision = 'd5b3e4f6a7c8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'idx_bookings_confirmed_departure',
+        'bookings',
+        ['departure_time'],
+        postgresql_where=sa.text("status = 'CONFIRMED'"),
+    )
+    op.create_index(
+        'idx_bookings_confirmed_return_departure',
+        'bookings',
+        ['return_departure_time'],
+        postgresql_where=sa.text("status = 'CONFIRMED'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_bookings_confirmed_return_departure', table_name='bookings')
+    op.drop_index('idx_bookings_confirmed_departure', table_name='bookings')
@@ -0,0 +1,46 @@
+"""Add sailing_inventory
+
+Per-sailing capacity and reserved counts; bookings reserve passengers,
+vehicles and cabins on this row at creation and release them on expiry or
+cancellation.
+
+Revision ID: f7d5a6b8c9e0
+Revises: e6c4f5a7b8d9
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f7d5a6b8c9e0'
+down_revision = 'e6c4f5a7b8d9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'sailing_inventory',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('sailing_id', sa.String(length=100), nullable=False),
+        sa.Column('operator', sa.String(length=50), nullable=True),
+        sa.Column('passenger_capacity', sa.Integer(), nullable=True),
+        sa.Column('vehicle_capacity', sa.Integer(), nullable=True),
+        sa.Column('cabin_capacity', sa.Integer(), nullable=True),
+        sa.Column('passengers_reserved', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('vehicles_reserved', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('cabins_reserved', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_sailing_inventory_id', 'sailing_inventory', ['id'])
+    op.create_index('ix_sailing_inventory_sailing_id', 'sailing_inventory', ['sailing_id'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_sailing_inventory_sailing_id', table_name='sailing_inventory')
+    op.drop_index('ix_sailing_inventory_id', table_name='sailing_inventory')
+    op.drop_table('sailing_inventory')
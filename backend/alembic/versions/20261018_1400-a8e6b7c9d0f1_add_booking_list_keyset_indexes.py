@@ -0,0 +1,29 @@
+"""Add (created_at, id) indexes for keyset-paginated booking lists
+
+The user and admin booking lists page newest first with a cursor on
+(created_at, id); these indexes serve the ordering and the cursor predicate
+directly, across all bookings (admin) and per user.
+
+Revision ID: a8e6b7c9d0f1
+Revises: f7d5a6b8c9e0
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'a8e6b7c9d0f1'
+down_revision = 'f7d5a6b8c9e0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('idx_bookings_created_at_id', 'bookings', ['created_at', 'id'])
+    op.create_index('idx_bookings_user_created_at_id', 'bookings', ['user_id', 'created_at', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_bookings_user_created_at_id', table_name='bookings')
+    op.drop_index('idx_bookings_created_at_id', table_name='bookings')
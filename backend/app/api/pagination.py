@@ -0,0 +1,91 @@
+"""
+Keyset (cursor) pagination for booking lists.
+
+Lists are ordered newest first on (created_at, id). A cursor is the opaque,
+URL-safe encoding of the last row's (created_at, id); the next page is the
+rows strictly before it, so it is read from the (created_at, id) index
+however deep the page is, unlike OFFSET which scans and discards every
+skipped row.
+
+Totals are optional: "exact" runs COUNT(*) over the filtered query,
+"estimate" counts at most LIST_COUNT_ESTIMATE_CAP rows (a lower bound past
+the cap) and "none" skips counting.
+"""
+
+import base64
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import func, tuple_
+from sqlalchemy.orm import Query
+
+from app.config import settings
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Cursor pointing just after a row."""
+    raw = f"{created_at.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decode a cursor from encode_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, row_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def count_total(query: Query, mode: str) -> Tuple[Optional[int], bool]:
+    """
+    Total rows of a filtered (unordered, unpaginated) query.
+
+    Returns:
+        (total, is_estimate); total is None for mode "none"
+    """
+    if mode == "none":
+        return None, False
+    if mode == "exact":
+        return query.order_by(None).count(), False
+
+    cap = settings.LIST_COUNT_ESTIMATE_CAP
+    capped = query.order_by(None).limit(cap).subquery()
+    total = query.session.query(func.count()).select_from(capped).scalar()
+    return total, total >= cap
+
+
+def keyset_page(
+    query: Query,
+    created_at_column,
+    id_column,
+    limit: int,
+    cursor: Optional[Tuple[datetime, int]] = None,
+    offset: int = 0
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    One page of a query, newest first.
+
+    Pages after the cursor when one is given, otherwise skips ``offset`` rows
+    (page-number clients). One extra row is fetched to know whether a next
+    page exists.
+
+    Returns:
+        (rows, next_cursor); next_cursor is None on the last page
+    """
+    if cursor is not None:
+        query = query.filter(tuple_(created_at_column, id_column) < tuple_(*cursor))
+        offset = 0
+
+    query = query.order_by(created_at_column.desc(), id_column.desc())
+    rows = query.offset(offset).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1].created_at, rows[-1].id)
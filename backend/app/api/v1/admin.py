@@ -14,10 +14,13 @@ from dotenv import load_dotenv
 import logging
 
 from app.api.deps import get_db, get_admin_user
+from app.api.pagination import count_total, decode_cursor, keyset_page
 from app.models.user import User
 from app.models.booking import Booking, BookingStatusEnum
 from app.models.payment import Payment, PaymentStatusEnum
 from app.services.email_service import email_service
+from app.services.inventory_service import inventory_service
+from app.services.booking_read_cache import booking_read_cache
 
 from app.schemas.admin import (
     DashboardStats, DashboardStatsToday, DashboardStatsTotal, DashboardStatsPending,
@@ -224,6 +227,10 @@ async def update_user(
     return UserResponse.from_orm(user)
 
 
+# Columns selected for admin booking list rows
+ADMIN_BOOKING_COLUMNS = [getattr(Booking, field) for field in BookingResponse.model_fields]
+
+
 @router.get("/bookings", response_model=BookingListResponse)
 async def list_bookings(
     skip: int = Query(0, ge=0),
@@ -232,15 +239,27 @@ async def list_bookings(
     operator: Optional[str] = None,
     search: Optional[str] = None,
     pending_refund: Optional[bool] = None,
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page; replaces skip"),
+    total: Optional[str] = Query(
+        None, pattern="^(exact|estimate|none)$",
+        description="Total count mode; defaults to exact on skip requests, none with a cursor"
+    ),
     db: Session = Depends(get_db),
     current_admin: User = Depends(get_admin_user)
 ):
     """
     List all bookings with filtering.
 
-    Admins can view and manage all platform bookings.
+    Admins can view and manage all platform bookings. Only the list columns
+    are selected; follow next_cursor so deep pages are read from the
+    (created_at, id) index rather than skipped with OFFSET.
     """
-    query = db.query(Booking)
+    try:
+        parsed_cursor = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    query = db.query(*ADMIN_BOOKING_COLUMNS)
 
     # Apply filters
     if status:
@@ -270,17 +289,20 @@ async def list_bookings(
         )
         query = query.filter(search_filter)
 
-    # Count total
-    total = query.count()
+    total_count, total_is_estimate = count_total(query, total or ("none" if cursor else "exact"))
 
-    # Get paginated results
-    bookings = query.order_by(Booking.created_at.desc()).offset(skip).limit(limit).all()
+    # Get paginated results, newest first
+    bookings, next_cursor = keyset_page(
+        query, Booking.created_at, Booking.id, limit, cursor=parsed_cursor, offset=skip
+    )
 
     return BookingListResponse(
-        bookings=[BookingResponse.from_orm(booking) for booking in bookings],
-        total=total,
+        bookings=[BookingResponse.model_validate(booking) for booking in bookings],
+        total=total_count,
+        total_is_estimate=total_is_estimate,
         skip=skip,
-        limit=limit
+        limit=limit,
+        next_cursor=next_cursor
     )
 
 
@@ -360,6 +382,7 @@ async def cancel_booking_admin(
     booking.status = BookingStatusEnum.CANCELLED
     booking.cancellation_reason = f"Admin cancellation: {cancel_request.reason}"
     booking.cancelled_at = datetime.utcnow()
+    inventory_service.release_booking(db, booking)
 
     # Set refund amount (but don't process yet - admin can do that from Pending Refunds)
     if payment and payment.amount:
@@ -372,6 +395,7 @@ async def cancel_booking_admin(
 
     db.commit()
     db.refresh(booking)
+    booking_read_cache.invalidate_booking(booking)
 
     # Queue cancellation email asynchronously (non-blocking)
     try:
@@ -474,6 +498,7 @@ async def process_refund(
 
         db.commit()
         db.refresh(booking)
+        booking_read_cache.invalidate_booking(booking)
 
         # Queue refund confirmation email asynchronously (non-blocking)
         try:
@@ -600,3 +625,27 @@ async def clear_email_dead_letter_queue(
         raise HTTPException(status_code=500, detail=result["message"])
 
     return result
+
+
+# =============================================================================
+# Ferry Operator SLOs
+# =============================================================================
+
+@router.get("/operators/slo")
+async def get_operator_slo(
+    current_admin: User = Depends(get_admin_user)
+):
+    """
+    Rolling SLO report per ferry operator and call type.
+
+    Availability, timeout rate, p50/p95/p99 latency and remaining error
+    budget over OPERATOR_SLO_WINDOW_SECONDS, plus the adaptive client
+    timeouts currently applied. Figures cover the worker serving the request.
+    """
+    from app.services.ferry_integrations.slo import operator_slo
+
+    return {
+        "window_seconds": operator_slo.window_seconds,
+        "operators": operator_slo.snapshot(),
+        "timeouts": operator_slo.current_timeouts(),
+    }
@@ -18,6 +18,7 @@ from passlib.context import CryptContext
 from app.api.deps import get_db, get_current_user, get_current_active_user
 from app.config import settings
 from app.models.user import User
+from app.services.booking_read_cache import booking_read_cache
 from app.schemas.user import (
     UserCreate, UserResponse, UserUpdate, UserLogin, Token,
     PasswordChange, PasswordReset, PasswordResetConfirm
@@ -235,7 +236,9 @@ async def register_from_booking(
             linked_count += 1
 
         print(f"Total bookings linked: {linked_count}")
+        linked_keys = [(b.id, b.booking_reference) for b in guest_bookings]
         db.commit()
+        booking_read_cache.invalidate_many(linked_keys)
         db.refresh(db_user)
 
         # Create access token for immediate login
@@ -320,7 +323,9 @@ async def login(
         if guest_bookings:
             print(f"Auto-linked {len(guest_bookings)} guest booking(s) to user {user.id} on login")
 
+        linked_keys = [(b.id, b.booking_reference) for b in guest_bookings]
         db.commit()
+        booking_read_cache.invalidate_many(linked_keys)
 
         # Create access token
         access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -399,7 +404,9 @@ async def login_with_email(
         if guest_bookings:
             print(f"Auto-linked {len(guest_bookings)} guest booking(s) to user {user.id} on login (email)")
 
+        linked_keys = [(b.id, b.booking_reference) for b in guest_bookings]
         db.commit()
+        booking_read_cache.invalidate_many(linked_keys)
 
         # Create access token
         access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -781,6 +788,7 @@ async def link_booking_to_account(
 
         # Link the booking to the user
         booking.user_id = current_user.id
+        linked_keys = [(booking.id, booking.booking_reference)]
         db.commit()
 
         # Also link any other guest bookings with the same email
@@ -794,7 +802,9 @@ async def link_booking_to_account(
             other_booking.user_id = current_user.id
             linked_count += 1
 
+        linked_keys += [(b.id, b.booking_reference) for b in other_bookings]
         db.commit()
+        booking_read_cache.invalidate_many(linked_keys)
 
         return {
             "message": f"Successfully linked {linked_count} booking(s) to your account",
@@ -921,7 +931,9 @@ async def google_login(
         if linked_count > 0:
             logger.info(f"Auto-linked {linked_count} guest booking(s) to user {user.id} on Google login")
 
+        linked_keys = [(b.id, b.booking_reference) for b in guest_bookings]
         db.commit()
+        booking_read_cache.invalidate_many(linked_keys)
         db.refresh(user)
 
         # Create access token
@@ -1117,7 +1129,9 @@ async def apple_login(
         if linked_count > 0:
             logger.info(f"Auto-linked {linked_count} guest booking(s) to user {user.id} on Apple login")
 
+        linked_keys = [(b.id, b.booking_reference) for b in guest_bookings]
         db.commit()
+        booking_read_cache.invalidate_many(linked_keys)
         db.refresh(user)
 
         # Create access token
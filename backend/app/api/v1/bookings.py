@@ -5,15 +5,15 @@ Booking API endpoints for creating, managing, and retrieving ferry bookings.
 import uuid
 import os
 import logging
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from datetime import datetime, timedelta
 from pydantic import BaseModel
 
 logger = logging.getLogger(__name__)
 
 try:
-    from fastapi import APIRouter, Depends, HTTPException, status, Query
-    from fastapi.responses import StreamingResponse
+    from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+    from fastapi.responses import Response
     from sqlalchemy.orm import Session, selectinload
     from sqlalchemy import and_, or_
 except ImportError:
@@ -73,11 +73,14 @@ try:
     from app.schemas.booking import (
         BookingCreate, BookingResponse, BookingUpdate, BookingCancellation,
         BookingListResponse, BookingSearchParams, BookingStatistics,
-        BookingModification, BookingConfirmation
+        BookingModification, BookingConfirmation, BookingSummaryResponse
     )
+    from app.api.pagination import count_total, decode_cursor, keyset_page
     from app.services.ferry_service import FerryService
     from app.services.ferry_integrations.base import FerryAPIError
     from app.services.invoice_service import invoice_service
+    from app.services.inventory_service import inventory_service, SoldOutError
+    from app.services.booking_read_cache import booking_read_cache
     from app.models.meal import BookingMeal
     from app.models.payment import Payment, PaymentStatusEnum
 except ImportError:
@@ -121,10 +124,14 @@ except ImportError:
         pass
     class BookingConfirmation:
         pass
+    class BookingSummaryResponse:
+        model_fields = {}
     class FerryService:
         pass
     class FerryAPIError(Exception):
         pass
+    class SoldOutError(Exception):
+        pass
 
 router = APIRouter()
 
@@ -137,6 +144,75 @@ def generate_booking_reference() -> str:
     return f"MR{uuid.uuid4().hex[:8].upper()}"
 
 
+async def _pdf_response(request: Request, key: str, kind: str, render_args: dict, filename: str) -> Response:
+    """
+    Serve a generated PDF from the document cache.
+
+    The cache key is also the ETag, so a matching If-None-Match gets a 304
+    without the PDF being read or rendered. Misses are rendered in the PDF
+    render pool so the event loop is not blocked.
+    """
+    from app.services.document_cache import document_cache
+    from app.services.pdf_renderer import render_pdf
+
+    headers = {"ETag": document_cache.etag(key), "Cache-Control": "private, no-cache"}
+    if document_cache.etag_matches(request.headers.get("if-none-match"), key):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    pdf_content = await document_cache.get_or_render_async(key, lambda: render_pdf(kind, **render_args))
+    headers["Content-Disposition"] = f"attachment; filename={filename}"
+    return Response(content=pdf_content, media_type="application/pdf", headers=headers)
+
+
+def _inventory_legs(booking_data: BookingCreate) -> List[dict]:
+    """Passengers, vehicles and cabins a new booking takes on each sailing."""
+    passengers = len(booking_data.passengers)
+    vehicles = len(booking_data.vehicles) if booking_data.vehicles else 0
+
+    def cabins(selections, legacy_cabin_id) -> int:
+        if selections:
+            return sum(cs.quantity for cs in selections)
+        return 1 if legacy_cabin_id else 0
+
+    legs = [{
+        "sailing_id": booking_data.sailing_id,
+        "operator": booking_data.operator,
+        "departure_port": booking_data.departure_port,
+        "arrival_port": booking_data.arrival_port,
+        "departure_time": booking_data.departure_time,
+        "passengers": passengers,
+        "vehicles": vehicles,
+        "cabins": cabins(booking_data.cabin_selections, booking_data.cabin_id),
+    }]
+    if booking_data.is_round_trip and booking_data.return_sailing_id:
+        legs.append({
+            "sailing_id": booking_data.return_sailing_id,
+            "operator": booking_data.return_operator or booking_data.operator,
+            "departure_port": booking_data.return_departure_port,
+            "arrival_port": booking_data.return_arrival_port,
+            "departure_time": booking_data.return_departure_time,
+            "passengers": passengers,
+            "vehicles": vehicles,
+            "cabins": cabins(booking_data.return_cabin_selections, booking_data.return_cabin_id),
+        })
+    return legs
+
+
+def _find_existing_pending(db: Session, booking_data: BookingCreate) -> Optional[Booking]:
+    """Unexpired PENDING booking of the same contact for the same route and departure."""
+    contact_email = booking_data.contact_info.email.lower() if booking_data.contact_info else None
+    if not (contact_email and booking_data.departure_time):
+        return None
+    return db.query(Booking).filter(
+        Booking.contact_email == contact_email,
+        Booking.departure_port == booking_data.departure_port,
+        Booking.arrival_port == booking_data.arrival_port,
+        Booking.departure_time == booking_data.departure_time,
+        Booking.status == BookingStatusEnum.PENDING.value,
+        Booking.expires_at > datetime.utcnow()  # Not expired
+    ).first()
+
+
 def booking_to_response(db_booking: Booking) -> BookingResponse:
     """Convert a Booking model to BookingResponse, handling enum conversions."""
     return BookingResponse(
@@ -296,6 +372,40 @@ def booking_to_response(db_booking: Booking) -> BookingResponse:
     )
 
 
+def _load_booking_detail(db: Session, *criteria) -> Optional[Booking]:
+    """Booking with everything booking_to_response reads, in one query per relationship."""
+    return db.query(Booking).options(
+        selectinload(Booking.passengers),
+        selectinload(Booking.vehicles),
+        selectinload(Booking.meals),
+        selectinload(Booking.booking_cabins).selectinload(BookingCabin.cabin),
+        selectinload(Booking.cabin),
+        selectinload(Booking.return_cabin),
+    ).filter(*criteria).first()
+
+
+def _cache_booking_response(db: Session, booking: Booking) -> Tuple[BookingResponse, dict]:
+    """
+    Build a booking's response and store it in the read-model cache.
+
+    Returns:
+        (response, access facts for booking_read_cache.can_view)
+    """
+    response = booking_to_response(booking)
+    access = {
+        "user_id": booking.user_id,
+        # What validate_booking_access allows without admin rights or ownership
+        "guest_access": validate_booking_access(booking.id, None, db),
+    }
+    booking_read_cache.store(response, access["user_id"], access["guest_access"])
+    return response, access
+
+
+def _cached_response(body: str) -> Response:
+    """Serve a cached BookingResponse JSON as stored."""
+    return Response(content=body, media_type="application/json")
+
+
 @router.post("/", response_model=BookingResponse)
 async def create_booking(
     booking_data: BookingCreate,
@@ -342,23 +452,31 @@ async def create_booking(
                     detail="Return bookings must be made at least 1 hour before departure"
                 )
 
-        # Check for existing PENDING booking with same route/time/contact to prevent duplicates
-        # This handles the case where user refreshes page and Redux state is lost
-        contact_email = booking_data.contact_info.email.lower() if booking_data.contact_info else None
-        if contact_email and booking_data.departure_time:
-            existing_pending = db.query(Booking).filter(
-                Booking.contact_email == contact_email,
-                Booking.departure_port == booking_data.departure_port,
-                Booking.arrival_port == booking_data.arrival_port,
-                Booking.departure_time == booking_data.departure_time,
-                Booking.status == BookingStatusEnum.PENDING.value,
-                Booking.expires_at > datetime.utcnow()  # Not expired
-            ).first()
-
+        # Reserve capacity before anything else: the sailing's inventory row stays
+        # locked until this transaction ends, so concurrent requests for the same
+        # sailing queue here and the duplicate check below sees committed bookings
+        try:
+            inventory_reservation = inventory_service.reserve_booking(db, _inventory_legs(booking_data))
+        except SoldOutError as e:
+            db.rollback()
+            # The last places may be held by this contact's own pending booking
+            existing_pending = _find_existing_pending(db, booking_data)
             if existing_pending:
-                logger.info(f"Found existing pending booking {existing_pending.booking_reference} for same route/time/contact, returning it instead of creating duplicate")
-                # Return the existing pending booking instead of creating a duplicate
+                logger.info(f"Sailing full, returning existing pending booking {existing_pending.booking_reference} for same route/time/contact")
                 return booking_to_response(existing_pending)
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=str(e)
+            )
+
+        # Check for existing PENDING booking with same route/time/contact to prevent duplicates
+        # This handles the case where user refreshes page and Redux state is lost
+        existing_pending = _find_existing_pending(db, booking_data)
+        if existing_pending:
+            logger.info(f"Found existing pending booking {existing_pending.booking_reference} for same route/time/contact, returning it instead of creating duplicate")
+            # Return the existing pending booking instead of creating a duplicate
+            db.rollback()  # Drop the reservation made for this request
+            return booking_to_response(existing_pending)
 
         # Generate unique booking reference
         booking_reference = generate_booking_reference()
@@ -551,7 +669,9 @@ async def create_booking(
             status=BookingStatusEnum.PENDING,
             expires_at=expires_at,  # Expires 30 minutes from creation
             extra_data={
-                "has_cancellation_protection": getattr(booking_data, 'has_cancellation_protection', False)
+                "has_cancellation_protection": getattr(booking_data, 'has_cancellation_protection', False),
+                # Released on expiry or cancellation (inventory_service.release_booking)
+                "inventory": inventory_reservation
             }
         )
         
@@ -790,6 +910,8 @@ async def create_booking(
 
             # Note: Status remains PENDING until payment is completed
             db.commit()
+            # A read since the first commit may have cached it without the operator references
+            booking_read_cache.invalidate_booking(db_booking)
 
         except FerryAPIError as e:
             # If operator booking fails, keep as pending for manual processing
@@ -827,6 +949,15 @@ async def create_booking(
         except Exception as e:
             logger.warning(f"Failed to publish availability update: {str(e)}")
 
+        # Booked routes rank higher in the background cache warmer
+        if db_booking.departure_time:
+            from app.services.cache_warmer_service import search_demand
+            search_demand.record_booking(
+                db_booking.departure_port,
+                db_booking.arrival_port,
+                db_booking.departure_time.date()
+            )
+
         # Send booking confirmation email
         try:
             booking_dict = {
@@ -900,6 +1031,7 @@ async def create_booking(
         return booking_to_response(db_booking)
         
     except HTTPException:
+        db.rollback()
         raise
     except Exception as e:
         db.rollback()
@@ -934,6 +1066,10 @@ async def create_booking(
         )
 
 
+# Columns selected for view=summary list rows
+BOOKING_SUMMARY_COLUMNS = [getattr(Booking, field) for field in BookingSummaryResponse.model_fields]
+
+
 @router.get("/", response_model=BookingListResponse)
 async def list_bookings(
     db: Session = Depends(get_db),
@@ -942,24 +1078,46 @@ async def list_bookings(
     status_filter: Optional[str] = Query(None, description="Filter by booking status"),
     operator: Optional[str] = Query(None, description="Filter by operator"),
     departure_date_from: Optional[datetime] = Query(None, description="Filter by departure date from"),
-    departure_date_to: Optional[datetime] = Query(None, description="Filter by departure date to")
+    departure_date_to: Optional[datetime] = Query(None, description="Filter by departure date to"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page; replaces page"),
+    view: str = Query("full", pattern="^(full|summary)$", description="summary: list row columns only"),
+    total: Optional[str] = Query(
+        None, pattern="^(exact|estimate|none)$",
+        description="Total count mode; defaults to exact on page-number requests, none with a cursor"
+    )
 ):
     """
     List user's bookings.
     
-    Returns a paginated list of bookings for the current user.
+    Returns a paginated list of bookings for the current user, newest first.
     Admin users can see all bookings.
+
+    Follow next_cursor for deep pages: cursor pages are read from the
+    (created_at, id) index instead of skipping rows with OFFSET. view=summary
+    returns list row columns without passengers, vehicles, meals and cabins.
     """
     try:
-        # Use selectinload to eagerly load relationships and avoid N+1 queries
-        query = db.query(Booking).options(
-            selectinload(Booking.passengers),
-            selectinload(Booking.vehicles),
-            selectinload(Booking.meals),
-            selectinload(Booking.booking_cabins).selectinload(BookingCabin.cabin),
-            selectinload(Booking.cabin),
-            selectinload(Booking.return_cabin),
+        parsed_cursor = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
         )
+    total_mode = total or ("none" if cursor else "exact")
+
+    try:
+        if view == "summary":
+            query = db.query(*BOOKING_SUMMARY_COLUMNS)
+        else:
+            # Use selectinload to eagerly load relationships and avoid N+1 queries
+            query = db.query(Booking).options(
+                selectinload(Booking.passengers),
+                selectinload(Booking.vehicles),
+                selectinload(Booking.meals),
+                selectinload(Booking.booking_cabins).selectinload(BookingCabin.cabin),
+                selectinload(Booking.cabin),
+                selectinload(Booking.return_cabin),
+            )
 
         # Guest users (not logged in) get empty list
         if not current_user:
@@ -994,24 +1152,32 @@ async def list_bookings(
         if departure_date_to:
             query = query.filter(Booking.departure_time <= departure_date_to)
         
-        # Get total count
-        total_count = query.count()
+        total_count, total_is_estimate = count_total(query, total_mode)
 
-        # Order by created_at descending (newest first)
-        query = query.order_by(Booking.created_at.desc())
+        # Newest first; a cursor takes precedence over the page number
+        rows, next_cursor = keyset_page(
+            query, Booking.created_at, Booking.id, common_params.page_size,
+            cursor=parsed_cursor, offset=common_params.offset
+        )
 
-        # Apply pagination
-        bookings = query.offset(common_params.offset).limit(common_params.page_size).all()
-        
         # Calculate pagination info
-        total_pages = (total_count + common_params.page_size - 1) // common_params.page_size
-        
+        total_pages = None
+        if total_count is not None:
+            total_pages = (total_count + common_params.page_size - 1) // common_params.page_size
+
+        if view == "summary":
+            bookings = [BookingSummaryResponse.model_validate(row) for row in rows]
+        else:
+            bookings = [booking_to_response(booking) for booking in rows]
+
         return BookingListResponse(
-            bookings=[booking_to_response(booking) for booking in bookings],
+            bookings=bookings,
             total_count=total_count,
+            total_is_estimate=total_is_estimate,
             page=common_params.page,
             page_size=common_params.page_size,
-            total_pages=total_pages
+            total_pages=total_pages,
+            next_cursor=next_cursor
         )
         
     except Exception as e:
@@ -1034,12 +1200,21 @@ async def lookup_booking(
     Requires both booking reference and contact email for verification.
     """
     try:
-        booking = db.query(Booking).filter(
-            and_(
-                Booking.booking_reference == booking_reference,
-                Booking.contact_email == email.lower()
-            )
-        ).first()
+        cached = booking_read_cache.get_by_reference(booking_reference)
+        if cached:
+            access, body = cached
+            if access["contact_email"] != email.lower():
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Booking not found or email does not match"
+                )
+            return _cached_response(body)
+
+        booking = _load_booking_detail(
+            db,
+            Booking.booking_reference == booking_reference,
+            Booking.contact_email == email.lower()
+        )
 
         if not booking:
             raise HTTPException(
@@ -1047,7 +1222,8 @@ async def lookup_booking(
                 detail="Booking not found or email does not match"
             )
 
-        return booking_to_response(booking)
+        response, _ = _cache_booking_response(db, booking)
+        return response
 
     except HTTPException:
         raise
@@ -1070,29 +1246,26 @@ async def get_booking(
     Returns detailed information about a specific booking.
     """
     try:
-        # Use selectinload to eagerly load relationships and avoid N+1 queries
-        booking = db.query(Booking).options(
-            selectinload(Booking.passengers),
-            selectinload(Booking.vehicles),
-            selectinload(Booking.meals),
-            selectinload(Booking.booking_cabins).selectinload(BookingCabin.cabin),
-            selectinload(Booking.cabin),
-            selectinload(Booking.return_cabin),
-        ).filter(Booking.id == booking_id).first()
-        if not booking:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Booking not found"
-            )
+        cached = booking_read_cache.get_by_id(booking_id)
+        if cached:
+            access, body = cached
+        else:
+            booking = _load_booking_detail(db, Booking.id == booking_id)
+            if not booking:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Booking not found"
+                )
+            response, access = _cache_booking_response(db, booking)
 
         # Check access permissions
-        if not validate_booking_access(booking_id, current_user, db):
+        if not booking_read_cache.can_view(access, current_user):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Access denied"
             )
 
-        return booking_to_response(booking)
+        return _cached_response(body) if cached else response
         
     except HTTPException:
         raise
@@ -1147,6 +1320,7 @@ async def update_booking(
         booking.updated_at = datetime.utcnow()
         db.commit()
         db.refresh(booking)
+        booking_read_cache.invalidate_booking(booking)
 
         return booking_to_response(booking)
         
@@ -1239,6 +1413,7 @@ async def quick_update_booking(
 
         booking.updated_at = datetime.utcnow()
         db.commit()
+        booking_read_cache.invalidate_booking(booking)
 
         return {"success": True, "message": "Booking updated successfully"}
 
@@ -1308,6 +1483,18 @@ async def add_cabin_to_booking(
                 detail="Cabin not found"
             )
 
+        # Reserve the cabin on the sailing (row stays locked until commit)
+        try:
+            inventory_service.reserve_cabins(
+                db, booking, cabin_request.quantity, return_leg=cabin_request.journey_type == 'return'
+            )
+        except SoldOutError as e:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=str(e)
+            )
+
         # Calculate cabin price
         from decimal import Decimal
         unit_price = Decimal(str(cabin.base_price))
@@ -1397,6 +1584,7 @@ async def add_cabin_to_booking(
 
         db.commit()
         db.refresh(booking)
+        booking_read_cache.invalidate_booking(booking)
 
         logger.info(f"Added cabin {cabin_request.cabin_id} x{cabin_request.quantity} to booking {booking.booking_reference} ({cabin_request.journey_type}) - BookingCabin ID: {booking_cabin.id}")
 
@@ -1604,12 +1792,14 @@ async def cancel_booking(
         booking.cancellation_reason = cancellation_data.reason
         booking.cancelled_at = datetime.utcnow()
         booking.updated_at = datetime.utcnow()
+        inventory_service.release_booking(db, booking)
         if total_refund_amount > 0:
             booking.refund_amount = total_refund_amount
             booking.refund_processed = refunds_processed > 0
 
         db.commit()
         db.refresh(booking)
+        booking_read_cache.invalidate_booking(booking)
 
         # Invalidate cache for this sailing (ferry now has more capacity)
         try:
@@ -1784,20 +1974,21 @@ async def get_booking_by_reference(
     and contact email for verification.
     """
     try:
-        # Use selectinload to eagerly load relationships and avoid N+1 queries
-        booking = db.query(Booking).options(
-            selectinload(Booking.passengers),
-            selectinload(Booking.vehicles),
-            selectinload(Booking.meals),
-            selectinload(Booking.booking_cabins).selectinload(BookingCabin.cabin),
-            selectinload(Booking.cabin),
-            selectinload(Booking.return_cabin),
-        ).filter(
-            and_(
-                Booking.booking_reference == booking_reference,
-                Booking.contact_email == email
-            )
-        ).first()
+        cached = booking_read_cache.get_by_reference(booking_reference)
+        if cached:
+            access, body = cached
+            if access["contact_email"] != email:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Booking not found or email doesn't match"
+                )
+            return _cached_response(body)
+
+        booking = _load_booking_detail(
+            db,
+            Booking.booking_reference == booking_reference,
+            Booking.contact_email == email
+        )
 
         if not booking:
             raise HTTPException(
@@ -1805,7 +1996,8 @@ async def get_booking_by_reference(
                 detail="Booking not found or email doesn't match"
             )
 
-        return booking_to_response(booking)
+        response, _ = _cache_booking_response(db, booking)
+        return response
         
     except HTTPException:
         raise
@@ -1840,9 +2032,12 @@ async def expire_pending_bookings(
             booking.status = BookingStatusEnum.CANCELLED
             booking.cancellation_reason = "Booking expired - payment not received within 3 days"
             booking.cancelled_at = datetime.utcnow()
+            inventory_service.release_booking(db, booking)
             expired_count += 1
 
+        expired_keys = [(booking.id, booking.booking_reference) for booking in expired_bookings]
         db.commit()
+        booking_read_cache.invalidate_many(expired_keys)
 
         return {
             "message": f"Expired {expired_count} pending booking(s)",
@@ -1859,6 +2054,7 @@ async def expire_pending_bookings(
 
 @router.get("/{booking_id}/invoice")
 async def get_booking_invoice(
+    request: Request,
     booking_id: int,
     current_user: Optional[User] = Depends(get_optional_current_user),
     db: Session = Depends(get_db)
@@ -1869,7 +2065,6 @@ async def get_booking_invoice(
     Only available for paid bookings. User must own the booking or be admin.
     """
     try:
-        import io
 
         # Get booking
         booking = db.query(Booking).filter(Booking.id == booking_id).first()
@@ -1992,24 +2187,19 @@ async def get_booking_invoice(
             'card_last_four': payment.card_last_four,
         }
 
-        # Generate PDF
-        pdf_content = invoice_service.generate_invoice(
-            booking=booking_data,
-            payment=payment_data,
-            passengers=passengers,
-            vehicles=vehicles,
-            meals=meals
-        )
-
-        # Return as downloadable file
-        filename = f"invoice_{booking.booking_reference}.pdf"
-
-        return StreamingResponse(
-            io.BytesIO(pdf_content),
-            media_type="application/pdf",
-            headers={
-                "Content-Disposition": f"attachment; filename={filename}"
-            }
+        # Serve from the document cache (rendered once per booking version)
+        return await _pdf_response(
+            request,
+            invoice_service.invoice_cache_key(booking_data, payment_data, passengers, vehicles, meals),
+            "invoice",
+            {
+                "booking": booking_data,
+                "payment": payment_data,
+                "passengers": passengers,
+                "vehicles": vehicles,
+                "meals": meals
+            },
+            f"invoice_{booking.booking_reference}.pdf"
         )
 
     except HTTPException:
@@ -2024,6 +2214,7 @@ async def get_booking_invoice(
 
 @router.get("/{booking_id}/cabin-upgrade-invoice")
 async def get_cabin_upgrade_invoice(
+    request: Request,
     booking_id: int,
     current_user: Optional[User] = Depends(get_optional_current_user),
     db: Session = Depends(get_db)
@@ -2035,7 +2226,6 @@ async def get_cabin_upgrade_invoice(
     User must own the booking or be admin.
     """
     try:
-        import io
 
         # Get booking
         booking = db.query(Booking).filter(Booking.id == booking_id).first()
@@ -2170,22 +2360,17 @@ async def get_cabin_upgrade_invoice(
             'card_last_four': payment.card_last_four,
         }
 
-        # Generate PDF using cabin upgrade invoice generator
-        pdf_content = invoice_service.generate_cabin_upgrade_invoice(
-            booking=booking_data,
-            cabin_data=cabin_data,
-            payment=payment_data
-        )
-
-        # Return as downloadable file
-        filename = f"cabin_upgrade_invoice_{booking.booking_reference}.pdf"
-
-        return StreamingResponse(
-            io.BytesIO(pdf_content),
-            media_type="application/pdf",
-            headers={
-                "Content-Disposition": f"attachment; filename={filename}"
-            }
+        # Serve from the document cache (rendered once per booking version)
+        return await _pdf_response(
+            request,
+            invoice_service.cabin_upgrade_invoice_cache_key(booking_data, cabin_data, payment_data),
+            "cabin_upgrade_invoice",
+            {
+                "booking": booking_data,
+                "cabin_data": cabin_data,
+                "payment": payment_data
+            },
+            f"cabin_upgrade_invoice_{booking.booking_reference}.pdf"
         )
 
     except HTTPException:
@@ -2200,6 +2385,7 @@ async def get_cabin_upgrade_invoice(
 
 @router.get("/{booking_id}/eticket")
 async def get_booking_eticket(
+    request: Request,
     booking_id: int,
     current_user: Optional[User] = Depends(get_optional_current_user),
     db: Session = Depends(get_db)
@@ -2211,7 +2397,6 @@ async def get_booking_eticket(
     The E-Ticket includes a QR code for check-in at the port.
     """
     try:
-        import io
         from app.services.eticket_service import eticket_service
 
         # Get booking
@@ -2289,22 +2474,17 @@ async def get_booking_eticket(
                 'license_plate': v.license_plate,
             })
 
-        # Generate E-Ticket PDF
-        pdf_content = eticket_service.generate_eticket(
-            booking=booking_data,
-            passengers=passengers,
-            vehicles=vehicles
-        )
-
-        # Return as downloadable file
-        filename = f"eticket_{booking.booking_reference}.pdf"
-
-        return StreamingResponse(
-            io.BytesIO(pdf_content),
-            media_type="application/pdf",
-            headers={
-                "Content-Disposition": f"attachment; filename={filename}"
-            }
+        # Serve from the document cache (rendered once per booking version)
+        return await _pdf_response(
+            request,
+            eticket_service.eticket_cache_key(booking_data, passengers, vehicles),
+            "eticket",
+            {
+                "booking": booking_data,
+                "passengers": passengers,
+                "vehicles": vehicles
+            },
+            f"eticket_{booking.booking_reference}.pdf"
         )
 
     except HTTPException:
@@ -2319,6 +2499,7 @@ async def get_booking_eticket(
 
 @router.get("/reference/{booking_reference}/eticket")
 async def get_booking_eticket_by_reference(
+    request: Request,
     booking_reference: str,
     email: Optional[str] = Query(None, description="Contact email for verification"),
     db: Session = Depends(get_db)
@@ -2329,7 +2510,6 @@ async def get_booking_eticket_by_reference(
     For guest bookings, email verification is required.
     """
     try:
-        import io
         from app.services.eticket_service import eticket_service
 
         # Find booking by reference
@@ -2410,22 +2590,17 @@ async def get_booking_eticket_by_reference(
                 'license_plate': v.license_plate,
             })
 
-        # Generate E-Ticket PDF
-        pdf_content = eticket_service.generate_eticket(
-            booking=booking_data,
-            passengers=passengers,
-            vehicles=vehicles
-        )
-
-        # Return as downloadable file
-        filename = f"eticket_{booking.booking_reference}.pdf"
-
-        return StreamingResponse(
-            io.BytesIO(pdf_content),
-            media_type="application/pdf",
-            headers={
-                "Content-Disposition": f"attachment; filename={filename}"
-            }
+        # Serve from the document cache (rendered once per booking version)
+        return await _pdf_response(
+            request,
+            eticket_service.eticket_cache_key(booking_data, passengers, vehicles),
+            "eticket",
+            {
+                "booking": booking_data,
+                "passengers": passengers,
+                "vehicles": vehicles
+            },
+            f"eticket_{booking.booking_reference}.pdf"
         )
 
     except HTTPException:
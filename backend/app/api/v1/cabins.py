@@ -3,6 +3,7 @@ Cabin API endpoints for ferry accommodations.
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from pydantic import BaseModel
@@ -15,6 +16,8 @@ from app.models.booking import Booking, BookingCabin, JourneyTypeEnum
 from app.models.availability_alert import AvailabilityAlert
 from app.schemas.cabin import CabinCreate, CabinUpdate, CabinResponse
 from app.api.deps import get_admin_user, get_optional_current_user
+from app.services.booking_read_cache import booking_read_cache
+from app.services.inventory_service import inventory_service, SoldOutError
 from app.models.user import User
 
 logger = logging.getLogger(__name__)
@@ -37,6 +40,13 @@ class AddCabinResponse(BaseModel):
     total_price: float = 0
 
 
+def _bookings_showing_cabin(db: Session, cabin_id: int) -> List[tuple]:
+    """(ID, reference) of bookings whose cached responses embed this cabin."""
+    return db.query(Booking.id, Booking.booking_reference).filter(
+        or_(Booking.cabin_id == cabin_id, Booking.return_cabin_id == cabin_id)
+    ).all()
+
+
 @router.get("", response_model=List[CabinResponse])
 async def list_cabins(
     db: Session = Depends(get_db),
@@ -205,8 +215,10 @@ async def update_cabin(
     for field, value in update_data.items():
         setattr(cabin, field, value)
 
+    affected_bookings = _bookings_showing_cabin(db, cabin_id)
     db.commit()
     db.refresh(cabin)
+    booking_read_cache.invalidate_many(affected_bookings)
 
     return cabin
 
@@ -281,6 +293,16 @@ async def add_cabin_to_booking(
             detail="Cabin not found"
         )
 
+    # Reserve the cabin on the sailing (row stays locked until commit)
+    try:
+        inventory_service.reserve_cabins(db, booking, request.quantity, return_leg=request.journey_type == "return")
+    except SoldOutError as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+
     # Determine journey type
     journey_type_enum = JourneyTypeEnum.RETURN if request.journey_type == "return" else JourneyTypeEnum.OUTBOUND
 
@@ -312,8 +334,10 @@ async def add_cabin_to_booking(
             alert.notified_at = datetime.utcnow()
             logger.info(f"Marked alert {request.alert_id} as fulfilled")
 
+    booking_reference = booking.booking_reference
     db.commit()
     db.refresh(booking_cabin)
+    booking_read_cache.invalidate(booking_id, booking_reference)
 
     logger.info(f"Added cabin {request.cabin_id} to booking {booking_id} (alert: {request.alert_id})")
 
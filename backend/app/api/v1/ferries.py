@@ -5,7 +5,7 @@ Ferry API endpoints for searching ferries, routes, and schedules.
 import time
 import logging
 from typing import Optional
-from datetime import datetime, date
+from datetime import datetime, date, timezone
 
 logger = logging.getLogger(__name__)
 
@@ -88,12 +88,20 @@ router = APIRouter()
 ferry_service = FerryService()
 
 
+def _result_field(result, name: str):
+    """Read a field from a cached result dict or a FerryResult."""
+    if isinstance(result, dict):
+        return result.get(name)
+    return getattr(result, name, None)
+
+
 async def adjust_availability_from_bookings(results: list) -> list:
     """
     Adjust cabin and passenger availability based on our actual bookings.
 
     This subtracts booked cabins/passengers from the operator's reported availability
-    to reflect our platform's bookings.
+    to reflect our platform's bookings. Results may be cached dicts or
+    FerryResult objects; both are updated in place.
     """
     from app.database import SessionLocal
     from app.models.booking import Booking, BookingCabin, BookingStatusEnum
@@ -106,7 +114,7 @@ async def adjust_availability_from_bookings(results: list) -> list:
         db = SessionLocal()
 
         # Get all sailing IDs from results
-        sailing_ids = [r.get("sailing_id") for r in results if r.get("sailing_id")]
+        sailing_ids = [_result_field(r, "sailing_id") for r in results if _result_field(r, "sailing_id")]
 
         if not sailing_ids:
             db.close()
@@ -160,14 +168,14 @@ async def adjust_availability_from_bookings(results: list) -> list:
 
         # Adjust results
         for result in results:
-            sailing_id = result.get("sailing_id")
+            sailing_id = _result_field(result, "sailing_id")
             if not sailing_id:
                 continue
 
             # Adjust cabin availability
             if sailing_id in cabin_booked:
                 booked = cabin_booked[sailing_id]
-                cabin_types = result.get("cabin_types", [])
+                cabin_types = _result_field(result, "cabin_types") or []
                 for cabin in cabin_types:
                     if cabin.get("type") not in ("deck", "seat", "reclining_seat"):
                         # Distribute booked cabins proportionally (simplified)
@@ -179,11 +187,11 @@ async def adjust_availability_from_bookings(results: list) -> list:
             if sailing_id in passenger_booked:
                 booked_pax, booked_vehicles = passenger_booked[sailing_id]
 
-                spaces = result.get("available_spaces", {})
+                # Updated in place on both dicts and FerryResults
+                spaces = _result_field(result, "available_spaces") or {}
                 if spaces:
                     spaces["passengers"] = max(0, spaces.get("passengers", 0) - booked_pax)
                     spaces["vehicles"] = max(0, spaces.get("vehicles", 0) - booked_vehicles)
-                    result["available_spaces"] = spaces
 
         logger.info(f"📊 Adjusted availability for {len(results)} results (cabins: {len(cabin_booked)}, passengers: {len(passenger_booked)} sailings)")
         return results
@@ -193,6 +201,30 @@ async def adjust_availability_from_bookings(results: list) -> list:
         return results
 
 
+def _departs_after(departure_time, min_departure_time: datetime) -> bool:
+    """
+    Check a result's departure time (datetime or ISO string) against a cutoff.
+
+    Results whose departure time cannot be parsed are kept.
+    """
+    if isinstance(departure_time, str):
+        try:
+            # Parse departure time (handle both ISO format and datetime string)
+            if "T" in departure_time:
+                departure_time = datetime.fromisoformat(departure_time.replace("Z", "+00:00"))
+            else:
+                departure_time = datetime.strptime(departure_time, "%Y-%m-%d %H:%M:%S")
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Could not parse departure time '{departure_time}': {e}")
+            return True
+    if not isinstance(departure_time, datetime):
+        return True
+    # Compare operator times as naive UTC
+    if departure_time.tzinfo is not None:
+        departure_time = departure_time.astimezone(timezone.utc).replace(tzinfo=None)
+    return departure_time >= min_departure_time
+
+
 @router.post("/search", response_model=FerrySearchResponse)
 async def search_ferries(
     search_params: FerrySearch
@@ -203,13 +235,18 @@ async def search_ferries(
     This endpoint searches all configured ferry operators for available
     sailings based on the provided search criteria.
 
-    Results are cached for 5 minutes to improve performance.
+    Results are cached for 5 minutes to improve performance. Responses are
+    written straight to JSON bytes with orjson (FerryResult dataclasses on a
+    miss, cached dicts on a hit) instead of being re-validated through
+    FerrySearchResponse; response_model only documents the shape.
     """
     try:
         start_time = time.time()
 
         # Try to get from cache first
         from app.services.cache_service import cache_service
+        from app.responses import FastJSONResponse
+        from datetime import timedelta
 
         cache_params = {
             "departure_port": search_params.departure_port,
@@ -226,47 +263,38 @@ async def search_ferries(
         }
 
         logger.info(f"🔑 Ferry search cache key params: {cache_params}")
+
+        # Feed the background cache warmer (cache hits count too)
+        from app.services.cache_warmer_service import search_demand
+        search_demand.record_search(cache_params)
+
+        # Echo the request's own params (orjson serializes dates and enums)
+        search_params_dict = search_params.model_dump()
+
+        # Filter out departures that have already passed (with 1 hour buffer for check-in)
+        min_departure_time = datetime.utcnow() + timedelta(hours=1)
+
         cached_response = cache_service.get_ferry_search(cache_params)
         if cached_response:
-            # Fix old cached data with vehicles as integer instead of list
-            if cached_response.get("search_params") and isinstance(cached_response["search_params"].get("vehicles"), int):
-                logger.warning(f"⚠️ Found old cache format with vehicles={cached_response['search_params']['vehicles']}, converting to list")
-                cached_response["search_params"]["vehicles"] = []
-
-            # Filter out past departures from cached results (with 1 hour buffer)
-            from datetime import datetime, timedelta
-            now = datetime.utcnow()
-            min_departure_time = now + timedelta(hours=1)
-
-            if cached_response.get("results"):
-                filtered_cached = []
-                for result in cached_response["results"]:
-                    departure_time_str = result.get("departure_time")
-                    if departure_time_str:
-                        try:
-                            if "T" in departure_time_str:
-                                departure_time = datetime.fromisoformat(departure_time_str.replace("Z", "+00:00").replace("+00:00", ""))
-                            else:
-                                departure_time = datetime.strptime(departure_time_str, "%Y-%m-%d %H:%M:%S")
-                            if departure_time >= min_departure_time:
-                                filtered_cached.append(result)
-                        except (ValueError, TypeError):
-                            filtered_cached.append(result)
-                    else:
-                        filtered_cached.append(result)
-                cached_response["results"] = filtered_cached
-                cached_response["total_results"] = len(filtered_cached)
+            cached_results = [
+                result for result in cached_response.get("results", [])
+                if _departs_after(result.get("departure_time"), min_departure_time)
+            ]
 
             # Adjust availability based on our bookings (even for cached results)
-            if cached_response.get("results"):
-                cached_response["results"] = await adjust_availability_from_bookings(cached_response["results"])
-                cached_response["total_results"] = len(cached_response["results"])
+            if cached_results:
+                cached_results = await adjust_availability_from_bookings(cached_results)
 
-            # Add cache hit indicator
-            cached_response["cached"] = True
-            cached_response["cache_age_ms"] = (time.time() - start_time) * 1000
             logger.info(f"✅ Cache HIT for ferry search ({(time.time() - start_time)*1000:.0f}ms)")
-            return FerrySearchResponse(**cached_response)
+            return FastJSONResponse({
+                "results": cached_results,
+                "total_results": len(cached_results),
+                "search_params": search_params_dict,
+                "operators_searched": cached_response.get("operators_searched", []),
+                "search_time_ms": cached_response.get("search_time_ms"),
+                "cached": True,
+                "cache_age_ms": (time.time() - start_time) * 1000
+            })
 
         logger.info(f"❌ Cache MISS for ferry search - fetching from operators")
 
@@ -291,70 +319,39 @@ async def search_ferries(
         # Get list of operators that were actually searched
         operators_searched = search_params.operators or ferry_service.get_available_operators()
 
-        # Convert FerryResult objects to dictionaries for Pydantic validation
-        results_dict = [result.to_dict() for result in results]
-
-        # Filter out departures that have already passed (with 1 hour buffer for check-in)
-        from datetime import datetime, timedelta
-        now = datetime.utcnow()
-        min_departure_time = now + timedelta(hours=1)
-
-        filtered_results = []
-        for result in results_dict:
-            departure_time_str = result.get("departure_time")
-            if departure_time_str:
-                try:
-                    # Parse departure time (handle both ISO format and datetime string)
-                    if "T" in departure_time_str:
-                        departure_time = datetime.fromisoformat(departure_time_str.replace("Z", "+00:00").replace("+00:00", ""))
-                    else:
-                        departure_time = datetime.strptime(departure_time_str, "%Y-%m-%d %H:%M:%S")
-
-                    # Only include future departures (with 1 hour buffer)
-                    if departure_time >= min_departure_time:
-                        filtered_results.append(result)
-                except (ValueError, TypeError) as e:
-                    # If parsing fails, include the result anyway
-                    logger.warning(f"Could not parse departure time '{departure_time_str}': {e}")
-                    filtered_results.append(result)
-            else:
-                # No departure time, include anyway
-                filtered_results.append(result)
-
-        results_dict = filtered_results
-
-        # Build response (cache RAW results before adjustment)
-        # Serialize search_params dates for caching
-        search_params_dict = search_params.dict()
-        if search_params_dict.get("departure_date"):
-            search_params_dict["departure_date"] = search_params_dict["departure_date"].isoformat()
-        if search_params_dict.get("return_date"):
-            search_params_dict["return_date"] = search_params_dict["return_date"].isoformat()
+        # FerryResult dataclasses are kept as-is: no to_dict() copy
+        results = [
+            result for result in results
+            if _departs_after(result.departure_time, min_departure_time)
+        ]
 
         response_dict = {
-            "results": results_dict,  # RAW unadjusted results for caching
-            "total_results": len(results_dict),
+            "results": results,  # RAW unadjusted results for caching
+            "total_results": len(results),
             "search_params": search_params_dict,
             "operators_searched": operators_searched,
             "search_time_ms": search_time,
             "cached": False
         }
 
-        # Cache the RAW results for 5 minutes (adjustment happens on read)
-        cache_service.set_ferry_search(cache_params, response_dict, ttl=300)
+        # Cache the RAW results for up to 5 minutes, no longer than the
+        # operator sailings they were composed from (adjustment happens on
+        # read). The entry is serialized here, before the adjustment below
+        # mutates the results' availability in place
+        cache_service.set_ferry_search(
+            cache_params, response_dict, ttl=ferry_service.search_cache_ttl(cache_params)
+        )
 
         logger.info(f"💾 Cached ferry search results ({search_time:.0f}ms)")
 
         # Now adjust availability based on our bookings (after caching raw results)
-        adjusted_results = await adjust_availability_from_bookings(results_dict)
+        adjusted_results = await adjust_availability_from_bookings(results)
 
-        # Return adjusted results (not the raw cached ones)
-        adjusted_response = {
+        return FastJSONResponse({
             **response_dict,
             "results": adjusted_results,
             "total_results": len(adjusted_results),
-        }
-        return FerrySearchResponse(**adjusted_response)
+        })
         
     except FerryAPIError as e:
         raise HTTPException(
@@ -844,8 +841,10 @@ async def get_date_prices(
     - Availability status
     """
     try:
-        from datetime import timedelta
+        from app.responses import FastJSONResponse
         from app.services.cache_service import cache_service
+        from app.services.cache_warmer_service import search_demand
+        from app.services.ferry_service import DATE_PRICES_CACHE_TTL
 
         # Check cache first (short TTL to balance performance vs freshness)
         cache_params = {
@@ -860,160 +859,39 @@ async def get_date_prices(
             "return_date": return_date.isoformat() if return_date else None
         }
 
+        search_demand.record_date_prices(cache_params)
+
+        # Returned as FastJSONResponse: this route has no response_model, so
+        # FastAPI would otherwise run jsonable_encoder over every day
         cached_result = cache_service.get_date_prices(cache_params)
         if cached_result:
             logger.info(f"✅ Returning cached date prices for {departure_port}→{arrival_port}")
-            return cached_result
+            return FastJSONResponse(cached_result)
 
         trip_type = f"round-trip (return: {return_date.isoformat()})" if return_date else "one-way"
         logger.info(f"🔍 Fetching date prices for {departure_port}→{arrival_port} on {center_date} ({trip_type}, A:{adults}, C:{children}, I:{infants})")
 
-        date_prices = []
-        start_date = center_date - timedelta(days=days_before)
-        end_date = center_date + timedelta(days=days_after)
-
-        current_date = start_date
-        while current_date <= end_date:
-            try:
-                # Try to get cached ferry search results first (5-min cache)
-                # This ensures calendar prices match the ferry list when both use cache
-                # Note: cache key uses integer for vehicles count
-                ferry_search_cache_params = {
-                    "departure_port": departure_port,
-                    "arrival_port": arrival_port,
-                    "departure_date": current_date.isoformat(),
-                    "return_date": return_date.isoformat() if return_date else None,
-                    "return_departure_port": None,
-                    "return_arrival_port": None,
-                    "adults": adults,
-                    "children": children,
-                    "infants": infants,
-                    "vehicles": 0,  # Integer count for cache key
-                    "operators": None
-                }
-
-                cached_ferry_results = cache_service.get_ferry_search(ferry_search_cache_params)
-
-                if cached_ferry_results:
-                    # Use cached results from ferry search
-                    results = [FerryResult(**r) for r in cached_ferry_results.get("results", [])]
-                    logger.info(f"  ✅ Calendar using cached ferry_search for {current_date.isoformat()} ({len(results)} ferries)")
-                else:
-                    # Cache miss - query operators directly
-                    # Pass return_date to get round-trip context pricing (if applicable)
-                    results = await ferry_service.search_ferries(
-                        departure_port=departure_port,
-                        arrival_port=arrival_port,
-                        departure_date=current_date,
-                        return_date=return_date,  # Include return context for accurate pricing
-                        adults=adults,
-                        children=children,
-                        infants=infants
-                    )
-                    logger.info(f"  ❌ Calendar queried operators for {current_date.isoformat()} ({len(results) if results else 0} ferries)")
-
-                    # Cache these results in ferry_search cache so subsequent searches use same data
-                    if results:
-                        results_dict = [r.to_dict() for r in results]
-
-                        # Build search_params dict matching FerrySearch schema
-                        search_params_for_response = {
-                            "departure_port": departure_port,
-                            "arrival_port": arrival_port,
-                            "departure_date": current_date.isoformat(),
-                            "return_date": return_date.isoformat() if return_date else None,
-                            "return_departure_port": None,
-                            "return_arrival_port": None,
-                            "adults": adults,
-                            "children": children,
-                            "infants": infants,
-                            "vehicles": [],  # List for response schema
-                            "operators": None,
-                            "passengers": None
-                        }
-
-                        cache_response = {
-                            "results": results_dict,
-                            "search_params": search_params_for_response,
-                            "operators_searched": list(set([r.operator for r in results])),
-                            "total_results": len(results),
-                            "search_time_ms": 0,  # Already searched
-                            "cached": False
-                        }
-                        cache_service.set_ferry_search(ferry_search_cache_params, cache_response, ttl=300)
-                        logger.info(f"  💾 Calendar cached ferry_search for {current_date.isoformat()} (TTL: 5min)")
-
-                if results:
-                    # Calculate lowest per-adult price (to match results display)
-                    lowest_price = None
-                    prices_found = []
-                    for result in results:
-                        adult_price = result.prices.get("adult", 0)
-                        if adult_price > 0:
-                            prices_found.append(adult_price)
-                            if lowest_price is None or adult_price < lowest_price:
-                                lowest_price = adult_price
-
-                    # Debug logging
-                    if current_date.day == 1:  # Log for Dec 1 specifically
-                        logger.info(f"🔍 Date {current_date.isoformat()}: Found {len(results)} ferries")
-                        logger.info(f"   Adult prices: {prices_found}")
-                        logger.info(f"   Lowest: €{lowest_price}")
-
-                    date_prices.append({
-                        "date": current_date.isoformat(),
-                        "day_of_week": current_date.strftime("%a"),
-                        "day_of_month": current_date.day,
-                        "month": current_date.strftime("%b"),
-                        "lowest_price": round(lowest_price, 2) if lowest_price else None,
-                        "available": True,
-                        "num_ferries": len(results),
-                        "is_center_date": current_date == center_date
-                    })
-                else:
-                    # No ferries available
-                    date_prices.append({
-                        "date": current_date.isoformat(),
-                        "day_of_week": current_date.strftime("%a"),
-                        "day_of_month": current_date.day,
-                        "month": current_date.strftime("%b"),
-                        "lowest_price": None,
-                        "available": False,
-                        "num_ferries": 0,
-                        "is_center_date": current_date == center_date
-                    })
-            except Exception as e:
-                logger.warning(f"Error searching date {current_date}: {e}")
-                # Add as unavailable
-                date_prices.append({
-                    "date": current_date.isoformat(),
-                    "day_of_week": current_date.strftime("%a"),
-                    "day_of_month": current_date.day,
-                    "month": current_date.strftime("%b"),
-                    "lowest_price": None,
-                    "available": False,
-                    "num_ferries": 0,
-                    "is_center_date": current_date == center_date
-                })
-
-            current_date += timedelta(days=1)
-
-        response = {
-            "route": {
-                "departure_port": departure_port,
-                "arrival_port": arrival_port
-            },
-            "center_date": center_date.isoformat(),
-            "date_prices": date_prices,
-            "total_dates": len(date_prices)
-        }
+        # One date-range search per operator for the dates not already in the
+        # ferry_search cache; fetched days are written back to that cache so
+        # the calendar and the result list show the same prices
+        response = await ferry_service.build_date_prices(
+            departure_port=departure_port,
+            arrival_port=arrival_port,
+            center_date=center_date,
+            days_before=days_before,
+            days_after=days_after,
+            adults=adults,
+            children=children,
+            infants=infants,
+            return_date=return_date
+        )
 
         # Cache for 5 minutes to match ferry_search cache TTL
         # Individual dates check ferry_search cache first, so prices will be consistent
         # This whole response cache prevents re-querying when toggling week/month view
-        cache_service.set_date_prices(cache_params, response, ttl=300)
+        cache_service.set_date_prices(cache_params, response, ttl=DATE_PRICES_CACHE_TTL)
 
-        return response
+        return FastJSONResponse(response)
 
     except Exception as e:
         logger.error(f"Date prices endpoint error: {e}")
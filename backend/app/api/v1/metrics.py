@@ -35,6 +35,60 @@ REQUEST_LATENCY = Histogram(
     buckets=[0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
 )
 
+# Per-stage time within a request or Celery task (see app/tracing.py)
+STAGE_LATENCY = Histogram(
+    'maritime_stage_duration_seconds',
+    'Time spent per stage (cache, db, operator, serialize, total) of a request or task',
+    ['stage', 'operation'],
+    buckets=[0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0]
+)
+
+# Ferry operator API calls (recorded in BaseFerryIntegration)
+OPERATOR_CALLS = Counter(
+    'maritime_operator_calls_total',
+    'Ferry operator API calls by outcome (success, error, timeout)',
+    ['operator', 'call', 'outcome']
+)
+
+OPERATOR_CALL_LATENCY = Histogram(
+    'maritime_operator_call_duration_seconds',
+    'Ferry operator API call latency in seconds',
+    ['operator', 'call'],
+    buckets=[0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 10.0, 20.0, 30.0, 60.0]
+)
+
+OPERATOR_HTTP_RESPONSES = Counter(
+    'maritime_operator_http_responses_total',
+    'Ferry operator HTTP responses by status class',
+    ['operator', 'call', 'status_class']
+)
+
+OPERATOR_RESPONSE_BYTES = Histogram(
+    'maritime_operator_response_bytes',
+    'Ferry operator response body size in bytes',
+    ['operator', 'call'],
+    buckets=[256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304]
+)
+
+OPERATOR_SEARCH_RESULTS = Histogram(
+    'maritime_operator_search_results',
+    'Sailings returned per operator search',
+    ['operator'],
+    buckets=[0, 1, 2, 5, 10, 20, 50, 100, 200]
+)
+
+OPERATOR_HEDGES = Counter(
+    'maritime_operator_hedged_requests_total',
+    'Hedged operator requests (fired, won by the hedge, skipped for budget)',
+    ['operator', 'call', 'result']
+)
+
+OPERATOR_TIMEOUT_SECONDS = Gauge(
+    'maritime_operator_timeout_seconds',
+    'Client timeout applied to the latest operator call (adaptive)',
+    ['operator', 'call']
+)
+
 # Business metrics
 BOOKINGS_CREATED = Counter(
     'maritime_bookings_created_total',
@@ -48,6 +102,25 @@ PAYMENTS_PROCESSED = Counter(
     ['status', 'payment_method']
 )
 
+BOOKING_MAINTENANCE_DURATION = Histogram(
+    'maritime_booking_maintenance_duration_seconds',
+    'Duration of periodic booking maintenance runs',
+    ['task'],
+    buckets=[0.05, 0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 240.0]
+)
+
+BOOKING_MAINTENANCE_ROWS = Counter(
+    'maritime_booking_maintenance_rows_total',
+    'Bookings changed by periodic booking maintenance runs',
+    ['task']
+)
+
+IDEMPOTENT_REQUESTS = Counter(
+    'maritime_idempotent_requests_total',
+    'Requests carrying an Idempotency-Key, by outcome',
+    ['route', 'outcome']
+)
+
 ACTIVE_WEBSOCKET_CONNECTIONS = Gauge(
     'maritime_websocket_connections_active',
     'Number of active WebSocket connections'
@@ -141,6 +214,38 @@ def record_request(method: str, endpoint: str, status: int, duration: float):
     REQUEST_LATENCY.labels(method=method, endpoint=endpoint).observe(duration)
 
 
+def record_stage(stage: str, operation: str, duration: float):
+    """Record time spent in one stage of a request or task."""
+    STAGE_LATENCY.labels(stage=stage, operation=operation).observe(duration)
+
+
+def record_operator_call(operator: str, call: str, duration: float, outcome: str):
+    """Record one ferry operator API call."""
+    OPERATOR_CALLS.labels(operator=operator, call=call, outcome=outcome).inc()
+    OPERATOR_CALL_LATENCY.labels(operator=operator, call=call).observe(duration)
+
+
+def record_operator_response(operator: str, call: str, status: int, size: int):
+    """Record an operator HTTP response's status class and body size."""
+    OPERATOR_HTTP_RESPONSES.labels(operator=operator, call=call, status_class=f"{status // 100}xx").inc()
+    OPERATOR_RESPONSE_BYTES.labels(operator=operator, call=call).observe(size)
+
+
+def record_operator_results(operator: str, count: int):
+    """Record the number of sailings an operator search returned."""
+    OPERATOR_SEARCH_RESULTS.labels(operator=operator).observe(count)
+
+
+def record_operator_hedge(operator: str, call: str, result: str):
+    """Record a hedged operator request event."""
+    OPERATOR_HEDGES.labels(operator=operator, call=call, result=result).inc()
+
+
+def set_operator_timeout(operator: str, call: str, seconds: float):
+    """Set the client timeout used for an operator call type."""
+    OPERATOR_TIMEOUT_SECONDS.labels(operator=operator, call=call).set(seconds)
+
+
 def record_booking(status: str, route: str = "unknown"):
     """Record booking creation."""
     BOOKINGS_CREATED.labels(status=status, route=route).inc()
@@ -151,6 +256,17 @@ def record_payment(status: str, payment_method: str = "card"):
     PAYMENTS_PROCESSED.labels(status=status, payment_method=payment_method).inc()
 
 
+def record_booking_maintenance(task: str, duration: float, rows: int):
+    """Record one periodic booking maintenance run."""
+    BOOKING_MAINTENANCE_DURATION.labels(task=task).observe(duration)
+    BOOKING_MAINTENANCE_ROWS.labels(task=task).inc(rows)
+
+
+def record_idempotent_request(route: str, outcome: str):
+    """Record an Idempotency-Key request (stored, replayed, in_flight, mismatch, not_stored, bypassed)."""
+    IDEMPOTENT_REQUESTS.labels(route=route, outcome=outcome).inc()
+
+
 def set_websocket_connections(count: int):
     """Set active WebSocket connection count."""
     ACTIVE_WEBSOCKET_CONNECTIONS.set(count)
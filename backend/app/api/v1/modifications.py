@@ -20,6 +20,7 @@ from app.schemas.modification import (
     ConfirmModificationResponse,
     ModificationHistoryResponse,
 )
+from app.services.booking_read_cache import booking_read_cache
 from app.services.modification_rules import ModificationRules
 
 router = APIRouter()
@@ -170,6 +171,7 @@ async def quick_update_booking(
         # Commit changes
         db.commit()
         db.refresh(booking)
+        booking_read_cache.invalidate_booking(booking)
 
         return QuickUpdateResponse(
             success=True,
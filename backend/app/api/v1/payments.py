@@ -29,6 +29,7 @@ from app.schemas.payment import (
 from app.api.v1.auth import get_current_active_user
 from app.api.deps import get_optional_current_user
 from app.services.email_service import email_service
+from app.services.booking_read_cache import booking_read_cache
 from app.models.meal import BookingMeal
 
 # Load environment variables (skip in testing mode)
@@ -39,6 +40,9 @@ router = APIRouter()
 
 # Configure Stripe
 stripe.api_key = os.getenv("STRIPE_SECRET_KEY")
+# Load tests point Stripe at the operator simulator (see loadtest/)
+if os.getenv("STRIPE_API_BASE"):
+    stripe.api_base = os.getenv("STRIPE_API_BASE")
 
 
 @router.post("/create-intent", response_model=PaymentIntent)
@@ -138,6 +142,7 @@ async def create_payment_intent(
             # Update booking status to confirmed
             booking.status = BookingStatusEnum.CONFIRMED
             db.commit()
+            booking_read_cache.invalidate_booking(booking)
 
             return PaymentIntent(
                 client_secret="free_booking",
@@ -336,6 +341,8 @@ async def confirm_payment(
 
         # Get the booking for response
         booking = db.query(Booking).filter(Booking.id == payment.booking_id).first()
+        if booking:
+            booking_read_cache.invalidate_booking(booking)
 
         # Get receipt URL from latest charge
         receipt_url = None
@@ -582,6 +589,8 @@ async def stripe_webhook(
                     booking.payment_status = "PAID"
 
                 db.commit()
+                if booking:
+                    booking_read_cache.invalidate_booking(booking)
 
         elif event_type == "payment_intent.payment_failed":
             # Payment failed
@@ -621,6 +630,8 @@ async def stripe_webhook(
                     booking.refund_amount = refund_amount
 
                 db.commit()
+                if booking:
+                    booking_read_cache.invalidate_booking(booking)
 
                 # Send refund confirmation email
                 if booking:
@@ -26,6 +26,8 @@ from app.services.price_prediction_service import (
     PredictionResult,
     PriceInsight,
 )
+from app.services.fare_calendar_service import FareCalendarService, month_bounds
+from app.services.ferry_service import get_ferry_service
 
 router = APIRouter()
 
@@ -242,42 +244,85 @@ def get_percentile_label(percentile: float) -> str:
     return "High price - consider waiting"
 
 
-# ============== API Endpoints ==============
+def calendar_days_from_grid(
+    calendar_data: dict,
+    year: int,
+    month: int,
+    passengers: int,
+) -> List[DayPrice]:
+    """Build calendar days from a cached per-person grid, scaled for passengers."""
+    _, num_days = calendar.monthrange(year, month)
+    days = []
 
-@router.get("/calendar", response_model=FareCalendarResponse)
-async def get_fare_calendar(
-    departure_port: str = Query(..., description="Departure port code"),
-    arrival_port: str = Query(..., description="Arrival port code"),
-    year: Optional[int] = Query(None, ge=2024, le=2030, description="Year"),
-    month: Optional[int] = Query(None, ge=1, le=12, description="Month"),
-    year_month: Optional[str] = Query(None, description="Year-month in YYYY-MM format (alternative to year/month)"),
-    passengers: int = Query(1, ge=1, le=9, description="Number of passengers"),
-    db: Session = Depends(get_db),
-):
-    """
-    Get fare calendar for a specific month.
+    for day in range(1, num_days + 1):
+        departure_date = date(year, month, day)
+        entry = calendar_data.get(str(day))
 
-    Returns daily prices with availability and price level indicators.
-    Uses cached data when available, otherwise generates from current prices.
+        if not entry or entry.get("price") is None:
+            days.append(DayPrice(
+                date=departure_date.isoformat(),
+                day=day,
+                price=None,
+                available=False,
+                num_ferries=0,
+                is_weekend=departure_date.weekday() >= 5,
+            ))
+            continue
 
-    Accepts either:
-    - year and month as separate parameters, OR
-    - year_month as "YYYY-MM" string
+        price_for_passengers = round(entry["price"] * passengers, 2)
+        highest = entry.get("highest")
+        days.append(DayPrice(
+            date=departure_date.isoformat(),
+            day=day,
+            price=price_for_passengers,
+            lowest_price=price_for_passengers,
+            highest_price=round(highest * passengers, 2) if highest else price_for_passengers,
+            available=entry.get("available", True),
+            num_ferries=entry.get("ferries", 0),
+            trend=entry.get("trend"),
+            is_weekend=departure_date.weekday() >= 5,
+        ))
+
+    return days
+
+
+async def live_price_grid(
+    departure_port: str,
+    arrival_port: str,
+    start_date: date,
+    end_date: date,
+    passengers: int,
+) -> Optional[dict]:
     """
-    # Parse year_month if provided, otherwise use year/month
-    if year_month:
-        try:
-            parts = year_month.split("-")
-            year = int(parts[0])
-            month = int(parts[1])
-        except (ValueError, IndexError):
-            raise HTTPException(status_code=400, detail="Invalid year_month format. Use YYYY-MM")
+    Get per-day lowest per-person prices from the ferry operators.
 
-    if year is None or month is None:
-        raise HTTPException(status_code=400, detail="Either year/month or year_month is required")
+    Future dates only. Returns None when no operator integrations are
+    configured, so callers can fall back to estimated prices.
+    """
+    ferry_service = get_ferry_service()
+    if not ferry_service.get_available_operators():
+        return None
 
-    route_id = get_route_id(departure_port, arrival_port)
+    start_date = max(start_date, date.today())
+    if start_date > end_date:
+        return {}
 
+    return await ferry_service.get_min_price_grid(
+        departure_port=departure_port,
+        arrival_port=arrival_port,
+        start_date=start_date,
+        end_date=end_date,
+        adults=passengers,
+    )
+
+
+def generate_calendar_days(
+    route_id: str,
+    year: int,
+    month: int,
+    passengers: int,
+) -> List[DayPrice]:
+    """Generate calendar days on demand when no cached grid is available."""
     # Base prices for different routes (mock data)
     base_prices = {
         "marseille_tunis": 85,
@@ -288,13 +333,9 @@ async def get_fare_calendar(
     }
     base_price = base_prices.get(route_id, 85)
 
-    # Get number of days in month
     _, num_days = calendar.monthrange(year, month)
-    month_name = calendar.month_name[month]
-
     today = date.today()
     days = []
-    prices = []
 
     # For development/demo purposes, generate prices even for past dates
     # In production with real data, this would query actual ferry schedules
@@ -318,7 +359,6 @@ async def get_fare_calendar(
         # Generate mock price (use absolute value for past dates to maintain price generation)
         price = generate_mock_price(base_price, departure_date, abs(days_ahead) if days_ahead >= 0 else 30)
         price_for_passengers = price * passengers
-        prices.append(price_for_passengers)
 
         days.append(DayPrice(
             date=departure_date.isoformat(),
@@ -331,8 +371,59 @@ async def get_fare_calendar(
             is_weekend=departure_date.weekday() >= 5,
         ))
 
+    return days
+
+
+# ============== API Endpoints ==============
+
+@router.get("/calendar", response_model=FareCalendarResponse)
+async def get_fare_calendar(
+    departure_port: str = Query(..., description="Departure port code"),
+    arrival_port: str = Query(..., description="Arrival port code"),
+    year: Optional[int] = Query(None, ge=2024, le=2030, description="Year"),
+    month: Optional[int] = Query(None, ge=1, le=12, description="Month"),
+    year_month: Optional[str] = Query(None, description="Year-month in YYYY-MM format (alternative to year/month)"),
+    passengers: int = Query(1, ge=1, le=9, description="Number of passengers"),
+    db: Session = Depends(get_db),
+):
+    """
+    Get fare calendar for a specific month.
+
+    Returns daily prices with availability and price level indicators.
+    Serves the precomputed per-person grid from FareCalendarCache (scaled
+    by passengers) while it has not expired, otherwise generates on demand.
+
+    Accepts either:
+    - year and month as separate parameters, OR
+    - year_month as "YYYY-MM" string
+    """
+    # Parse year_month if provided, otherwise use year/month
+    if year_month:
+        try:
+            parts = year_month.split("-")
+            year = int(parts[0])
+            month = int(parts[1])
+        except (ValueError, IndexError):
+            raise HTTPException(status_code=400, detail="Invalid year_month format. Use YYYY-MM")
+
+    if year is None or month is None:
+        raise HTTPException(status_code=400, detail="Either year/month or year_month is required")
+
+    route_id = get_route_id(departure_port, arrival_port)
+
+    # Get number of days in month
+    _, num_days = calendar.monthrange(year, month)
+    month_name = calendar.month_name[month]
+
+    # Serve the precomputed per-person grid if fresh, else generate on demand
+    cached_grid = FareCalendarService(db).get_month(route_id, year, month)
+    if cached_grid:
+        days = calendar_days_from_grid(cached_grid.calendar_data, year, month, passengers)
+    else:
+        days = generate_calendar_days(route_id, year, month, passengers)
+
     # Calculate summary stats
-    valid_prices = [p for p in prices if p is not None]
+    valid_prices = [d.price for d in days if d.price is not None]
     if valid_prices:
         min_price = min(valid_prices)
         max_price = max(valid_prices)
@@ -533,46 +624,37 @@ async def flexible_dates_search(
     Search for prices across a flexible date range.
 
     Returns prices for dates around the selected date, sorted by price.
+    Prices come from one date-range search per operator (sharing the ferry
+    search cache); estimated prices are used only when no operator
+    integrations are configured.
     """
     route_id = get_route_id(departure_port, arrival_port)
     selected_date = date.fromisoformat(base_date)
-    today = date.today()
 
-    # Base price
-    base_prices = {
-        "marseille_tunis": 85,
-        "genoa_tunis": 95,
-        "civitavecchia_tunis": 90,
-    }
-    base_price = base_prices.get(route_id, 85)
-
-    results = []
-    selected_price = None
-
-    for offset in range(-flexibility, flexibility + 1):
-        check_date = selected_date + timedelta(days=offset)
-        days_ahead = (check_date - today).days
-
-        # For demo: allow dates within 1 year range
-        if days_ahead < -365 or days_ahead > 365:
-            continue
-
-        # Generate price (use abs for past dates)
-        price = generate_mock_price(base_price, check_date, abs(days_ahead) if days_ahead >= 0 else 30)
-        total_price = price * passengers
-
-        is_selected = offset == 0
-        if is_selected:
-            selected_price = total_price
-
-        results.append({
-            "date": check_date,
-            "day_name": check_date.strftime("%A"),
-            "price": total_price,
-            "is_selected": is_selected,
-            "available": True,
-            "num_ferries": 3 if check_date.weekday() < 5 else 2,
-        })
+    grid = await live_price_grid(
+        departure_port,
+        arrival_port,
+        selected_date - timedelta(days=flexibility),
+        selected_date + timedelta(days=flexibility),
+        passengers,
+    )
+    if grid is None:
+        results = estimate_flexible_prices(route_id, selected_date, flexibility, passengers)
+    else:
+        results = []
+        for check_date, day_prices in grid.items():
+            if day_prices["lowest_price"] is None:
+                continue
+            results.append({
+                "date": check_date,
+                "day_name": check_date.strftime("%A"),
+                "price": day_prices["lowest_price"] * passengers,
+                "is_selected": check_date == selected_date,
+                "available": day_prices["available"],
+                "num_ferries": day_prices["num_ferries"],
+            })
+
+    selected_price = next((r["price"] for r in results if r["is_selected"]), None)
 
     # Sort by price and find cheapest
     if not results:
@@ -609,6 +691,48 @@ async def flexible_dates_search(
     )
 
 
+def estimate_flexible_prices(
+    route_id: str,
+    selected_date: date,
+    flexibility: int,
+    passengers: int,
+) -> List[dict]:
+    """Estimate flexible-search prices when no operator can be queried."""
+    today = date.today()
+
+    # Base price
+    base_prices = {
+        "marseille_tunis": 85,
+        "genoa_tunis": 95,
+        "civitavecchia_tunis": 90,
+    }
+    base_price = base_prices.get(route_id, 85)
+
+    results = []
+
+    for offset in range(-flexibility, flexibility + 1):
+        check_date = selected_date + timedelta(days=offset)
+        days_ahead = (check_date - today).days
+
+        # For demo: allow dates within 1 year range
+        if days_ahead < -365 or days_ahead > 365:
+            continue
+
+        # Generate price (use abs for past dates)
+        price = generate_mock_price(base_price, check_date, abs(days_ahead) if days_ahead >= 0 else 30)
+
+        results.append({
+            "date": check_date,
+            "day_name": check_date.strftime("%A"),
+            "price": price * passengers,
+            "is_selected": offset == 0,
+            "available": True,
+            "num_ferries": 3 if check_date.weekday() < 5 else 2,
+        })
+
+    return results
+
+
 @router.get("/insights")
 async def get_price_insights(
     departure_port: str = Query(...),
@@ -666,10 +790,19 @@ async def get_price_insights(
             "all_time_high": insights.max_price_30d,
         },
         "patterns": {
-            "best_day_of_week": "Tuesday",
-            "worst_day_of_week": "Saturday",
+            "best_day_of_week": (
+                calendar.day_name[insights.cheapest_day_of_week]
+                if insights.cheapest_day_of_week is not None else "Tuesday"
+            ),
+            "worst_day_of_week": (
+                calendar.day_name[insights.most_expensive_day]
+                if insights.most_expensive_day is not None else "Saturday"
+            ),
             "best_booking_window": insights.best_booking_window,
-            "weekday_vs_weekend": 0.12,  # 12% weekend premium
+            # Weekend premium from rolling aggregates (12% until they exist)
+            "weekday_vs_weekend": (
+                insights.weekend_premium if insights.weekend_premium is not None else 0.12
+            ),
         },
         "current_status": {
             "current_price": insights.current_price,
@@ -693,14 +826,37 @@ async def get_cheapest_in_month(
     """
     Find the cheapest date in a month.
 
-    Quick endpoint for "cheapest in month" feature.
+    Quick endpoint for "cheapest in month" feature. Uses one date-range
+    operator search for the remaining days of the month; the fare calendar
+    is used when no operator integrations are configured.
     """
+    route_id = get_route_id(departure_port, arrival_port)
+    first_day, last_day = month_bounds(year, month)
+
+    grid = await live_price_grid(departure_port, arrival_port, first_day, last_day, passengers)
+    if grid is not None:
+        priced = [(d, p) for d, p in grid.items() if p["lowest_price"] is not None]
+        if not priced:
+            raise HTTPException(status_code=404, detail="No available dates in this month")
+
+        cheapest_date, cheapest = min(priced, key=lambda item: (item[1]["lowest_price"], item[0]))
+        return {
+            "route_id": route_id,
+            "year": year,
+            "month": month,
+            "cheapest_date": cheapest_date.isoformat(),
+            "price": round(cheapest["lowest_price"] * passengers, 2),
+            "day_of_week": cheapest_date.strftime("%A"),
+            "num_ferries": cheapest["num_ferries"],
+        }
+
     # Get full calendar
     calendar_data = await get_fare_calendar(
         departure_port=departure_port,
         arrival_port=arrival_port,
         year=year,
         month=month,
+        year_month=None,
         passengers=passengers,
         db=db,
     )
@@ -3,7 +3,7 @@ Webhook endpoints for third-party integrations (Stripe, etc.)
 """
 
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 try:
     from fastapi import APIRouter, Request, HTTPException, status, Header
@@ -47,6 +47,56 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+def _enqueue_event(
+    event_id: Optional[str],
+    event_type: str,
+    payment_intent_id: str,
+    event_data: Dict[str, Any]
+) -> str:
+    """
+    Hand an event to the payment workers.
+
+    Events go to the Redis webhook stream (batched, per-booking ordered
+    processing, see services/webhook_stream_service.py) after dropping event
+    IDs already accepted. Without Redis they are queued as one Celery task each.
+
+    Returns:
+        "streamed", "duplicate" or "queued"
+    """
+    from app.services.webhook_stream_service import webhook_stream_service
+    from app.tasks.payment_tasks import process_payment_webhook_task, process_webhook_stream_task
+
+    if webhook_stream_service.is_available():
+        seen = False
+        try:
+            if event_id and not webhook_stream_service.mark_seen(event_id):
+                logger.info(f"🔁 Duplicate Stripe webhook {event_id} ({event_type}) ignored")
+                return "duplicate"
+            seen = bool(event_id)
+            shard = webhook_stream_service.append(event_id, event_type, payment_intent_id, event_data)
+        except Exception as e:
+            logger.warning(f"⚠️ Webhook stream unavailable, queuing task instead: {str(e)}")
+            if seen:
+                webhook_stream_service.forget(event_id)
+        else:
+            # Start a consumer for the shard (no-op if one is already draining it);
+            # the periodic drain picks the event up if this cannot be queued
+            try:
+                process_webhook_stream_task.delay(shard)
+            except Exception as e:
+                logger.warning(f"⚠️ Could not queue webhook stream consumer: {str(e)}")
+            logger.info(f"✅ Webhook {event_type} appended to stream shard {shard}")
+            return "streamed"
+
+    task = process_payment_webhook_task.delay(
+        event_type=event_type,
+        payment_intent_id=payment_intent_id,
+        event_data=event_data
+    )
+    logger.info(f"✅ Webhook task queued: task_id={task.id}")
+    return "queued"
+
+
 @router.post("/stripe")
 async def stripe_webhook(
     request: Request,
@@ -57,7 +107,8 @@ async def stripe_webhook(
 
     This endpoint receives webhook events from Stripe and processes them
     asynchronously using Celery workers. This ensures fast responses to Stripe
-    and decouples payment processing from email notifications.
+    and decouples payment processing from email notifications. Events Stripe
+    retries after they were accepted are acknowledged without reprocessing.
 
     Supported events:
     - payment_intent.succeeded: Payment completed successfully
@@ -95,9 +146,6 @@ async def stripe_webhook(
 
         logger.info(f"📨 Received Stripe webhook: {event_type}")
 
-        # Queue the webhook processing task asynchronously
-        from app.tasks.payment_tasks import process_payment_webhook_task
-
         # Extract payment intent ID
         payment_intent_id = None
         if event_type.startswith("payment_intent"):
@@ -105,16 +153,13 @@ async def stripe_webhook(
         elif event_type == "charge.refunded":
             payment_intent_id = event_data.get("payment_intent")
 
-        if payment_intent_id:
-            # Queue task and return immediately to Stripe
-            task = process_payment_webhook_task.delay(
-                event_type=event_type,
-                payment_intent_id=payment_intent_id,
-                event_data=event_data
-            )
-            logger.info(f"✅ Webhook task queued: task_id={task.id}")
-        else:
+        if not payment_intent_id:
             logger.warning(f"⚠️ No payment_intent_id found in event: {event_type}")
+        elif _enqueue_event(event.get("id"), event_type, payment_intent_id, event_data) == "duplicate":
+            return {
+                "status": "success",
+                "message": "Webhook already received"
+            }
 
         # Return 200 OK immediately to Stripe
         # Actual processing happens asynchronously in Celery worker
@@ -4,7 +4,7 @@ Celery application configuration for async task processing.
 import os
 import logging
 from celery import Celery
-from celery.signals import worker_init, beat_init
+from celery.signals import worker_init, beat_init, task_prerun, task_postrun
 from kombu import Queue
 
 logger = logging.getLogger(__name__)
@@ -27,6 +27,7 @@ celery_app = Celery(
         "app.tasks.price_alert_tasks",
         "app.tasks.price_tracking_tasks",
         "app.tasks.availability_sync_tasks",
+        "app.tasks.cache_warmer_tasks",
     ]
 )
 
@@ -88,6 +89,16 @@ celery_app.conf.update(
                 'expires': 300,  # Task expires after 5 minutes if not picked up
             }
         },
+        # Drain Stripe webhook streams
+        # Each webhook queues a consumer for its shard; this catches events whose
+        # consumer could not be queued and entries left by a dead consumer
+        'drain-webhook-streams': {
+            'task': 'app.tasks.payment_tasks.drain_webhook_streams',
+            'schedule': 15,  # 15 seconds
+            'options': {
+                'expires': 60,  # Task expires after 1 minute if not picked up
+            }
+        },
         # Check availability alerts
         # Testing: Every 1 minute for testing
         # Production: Change to 3600 (1 hour) or 7200 (2 hours)
@@ -108,11 +119,12 @@ celery_app.conf.update(
                 'expires': 7200,  # Task expires after 2 hours if not picked up
             }
         },
-        # Check for departure reminders (24h and 2h before departure)
-        # Runs every 15 minutes to catch bookings in the reminder windows
+        # Schedule departure reminders (24h and 2h before departure)
+        # Sends are queued with an ETA at the exact reminder time, so the scan
+        # only needs to run more often than REMINDER_LOOKAHEAD_SECONDS (45 min)
         'check-departure-reminders': {
             'task': 'app.tasks.reminder_tasks.check_departure_reminders',
-            'schedule': 900,  # 15 minutes in seconds
+            'schedule': 1800,  # 30 minutes in seconds
             'options': {
                 'expires': 600,  # Task expires after 10 minutes if not picked up
             }
@@ -167,6 +179,14 @@ celery_app.conf.update(
                 'expires': 3600,  # Task expires after 1 hour if not picked up
             }
         },
+        # Price tracking: Rebuild rolling price aggregates daily (drift correction)
+        'rebuild-price-aggregates': {
+            'task': 'app.tasks.price_tracking_tasks.rebuild_price_aggregates',
+            'schedule': 86400,  # 24 hours in seconds
+            'options': {
+                'expires': 7200,  # Task expires after 2 hours if not picked up
+            }
+        },
         # Price tracking: Update fare calendar cache every 4 hours
         'update-fare-calendar-cache': {
             'task': 'app.tasks.price_tracking_tasks.update_fare_calendar_cache',
@@ -183,6 +203,14 @@ celery_app.conf.update(
                 'expires': 7200,  # Task expires after 2 hours if not picked up
             }
         },
+        # Price tracking: Pre-create and drop monthly price_history partitions daily
+        'maintain-price-history-partitions': {
+            'task': 'app.tasks.price_tracking_tasks.maintain_price_history_partitions',
+            'schedule': 86400,  # 24 hours in seconds
+            'options': {
+                'expires': 7200,  # Task expires after 2 hours if not picked up
+            }
+        },
         # Real-time availability sync with external APIs
         # Runs every 2 minutes to detect changes made outside our platform
         'sync-external-availability': {
@@ -192,6 +220,14 @@ celery_app.conf.update(
                 'expires': 60,  # Task expires after 1 minute if not picked up
             }
         },
+        # Refresh popular search caches shortly before their 5 minute TTL runs out
+        'warm-search-cache': {
+            'task': 'app.tasks.cache_warmer_tasks.warm_search_cache',
+            'schedule': 60,  # Every minute
+            'options': {
+                'expires': 50,  # Skip a stale run rather than overlap the next one
+            }
+        },
     },
 )
 
@@ -272,3 +308,28 @@ def init_sentry_on_beat(**kwargs):
         logger.warning("sentry-sdk not installed for Celery Beat")
     except Exception as e:
         logger.error(f"Failed to initialize Sentry for Celery Beat: {e}")
+
+
+# Per-task traces: cache, db and operator stages of every task are timed
+# into the maritime_stage_duration_seconds histogram (see app/tracing.py)
+_task_traces = {}
+
+
+@task_prerun.connect
+def start_task_trace(task_id=None, task=None, **kwargs):
+    """Start a trace for the task about to run."""
+    from app.tracing import start_trace
+    _task_traces[task_id] = start_trace(task.name, task_id=task_id)
+
+
+@task_postrun.connect
+def finish_task_trace(task_id=None, task=None, state=None, **kwargs):
+    """Finish the task's trace and record its stage timings."""
+    from app.tracing import finish_trace
+    trace = finish_trace(
+        _task_traces.pop(task_id, None),
+        operation=task.name,
+        error=None if state in (None, "SUCCESS") else state,
+    )
+    if trace is not None:
+        logger.debug(f"⏱️ {task.name} stages: {trace.server_timing()}")
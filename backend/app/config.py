@@ -89,6 +89,26 @@ class Settings(BaseSettings):
     API_TIMEOUT: int = 30
     MAX_RETRIES: int = 3
     CACHE_TTL_MINUTES: int = 5
+
+    # Search cache warmer (refreshes popular ferry_search/date_prices entries)
+    CACHE_WARMER_ENABLED: bool = True
+    CACHE_WARMER_TOP_SEARCHES: int = 50  # Route/date pairs refreshed per cycle
+    CACHE_WARMER_TOP_DATE_PRICES: int = 20  # date_prices entries refreshed per cycle
+    CACHE_WARMER_OPERATOR_CALL_BUDGET: int = 200  # Max operator API calls per cycle
+    CACHE_WARMER_REFRESH_BEFORE_SECONDS: int = 90  # Refresh entries expiring within this window
+    SEARCH_DEMAND_WINDOW_HOURS: int = 24  # Search/booking counters considered for ranking
+
+    # Operator call SLOs and adaptive timeouts (see ferry_integrations/slo.py)
+    OPERATOR_SLO_WINDOW_SECONDS: int = 3600  # Rolling window for SLO reports and timeouts
+    OPERATOR_ADAPTIVE_TIMEOUTS: bool = True
+    OPERATOR_TIMEOUT_P99_MULTIPLIER: float = 2.0  # Timeout = observed p99 x multiplier...
+    OPERATOR_TIMEOUT_MIN_SECONDS: float = 5.0  # ...never below this, never above the static timeout
+    OPERATOR_TIMEOUT_MIN_SAMPLES: int = 100  # Calls needed in the window before adapting
+    OPERATOR_TIMEOUT_MAX_TIMEOUT_RATE: float = 0.02  # Revert to the static timeout above this
+    OPERATOR_TIMEOUT_REFRESH_SECONDS: int = 30
+    OPERATOR_HEDGING_ENABLED: bool = False  # Race a second search call when an operator is slow
+    OPERATOR_HEDGE_PERCENTILE: float = 90  # Hedge after the operator's observed p90...
+    OPERATOR_HEDGE_BUDGET_RATIO: float = 0.05  # ...for at most 5% extra calls
     
     # Logging
     LOG_LEVEL: str = "INFO"
@@ -100,6 +120,38 @@ class Settings(BaseSettings):
     SENTRY_TRACES_SAMPLE_RATE: float = 0.1
     SENTRY_PROFILES_SAMPLE_RATE: float = 0.1
 
+    # Request tracing (per-stage timings, Server-Timing header, stage histograms)
+    TRACING_ENABLED: bool = True
+    TRACING_EXPORTER: str = "none"  # none | file (local JSON lines) | otel (OpenTelemetry API)
+    TRACING_EXPORT_PATH: str = "logs/traces.jsonl"
+
+    # Pending booking expiry (see tasks/booking_tasks.expire_old_bookings_task)
+    BOOKING_EXPIRY_BATCH_SIZE: int = 500  # Bookings expired per UPDATE
+    BOOKING_EXPIRY_TIME_BUDGET_SECONDS: int = 120  # Leave the rest to the next run (soft limit is 240s)
+    BOOKING_COMPLETION_BATCH_SIZE: int = 1000  # Bookings completed per UPDATE (complete_past_bookings_task)
+
+    # Departure reminders (see tasks/reminder_tasks.check_departure_reminders)
+    REMINDER_LOOKAHEAD_SECONDS: int = 2700  # Schedule sends due within this; keep under the broker visibility timeout (1h)
+    REMINDER_LATE_GRACE_SECONDS: int = 1800  # Still send reminders this far past their time
+
+    # Stripe webhook stream (see services/webhook_stream_service.py)
+    STRIPE_WEBHOOK_SHARDS: int = 4  # Streams; events of one booking always share a stream
+    STRIPE_WEBHOOK_BATCH_SIZE: int = 50  # Events applied per DB transaction
+    STRIPE_WEBHOOK_DEDUPE_TTL_SECONDS: int = 259200  # Stripe retries an event for up to 3 days
+    STRIPE_WEBHOOK_STREAM_MAXLEN: int = 100000  # Approximate cap per stream
+
+    # Idempotency-Key support (see app/idempotency.py)
+    IDEMPOTENCY_TTL_SECONDS: int = 86400  # Keep stored responses for retries this long
+    IDEMPOTENCY_LOCK_SECONDS: int = 60  # In-flight lock; must outlast the slowest covered request
+
+    # Booking list pagination (see api/pagination.py)
+    LIST_COUNT_ESTIMATE_CAP: int = 1000  # total=estimate counts at most this many rows
+
+    # Booking detail read model (see services/booking_read_cache.py)
+    BOOKING_READ_CACHE_ENABLED: bool = True
+    BOOKING_READ_CACHE_TTL_SECONDS: int = 300  # Bounds staleness from writes that skip invalidation
+    BOOKING_READ_CACHE_INVALIDATION_HOLD_SECONDS: int = 10  # Refills blocked this long after a write
+
     # Celery Configuration
     CELERY_BROKER_URL: str = "redis://localhost:6379/1"
     CELERY_RESULT_BACKEND: str = "redis://localhost:6379/1"
@@ -107,6 +159,12 @@ class Settings(BaseSettings):
     # File Upload
     MAX_FILE_SIZE: int = 10485760  # 10MB
     UPLOAD_DIR: str = "uploads/"
+
+    # Generated PDF cache (e-tickets, invoices; see services/document_cache.py)
+    DOCUMENT_CACHE_ENABLED: bool = True
+    DOCUMENT_CACHE_DIR: str = "cache/documents"
+    DOCUMENT_CACHE_MAX_BYTES: int = 536870912  # 512MB, least recently used evicted beyond
+    PDF_RENDER_PROCESSES: int = 2  # Render pool size for API downloads (0 = thread pool)
     
     # Use model_config for pydantic-settings v2
     # Skip loading .env file in testing mode - tests set environment variables directly
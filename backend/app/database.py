@@ -6,6 +6,7 @@ from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.config import settings
+from app.tracing import instrument_sqlalchemy
 
 # Configure engine based on database type
 if settings.DATABASE_URL.startswith("sqlite"):
@@ -24,6 +25,9 @@ else:
         echo=settings.DEBUG
     )
 
+# Time every statement as a "db" stage of the current request/task trace
+instrument_sqlalchemy(engine)
+
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
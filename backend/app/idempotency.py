@@ -0,0 +1,238 @@
+"""
+Idempotency-Key support for booking and payment creation.
+
+Clients (mobile apps on flaky networks in particular) send an
+`Idempotency-Key` header with a value unique to the operation, e.g. a UUID
+generated when the user taps "Pay", and resend the same key on retries.
+The first request runs normally and its response is stored in Redis; a
+retry gets the stored response back without touching the database or
+Stripe again. Claiming the key and reading a stored response is a single
+`SET NX GET` round-trip.
+
+A request sent while the first one is still running gets 409 with
+Retry-After; reusing a key with a different request body gets 422. Server
+errors (5xx) and 409/429 responses are not stored, so those retries run
+again. Keys are scoped to the route and the caller's Authorization header.
+If Redis is unavailable requests run without idempotency.
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import re
+from typing import List, Optional, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = b"idempotency-key"
+REPLAYED_HEADER = b"idempotent-replayed"
+MAX_KEY_LENGTH = 255
+
+# (method, path pattern, metrics label) of the endpoints that honour the header
+IDEMPOTENT_ROUTES: List[Tuple[str, "re.Pattern", str]] = [
+    ("POST", re.compile(r"^/api/v1/bookings/?$"), "create_booking"),
+    ("POST", re.compile(r"^/api/v1/payments/create-intent/?$"), "create_payment_intent"),
+    ("POST", re.compile(r"^/api/v1/bookings/\d+/modifications/[^/]+/confirm/?$"), "confirm_modification"),
+]
+
+# Responses a retry should re-run rather than replay
+UNSTORED_STATUSES = {409, 429}
+
+# Response headers kept with a stored response
+STORED_HEADERS = {b"content-type", b"location"}
+
+
+def match_route(method: str, path: str) -> Optional[str]:
+    """Metrics label of the idempotent route matching a request, if any."""
+    for route_method, pattern, label in IDEMPOTENT_ROUTES:
+        if method == route_method and pattern.match(path):
+            return label
+    return None
+
+
+def _record(route: str, outcome: str) -> None:
+    try:
+        from app.api.v1.metrics import record_idempotent_request
+        record_idempotent_request(route, outcome)
+    except Exception:
+        pass
+
+
+class IdempotencyStore:
+    """Redis storage of in-flight claims and completed responses."""
+
+    PREFIX = "idempotency"
+
+    def __init__(self, cache=None):
+        self._cache = cache
+
+    @property
+    def cache(self):
+        if self._cache is None:
+            from app.services.cache_service import cache_service
+            self._cache = cache_service
+        return self._cache
+
+    def key(self, method: str, path: str, authorization: str, idempotency_key: str) -> str:
+        scope = "\n".join([method, path.rstrip("/"), authorization, idempotency_key])
+        return f"{self.PREFIX}:{hashlib.sha256(scope.encode()).hexdigest()}"
+
+    def claim(self, key: str, fingerprint: str) -> Tuple[bool, Optional[dict]]:
+        """
+        Claim a key for a new request, or return what is already stored.
+
+        Returns:
+            (True, None) when claimed, (False, record) when the key exists
+            and (False, None) when Redis is unavailable
+        """
+        if not self.cache.redis_client:
+            return False, None
+        in_flight = json.dumps({"state": "in_flight", "fingerprint": fingerprint})
+        try:
+            existing = self.cache.redis_client.set(
+                key, in_flight, nx=True, ex=settings.IDEMPOTENCY_LOCK_SECONDS, get=True
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ Idempotency store unavailable: {e}")
+            return False, None
+        if existing is None:
+            return True, None
+        return False, json.loads(existing)
+
+    def complete(self, key: str, fingerprint: str, status: int, headers: list, body: bytes) -> None:
+        """Store a finished response for replay."""
+        record = {
+            "state": "done",
+            "fingerprint": fingerprint,
+            "status": status,
+            "headers": [[name.decode("latin-1"), value.decode("latin-1")] for name, value in headers],
+            "body": base64.b64encode(body).decode("ascii"),
+        }
+        try:
+            self.cache.redis_client.set(key, json.dumps(record), ex=settings.IDEMPOTENCY_TTL_SECONDS)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not store idempotent response: {e}")
+
+    def release(self, key: str) -> None:
+        """Drop an in-flight claim so the request can be retried."""
+        try:
+            self.cache.redis_client.delete(key)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not release idempotency key: {e}")
+
+
+class IdempotencyMiddleware:
+    """Replay stored responses for retried requests carrying an Idempotency-Key."""
+
+    def __init__(self, app, store: Optional[IdempotencyStore] = None):
+        self.app = app
+        self.store = store or IdempotencyStore()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route = match_route(scope["method"], scope["path"])
+        headers = dict(scope.get("headers") or [])
+        idempotency_key = headers.get(IDEMPOTENCY_HEADER)
+        if route is None or idempotency_key is None:
+            await self.app(scope, receive, send)
+            return
+
+        idempotency_key = idempotency_key.decode("latin-1").strip()
+        if not idempotency_key or len(idempotency_key) > MAX_KEY_LENGTH:
+            await self._error(send, 400, f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters")
+            return
+
+        # Buffer the body to fingerprint it, then hand it on unchanged
+        body = b""
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            body += message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+        body_sent = False
+
+        async def replay_body():
+            nonlocal body_sent
+            if body_sent:
+                return await receive()
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        fingerprint = hashlib.sha256(body).hexdigest()
+        key = self.store.key(
+            scope["method"],
+            scope["path"],
+            headers.get(b"authorization", b"").decode("latin-1"),
+            idempotency_key
+        )
+
+        claimed, record = self.store.claim(key, fingerprint)
+        if not claimed:
+            if record is None:
+                _record(route, "bypassed")
+                await self.app(scope, replay_body, send)
+            elif record.get("fingerprint") != fingerprint:
+                _record(route, "mismatch")
+                await self._error(send, 422, "Idempotency-Key was already used with a different request body")
+            elif record.get("state") == "in_flight":
+                _record(route, "in_flight")
+                await self._error(
+                    send, 409, "A request with this Idempotency-Key is still being processed",
+                    extra_headers=[(b"retry-after", b"1")]
+                )
+            else:
+                _record(route, "replayed")
+                await self._replay(send, record)
+            return
+
+        response = {"status": 500, "headers": [], "body": b""}
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["headers"] = [
+                    (name, value) for name, value in message.get("headers", [])
+                    if name.lower() in STORED_HEADERS
+                ]
+            elif message["type"] == "http.response.body":
+                response["body"] += message.get("body", b"")
+            await send(message)
+
+        try:
+            await self.app(scope, replay_body, capture)
+        except Exception:
+            self.store.release(key)
+            raise
+
+        if response["status"] >= 500 or response["status"] in UNSTORED_STATUSES:
+            _record(route, "not_stored")
+            self.store.release(key)
+        else:
+            _record(route, "stored")
+            self.store.complete(key, fingerprint, response["status"], response["headers"], response["body"])
+
+    async def _replay(self, send, record: dict) -> None:
+        body = base64.b64decode(record["body"])
+        headers = [(name.encode("latin-1"), value.encode("latin-1")) for name, value in record["headers"]]
+        headers += [(b"content-length", str(len(body)).encode()), (REPLAYED_HEADER, b"true")]
+        await send({"type": "http.response.start", "status": record["status"], "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+    async def _error(self, send, status: int, message: str, extra_headers: Optional[list] = None) -> None:
+        body = json.dumps({"error": True, "message": message, "status_code": status}).encode()
+        headers = [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            *(extra_headers or []),
+        ]
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
@@ -13,6 +13,9 @@ from starlette.exceptions import HTTPException as StarletteHTTPException
 import time
 import logging
 
+from app.idempotency import IdempotencyMiddleware
+from app.tracing import start_trace, finish_trace
+
 # Import configuration
 try:
     from app.config import settings
@@ -138,6 +141,8 @@ except ImportError:
     sentry_enabled = False
     logger.warning("Monitoring module not available")
 
+from app.responses import DEFAULT_RESPONSE_CLASS
+
 # Create FastAPI application
 # Disable default docs to serve with local static files (avoids CDN blocking issues)
 app = FastAPI(
@@ -147,6 +152,7 @@ app = FastAPI(
     docs_url=None,
     redoc_url=None,
     redirect_slashes=False,  # Disable automatic trailing slash redirects to avoid CORS issues
+    default_response_class=DEFAULT_RESPONSE_CLASS,  # orjson unless Pydantic serializes models itself
 )
 
 # Mount static files for Swagger UI (served locally to avoid CDN blocking)
@@ -174,6 +180,9 @@ if settings.DEBUG:
             redoc_js_url="/static/redoc.standalone.js",
         )
 
+# Replay stored responses for retried booking/payment requests (Idempotency-Key)
+app.add_middleware(IdempotencyMiddleware)
+
 # Add request ID middleware (must be first)
 app.add_middleware(RequestIDMiddleware)
 
@@ -214,14 +223,29 @@ if not settings.DEBUG:
 # Security headers and request timing middleware
 @app.middleware("http")
 async def add_security_headers(request: Request, call_next):
-    """Add security headers and processing time to response."""
+    """Add security headers, processing time and per-stage timings to response."""
     start_time = time.time()
-    response = await call_next(request)
+    trace_handle = start_trace(f"{request.method} {request.url.path}")
+    try:
+        response = await call_next(request)
+    except Exception as e:
+        finish_trace(trace_handle, operation="unhandled", error=type(e).__name__)
+        raise
     process_time = time.time() - start_time
 
     # Processing time header
     response.headers["X-Process-Time"] = str(process_time)
 
+    # Per-stage timings (cache, db, operator, serialize); labelled by route
+    # template so the stage histograms keep a bounded set of operations
+    route = request.scope.get("route")
+    trace = finish_trace(
+        trace_handle,
+        operation=f"{request.method} {route.path}" if route is not None else "unmatched",
+    )
+    if trace is not None:
+        response.headers["Server-Timing"] = trace.server_timing()
+
     # Security headers (OWASP recommendations)
     response.headers["X-Content-Type-Options"] = "nosniff"
     response.headers["X-Frame-Options"] = "DENY"
@@ -500,6 +524,15 @@ async def startup_event():
     except Exception as e:
         logger.warning(f"Could not initialize WebSocket manager: {e}")
 
+    # Start the PDF render pool (e-ticket / invoice downloads)
+    # Skip in testing mode - tests render in the default thread pool
+    if settings.ENVIRONMENT != "testing":
+        try:
+            from app.services import pdf_renderer
+            pdf_renderer.start()
+        except Exception as e:
+            logger.warning(f"Could not start PDF render pool: {e}")
+
 
 # Shutdown event
 @app.on_event("shutdown")
@@ -516,6 +549,10 @@ async def shutdown_event():
     except Exception as e:
         logger.warning(f"Error disconnecting WebSocket manager: {e}")
 
+    # Stop the PDF render pool
+    from app.services import pdf_renderer
+    pdf_renderer.shutdown()
+
 
 if __name__ == "__main__":
     import uvicorn
@@ -11,11 +11,13 @@ from .promo_code import PromoCode, PromoCodeUsage, PromoCodeTypeEnum
 from .booking_reminder import BookingReminder, ReminderTypeEnum
 from .availability_alert import AvailabilityAlert, AlertTypeEnum, AlertStatusEnum
 from .price_alert import PriceAlert, PriceAlertStatusEnum
+from .sailing_inventory import SailingInventory
 from .price_history import (
     PriceHistory,
     PricePrediction,
     RouteStatistics,
     FareCalendarCache,
+    RoutePriceAggregate,
     PriceTrendEnum,
     BookingRecommendationEnum,
 )
@@ -48,10 +50,12 @@ __all__ = [
     "AlertStatusEnum",
     "PriceAlert",
     "PriceAlertStatusEnum",
+    "SailingInventory",
     "PriceHistory",
     "PricePrediction",
     "RouteStatistics",
     "FareCalendarCache",
+    "RoutePriceAggregate",
     "PriceTrendEnum",
     "BookingRecommendationEnum",
 ] 
\ No newline at end of file
@@ -2,7 +2,7 @@
 Booking models for ferry reservations.
 """
 
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, Numeric, ForeignKey, Enum, JSON
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, Numeric, ForeignKey, Enum, JSON, Index, text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -149,6 +149,17 @@ class Booking(Base):
     booking_cabins = relationship("BookingCabin", back_populates="booking", cascade="all, delete-orphan")
     reminders = relationship("BookingReminder", back_populates="booking", cascade="all, delete-orphan")
 
+    # Confirmed bookings by departure, for the completion task's set-based UPDATE;
+    # (created_at, id) orderings for keyset-paginated booking lists (api/pagination.py)
+    __table_args__ = (
+        Index('idx_bookings_confirmed_departure', 'departure_time',
+              postgresql_where=text("status = 'CONFIRMED'")),
+        Index('idx_bookings_confirmed_return_departure', 'return_departure_time',
+              postgresql_where=text("status = 'CONFIRMED'")),
+        Index('idx_bookings_created_at_id', 'created_at', 'id'),
+        Index('idx_bookings_user_created_at_id', 'user_id', 'created_at', 'id'),
+    )
+
     def __repr__(self):
         return f"<Booking(id={self.id}, ref='{self.booking_reference}', status='{self.status.value}')>"
     
@@ -49,6 +49,9 @@ class BookingReminder(Base):
     # Email sent to
     sent_to_email = Column(String(255), nullable=False)
 
+    # When the send is scheduled (claimed by the reminder scan)
+    scheduled_for = Column(DateTime(timezone=True), nullable=True)
+
     # Status
     sent_at = Column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
     success = Column(Boolean, default=True, nullable=False)
@@ -69,10 +72,12 @@ class BookingReminder(Base):
 # Add indexes for efficient querying
 from sqlalchemy import Index
 
-# Composite index for checking if reminder was already sent
+# One row per booking/reminder/journey: the reminder scan claims it with
+# INSERT ... ON CONFLICT DO NOTHING, the send task updates it
 Index(
     'idx_booking_reminder_unique',
     BookingReminder.booking_id,
     BookingReminder.reminder_type,
-    BookingReminder.journey_type
+    BookingReminder.journey_type,
+    unique=True
 )
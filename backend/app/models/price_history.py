@@ -43,6 +43,10 @@ class PriceHistory(Base):
     - Historical comparisons
     - ML model training
     - User price insights
+
+    On PostgreSQL the table is range-partitioned by month on recorded_at
+    (primary key is (id, recorded_at) at the database level). Partitions are
+    managed by app.services.price_history_partitions.
     """
     __tablename__ = "price_history"
 
@@ -246,3 +250,53 @@ class FareCalendarCache(Base):
 
     def __repr__(self):
         return f"<FareCalendarCache {self.route_id} {self.year_month}>"
+
+
+class RoutePriceAggregate(Base):
+    """
+    Rolling price aggregates for a route, updated on every snapshot.
+
+    Holds running sums so summaries (mean, stddev, min/max, weekday and
+    lead-time averages, recent trend window) can be read without scanning
+    price_history. Rebuilt periodically from price_history to correct drift.
+    """
+    __tablename__ = "route_price_aggregates"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # Route identification
+    route_id = Column(String(100), unique=True, nullable=False, index=True)
+
+    # All-time running totals (only non-zero prices are aggregated)
+    snapshot_count = Column(Integer, default=0, nullable=False)  # All snapshots, priced or not
+    price_count = Column(Integer, default=0, nullable=False)
+    price_sum = Column(Float, default=0.0, nullable=False)
+    price_sum_sq = Column(Float, default=0.0, nullable=False)
+    min_price = Column(Float, nullable=True)
+    max_price = Column(Float, nullable=True)
+    min_price_date = Column(Date, nullable=True)  # Departure date of the lowest price
+    max_price_date = Column(Date, nullable=True)
+
+    # Buckets of [count, sum, sum_sq] (JSON for flexibility)
+    weekday_buckets = Column(JSON, nullable=True)
+    # Example: {"0": [12, 1020.0, 86900.0], ..., "6": [...]}  (0=Monday)
+    lead_time_buckets = Column(JSON, nullable=True)
+    # Example: {"0-3": [4, 420.0, 44100.0], "4-7": [...], ...}
+
+    # Daily buckets by recorded date: [snapshots, count, sum, sum_sq, min, max]
+    daily_buckets = Column(JSON, nullable=True)
+    # Example: {"2025-06-01": [90, 90, 8100.0, 731000.0, 72.0, 110.0], ...}
+
+    # Most recent snapshots, newest first: [recorded_at, lowest_price, available_passengers]
+    recent_snapshots = Column(JSON, nullable=True)
+
+    # Latest observation
+    last_price = Column(Float, nullable=True)
+    last_recorded_at = Column(DateTime, nullable=True)
+
+    # Maintenance
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    rebuilt_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<RoutePriceAggregate {self.route_id} n={self.price_count}>"
@@ -0,0 +1,41 @@
+"""
+Per-sailing inventory reserved by bookings on this platform.
+"""
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime
+from app.database import Base
+
+
+class SailingInventory(Base):
+    """
+    Capacity and reserved counts for one sailing.
+
+    Bookings reserve passengers, vehicles and cabins with a conditional
+    UPDATE on this row (see services/inventory_service.py), so concurrent
+    bookings for a sailing are serialized on this row only. A NULL capacity
+    means the operator's availability was unknown and is not enforced.
+    """
+    __tablename__ = "sailing_inventory"
+
+    id = Column(Integer, primary_key=True, index=True)
+    sailing_id = Column(String(100), unique=True, nullable=False, index=True)
+    operator = Column(String(50), nullable=True)
+
+    # Capacity sellable on this platform (operator-reported availability)
+    passenger_capacity = Column(Integer, nullable=True)
+    vehicle_capacity = Column(Integer, nullable=True)
+    cabin_capacity = Column(Integer, nullable=True)
+
+    # Held by PENDING and CONFIRMED bookings
+    passengers_reserved = Column(Integer, default=0, nullable=False)
+    vehicles_reserved = Column(Integer, default=0, nullable=False)
+    cabins_reserved = Column(Integer, default=0, nullable=False)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return (
+            f"<SailingInventory {self.sailing_id}: "
+            f"{self.passengers_reserved}/{self.passenger_capacity} passengers>"
+        )
@@ -0,0 +1,57 @@
+"""
+orjson-based JSON responses.
+
+orjson serializes dataclasses (including slotted ones), datetimes, dates,
+enums and numpy values natively, so results can be written straight to JSON
+bytes without an intermediate dict or Pydantic round-trip. Types orjson does
+not know are converted the way FastAPI's jsonable_encoder converts them.
+"""
+
+import inspect
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi.datastructures import Default
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from pydantic import BaseModel
+
+from app.tracing import span
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _default(obj: Any) -> Any:
+    """Convert values orjson cannot serialize natively."""
+    if isinstance(obj, Decimal):
+        # Same as jsonable_encoder: whole amounts as int, others as float
+        return int(obj) if obj.as_tuple().exponent >= 0 else float(obj)
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize content to JSON bytes with orjson."""
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson."""
+
+    def render(self, content: Any) -> bytes:
+        with span("serialize.orjson", "serialize"):
+            return dumps(content)
+
+
+# FastAPI versions that serialize response_model routes straight to JSON
+# bytes with Pydantic's Rust core skip that path once a custom default
+# response class is set, which makes model routes slower (see
+# scripts/benchmark_json_responses.py). Keep FastAPI's default there; older
+# versions go through jsonable_encoder + json.dumps, where orjson is faster.
+PYDANTIC_JSON_FAST_PATH = "dump_json" in inspect.signature(serialize_response).parameters
+
+DEFAULT_RESPONSE_CLASS = Default(JSONResponse) if PYDANTIC_JSON_FAST_PATH else FastJSONResponse
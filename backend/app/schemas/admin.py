@@ -128,9 +128,11 @@ class BookingResponse(BookingBase):
 class BookingListResponse(BaseModel):
     """Paginated booking list response."""
     bookings: List[BookingResponse]
-    total: int
+    total: Optional[int] = None  # None when total=none
+    total_is_estimate: bool = False  # total=estimate hit the count cap
     skip: int
     limit: int
+    next_cursor: Optional[str] = None  # Pass as ?cursor= for the next page; None on the last page
 
 
 class BookingUpdate(BaseModel):
@@ -2,7 +2,7 @@
 Booking Pydantic schemas for request/response validation.
 """
 
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Union
 from datetime import datetime, date
 from decimal import Decimal
 try:
@@ -322,13 +322,50 @@ class BookingSearchParams(BaseModel):
     contact_email: Optional[str] = None
 
 
+class BookingSummaryResponse(BaseModel):
+    """Booking list row (view=summary): booking columns only, no related data."""
+    id: int
+    booking_reference: str
+    status: str
+    sailing_id: str
+    operator: str
+    departure_port: Optional[str] = None
+    arrival_port: Optional[str] = None
+    departure_time: Optional[datetime] = None
+    is_round_trip: bool = False
+    return_departure_time: Optional[datetime] = None
+    contact_email: str
+    contact_first_name: str
+    contact_last_name: str
+    total_passengers: int
+    total_vehicles: int
+    total_amount: float
+    currency: str
+    created_at: datetime
+    expires_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+    @field_validator('status', mode='before')
+    @classmethod
+    def convert_status_enum(cls, v: Any) -> str:
+        return v.value if hasattr(v, 'value') else str(v)
+
+    @field_validator('is_round_trip', mode='before')
+    @classmethod
+    def default_round_trip(cls, v: Any) -> bool:
+        return bool(v)
+
+
 class BookingListResponse(BaseModel):
     """Booking list response schema."""
-    bookings: List[BookingResponse]
-    total_count: int
+    bookings: List[Union[BookingResponse, BookingSummaryResponse]]
+    total_count: Optional[int] = None  # None when total=none
+    total_is_estimate: bool = False  # total=estimate hit the count cap
     page: int
     page_size: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None  # Pass as ?cursor= for the next page; None on the last page
 
 
 class BookingStatistics(BaseModel):
@@ -13,6 +13,7 @@ from sqlalchemy.orm import Session
 
 from app.models.booking import Booking, BookingModification, ModificationQuote
 from app.schemas.modification import ModificationRequest
+from app.services.booking_read_cache import booking_read_cache
 from app.services.modification_rules import ModificationRules
 from app.services.modification_price_calculator import ModificationPriceCalculator
 from app.services.ferry_service import FerryService
@@ -262,6 +263,7 @@ class BookingModificationService:
         quote.status = "accepted"
 
         db.commit()
+        booking_read_cache.invalidate_booking(booking)
         db.refresh(modification)
 
         # 9. Send confirmation email (TODO)
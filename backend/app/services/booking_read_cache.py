@@ -0,0 +1,151 @@
+"""
+Redis read-model cache for booking detail responses.
+
+GET /bookings/{id}, /bookings/reference/{ref} and /bookings/lookup/{ref}
+serve a BookingResponse that is serialized once and stored under both the
+booking ID and the booking reference, so a repeated read is one Redis GET
+and no database query, relationship loading or model conversion.
+
+Each value is one line of access facts (owner, whether guests may view it,
+contact email) followed by the response JSON, so access checks need no
+second round trip and the response bytes are returned as stored.
+
+Every write path calls invalidate() after committing. Invalidation
+overwrites both keys with a short-lived tombstone instead of deleting them,
+and fills only SET NX: a reader that loaded the booking before a write but
+stores it after the invalidation cannot bring the old state back. Keys
+carry READ_MODEL_VERSION so a change to BookingResponse or
+booking_to_response never serves entries in the old shape.
+"""
+
+import logging
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import orjson
+
+from app.config import settings
+from app.services.cache_service import cache_service
+
+logger = logging.getLogger(__name__)
+
+# Bump when BookingResponse or booking_to_response changes
+READ_MODEL_VERSION = 1
+
+KEY_PREFIX = f"booking_read:v{READ_MODEL_VERSION}"
+TOMBSTONE = "-"
+
+
+class BookingReadCache:
+    """Serialized BookingResponse read model, keyed by booking ID and reference."""
+
+    def __init__(self, cache=cache_service):
+        self.cache = cache
+
+    @property
+    def redis(self):
+        if not settings.BOOKING_READ_CACHE_ENABLED:
+            return None
+        return self.cache.redis_client
+
+    @staticmethod
+    def id_key(booking_id: int) -> str:
+        return f"{KEY_PREFIX}:id:{booking_id}"
+
+    @staticmethod
+    def reference_key(booking_reference: str) -> str:
+        return f"{KEY_PREFIX}:ref:{booking_reference}"
+
+    def _get(self, key: str) -> Optional[Tuple[Dict[str, Any], str]]:
+        # No is_available() ping: a hit must cost exactly one round trip
+        if self.redis is None:
+            return None
+        try:
+            value = self.redis.get(key)
+        except Exception as e:
+            logger.warning(f"⚠️ Booking read cache unavailable: {str(e)}")
+            return None
+        if not value or value == TOMBSTONE:
+            return None
+        access, body = value.split("\n", 1)
+        return orjson.loads(access), body
+
+    def get_by_id(self, booking_id: int) -> Optional[Tuple[Dict[str, Any], str]]:
+        """
+        Cached booking by ID.
+
+        Returns:
+            (access facts, response JSON) or None on a miss
+        """
+        return self._get(self.id_key(booking_id))
+
+    def get_by_reference(self, booking_reference: str) -> Optional[Tuple[Dict[str, Any], str]]:
+        """Cached booking by reference; see get_by_id."""
+        return self._get(self.reference_key(booking_reference))
+
+    def store(self, response, user_id: Optional[int], guest_access: bool) -> None:
+        """
+        Cache a booking's response unless it was invalidated meanwhile.
+
+        Args:
+            response: The booking's BookingResponse
+            user_id: Owner of the booking (None for guest bookings)
+            guest_access: Whether users other than the owner may view it
+        """
+        if self.redis is None:
+            return
+        access = orjson.dumps({
+            "user_id": user_id,
+            "guest_access": guest_access,
+            "contact_email": response.contact_email,
+        })
+        value = access.decode() + "\n" + response.model_dump_json()
+        ttl = settings.BOOKING_READ_CACHE_TTL_SECONDS
+        try:
+            pipe = self.redis.pipeline()
+            pipe.set(self.id_key(response.id), value, nx=True, ex=ttl)
+            pipe.set(self.reference_key(response.booking_reference), value, nx=True, ex=ttl)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"⚠️ Could not cache booking {response.id}: {str(e)}")
+
+    def invalidate_many(self, bookings: Iterable[Tuple[int, Optional[str]]]) -> None:
+        """
+        Drop cached responses after a write, in one round trip; call once the write is committed.
+
+        Args:
+            bookings: (booking ID, booking reference) pairs
+        """
+        if self.redis is None:
+            return
+        hold = settings.BOOKING_READ_CACHE_INVALIDATION_HOLD_SECONDS
+        booking_ids = []
+        try:
+            pipe = self.redis.pipeline()
+            for booking_id, booking_reference in bookings:
+                booking_ids.append(booking_id)
+                pipe.set(self.id_key(booking_id), TOMBSTONE, ex=hold)
+                if booking_reference:
+                    pipe.set(self.reference_key(booking_reference), TOMBSTONE, ex=hold)
+            if booking_ids:
+                pipe.execute()
+        except Exception as e:
+            logger.error(f"❌ Could not invalidate cached bookings {booking_ids}: {str(e)}")
+
+    def invalidate(self, booking_id: int, booking_reference: Optional[str] = None) -> None:
+        """Drop one booking's cached response; see invalidate_many."""
+        self.invalidate_many([(booking_id, booking_reference)])
+
+    def invalidate_booking(self, booking) -> None:
+        """Invalidate a Booking instance (ID and reference)."""
+        self.invalidate(booking.id, booking.booking_reference)
+
+    @staticmethod
+    def can_view(access: Dict[str, Any], current_user) -> bool:
+        """validate_booking_access on cached access facts."""
+        if current_user and (current_user.is_admin or access["user_id"] == current_user.id):
+            return True
+        return access["guest_access"]
+
+
+# Global booking read cache instance
+booking_read_cache = BookingReadCache()
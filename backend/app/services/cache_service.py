@@ -4,11 +4,14 @@ Redis cache service for caching ferry search results and other data.
 import json
 import hashlib
 import logging
-from typing import Any, Optional, Dict
+from typing import Any, Optional, Dict, List
 from datetime import datetime, date
+import orjson
 import redis
 import os
 
+from app.tracing import traced
+
 logger = logging.getLogger(__name__)
 
 
@@ -59,6 +62,7 @@ class CacheService:
             logger.error(f"❌ Failed to connect to Redis: {str(e)}")
             self.redis_client = None
 
+    @traced("cache")
     def is_available(self) -> bool:
         """Check if Redis is available."""
         if not self.redis_client:
@@ -85,6 +89,7 @@ class CacheService:
         param_hash = hashlib.md5(sorted_params.encode(), usedforsecurity=False).hexdigest()
         return f"{prefix}:{param_hash}"
 
+    @traced("cache")
     def get_ferry_search(self, search_params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
         Get cached ferry search results.
@@ -116,6 +121,7 @@ class CacheService:
             logger.error(f"Error getting from cache: {str(e)}")
             return None
 
+    @traced("cache")
     def set_ferry_search(
         self,
         search_params: Dict[str, Any],
@@ -139,10 +145,11 @@ class CacheService:
 
         try:
             cache_key = self._generate_cache_key("ferry_search", search_params)
+            # orjson writes FerryResult dataclasses and datetimes directly
             self.redis_client.setex(
                 cache_key,
                 ttl,
-                json.dumps(results, cls=DateTimeEncoder)
+                orjson.dumps(results, option=orjson.OPT_NON_STR_KEYS)
             )
             logger.info(f"✅ Cached ferry search results: {cache_key} (TTL: {ttl}s)")
             return True
@@ -151,6 +158,7 @@ class CacheService:
             logger.error(f"Error setting cache: {str(e)}")
             return False
 
+    @traced("cache")
     def invalidate_ferry_search(self, search_params: Dict[str, Any]) -> bool:
         """
         Invalidate cached ferry search results.
@@ -174,6 +182,7 @@ class CacheService:
             logger.error(f"Error invalidating cache: {str(e)}")
             return False
 
+    @traced("cache")
     def get_date_prices(self, search_params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
         Get cached date prices.
@@ -203,6 +212,7 @@ class CacheService:
             logger.error(f"Error getting date prices from cache: {str(e)}")
             return None
 
+    @traced("cache")
     def set_date_prices(
         self,
         search_params: Dict[str, Any],
@@ -238,6 +248,119 @@ class CacheService:
             logger.error(f"Error setting date prices cache: {str(e)}")
             return False
 
+    @traced("cache")
+    def get_ttl(self, prefix: str, search_params: Dict[str, Any]) -> Optional[int]:
+        """
+        Get the remaining time to live of a cached entry.
+
+        Args:
+            prefix: Key prefix (e.g., 'ferry_search', 'date_prices')
+            search_params: Parameters the entry was cached with
+
+        Returns:
+            Seconds left, -1 if the key has no expiry, -2 if it does not
+            exist, or None if Redis is unavailable
+        """
+        if not self.is_available():
+            return None
+
+        try:
+            return self.redis_client.ttl(self._generate_cache_key(prefix, search_params))
+
+        except Exception as e:
+            logger.error(f"Error getting cache TTL: {str(e)}")
+            return None
+
+    @traced("cache")
+    def get_operator_sailings(self, sailing_params: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+        """
+        Get cached raw sailings of one operator for a route and date.
+
+        Args:
+            sailing_params: Key parameters (operator, departure_port, arrival_port, departure_date)
+
+        Returns:
+            Cached sailings (possibly empty) or None if not found
+        """
+        if not self.is_available():
+            return None
+
+        try:
+            cache_key = self._generate_cache_key("operator_sailings", sailing_params)
+            cached_data = self.redis_client.get(cache_key)
+
+            if cached_data is not None:
+                logger.info(f"✅ Cache HIT for operator sailings: {cache_key}")
+                return json.loads(cached_data)
+
+            return None
+
+        except Exception as e:
+            logger.error(f"Error getting operator sailings from cache: {str(e)}")
+            return None
+
+    @traced("cache")
+    def get_operator_sailings_ttl(self, sailing_params_list: List[Dict[str, Any]]) -> Optional[int]:
+        """
+        Get the shortest remaining time to live of cached operator sailings.
+
+        Args:
+            sailing_params_list: Key parameters of the entries to check
+
+        Returns:
+            Seconds left on the entry expiring first, or None if none of the
+            entries exist or Redis is unavailable
+        """
+        if not sailing_params_list or not self.is_available():
+            return None
+
+        try:
+            pipe = self.redis_client.pipeline()
+            for sailing_params in sailing_params_list:
+                pipe.ttl(self._generate_cache_key("operator_sailings", sailing_params))
+            remaining = [ttl for ttl in pipe.execute() if ttl is not None and ttl >= 0]
+            return min(remaining) if remaining else None
+
+        except Exception as e:
+            logger.error(f"Error getting operator sailings TTL: {str(e)}")
+            return None
+
+    @traced("cache")
+    def set_operator_sailings(
+        self,
+        sailing_params: Dict[str, Any],
+        sailings: List[Any],
+        ttl: int = 300  # 5 minutes default (matches ferry_search)
+    ) -> bool:
+        """
+        Cache raw sailings of one operator for a route and date.
+
+        Args:
+            sailing_params: Key parameters
+            sailings: FerryResults (or their dicts) with per-type unit prices
+            ttl: Time to live in seconds (default 5 minutes)
+
+        Returns:
+            True if cached successfully
+        """
+        if not self.is_available():
+            return False
+
+        try:
+            cache_key = self._generate_cache_key("operator_sailings", sailing_params)
+            self.redis_client.setex(
+                cache_key,
+                ttl,
+                orjson.dumps(sailings, option=orjson.OPT_NON_STR_KEYS)
+            )
+            logger.info(f"✅ Cached operator sailings: {cache_key} (TTL: {ttl}s)")
+            return True
+
+        except Exception as e:
+            logger.error(f"Error setting operator sailings cache: {str(e)}")
+            return False
+
+    @traced("cache")
     def get_availability(self, sailing_id: str) -> Optional[Dict[str, Any]]:
         """
         Get cached availability information for a specific sailing.
@@ -265,6 +388,7 @@ class CacheService:
             logger.error(f"Error getting availability from cache: {str(e)}")
             return None
 
+    @traced("cache")
     def set_availability(
         self,
         sailing_id: str,
@@ -299,6 +423,7 @@ class CacheService:
             logger.error(f"Error caching availability: {str(e)}")
             return False
 
+    @traced("cache")
     def invalidate_sailing_availability(self, sailing_id: str) -> bool:
         """
         Invalidate cached availability for a specific sailing.
@@ -337,6 +462,7 @@ class CacheService:
         """Alias for set_availability()."""
         return self.set_availability(sailing_id, availability_data, ttl)
 
+    @traced("cache")
     def invalidate_route_searches(self, departure_port: str, arrival_port: str) -> int:
         """
         Invalidate all cached searches for a specific route.
@@ -368,6 +494,7 @@ class CacheService:
             logger.error(f"Error invalidating route searches: {str(e)}")
             return 0
 
+    @traced("cache")
     def clear_all_ferry_searches(self) -> int:
         """
         Clear all cached ferry searches (useful for maintenance/debugging).
@@ -380,6 +507,7 @@ class CacheService:
 
         try:
             keys = list(self.redis_client.scan_iter(match="ferry_search:*"))
+            keys += list(self.redis_client.scan_iter(match="operator_sailings:*"))
             if keys:
                 deleted = self.redis_client.delete(*keys)
                 logger.info(f"🗑️ Cleared {deleted} ferry search cache entries")
@@ -0,0 +1,353 @@
+"""
+Search demand tracking and background cache warming.
+
+/ferries/search, /ferries/date-prices and booking creation bump lightweight
+hourly counters in Redis. A Celery beat job ranks route/date pairs and
+date-price windows by recent volume and refreshes the most popular
+ferry_search and date_prices cache entries just before they expire, so users
+after a TTL expiry do not pay the full operator fan-out.
+
+Redis layout (hour = UTC "YYYYMMDDHH"):
+- search_demand:routes:{hour}       ZSET  "DEP|ARR|YYYY-MM-DD" -> searches + weighted bookings
+- search_demand:variants:{route}    HASH  ferry_search cache params (JSON) -> searches
+- search_demand:date_prices:{hour}  ZSET  date_prices cache params (JSON) -> requests
+"""
+
+import json
+import logging
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.services.cache_service import CacheService, cache_service
+from app.services.ferry_service import (
+    DATE_PRICES_CACHE_TTL,
+    FerryService,
+)
+
+logger = logging.getLogger(__name__)
+
+ROUTE_DEMAND_PREFIX = "search_demand:routes"
+VARIANT_DEMAND_PREFIX = "search_demand:variants"
+DATE_PRICES_DEMAND_PREFIX = "search_demand:date_prices"
+RANKING_KEY = "search_demand:ranking"
+WARMER_LOCK_KEY = "cache_warmer:lock"
+
+# A booking signals more intent than a search
+BOOKING_WEIGHT = 5
+
+# Most-searched passenger/return variants warmed per route/date pair
+VARIANTS_PER_ROUTE_DATE = 2
+
+# Upper bound on a warming cycle, after which the lock is released anyway
+WARMER_LOCK_SECONDS = 300
+
+# Delete the lock only if it still holds our token: a cycle that outlived
+# WARMER_LOCK_SECONDS must not release the next cycle's lock
+RELEASE_LOCK_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+
+def _hour_key(prefix: str, moment: datetime) -> str:
+    return f"{prefix}:{moment.strftime('%Y%m%d%H')}"
+
+
+def route_date_key(departure_port: str, arrival_port: str, departure_date: str) -> str:
+    """Member used in the route demand ZSETs, e.g. "TUNIS|GENOA|2025-06-01"."""
+    return f"{departure_port.upper()}|{arrival_port.upper()}|{departure_date}"
+
+
+class SearchDemandTracker:
+    """Records search and booking volume in hourly Redis counters."""
+
+    def __init__(self, cache: CacheService):
+        self.cache = cache
+
+    @property
+    def window_hours(self) -> int:
+        return settings.SEARCH_DEMAND_WINDOW_HOURS
+
+    def record_search(self, cache_params: Dict[str, Any], now: Optional[datetime] = None) -> None:
+        """
+        Count a /ferries/search request by its ferry_search cache params.
+
+        Searches with vehicles are not tracked: the cache key only holds the
+        vehicle count, so the warmer could not replay them.
+        """
+        if cache_params.get("vehicles") or not cache_params.get("departure_date"):
+            return
+
+        route_date = route_date_key(
+            cache_params["departure_port"],
+            cache_params["arrival_port"],
+            cache_params["departure_date"],
+        )
+        variant = json.dumps(cache_params, sort_keys=True)
+        self._increment(route_date, 1, variant=variant, now=now)
+
+    def record_booking(
+        self,
+        departure_port: str,
+        arrival_port: str,
+        departure_date: date,
+        now: Optional[datetime] = None
+    ) -> None:
+        """Count a booking towards its route/date ranking."""
+        route_date = route_date_key(departure_port, arrival_port, departure_date.isoformat())
+        self._increment(route_date, BOOKING_WEIGHT, now=now)
+
+    def record_date_prices(self, cache_params: Dict[str, Any], now: Optional[datetime] = None) -> None:
+        """Count a /ferries/date-prices request by its cache params."""
+        if not self.cache.is_available():
+            return
+
+        now = now or datetime.utcnow()
+        try:
+            key = _hour_key(DATE_PRICES_DEMAND_PREFIX, now)
+            pipe = self.cache.redis_client.pipeline()
+            pipe.zincrby(key, 1, json.dumps(cache_params, sort_keys=True))
+            pipe.expire(key, (self.window_hours + 1) * 3600)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to record date prices demand: {e}")
+
+    def _increment(
+        self,
+        route_date: str,
+        amount: int,
+        variant: Optional[str] = None,
+        now: Optional[datetime] = None
+    ) -> None:
+        if not self.cache.is_available():
+            return
+
+        now = now or datetime.utcnow()
+        ttl = (self.window_hours + 1) * 3600
+        try:
+            key = _hour_key(ROUTE_DEMAND_PREFIX, now)
+            pipe = self.cache.redis_client.pipeline()
+            pipe.zincrby(key, amount, route_date)
+            pipe.expire(key, ttl)
+            if variant is not None:
+                variants_key = f"{VARIANT_DEMAND_PREFIX}:{route_date}"
+                pipe.hincrby(variants_key, variant, 1)
+                pipe.expire(variants_key, ttl)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to record search demand: {e}")
+
+    def top_route_dates(self, limit: int, now: Optional[datetime] = None) -> List[Tuple[str, float]]:
+        """Route/date pairs with the most searches and bookings in the window."""
+        return self._top(ROUTE_DEMAND_PREFIX, limit, now)
+
+    def top_date_prices(self, limit: int, now: Optional[datetime] = None) -> List[Tuple[Dict[str, Any], float]]:
+        """Most requested date_prices cache params in the window."""
+        return [(json.loads(member), score) for member, score in self._top(DATE_PRICES_DEMAND_PREFIX, limit, now)]
+
+    def top_variants(self, route_date: str, limit: int) -> List[Dict[str, Any]]:
+        """Most searched ferry_search cache params for a route/date pair."""
+        variants = self.cache.redis_client.hgetall(f"{VARIANT_DEMAND_PREFIX}:{route_date}")
+        ranked = sorted(variants.items(), key=lambda item: -int(item[1]))
+        return [json.loads(variant) for variant, _ in ranked[:limit]]
+
+    def _top(self, prefix: str, limit: int, now: Optional[datetime]) -> List[Tuple[str, float]]:
+        if limit <= 0 or not self.cache.is_available():
+            return []
+
+        now = now or datetime.utcnow()
+        keys = [
+            _hour_key(prefix, now - timedelta(hours=offset))
+            for offset in range(self.window_hours)
+        ]
+        ranking_key = f"{RANKING_KEY}:{prefix}"
+
+        pipe = self.cache.redis_client.pipeline()
+        pipe.zunionstore(ranking_key, keys)
+        pipe.zrevrange(ranking_key, 0, limit - 1, withscores=True)
+        pipe.delete(ranking_key)
+        _, ranked, _ = pipe.execute()
+        return ranked
+
+
+@dataclass
+class WarmingReport:
+    """Outcome of one warming cycle."""
+    searches_refreshed: int = 0
+    date_prices_refreshed: int = 0
+    skipped_fresh: int = 0
+    operator_calls: int = 0
+    budget_exhausted: bool = False
+    errors: List[str] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "searches_refreshed": self.searches_refreshed,
+            "date_prices_refreshed": self.date_prices_refreshed,
+            "skipped_fresh": self.skipped_fresh,
+            "operator_calls": self.operator_calls,
+            "budget_exhausted": self.budget_exhausted,
+            "errors": len(self.errors),
+        }
+
+
+class CacheWarmerService:
+    """Refreshes popular search cache entries within an operator-call budget."""
+
+    def __init__(
+        self,
+        ferry_service: FerryService,
+        cache: CacheService = cache_service,
+        tracker: Optional[SearchDemandTracker] = None
+    ):
+        self.ferry_service = ferry_service
+        self.cache = cache
+        self.tracker = tracker or SearchDemandTracker(cache)
+        self._lock_token: Optional[str] = None
+
+    def acquire_lock(self) -> bool:
+        """Prevent overlapping cycles across workers."""
+        if not self.cache.is_available():
+            return False
+        token = uuid.uuid4().hex
+        if not self.cache.redis_client.set(WARMER_LOCK_KEY, token, nx=True, ex=WARMER_LOCK_SECONDS):
+            return False
+        self._lock_token = token
+        return True
+
+    def release_lock(self) -> None:
+        """Release the lock if this warmer still holds it."""
+        token, self._lock_token = self._lock_token, None
+        if token and self.cache.is_available():
+            self.cache.redis_client.eval(RELEASE_LOCK_SCRIPT, 1, WARMER_LOCK_KEY, token)
+
+    def needs_refresh(self, prefix: str, cache_params: Dict[str, Any], refresh_before: int) -> bool:
+        """True if the entry is missing or expires within refresh_before seconds."""
+        ttl = self.cache.get_ttl(prefix, cache_params)
+        if ttl is None or ttl == -1:
+            return False
+        return ttl == -2 or ttl <= refresh_before
+
+    def _search_cost(self, cache_params: Dict[str, Any]) -> int:
+        """Operator calls made by one search (one per operator searched)."""
+        operators = self.ferry_service.get_available_operators()
+        if cache_params.get("operators"):
+            operators = [o for o in operators if o in cache_params["operators"]]
+        return len(operators)
+
+    def _date_prices_cost(self, cache_params: Dict[str, Any]) -> int:
+        """Upper bound: every day of the window searched on every operator."""
+        days = cache_params["days_before"] + cache_params["days_after"] + 1
+        return days * len(self.ferry_service.get_available_operators())
+
+    async def warm(
+        self,
+        top_searches: int,
+        top_date_prices: int,
+        operator_call_budget: int,
+        refresh_before: int,
+        now: Optional[datetime] = None
+    ) -> WarmingReport:
+        """
+        Run one warming cycle.
+
+        ferry_search entries are refreshed first, so the date_prices refresh
+        can reuse them. Entries are processed in demand order and the cycle
+        stops before an entry would exceed the operator-call budget.
+        Refreshes run one at a time to keep operator load flat.
+        """
+        now = now or datetime.utcnow()
+        today = now.date()
+        report = WarmingReport()
+
+        def within_budget(cost: int) -> bool:
+            if report.operator_calls + cost > operator_call_budget:
+                report.budget_exhausted = True
+                return False
+            return True
+
+        for route_date, _ in self.tracker.top_route_dates(top_searches, now):
+            if report.budget_exhausted:
+                break
+            for cache_params in self.tracker.top_variants(route_date, VARIANTS_PER_ROUTE_DATE):
+                departure_date = date.fromisoformat(cache_params["departure_date"])
+                if departure_date < today:
+                    continue
+                if not self.needs_refresh("ferry_search", cache_params, refresh_before):
+                    report.skipped_fresh += 1
+                    continue
+                cost = self._search_cost(cache_params)
+                if not within_budget(cost):
+                    break
+
+                try:
+                    await self._refresh_search(cache_params, departure_date)
+                    report.searches_refreshed += 1
+                except Exception as e:
+                    logger.warning(f"Cache warmer search refresh failed for {route_date}: {e}")
+                    report.errors.append(str(e))
+                report.operator_calls += cost
+
+        for cache_params, _ in self.tracker.top_date_prices(top_date_prices, now):
+            if report.budget_exhausted:
+                break
+            center_date = date.fromisoformat(cache_params["center_date"])
+            if center_date + timedelta(days=cache_params["days_after"]) < today:
+                continue
+            if not self.needs_refresh("date_prices", cache_params, refresh_before):
+                report.skipped_fresh += 1
+                continue
+            cost = self._date_prices_cost(cache_params)
+            if not within_budget(cost):
+                break
+
+            try:
+                await self._refresh_date_prices(cache_params, center_date)
+                report.date_prices_refreshed += 1
+            except Exception as e:
+                logger.warning(f"Cache warmer date prices refresh failed: {e}")
+                report.errors.append(str(e))
+            report.operator_calls += cost
+
+        return report
+
+    async def _refresh_search(self, cache_params: Dict[str, Any], departure_date: date) -> None:
+        return_date = cache_params.get("return_date")
+        results = await self.ferry_service.search_ferries(
+            departure_port=cache_params["departure_port"],
+            arrival_port=cache_params["arrival_port"],
+            departure_date=departure_date,
+            return_date=date.fromisoformat(return_date) if return_date else None,
+            return_departure_port=cache_params.get("return_departure_port"),
+            return_arrival_port=cache_params.get("return_arrival_port"),
+            adults=cache_params.get("adults", 1),
+            children=cache_params.get("children", 0),
+            infants=cache_params.get("infants", 0),
+            operators=cache_params.get("operators"),
+            refresh_operator_cache=True,
+        )
+        self.ferry_service.cache_search_results(cache_params, results)
+
+    async def _refresh_date_prices(self, cache_params: Dict[str, Any], center_date: date) -> None:
+        return_date = cache_params.get("return_date")
+        response = await self.ferry_service.build_date_prices(
+            departure_port=cache_params["departure_port"],
+            arrival_port=cache_params["arrival_port"],
+            center_date=center_date,
+            days_before=cache_params["days_before"],
+            days_after=cache_params["days_after"],
+            adults=cache_params.get("adults", 1),
+            children=cache_params.get("children", 0),
+            infants=cache_params.get("infants", 0),
+            return_date=date.fromisoformat(return_date) if return_date else None,
+        )
+        self.cache.set_date_prices(cache_params, response, ttl=DATE_PRICES_CACHE_TTL)
+
+
+# Singleton used by the API to record demand
+search_demand = SearchDemandTracker(cache_service)
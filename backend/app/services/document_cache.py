@@ -0,0 +1,190 @@
+"""
+Content-addressed cache for generated PDF documents (e-tickets, invoices).
+
+A document's key is the SHA-256 of everything it renders - the booking,
+passenger, vehicle and payment data plus the template version and company
+details - so a booking change produces a new key and an unchanged booking is
+rendered once, however often it is downloaded or attached to emails.
+
+Documents are stored as immutable objects under DOCUMENT_CACHE_DIR with
+object-store style keys ("<kind>/<key>.pdf"); writes are atomic so API
+workers and Celery workers can share the directory. When the directory
+grows past DOCUMENT_CACHE_MAX_BYTES the least recently used documents are
+evicted (hits refresh the file's mtime).
+
+Keys double as ETags for the download endpoints, so a client revalidating
+with If-None-Match gets a 304 without the PDF being read or rendered.
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+from threading import Lock
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+import orjson
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Bump when a template changes so existing documents are re-rendered
+TEMPLATE_VERSION = 1
+
+# After eviction the cache is trimmed to this fraction of the limit
+EVICT_TO_RATIO = 0.8
+
+# Writes between full size rescans (picks up other processes' writes)
+RESCAN_EVERY = 100
+
+
+def _default(value):
+    return str(value)
+
+
+class DocumentCache:
+    """Size-bounded, content-addressed PDF store on local disk."""
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.directory = directory or settings.DOCUMENT_CACHE_DIR
+        self.max_bytes = max_bytes if max_bytes is not None else settings.DOCUMENT_CACHE_MAX_BYTES
+        self._size: Optional[int] = None
+        self._writes = 0
+        self._lock = Lock()
+
+    @staticmethod
+    def key(kind: str, **inputs) -> str:
+        """Cache key for a document of `kind` rendered from `inputs`."""
+        payload = orjson.dumps(
+            {"kind": kind, "template": TEMPLATE_VERSION, "inputs": inputs},
+            option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS,
+            default=_default,
+        )
+        return f"{kind}-{hashlib.sha256(payload).hexdigest()}"
+
+    @staticmethod
+    def etag(key: str) -> str:
+        """Weak ETag: the same inputs always produce an equivalent PDF."""
+        return f'W/"{key}"'
+
+    @classmethod
+    def etag_matches(cls, if_none_match: Optional[str], key: str) -> bool:
+        """Whether an If-None-Match header already names this document."""
+        if not if_none_match:
+            return False
+        if if_none_match.strip() == "*":
+            return True
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return f'"{key}"' in candidates
+
+    def _path(self, key: str) -> str:
+        kind = key.split("-", 1)[0]
+        return os.path.join(self.directory, kind, f"{key}.pdf")
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Stored document, or None."""
+        if not settings.DOCUMENT_CACHE_ENABLED:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                content = f.read()
+            os.utime(path)
+            return content
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"⚠️ Document cache read failed for {key}: {e}")
+            return None
+
+    def put(self, key: str, content: bytes) -> None:
+        """Store a document (atomically) and evict if over the size limit."""
+        if not settings.DOCUMENT_CACHE_ENABLED:
+            return
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"⚠️ Document cache write failed for {key}: {e}")
+            return
+
+        with self._lock:
+            self._writes += 1
+            if self._size is None or self._writes % RESCAN_EVERY == 0:
+                self._size = sum(size for _, size, _ in self._entries())
+            else:
+                self._size += len(content)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def get_or_render(self, key: str, render: Callable[[], bytes]) -> bytes:
+        """Stored document for key, rendering and storing it on a miss."""
+        content = self.get(key)
+        if content is not None:
+            logger.debug(f"📄 Document cache hit: {key}")
+            return content
+        content = render()
+        self.put(key, content)
+        return content
+
+    async def get_or_render_async(self, key: str, render: Callable[[], Awaitable[bytes]]) -> bytes:
+        """get_or_render for an async renderer (see pdf_renderer.render_pdf)."""
+        content = self.get(key)
+        if content is not None:
+            logger.debug(f"📄 Document cache hit: {key}")
+            return content
+        content = await render()
+        self.put(key, content)
+        return content
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        """(mtime, size, path) of every stored document."""
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith(".pdf"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _evict(self) -> None:
+        """Delete least recently used documents down to EVICT_TO_RATIO of the limit."""
+        entries = sorted(self._entries())
+        size = sum(entry[1] for entry in entries)
+        target = self.max_bytes * EVICT_TO_RATIO
+        evicted = 0
+        for _, entry_size, path in entries:
+            if size <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            size -= entry_size
+            evicted += 1
+        self._size = size
+        logger.info(f"🧹 Document cache evicted {evicted} documents ({size} bytes kept)")
+
+    def clear(self) -> None:
+        """Remove every stored document."""
+        with self._lock:
+            for _, _, path in self._entries():
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            self._size = 0
+
+
+# Global document cache instance
+document_cache = DocumentCache()
@@ -1,6 +1,7 @@
 """
 E-Ticket PDF generation service with QR code.
 """
+import functools
 import io
 import os
 import qrcode
@@ -21,8 +22,13 @@ from reportlab.graphics import renderPDF
 import logging
 import json
 
+from app.services.document_cache import document_cache
+
 logger = logging.getLogger(__name__)
 
+# Built once per process: styles are only read while rendering
+_sample_styles = functools.lru_cache(maxsize=None)(getSampleStyleSheet)
+
 
 class QRCodeFlowable(Flowable):
     """Custom flowable for QR codes."""
@@ -75,6 +81,33 @@ class ETicketService:
         self.text_color = colors.HexColor('#1F2937')
         self.light_gray = colors.HexColor('#F3F4F6')
 
+    def eticket_cache_key(
+        self,
+        booking: Dict[str, Any],
+        passengers: list = None,
+        vehicles: list = None,
+    ) -> str:
+        """Document cache key covering everything generate_eticket renders."""
+        return document_cache.key(
+            "eticket",
+            company=[self.company_name, self.company_phone, self.company_email],
+            booking=booking,
+            passengers=passengers or [],
+            vehicles=vehicles or [],
+        )
+
+    def get_eticket(
+        self,
+        booking: Dict[str, Any],
+        passengers: list = None,
+        vehicles: list = None,
+    ) -> bytes:
+        """generate_eticket through the document cache: rendered once per booking version."""
+        return document_cache.get_or_render(
+            self.eticket_cache_key(booking, passengers, vehicles),
+            lambda: self.generate_eticket(booking, passengers, vehicles),
+        )
+
     def generate_eticket(
         self,
         booking: Dict[str, Any],
@@ -103,7 +136,7 @@ class ETicketService:
         )
 
         # Get styles
-        styles = getSampleStyleSheet()
+        styles = _sample_styles()
 
         # Custom styles
         title_style = ParagraphStyle(
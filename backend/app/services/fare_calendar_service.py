@@ -0,0 +1,285 @@
+"""
+Fare Calendar Service
+
+Builds and serves precomputed monthly fare grids stored in FareCalendarCache.
+
+Grids hold per-person prices (passengers=1) derived from the latest
+price_history snapshot of each departure date. The calendar endpoint scales
+them by passenger count at read time, so one row serves every party size.
+"""
+
+import logging
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import and_, func, select
+from sqlalchemy.orm import Session
+
+from app.models.price_history import FareCalendarCache, PriceHistory
+
+logger = logging.getLogger(__name__)
+
+# How long a month grid is served before it must be rebuilt
+CALENDAR_CACHE_TTL = timedelta(hours=4)
+
+# Grids are stored for single passengers and scaled on read
+BASE_PASSENGERS = 1
+
+
+def year_month_key(year: int, month: int) -> str:
+    """Return the FareCalendarCache year_month key, e.g. "2025-01"."""
+    return f"{year}-{month:02d}"
+
+
+def month_bounds(year: int, month: int) -> Tuple[date, date]:
+    """Return the first and last day of a month."""
+    first_day = date(year, month, 1)
+    if month == 12:
+        next_month = date(year + 1, 1, 1)
+    else:
+        next_month = date(year, month + 1, 1)
+    return first_day, next_month - timedelta(days=1)
+
+
+def summarize_grid(calendar_data: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Recompute per-day trend labels and the month summary for a grid.
+
+    Trend marks a day as "falling" (cheap) or "rising" (expensive) when its
+    price is more than 10% below or above the month average.
+
+    Returns:
+        Summary values for the FareCalendarCache month_* columns
+    """
+    prices = [day["price"] for day in calendar_data.values() if day.get("price") is not None]
+    if not prices:
+        return {
+            "month_lowest": None,
+            "month_highest": None,
+            "month_average": None,
+            "cheapest_date": None,
+        }
+
+    month_average = sum(prices) / len(prices)
+    for day in calendar_data.values():
+        price = day.get("price")
+        if price is None:
+            continue
+        if price < month_average * 0.9:
+            day["trend"] = "falling"
+        elif price > month_average * 1.1:
+            day["trend"] = "rising"
+        else:
+            day["trend"] = "stable"
+
+    priced_days = [d for d in calendar_data if calendar_data[d].get("price") is not None]
+    cheapest_date = min(priced_days, key=lambda d: (calendar_data[d]["price"], int(d)))
+
+    return {
+        "month_lowest": min(prices),
+        "month_highest": max(prices),
+        "month_average": round(month_average, 2),
+        "cheapest_date": int(cheapest_date),
+    }
+
+
+class FareCalendarService:
+    """Service for building, patching and reading precomputed fare grids."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_month(
+        self,
+        route_id: str,
+        year: int,
+        month: int,
+        now: Optional[datetime] = None,
+    ) -> Optional[FareCalendarCache]:
+        """
+        Get the cached grid for a route and month.
+
+        Returns:
+            The cache row, or None when missing or past its expires_at
+        """
+        now = now or datetime.utcnow()
+        return self.db.query(FareCalendarCache).filter(
+            and_(
+                FareCalendarCache.route_id == route_id,
+                FareCalendarCache.year_month == year_month_key(year, month),
+                FareCalendarCache.passengers == BASE_PASSENGERS,
+                FareCalendarCache.expires_at > now,
+            )
+        ).first()
+
+    def build_month(
+        self,
+        route_id: str,
+        year: int,
+        month: int,
+        today: Optional[date] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Build a month grid from the latest price_history snapshot of each day.
+
+        Past departure dates and days without any snapshot are left out.
+        """
+        today = today or datetime.utcnow().date()
+        first_day, last_day = month_bounds(year, month)
+        first_day = max(first_day, today)
+        if first_day > last_day:
+            return {}
+
+        history = PriceHistory.__table__
+        latest = select(
+            history.c.departure_date,
+            history.c.lowest_price,
+            history.c.highest_price,
+            history.c.num_ferries,
+            history.c.available_passengers,
+            func.row_number().over(
+                partition_by=history.c.departure_date,
+                order_by=history.c.recorded_at.desc(),
+            ).label("snapshot_rank"),
+        ).where(
+            and_(
+                history.c.route_id == route_id,
+                history.c.departure_date >= first_day,
+                history.c.departure_date <= last_day,
+            )
+        ).subquery("latest")
+
+        rows = self.db.execute(
+            select(latest).where(latest.c.snapshot_rank == 1)
+        ).all()
+
+        return {
+            str(row.departure_date.day): _grid_entry(
+                price=row.lowest_price,
+                highest=row.highest_price,
+                ferries=row.num_ferries,
+                available_passengers=row.available_passengers,
+            )
+            for row in rows
+        }
+
+    def refresh_month(
+        self,
+        route_id: str,
+        year: int,
+        month: int,
+        now: Optional[datetime] = None,
+    ) -> Optional[FareCalendarCache]:
+        """
+        Rebuild and store the grid for one route and month.
+
+        Returns:
+            The stored cache row, or None if the month has no priced days
+        """
+        now = now or datetime.utcnow()
+        calendar_data = self.build_month(route_id, year, month, today=now.date())
+        if not calendar_data:
+            return None
+
+        return self._store(route_id, year_month_key(year, month), calendar_data, now)
+
+    def apply_snapshots(
+        self,
+        route_id: str,
+        day_prices: Dict[date, Dict[str, Any]],
+        now: Optional[datetime] = None,
+    ) -> int:
+        """
+        Patch cached grids with freshly recorded snapshots.
+
+        Only the affected days are rewritten; months without a grid yet are
+        created from the given days alone.
+
+        Args:
+            route_id: Route identifier
+            day_prices: Mapping of departure date to grid entry values
+                (price, highest, ferries, available_passengers)
+            now: Reference time for expiry
+
+        Returns:
+            Number of month grids written
+        """
+        now = now or datetime.utcnow()
+
+        by_month: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for departure_date, values in day_prices.items():
+            key = year_month_key(departure_date.year, departure_date.month)
+            by_month.setdefault(key, {})[str(departure_date.day)] = _grid_entry(**values)
+
+        existing = {
+            cache.year_month: cache
+            for cache in self.db.query(FareCalendarCache).filter(
+                and_(
+                    FareCalendarCache.route_id == route_id,
+                    FareCalendarCache.year_month.in_(list(by_month)),
+                    FareCalendarCache.passengers == BASE_PASSENGERS,
+                )
+            )
+        }
+
+        for key, days in by_month.items():
+            cache = existing.get(key)
+            calendar_data = dict(cache.calendar_data) if cache else {}
+            calendar_data.update(days)
+            self._store(route_id, key, calendar_data, now, cache=cache)
+
+        self.db.commit()
+        return len(by_month)
+
+    def _store(
+        self,
+        route_id: str,
+        year_month: str,
+        calendar_data: Dict[str, Dict[str, Any]],
+        now: datetime,
+        cache: Optional[FareCalendarCache] = None,
+    ) -> FareCalendarCache:
+        """Insert or update a grid row with a fresh summary and expiry."""
+        summary = summarize_grid(calendar_data)
+
+        if cache is None:
+            cache = self.db.query(FareCalendarCache).filter(
+                and_(
+                    FareCalendarCache.route_id == route_id,
+                    FareCalendarCache.year_month == year_month,
+                    FareCalendarCache.passengers == BASE_PASSENGERS,
+                )
+            ).first()
+
+        if cache is None:
+            cache = FareCalendarCache(
+                route_id=route_id,
+                year_month=year_month,
+                passengers=BASE_PASSENGERS,
+            )
+            self.db.add(cache)
+
+        # Assign a new dict so the JSON column is flagged as modified
+        cache.calendar_data = calendar_data
+        cache.month_lowest = summary["month_lowest"]
+        cache.month_highest = summary["month_highest"]
+        cache.month_average = summary["month_average"]
+        cache.cheapest_date = summary["cheapest_date"]
+        cache.expires_at = now + CALENDAR_CACHE_TTL
+        return cache
+
+
+def _grid_entry(
+    price: Optional[float],
+    highest: Optional[float] = None,
+    ferries: Optional[int] = None,
+    available_passengers: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Build one day of a calendar grid (per-person prices)."""
+    return {
+        "price": price,
+        "highest": highest,
+        "available": price is not None and (available_passengers is None or available_passengers > 0),
+        "ferries": ferries or 0,
+        "trend": "stable",
+    }
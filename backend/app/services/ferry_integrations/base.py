@@ -3,14 +3,40 @@ Base ferry integration class that all ferry operators must implement.
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional, Any
-from datetime import datetime, date
+from typing import List, Dict, Optional, Any, Tuple
+from datetime import datetime, date, timedelta
 import asyncio
+import contextvars
+import copy
+import functools
+import time
+from dataclasses import dataclass
 import httpx
 import logging
 
+from app.api.v1.metrics import (
+    record_operator_call,
+    record_operator_response,
+    record_operator_results,
+    set_operator_timeout,
+)
+from .slo import operator_slo
+
 logger = logging.getLogger(__name__)
 
+# Operator methods measured per call type (see BaseFerryIntegration.__init_subclass__)
+INSTRUMENTED_CALLS = {
+    "search_ferries": "search",
+    "create_booking": "book",
+    "get_booking_status": "status",
+    "cancel_booking": "cancel",
+}
+
+# (operator, call type) of the operator call in progress, read by the HTTP event hooks
+_current_call: contextvars.ContextVar[Optional[Tuple[str, str]]] = contextvars.ContextVar(
+    "operator_call", default=None
+)
+
 
 class FerryAPIError(Exception):
     """Custom exception for ferry API errors."""
@@ -22,62 +48,52 @@ class FerryAPIError(Exception):
         super().__init__(self.message)
 
 
+@dataclass(slots=True)
 class SearchRequest:
     """Ferry search request model."""
+    departure_port: str
+    arrival_port: str
+    departure_date: date
+    return_date: Optional[date] = None
+    # Different return route support
+    return_departure_port: Optional[str] = None
+    return_arrival_port: Optional[str] = None
+    adults: int = 1
+    children: int = 0
+    infants: int = 0
+    vehicles: Optional[List[Dict]] = None
 
-    def __init__(
-        self,
-        departure_port: str,
-        arrival_port: str,
-        departure_date: date,
-        return_date: Optional[date] = None,
-        # Different return route support
-        return_departure_port: Optional[str] = None,
-        return_arrival_port: Optional[str] = None,
-        adults: int = 1,
-        children: int = 0,
-        infants: int = 0,
-        vehicles: Optional[List[Dict]] = None
-    ):
-        self.departure_port = departure_port
-        self.arrival_port = arrival_port
-        self.departure_date = departure_date
-        self.return_date = return_date
+    def __post_init__(self):
         # If no return route specified, use reversed outbound route
-        self.return_departure_port = return_departure_port or arrival_port
-        self.return_arrival_port = return_arrival_port or departure_port
-        self.adults = adults
-        self.children = children
-        self.infants = infants
-        self.vehicles = vehicles or []
+        self.return_departure_port = self.return_departure_port or self.arrival_port
+        self.return_arrival_port = self.return_arrival_port or self.departure_port
+        self.vehicles = self.vehicles or []
 
 
+@dataclass(slots=True)
 class FerryResult:
-    """Ferry search result model."""
-    
-    def __init__(
-        self,
-        sailing_id: str,
-        operator: str,
-        departure_port: str,
-        arrival_port: str,
-        departure_time: datetime,
-        arrival_time: datetime,
-        vessel_name: str,
-        prices: Dict[str, float],
-        cabin_types: Optional[List[Dict]] = None,
-        available_spaces: Optional[Dict[str, int]] = None
-    ):
-        self.sailing_id = sailing_id
-        self.operator = operator
-        self.departure_port = departure_port
-        self.arrival_port = arrival_port
-        self.departure_time = departure_time
-        self.arrival_time = arrival_time
-        self.vessel_name = vessel_name
-        self.prices = prices
-        self.cabin_types = cabin_types or []
-        self.available_spaces = available_spaces or {}
+    """
+    Ferry search result model.
+
+    Slotted so large result sets stay compact; orjson serializes instances
+    directly, with the same fields as the FerryResult API schema.
+    """
+    sailing_id: str
+    operator: str
+    departure_port: str
+    arrival_port: str
+    departure_time: datetime
+    arrival_time: datetime
+    vessel_name: str
+    prices: Dict[str, float]
+    cabin_types: Optional[List[Dict]] = None
+    available_spaces: Optional[Dict[str, int]] = None
+    duration: Optional[str] = None
+    route_info: Optional[Dict[str, Any]] = None
+
+    def __post_init__(self):
+        self.cabin_types = self.cabin_types or []
+        self.available_spaces = self.available_spaces or {}
 
     def to_dict(self) -> Dict:
         """Convert FerryResult to dictionary for Pydantic validation."""
@@ -91,62 +107,164 @@ class FerryResult:
             "vessel_name": self.vessel_name,
             "prices": self.prices,
             "cabin_types": self.cabin_types,
-            "available_spaces": self.available_spaces
+            "available_spaces": self.available_spaces,
+            "duration": self.duration,
+            "route_info": self.route_info
         }
 
+    @classmethod
+    def from_dict(cls, data: Dict) -> "FerryResult":
+        """Rebuild a FerryResult from to_dict() output (e.g. a cached sailing)."""
+        return cls(
+            sailing_id=data["sailing_id"],
+            operator=data["operator"],
+            departure_port=data["departure_port"],
+            arrival_port=data["arrival_port"],
+            departure_time=datetime.fromisoformat(data["departure_time"]),
+            arrival_time=datetime.fromisoformat(data["arrival_time"]),
+            vessel_name=data["vessel_name"],
+            prices=data["prices"],
+            cabin_types=data.get("cabin_types"),
+            available_spaces=data.get("available_spaces"),
+            duration=data.get("duration"),
+            route_info=data.get("route_info")
+        )
+
 
+@dataclass(slots=True)
 class BookingRequest:
     """Ferry booking request model."""
-    
-    def __init__(
-        self,
-        sailing_id: str,
-        passengers: List[Dict],
-        vehicles: Optional[List[Dict]] = None,
-        cabin_selection: Optional[Dict] = None,
-        contact_info: Dict[str, str] = None,
-        special_requests: Optional[str] = None
-    ):
-        self.sailing_id = sailing_id
-        self.passengers = passengers
-        self.vehicles = vehicles or []
-        self.cabin_selection = cabin_selection
-        self.contact_info = contact_info or {}
-        self.special_requests = special_requests
+    sailing_id: str
+    passengers: List[Dict]
+    vehicles: Optional[List[Dict]] = None
+    cabin_selection: Optional[Dict] = None
+    contact_info: Optional[Dict[str, str]] = None
+    special_requests: Optional[str] = None
 
+    def __post_init__(self):
+        self.vehicles = self.vehicles or []
+        self.contact_info = self.contact_info or {}
 
+
+@dataclass(slots=True)
 class BookingConfirmation:
     """Ferry booking confirmation model."""
-    
-    def __init__(
-        self,
-        booking_reference: str,
-        operator_reference: str,
-        status: str,
-        total_amount: float,
-        currency: str = "EUR",
-        confirmation_details: Optional[Dict] = None
-    ):
-        self.booking_reference = booking_reference
-        self.operator_reference = operator_reference
-        self.status = status
-        self.total_amount = total_amount
-        self.currency = currency
-        self.confirmation_details = confirmation_details or {}
+    booking_reference: str
+    operator_reference: str
+    status: str
+    total_amount: float
+    currency: str = "EUR"
+    confirmation_details: Optional[Dict] = None
+
+    def __post_init__(self):
+        self.confirmation_details = self.confirmation_details or {}
+
+
+def _is_timeout(error: BaseException) -> bool:
+    """Whether error is, or was raised while handling, a client timeout."""
+    seen = set()
+    while error is not None and id(error) not in seen:
+        if isinstance(error, (httpx.TimeoutException, asyncio.TimeoutError)):
+            return True
+        seen.add(id(error))
+        error = error.__cause__ or error.__context__
+    return False
+
+
+def _instrument(func, call: str):
+    """Wrap an operator method to record latency, outcome and result count."""
+    @functools.wraps(func)
+    async def wrapper(self, *args, **kwargs):
+        operator = self.metrics_name
+        if _current_call.get() == (operator, call):
+            # A subclass override calling super(): already being measured
+            return await func(self, *args, **kwargs)
+        token = _current_call.set((operator, call))
+        started = time.perf_counter()
+        outcome = "success"
+        try:
+            result = await func(self, *args, **kwargs)
+            if call == "search" and result is not None:
+                record_operator_results(operator, len(result))
+            return result
+        except asyncio.CancelledError:
+            # e.g. the losing side of a hedged request: not a real outcome
+            outcome = "cancelled"
+            raise
+        except Exception as e:
+            outcome = "timeout" if _is_timeout(e) else "error"
+            raise
+        finally:
+            _current_call.reset(token)
+            if outcome != "cancelled":
+                duration = time.perf_counter() - started
+                record_operator_call(operator, call, duration, outcome)
+                operator_slo.record(operator, call, duration, outcome)
+    wrapper.__instrumented__ = True
+    return wrapper
 
 
 class BaseFerryIntegration(ABC):
-    """Abstract base class for ferry operator integrations."""
+    """
+    Abstract base class for ferry operator integrations.
+
+    Subclass implementations of search_ferries, create_booking,
+    get_booking_status and cancel_booking are wrapped automatically to record
+    per-operator latency, outcome (success/error/timeout) and search result
+    counts. Clients from _create_session additionally record HTTP status
+    classes and response sizes, and apply the adaptive timeout from
+    operator_slo to each request.
+    """
+
+    # Max concurrent per-day searches in the default search_date_range
+    date_range_concurrency: int = 4
     
     def __init__(self, api_key: str = "", base_url: str = "", timeout: int = 30):
         self.api_key = api_key
         self.base_url = base_url
         self.timeout = timeout
         self.session = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for name, call in INSTRUMENTED_CALLS.items():
+            func = cls.__dict__.get(name)
+            if func is not None and not getattr(func, "__isabstractmethod__", False) \
+                    and not getattr(func, "__instrumented__", False):
+                setattr(cls, name, _instrument(func, call))
+
+    @property
+    def metrics_name(self) -> str:
+        """Operator label for metrics and SLO reports."""
+        return getattr(self, "operator_name", None) or self.__class__.__name__
+
+    def _create_session(self) -> httpx.AsyncClient:
+        """HTTP client with the metrics and adaptive timeout event hooks."""
+        return httpx.AsyncClient(
+            timeout=self.timeout,
+            event_hooks={"request": [self._on_request], "response": [self._on_response]},
+        )
+
+    async def _on_request(self, request: httpx.Request) -> None:
+        current = _current_call.get()
+        if current is None:
+            return
+        operator, call = current
+        timeout = operator_slo.timeout_for(operator, call, float(self.timeout))
+        set_operator_timeout(operator, call, timeout)
+        request.extensions["timeout"] = httpx.Timeout(timeout).as_dict()
+
+    async def _on_response(self, response: httpx.Response) -> None:
+        current = _current_call.get()
+        if current is None:
+            return
+        await response.aread()
+        operator, call = current
+        record_operator_response(operator, call, response.status_code, len(response.content))
     
     async def __aenter__(self):
         """Async context manager entry."""
-        self.session = httpx.AsyncClient(timeout=self.timeout)
+        self.session = self._create_session()
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
@@ -170,6 +288,52 @@ class BaseFerryIntegration(ABC):
         """
         pass
     
+    async def search_date_range(
+        self,
+        search_request: SearchRequest,
+        start_date: date,
+        end_date: date
+    ) -> Dict[date, List[FerryResult]]:
+        """
+        Search every departure date from start_date to end_date (inclusive).
+
+        The default runs one search_ferries call per day, at most
+        `date_range_concurrency` at a time, all sharing the client opened by
+        the context manager. Operators whose API supports range queries
+        should override this with a single request.
+
+        Args:
+            search_request: Search parameters; departure_date is replaced per day
+            start_date: First departure date
+            end_date: Last departure date
+
+        Returns:
+            Mapping of departure date to results. Days whose search failed
+            are omitted.
+        """
+        if end_date < start_date:
+            return {}
+
+        days = [start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)]
+        semaphore = asyncio.Semaphore(self.date_range_concurrency)
+
+        async def search_day(day: date) -> List[FerryResult]:
+            day_request = copy.copy(search_request)
+            day_request.departure_date = day
+            async with semaphore:
+                return await self.search_ferries(day_request)
+
+        results = await asyncio.gather(*(search_day(day) for day in days), return_exceptions=True)
+
+        results_by_date = {}
+        for day, day_results in zip(days, results):
+            if isinstance(day_results, Exception):
+                logger.warning(f"{self.__class__.__name__} search failed for {day}: {day_results}")
+                continue
+            results_by_date[day] = day_results
+
+        return results_by_date
+    
     @abstractmethod
     async def create_booking(self, booking_request: BookingRequest) -> BookingConfirmation:
         """
@@ -228,7 +392,7 @@ class BaseFerryIntegration(ABC):
         """
         try:
             if not self.session:
-                self.session = httpx.AsyncClient(timeout=self.timeout)
+                self.session = self._create_session()
             
             response = await self.session.get(f"{self.base_url}/health")
             return response.status_code == 200
@@ -59,7 +59,7 @@ class CorsicaIntegration(BaseFerryIntegration):
         """Search for available Corsica Lines ferries."""
         try:
             if not self.session:
-                self.session = httpx.AsyncClient(timeout=self.timeout)
+                self.session = self._create_session()
             
             # Prepare search parameters for Corsica Lines API
             search_params = {
@@ -151,7 +151,7 @@ class CorsicaIntegration(BaseFerryIntegration):
         """Create a Corsica Lines ferry booking."""
         try:
             if not self.session:
-                self.session = httpx.AsyncClient(timeout=self.timeout)
+                self.session = self._create_session()
             
             # Prepare booking data for Corsica Lines API
             reservation_data = {
@@ -246,7 +246,7 @@ class CorsicaIntegration(BaseFerryIntegration):
         """Get Corsica Lines booking status."""
         try:
             if not self.session:
-                self.session = httpx.AsyncClient(timeout=self.timeout)
+                self.session = self._create_session()
             
             headers = {
                 "X-API-Key": self.api_key,
@@ -272,7 +272,7 @@ class CorsicaIntegration(BaseFerryIntegration):
         """Cancel Corsica Lines booking."""
         try:
             if not self.session:
-                self.session = httpx.AsyncClient(timeout=self.timeout)
+                self.session = self._create_session()
             
             cancel_data = {"motif": reason} if reason else {}
             
@@ -312,7 +312,7 @@ class CorsicaIntegration(BaseFerryIntegration):
         """Get ferry schedule for a route over a date range."""
         try:
             if not self.session:
-                self.session = httpx.AsyncClient(timeout=self.timeout)
+                self.session = self._create_session()
             
             headers = {
                 "X-API-Key": self.api_key,
@@ -344,7 +344,7 @@ class CorsicaIntegration(BaseFerryIntegration):
         """Get vessel deck plan and cabin layout."""
         try:
             if not self.session:
-                self.session = httpx.AsyncClient(timeout=self.timeout)
+                self.session = self._create_session()
             
             headers = {
                 "X-API-Key": self.api_key,
@@ -367,7 +367,7 @@ class CorsicaIntegration(BaseFerryIntegration):
         """Get port facilities and services."""
         try:
             if not self.session:
-                self.session = httpx.AsyncClient(timeout=self.timeout)
+                self.session = self._create_session()
             
             headers = {
                 "X-API-Key": self.api_key,
@@ -391,7 +391,7 @@ class CorsicaIntegration(BaseFerryIntegration):
         """Modify an existing booking."""
         try:
             if not self.session:
-                self.session = httpx.AsyncClient(timeout=self.timeout)
+                self.session = self._create_session()
             
             headers = {
                 "X-API-Key": self.api_key,
@@ -49,7 +49,7 @@ class CTNIntegration(BaseFerryIntegration):
         """Search for available CTN ferries."""
         try:
             if not self.session:
-                self.session = httpx.AsyncClient(timeout=self.timeout)
+                self.session = self._create_session()
             
             # Prepare search parameters
             params = {
@@ -122,7 +122,7 @@ class CTNIntegration(BaseFerryIntegration):
         """Create a CTN ferry booking."""
         try:
             if not self.session:
-                self.session = httpx.AsyncClient(timeout=self.timeout)
+                self.session = self._create_session()
             
             # Prepare booking data
             booking_data = {
@@ -208,7 +208,7 @@ class CTNIntegration(BaseFerryIntegration):
         """Get CTN booking status."""
         try:
             if not self.session:
-                self.session = httpx.AsyncClient(timeout=self.timeout)
+                self.session = self._create_session()
             
             headers = {
                 "Authorization": f"Bearer {self.api_key}",
@@ -234,7 +234,7 @@ class CTNIntegration(BaseFerryIntegration):
         """Cancel CTN booking."""
         try:
             if not self.session:
-                self.session = httpx.AsyncClient(timeout=self.timeout)
+                self.session = self._create_session()
             
             cancel_data = {"reason": reason} if reason else {}
             
@@ -273,7 +273,7 @@ class CTNIntegration(BaseFerryIntegration):
         """Get route information including duration and distance."""
         try:
             if not self.session:
-                self.session = httpx.AsyncClient(timeout=self.timeout)
+                self.session = self._create_session()
             
             headers = {
                 "Authorization": f"Bearer {self.api_key}",
@@ -302,7 +302,7 @@ class CTNIntegration(BaseFerryIntegration):
         """Get vessel information and amenities."""
         try:
             if not self.session:
-                self.session = httpx.AsyncClient(timeout=self.timeout)
+                self.session = self._create_session()
             
             headers = {
                 "Authorization": f"Bearer {self.api_key}",
@@ -59,7 +59,7 @@ class DanelIntegration(BaseFerryIntegration):
         """Search for available Danel ferries."""
         try:
             if not self.session:
-                self.session = httpx.AsyncClient(timeout=self.timeout)
+                self.session = self._create_session()
             
             # Prepare search parameters for Danel API
             search_payload = {
@@ -150,7 +150,7 @@ class DanelIntegration(BaseFerryIntegration):
         """Create a Danel ferry booking."""
         try:
             if not self.session:
-                self.session = httpx.AsyncClient(timeout=self.timeout)
+                self.session = self._create_session()
             
             # Prepare booking data for Danel API
             booking_payload = {
@@ -255,7 +255,7 @@ class DanelIntegration(BaseFerryIntegration):
         """Get Danel booking status."""
         try:
             if not self.session:
-                self.session = httpx.AsyncClient(timeout=self.timeout)
+                self.session = self._create_session()
             
             headers = {
                 "Authorization": f"Bearer {self.api_key}",
@@ -282,7 +282,7 @@ class DanelIntegration(BaseFerryIntegration):
         """Cancel Danel booking."""
         try:
             if not self.session:
-                self.session = httpx.AsyncClient(timeout=self.timeout)
+                self.session = self._create_session()
             
             cancel_payload = {
                 "motif_annulation": reason or "Demande client",
@@ -326,7 +326,7 @@ class DanelIntegration(BaseFerryIntegration):
         """Get detailed information about a specific crossing."""
         try:
             if not self.session:
-                self.session = httpx.AsyncClient(timeout=self.timeout)
+                self.session = self._create_session()
             
             headers = {
                 "Authorization": f"Bearer {self.api_key}",
@@ -350,7 +350,7 @@ class DanelIntegration(BaseFerryIntegration):
         """Get vessel information and facilities."""
         try:
             if not self.session:
-                self.session = httpx.AsyncClient(timeout=self.timeout)
+                self.session = self._create_session()
             
             headers = {
                 "Authorization": f"Bearer {self.api_key}",
@@ -374,7 +374,7 @@ class DanelIntegration(BaseFerryIntegration):
         """Get port information and services."""
         try:
             if not self.session:
-                self.session = httpx.AsyncClient(timeout=self.timeout)
+                self.session = self._create_session()
             
             headers = {
                 "Authorization": f"Bearer {self.api_key}",
@@ -399,7 +399,7 @@ class DanelIntegration(BaseFerryIntegration):
         """Modify an existing reservation."""
         try:
             if not self.session:
-                self.session = httpx.AsyncClient(timeout=self.timeout)
+                self.session = self._create_session()
             
             headers = {
                 "Authorization": f"Bearer {self.api_key}",
@@ -425,7 +425,7 @@ class DanelIntegration(BaseFerryIntegration):
         """Get available accommodations for a specific sailing."""
         try:
             if not self.session:
-                self.session = httpx.AsyncClient(timeout=self.timeout)
+                self.session = self._create_session()
             
             headers = {
                 "Authorization": f"Bearer {self.api_key}",
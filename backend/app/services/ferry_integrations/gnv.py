@@ -60,7 +60,7 @@ class GNVIntegration(BaseFerryIntegration):
         """Search for available GNV ferries."""
         try:
             if not self.session:
-                self.session = httpx.AsyncClient(timeout=self.timeout)
+                self.session = self._create_session()
             
             # Prepare search parameters for GNV API
             search_data = {
@@ -148,7 +148,7 @@ class GNVIntegration(BaseFerryIntegration):
         """Create a GNV ferry booking."""
         try:
             if not self.session:
-                self.session = httpx.AsyncClient(timeout=self.timeout)
+                self.session = self._create_session()
             
             # Prepare booking data for GNV API
             prenotazione_data = {
@@ -243,7 +243,7 @@ class GNVIntegration(BaseFerryIntegration):
         """Get GNV booking status."""
         try:
             if not self.session:
-                self.session = httpx.AsyncClient(timeout=self.timeout)
+                self.session = self._create_session()
             
             headers = {
                 "Authorization": f"ApiKey {self.api_key}",
@@ -269,7 +269,7 @@ class GNVIntegration(BaseFerryIntegration):
         """Cancel GNV booking."""
         try:
             if not self.session:
-                self.session = httpx.AsyncClient(timeout=self.timeout)
+                self.session = self._create_session()
             
             cancel_data = {"motivo": reason} if reason else {}
             
@@ -309,7 +309,7 @@ class GNVIntegration(BaseFerryIntegration):
         """Get available cabins for a specific sailing."""
         try:
             if not self.session:
-                self.session = httpx.AsyncClient(timeout=self.timeout)
+                self.session = self._create_session()
             
             headers = {
                 "Authorization": f"ApiKey {self.api_key}",
@@ -334,7 +334,7 @@ class GNVIntegration(BaseFerryIntegration):
         """Get vessel amenities and services."""
         try:
             if not self.session:
-                self.session = httpx.AsyncClient(timeout=self.timeout)
+                self.session = self._create_session()
             
             headers = {
                 "Authorization": f"ApiKey {self.api_key}",
@@ -357,7 +357,7 @@ class GNVIntegration(BaseFerryIntegration):
         """Get port information and facilities."""
         try:
             if not self.session:
-                self.session = httpx.AsyncClient(timeout=self.timeout)
+                self.session = self._create_session()
             
             headers = {
                 "Authorization": f"ApiKey {self.api_key}",
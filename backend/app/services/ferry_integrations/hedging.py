@@ -0,0 +1,124 @@
+"""
+Hedged operator requests.
+
+When an operator call has not answered within that operator's observed
+latency percentile (OPERATOR_HEDGE_PERCENTILE, p90 by default), a second
+identical call is started on the same client - httpx opens another pooled
+connection - and whichever succeeds first is used; the other is cancelled.
+An error from one side does not end the race while the other is pending.
+
+A global budget keeps the extra load bounded: every call deposits
+OPERATOR_HEDGE_BUDGET_RATIO tokens and a hedge costs one, so at most ~5%
+extra calls are made over time (with a small burst allowance).
+
+Opt-in through OPERATOR_HEDGING_ENABLED.
+"""
+
+import asyncio
+import logging
+from threading import Lock
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from app.api.v1.metrics import record_operator_hedge
+from app.config import settings
+from .slo import operator_slo
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class HedgeBudget:
+    """Token bucket allowing hedges for a fraction of all calls."""
+
+    def __init__(self, ratio: Optional[float] = None, max_tokens: float = 10.0):
+        self.ratio = settings.OPERATOR_HEDGE_BUDGET_RATIO if ratio is None else ratio
+        self.max_tokens = max_tokens
+        self.tokens = 0.0
+        self._lock = Lock()
+
+    def deposit(self) -> None:
+        """Credit one call."""
+        with self._lock:
+            self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        """Take one hedge from the budget, if available."""
+        with self._lock:
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+    def reset(self) -> None:
+        with self._lock:
+            self.tokens = 0.0
+
+
+# Global budget shared by all operators
+hedge_budget = HedgeBudget()
+
+
+def hedge_delay(operator: str, call: str) -> Optional[float]:
+    """Seconds to wait before hedging, or None when hedging does not apply."""
+    if not settings.OPERATOR_HEDGING_ENABLED:
+        return None
+    return operator_slo.latency_percentile(operator, call, settings.OPERATOR_HEDGE_PERCENTILE)
+
+
+def _discard(task: Optional[asyncio.Future]) -> None:
+    """Cancel a pending task, or retrieve a finished one's exception."""
+    if task is None:
+        return
+    if not task.done():
+        task.cancel()
+    elif not task.cancelled():
+        task.exception()
+
+
+async def hedged(operator: str, call: str, make_request: Callable[[], Awaitable[T]]) -> T:
+    """
+    Await make_request(), hedging it with a second call if it is slow.
+
+    Args:
+        operator: Operator label (as in the SLO tracker)
+        call: Call type, e.g. "search"
+        make_request: Zero-argument coroutine factory for the call
+
+    Returns:
+        The first successful result
+
+    Raises:
+        The last error when every started call failed
+    """
+    delay = hedge_delay(operator, call)
+    if delay is None:
+        return await make_request()
+
+    hedge_budget.deposit()
+    primary = asyncio.ensure_future(make_request())
+    hedge = None
+    try:
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if not done:
+            if hedge_budget.withdraw():
+                logger.info(f"🔀 {operator} {call} slower than {delay:.2f}s, hedging")
+                record_operator_hedge(operator, call, "fired")
+                hedge = asyncio.ensure_future(make_request())
+            else:
+                record_operator_hedge(operator, call, "budget_exhausted")
+
+        pending = {primary} if hedge is None else {primary, hedge}
+        error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in sorted(done, key=lambda t: t is not primary):
+                if task.exception() is None:
+                    if task is hedge:
+                        record_operator_hedge(operator, call, "won")
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        _discard(primary)
+        _discard(hedge)
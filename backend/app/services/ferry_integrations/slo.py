@@ -0,0 +1,226 @@
+"""
+Rolling SLO tracking and adaptive timeouts for ferry operator calls.
+
+BaseFerryIntegration records every search/book/status/cancel call here (and
+in the Prometheus metrics). The tracker keeps a time-bounded window of
+samples per (operator, call) and derives:
+- availability, timeout rate and p50/p95/p99 latency over the window
+- compliance with the per-call SLO targets and the remaining error budget
+- an adaptive client timeout: p99 x OPERATOR_TIMEOUT_P99_MULTIPLIER, clamped
+  between OPERATOR_TIMEOUT_MIN_SECONDS and the integration's static timeout
+
+State is per process: the admin endpoint reports the worker that serves it,
+while Prometheus aggregates the counters across workers.
+"""
+
+import math
+import time
+import logging
+from collections import deque
+from dataclasses import dataclass
+from threading import Lock
+from typing import Deque, Dict, List, Optional, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+CALL_TYPES = ("search", "book", "status", "cancel")
+
+
+@dataclass(frozen=True)
+class SLOTarget:
+    """Objectives for one call type."""
+    availability: float  # Fraction of calls that must succeed
+    latency_seconds: float  # Latency threshold...
+    latency_objective: float = 0.95  # ...that this fraction of calls must meet
+
+
+DEFAULT_SLO_TARGETS: Dict[str, SLOTarget] = {
+    "search": SLOTarget(availability=0.99, latency_seconds=3.0),
+    "book": SLOTarget(availability=0.995, latency_seconds=10.0),
+    "status": SLOTarget(availability=0.99, latency_seconds=3.0),
+    "cancel": SLOTarget(availability=0.99, latency_seconds=10.0),
+}
+
+
+@dataclass(slots=True)
+class CallSample:
+    """One finished operator call."""
+    at: float
+    latency: float
+    outcome: str  # success | error | timeout
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class OperatorSLOTracker:
+    """Rolling window of operator call samples with SLO and timeout derivation."""
+
+    def __init__(
+        self,
+        window_seconds: Optional[int] = None,
+        max_samples: int = 5000,
+        targets: Optional[Dict[str, SLOTarget]] = None,
+    ):
+        self.window_seconds = window_seconds or settings.OPERATOR_SLO_WINDOW_SECONDS
+        self.max_samples = max_samples
+        self.targets = targets or DEFAULT_SLO_TARGETS
+        self._samples: Dict[Tuple[str, str], Deque[CallSample]] = {}
+        self._timeouts: Dict[Tuple[str, str], Tuple[float, float, float]] = {}
+        self._percentiles: Dict[Tuple[str, str, float], Tuple[float, Optional[float]]] = {}
+        self._lock = Lock()
+
+    def record(self, operator: str, call: str, latency: float, outcome: str, now: Optional[float] = None) -> None:
+        """Add a finished call to the window."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            samples = self._samples.get((operator, call))
+            if samples is None:
+                samples = self._samples[(operator, call)] = deque(maxlen=self.max_samples)
+            samples.append(CallSample(at=now, latency=latency, outcome=outcome))
+
+    def _window(self, operator: str, call: str, now: float) -> List[CallSample]:
+        """Samples inside the window; older ones are dropped."""
+        with self._lock:
+            samples = self._samples.get((operator, call))
+            if not samples:
+                return []
+            cutoff = now - self.window_seconds
+            while samples and samples[0].at < cutoff:
+                samples.popleft()
+            return list(samples)
+
+    def report(self, operator: str, call: str, now: Optional[float] = None) -> Dict:
+        """SLO report for one operator call type over the window."""
+        now = time.monotonic() if now is None else now
+        samples = self._window(operator, call, now)
+        target = self.targets.get(call, DEFAULT_SLO_TARGETS["search"])
+        total = len(samples)
+        report = {
+            "operator": operator,
+            "call": call,
+            "window_seconds": self.window_seconds,
+            "count": total,
+            "target": {
+                "availability": target.availability,
+                "latency_seconds": target.latency_seconds,
+                "latency_objective": target.latency_objective,
+            },
+        }
+        if not total:
+            return report
+
+        latencies = sorted(s.latency for s in samples)
+        successes = sum(1 for s in samples if s.outcome == "success")
+        timeouts = sum(1 for s in samples if s.outcome == "timeout")
+        fast = sum(1 for s in samples if s.outcome == "success" and s.latency <= target.latency_seconds)
+
+        availability = successes / total
+        latency_compliance = fast / total
+        allowed_failures = 1 - target.availability
+        error_budget_remaining = (
+            1 - (1 - availability) / allowed_failures if allowed_failures > 0 else float(availability == 1)
+        )
+
+        report.update({
+            "availability": round(availability, 5),
+            "error_rate": round((total - successes - timeouts) / total, 5),
+            "timeout_rate": round(timeouts / total, 5),
+            "latency_seconds": {
+                "p50": round(percentile(latencies, 50), 4),
+                "p95": round(percentile(latencies, 95), 4),
+                "p99": round(percentile(latencies, 99), 4),
+                "max": round(latencies[-1], 4),
+            },
+            "latency_compliance": round(latency_compliance, 5),
+            "error_budget_remaining": round(error_budget_remaining, 5),
+            "availability_met": availability >= target.availability,
+            "latency_met": latency_compliance >= target.latency_objective,
+        })
+        report["slo_met"] = report["availability_met"] and report["latency_met"]
+        return report
+
+    def snapshot(self, now: Optional[float] = None) -> Dict[str, Dict[str, Dict]]:
+        """Reports for every operator and call type seen, keyed operator -> call."""
+        with self._lock:
+            keys = sorted(self._samples)
+        result: Dict[str, Dict[str, Dict]] = {}
+        for operator, call in keys:
+            report = self.report(operator, call, now)
+            if report["count"]:
+                result.setdefault(operator, {})[call] = report
+        return result
+
+    def timeout_for(self, operator: str, call: str, default: float, now: Optional[float] = None) -> float:
+        """
+        Client timeout for the next call.
+
+        Falls back to `default` until OPERATOR_TIMEOUT_MIN_SAMPLES calls are in
+        the window, and whenever the timeout rate exceeds
+        OPERATOR_TIMEOUT_MAX_TIMEOUT_RATE (the window no longer shows the real
+        tail, so tightening further would only cut off more calls). Values are
+        recomputed at most every OPERATOR_TIMEOUT_REFRESH_SECONDS.
+        """
+        if not settings.OPERATOR_ADAPTIVE_TIMEOUTS:
+            return default
+        now = time.monotonic() if now is None else now
+        cached = self._timeouts.get((operator, call))
+        if cached and cached[2] == default and now - cached[0] < settings.OPERATOR_TIMEOUT_REFRESH_SECONDS:
+            return cached[1]
+
+        samples = self._window(operator, call, now)
+        timeout = default
+        if len(samples) >= settings.OPERATOR_TIMEOUT_MIN_SAMPLES:
+            timeouts = sum(1 for s in samples if s.outcome == "timeout")
+            if timeouts / len(samples) <= settings.OPERATOR_TIMEOUT_MAX_TIMEOUT_RATE:
+                p99 = percentile(sorted(s.latency for s in samples), 99)
+                timeout = min(default, max(settings.OPERATOR_TIMEOUT_MIN_SECONDS,
+                                           p99 * settings.OPERATOR_TIMEOUT_P99_MULTIPLIER))
+
+        previous = cached[1] if cached else default
+        if abs(timeout - previous) >= 1:
+            logger.info(f"⏱️ {operator} {call} timeout {previous:.1f}s -> {timeout:.1f}s")
+        self._timeouts[(operator, call)] = (now, timeout, default)
+        return timeout
+
+    def latency_percentile(self, operator: str, call: str, pct: float, now: Optional[float] = None) -> Optional[float]:
+        """
+        Latency percentile of successful calls in the window.
+
+        None until OPERATOR_TIMEOUT_MIN_SAMPLES successes are in the window.
+        Cached for OPERATOR_TIMEOUT_REFRESH_SECONDS.
+        """
+        now = time.monotonic() if now is None else now
+        cached = self._percentiles.get((operator, call, pct))
+        if cached and now - cached[0] < settings.OPERATOR_TIMEOUT_REFRESH_SECONDS:
+            return cached[1]
+
+        latencies = sorted(s.latency for s in self._window(operator, call, now) if s.outcome == "success")
+        value = percentile(latencies, pct) if len(latencies) >= settings.OPERATOR_TIMEOUT_MIN_SAMPLES else None
+        self._percentiles[(operator, call, pct)] = (now, value)
+        return value
+
+    def current_timeouts(self) -> Dict[str, Dict[str, float]]:
+        """Last computed timeout per operator and call type."""
+        result: Dict[str, Dict[str, float]] = {}
+        for (operator, call), (_, timeout, _) in sorted(self._timeouts.items()):
+            result.setdefault(operator, {})[call] = round(timeout, 3)
+        return result
+
+    def reset(self) -> None:
+        """Forget all samples and timeouts (tests)."""
+        with self._lock:
+            self._samples.clear()
+            self._timeouts.clear()
+            self._percentiles.clear()
+
+
+# Global tracker fed by BaseFerryIntegration
+operator_slo = OperatorSLOTracker()
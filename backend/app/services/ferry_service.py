@@ -4,8 +4,8 @@ Ferry service orchestrator - manages all ferry operator integrations.
 
 import logging
 import asyncio
-from typing import List, Dict, Optional
-from datetime import date
+from typing import List, Dict, Optional, Any
+from datetime import date, timedelta
 
 from app.config import settings
 from app.services.ferry_integrations.base import (
@@ -21,9 +21,81 @@ from app.services.ferry_integrations.gnv import GNVIntegration
 from app.services.ferry_integrations.corsica import CorsicaIntegration
 from app.services.ferry_integrations.danel import DanelIntegration
 from app.services.ferry_integrations.mock import MockFerryIntegration
+from app.services.ferry_integrations.hedging import hedged
+from app.tracing import span
 
 logger = logging.getLogger(__name__)
 
+# TTL for per-day results written to the ferry_search cache (matches /ferries/search)
+SEARCH_CACHE_TTL = 300
+
+# TTL for /ferries/date-prices responses (matches the ferry_search cache)
+DATE_PRICES_CACHE_TTL = 300
+
+# TTL for per-operator sailings. A ferry_search entry composed from them is
+# cached only until the oldest one expires (see search_cache_ttl), so the two
+# caches together are never staler than this
+OPERATOR_SAILINGS_TTL = 300
+
+
+def search_cache_params(
+    departure_port: str,
+    arrival_port: str,
+    departure_date: date,
+    return_date: Optional[date] = None,
+    adults: int = 1,
+    children: int = 0,
+    infants: int = 0
+) -> Dict[str, Any]:
+    """
+    Build the ferry_search cache key params for a plain (no vehicles, all
+    operators) search, matching the key used by /ferries/search.
+    """
+    return {
+        "departure_port": departure_port,
+        "arrival_port": arrival_port,
+        "departure_date": departure_date.isoformat(),
+        "return_date": return_date.isoformat() if return_date else None,
+        "return_departure_port": None,
+        "return_arrival_port": None,
+        "adults": adults,
+        "children": children,
+        "infants": infants,
+        "vehicles": 0,  # Integer count for cache key
+        "operators": None
+    }
+
+
+def operator_sailing_params(
+    operator_name: str,
+    departure_port: str,
+    arrival_port: str,
+    departure_date: date
+) -> Dict[str, Any]:
+    """Build the operator_sailings cache key params for one operator, route and date."""
+    return {
+        "operator": operator_name,
+        "departure_port": departure_port,
+        "arrival_port": arrival_port,
+        "departure_date": departure_date.isoformat()
+    }
+
+
+def compose_for_party(sailings: List[FerryResult], search_request: SearchRequest) -> List[FerryResult]:
+    """
+    Fit cached operator sailings to a search's passenger mix.
+
+    Prices stay per passenger type (totals are computed by the client), so
+    composing only drops sailings without enough passenger capacity for
+    the party. Sailings that report no passenger capacity are kept.
+    """
+    party_size = search_request.adults + search_request.children + search_request.infants
+    return [
+        sailing for sailing in sailings
+        if sailing.available_spaces.get("passengers") is None
+        or sailing.available_spaces["passengers"] >= party_size
+    ]
+
 
 class FerryService:
     """
@@ -121,7 +193,8 @@ class FerryService:
         children: int = 0,
         infants: int = 0,
         vehicles: Optional[List[Dict]] = None,
-        operators: Optional[List[str]] = None
+        operators: Optional[List[str]] = None,
+        refresh_operator_cache: bool = False
     ) -> List[FerryResult]:
         """
         Search for ferries across all or specific operators.
@@ -138,6 +211,8 @@ class FerryService:
             infants: Number of infant passengers (0-2 years)
             vehicles: List of vehicles to transport
             operators: Optional list of specific operators to search (e.g., ["ctn", "gnv"])
+            refresh_operator_cache: Query operators even when their sailings are
+                cached, and re-cache them (used by the cache warmer)
 
         Returns:
             Combined list of ferry results from all operators
@@ -174,7 +249,7 @@ class FerryService:
         # Search all operators concurrently
         search_tasks = []
         for operator_name, integration in integrations_to_search.items():
-            task = self._search_operator(operator_name, integration, search_request)
+            task = self._search_operator(operator_name, integration, search_request, refresh_operator_cache)
             search_tasks.append(task)
 
         # Wait for all searches to complete
@@ -200,7 +275,8 @@ class FerryService:
         self,
         operator_name: str,
         integration: BaseFerryIntegration,
-        search_request: SearchRequest
+        search_request: SearchRequest,
+        refresh_cache: bool = False
     ) -> List[FerryResult]:
         """
         Search a single operator with error handling.
@@ -209,14 +285,23 @@ class FerryService:
             operator_name: Name of the operator
             integration: Ferry integration instance
             search_request: Search parameters
+            refresh_cache: Bypass cached operator sailings and re-cache them
 
         Returns:
             List of ferry results
         """
+        from app.services.cache_service import cache_service
+
         try:
-            async with integration:
-                results = await integration.search_ferries(search_request)
-                return results
+            # Vehicle quotes depend on the vehicles themselves, so they are
+            # never served from the per-operator sailing cache
+            if search_request.vehicles or not cache_service.is_available():
+                return await self._call_search(operator_name, integration, search_request)
+
+            sailings = await self._get_operator_sailings(
+                operator_name, integration, search_request, refresh_cache
+            )
+            return compose_for_party(sailings, search_request)
         except FerryAPIError as e:
             logger.error(f"{operator_name} API error: {e.message} (code: {e.error_code})")
             return []
@@ -224,6 +309,373 @@ class FerryService:
             logger.error(f"{operator_name} search failed: {e}", exc_info=True)
             return []
 
+    async def _call_search(
+        self,
+        operator_name: str,
+        integration: BaseFerryIntegration,
+        search_request: SearchRequest
+    ) -> List[FerryResult]:
+        """
+        Call an operator's search, hedged when OPERATOR_HEDGING_ENABLED.
+
+        A search slower than the operator's observed p90 is raced against a
+        second identical call on the same client (see ferry_integrations/
+        hedging.py); the first success wins.
+        """
+        with span("operator.search", operator=operator_name):
+            async with integration:
+                return await hedged(
+                    integration.metrics_name,
+                    "search",
+                    lambda: integration.search_ferries(search_request)
+                )
+
+    async def _get_operator_sailings(
+        self,
+        operator_name: str,
+        integration: BaseFerryIntegration,
+        search_request: SearchRequest,
+        refresh_cache: bool = False
+    ) -> List[FerryResult]:
+        """
+        Get an operator's sailings for the request's route and date.
+
+        Sailings are cached per (operator, route, date) with per-type unit
+        prices, independent of the passenger mix and return date, so every
+        search on that route and date shares one operator call. On a miss (or
+        with refresh_cache) the operator is queried once for a single adult,
+        one way.
+        """
+        from app.services.cache_service import cache_service
+
+        sailing_params = operator_sailing_params(
+            operator_name,
+            search_request.departure_port,
+            search_request.arrival_port,
+            search_request.departure_date
+        )
+        cached = None if refresh_cache else cache_service.get_operator_sailings(sailing_params)
+        if cached is not None:
+            return [FerryResult.from_dict(sailing) for sailing in cached]
+
+        sailings = await self._call_search(operator_name, integration, SearchRequest(
+            departure_port=search_request.departure_port,
+            arrival_port=search_request.arrival_port,
+            departure_date=search_request.departure_date
+        ))
+
+        cache_service.set_operator_sailings(
+            sailing_params,
+            sailings,
+            ttl=OPERATOR_SAILINGS_TTL
+        )
+        return sailings
+
+    async def search_date_range(
+        self,
+        departure_port: str,
+        arrival_port: str,
+        start_date: date,
+        end_date: date,
+        return_date: Optional[date] = None,
+        adults: int = 1,
+        children: int = 0,
+        infants: int = 0,
+        operators: Optional[List[str]] = None
+    ) -> Dict[date, List[FerryResult]]:
+        """
+        Search a range of departure dates across all or specific operators.
+
+        Each operator receives one date-range call (see
+        BaseFerryIntegration.search_date_range) instead of one search per day.
+
+        Returns:
+            Mapping of departure date to combined results sorted by departure
+            time. Dates no operator answered for are omitted.
+        """
+        search_request = SearchRequest(
+            departure_port=departure_port,
+            arrival_port=arrival_port,
+            departure_date=start_date,
+            return_date=return_date,
+            adults=adults,
+            children=children,
+            infants=infants
+        )
+
+        if operators:
+            integrations_to_search = {
+                name: integration
+                for name, integration in self.integrations.items()
+                if name in operators
+            }
+        else:
+            integrations_to_search = self.integrations
+
+        if not integrations_to_search:
+            logger.warning("No ferry integrations available to search")
+            return {}
+
+        logger.info(
+            f"Searching {len(integrations_to_search)} operators for "
+            f"{start_date.isoformat()}..{end_date.isoformat()}: {list(integrations_to_search.keys())}"
+        )
+
+        results_by_operator = await asyncio.gather(*(
+            self._search_operator_range(operator_name, integration, search_request, start_date, end_date)
+            for operator_name, integration in integrations_to_search.items()
+        ))
+
+        results_by_date: Dict[date, List[FerryResult]] = {}
+        for operator_results in results_by_operator:
+            for day, day_results in operator_results.items():
+                results_by_date.setdefault(day, []).extend(day_results)
+
+        for day_results in results_by_date.values():
+            day_results.sort(key=lambda x: x.departure_time)
+
+        return results_by_date
+
+    async def _search_operator_range(
+        self,
+        operator_name: str,
+        integration: BaseFerryIntegration,
+        search_request: SearchRequest,
+        start_date: date,
+        end_date: date
+    ) -> Dict[date, List[FerryResult]]:
+        """Search a date range on a single operator with error handling."""
+        try:
+            with span("operator.search_date_range", operator=operator_name):
+                async with integration:
+                    return await integration.search_date_range(search_request, start_date, end_date)
+        except FerryAPIError as e:
+            logger.error(f"{operator_name} API error: {e.message} (code: {e.error_code})")
+            return {}
+        except Exception as e:
+            logger.error(f"{operator_name} date-range search failed: {e}", exc_info=True)
+            return {}
+
+    async def get_min_price_grid(
+        self,
+        departure_port: str,
+        arrival_port: str,
+        start_date: date,
+        end_date: date,
+        return_date: Optional[date] = None,
+        adults: int = 1,
+        children: int = 0,
+        infants: int = 0
+    ) -> Dict[date, Dict[str, Any]]:
+        """
+        Get the lowest per-adult price for every date in a range.
+
+        Dates already in the ferry_search cache are read from it, so the grid
+        matches the result lists users see. The remaining dates are fetched
+        with date-range searches (one per run of consecutive uncached dates)
+        and written back to the ferry_search cache.
+
+        Returns:
+            Mapping of date to {"lowest_price", "num_ferries", "available"}.
+            Dates no operator answered for are omitted.
+        """
+        from app.services.cache_service import cache_service
+
+        # Per-sailing price dicts for each date
+        prices_by_date: Dict[date, List[Dict[str, float]]] = {}
+        missing: List[date] = []
+
+        day = start_date
+        while day <= end_date:
+            cached = cache_service.get_ferry_search(search_cache_params(
+                departure_port, arrival_port, day, return_date, adults, children, infants
+            ))
+            if cached:
+                prices_by_date[day] = [
+                    result.get("prices") or {} for result in cached.get("results", [])
+                ]
+            else:
+                missing.append(day)
+            day += timedelta(days=1)
+
+        if missing:
+            # One range search per run of consecutive uncached dates
+            runs: List[List[date]] = []
+            for day in missing:
+                if runs and day - runs[-1][-1] == timedelta(days=1):
+                    runs[-1].append(day)
+                else:
+                    runs.append([day])
+
+            # Runs are searched one after another: each opens and closes the
+            # integrations' shared client
+            fetched: Dict[date, List[FerryResult]] = {}
+            for run in runs:
+                fetched.update(await self.search_date_range(
+                    departure_port=departure_port,
+                    arrival_port=arrival_port,
+                    start_date=run[0],
+                    end_date=run[-1],
+                    return_date=return_date,
+                    adults=adults,
+                    children=children,
+                    infants=infants
+                ))
+
+            for day in missing:
+                if day not in fetched:
+                    continue
+                prices_by_date[day] = [result.prices for result in fetched[day]]
+                if fetched[day]:
+                    self.cache_search_results(
+                        search_cache_params(
+                            departure_port, arrival_port, day, return_date, adults, children, infants
+                        ),
+                        fetched[day]
+                    )
+
+        grid = {}
+        for day, sailing_prices in sorted(prices_by_date.items()):
+            adult_prices = [p.get("adult", 0) for p in sailing_prices if p.get("adult", 0) > 0]
+            grid[day] = {
+                "lowest_price": min(adult_prices) if adult_prices else None,
+                "num_ferries": len(sailing_prices),
+                "available": bool(sailing_prices),
+            }
+
+        return grid
+
+    async def build_date_prices(
+        self,
+        departure_port: str,
+        arrival_port: str,
+        center_date: date,
+        days_before: int = 3,
+        days_after: int = 3,
+        adults: int = 1,
+        children: int = 0,
+        infants: int = 0,
+        return_date: Optional[date] = None
+    ) -> Dict[str, Any]:
+        """
+        Build the /ferries/date-prices response for dates around center_date.
+
+        Prices come from get_min_price_grid, so days already in the
+        ferry_search cache are not searched again.
+        """
+        start_date = center_date - timedelta(days=days_before)
+        end_date = center_date + timedelta(days=days_after)
+
+        # Pass return_date to get round-trip context pricing (if applicable)
+        price_grid = await self.get_min_price_grid(
+            departure_port=departure_port,
+            arrival_port=arrival_port,
+            start_date=start_date,
+            end_date=end_date,
+            return_date=return_date,
+            adults=adults,
+            children=children,
+            infants=infants
+        )
+
+        date_prices = []
+        current_date = start_date
+        while current_date <= end_date:
+            day_prices = price_grid.get(current_date)
+            available = bool(day_prices and day_prices["available"])
+            lowest_price = day_prices["lowest_price"] if available else None
+
+            date_prices.append({
+                "date": current_date.isoformat(),
+                "day_of_week": current_date.strftime("%a"),
+                "day_of_month": current_date.day,
+                "month": current_date.strftime("%b"),
+                "lowest_price": round(lowest_price, 2) if lowest_price else None,
+                "available": available,
+                "num_ferries": day_prices["num_ferries"] if available else 0,
+                "is_center_date": current_date == center_date
+            })
+
+            current_date += timedelta(days=1)
+
+        return {
+            "route": {
+                "departure_port": departure_port,
+                "arrival_port": arrival_port
+            },
+            "center_date": center_date.isoformat(),
+            "date_prices": date_prices,
+            "total_dates": len(date_prices)
+        }
+
+    def search_cache_ttl(self, cache_params: Dict[str, Any]) -> int:
+        """
+        TTL for a ferry_search entry of results just returned by search_ferries.
+
+        Results composed from cached operator sailings are only as fresh as
+        the oldest of them, so the entry expires no later than the first
+        operator entry it was built from instead of a full SEARCH_CACHE_TTL
+        after that.
+
+        Args:
+            cache_params: ferry_search cache key params (vehicles as a count)
+        """
+        from app.services.cache_service import cache_service
+
+        # Vehicle searches never use the operator sailing cache
+        if cache_params.get("vehicles") or not cache_params.get("departure_date"):
+            return SEARCH_CACHE_TTL
+
+        departure_date = date.fromisoformat(cache_params["departure_date"])
+        operators = cache_params.get("operators") or self.get_available_operators()
+        remaining = cache_service.get_operator_sailings_ttl([
+            operator_sailing_params(
+                operator,
+                cache_params["departure_port"],
+                cache_params["arrival_port"],
+                departure_date
+            )
+            for operator in operators
+        ])
+        if remaining is None:
+            return SEARCH_CACHE_TTL
+        return max(1, min(SEARCH_CACHE_TTL, remaining))
+
+    def cache_search_results(
+        self,
+        cache_params: Dict[str, Any],
+        results: List[FerryResult]
+    ) -> bool:
+        """
+        Store results in the ferry_search cache entry read by /ferries/search.
+
+        The entry lives a full SEARCH_CACHE_TTL, so results must come straight
+        from the operators (search_ferries with refresh_operator_cache, or
+        search_date_range), not from cached operator sailings.
+
+        Args:
+            cache_params: ferry_search cache key params (vehicles as a count)
+            results: Results to cache
+
+        Returns:
+            True if cached successfully
+        """
+        from app.services.cache_service import cache_service
+
+        cache_response = {
+            "results": results,  # Serialized directly by the cache
+            "search_params": {
+                **cache_params,
+                "vehicles": [],  # List for response schema
+                "passengers": None
+            },
+            "operators_searched": list(set([r.operator for r in results])),
+            "total_results": len(results),
+            "search_time_ms": 0,  # Searched in the background
+            "cached": False
+        }
+        return cache_service.set_ferry_search(cache_params, cache_response, ttl=SEARCH_CACHE_TTL)
+
     async def create_booking(
         self,
         operator: str,
@@ -269,8 +721,9 @@ class FerryService:
         )
 
         try:
-            async with integration:
-                confirmation = await integration.create_booking(booking_request)
+            with span("operator.create_booking", operator=operator_key):
+                async with integration:
+                    confirmation = await integration.create_booking(booking_request)
                 logger.info(f"Booking created: {confirmation.booking_reference} with {operator}")
                 return confirmation
         except FerryAPIError as e:
@@ -298,8 +751,9 @@ class FerryService:
             raise ValueError(f"Unknown operator: {operator}")
 
         try:
-            async with integration:
-                status = await integration.get_booking_status(booking_reference)
+            with span("operator.get_booking_status", operator=operator_key):
+                async with integration:
+                    status = await integration.get_booking_status(booking_reference)
                 return status
         except FerryAPIError as e:
             logger.error(f"Status check failed for {operator}: {e.message}")
@@ -332,8 +786,9 @@ class FerryService:
             raise ValueError(f"Unknown operator: {operator}")
 
         try:
-            async with integration:
-                success = await integration.cancel_booking(booking_reference, reason)
+            with span("operator.cancel_booking", operator=operator_key):
+                async with integration:
+                    success = await integration.cancel_booking(booking_reference, reason)
                 if success:
                     logger.info(f"Booking cancelled: {booking_reference} with {operator}")
                 return success
@@ -0,0 +1,362 @@
+"""
+Concurrency-safe sailing inventory reservations.
+
+Each sailing booked on this platform has one sailing_inventory row holding
+its capacity and the passengers, vehicles and cabins reserved by PENDING and
+CONFIRMED bookings. A booking reserves with a single conditional UPDATE:
+
+    UPDATE sailing_inventory
+       SET passengers_reserved = passengers_reserved + :n, ...
+     WHERE sailing_id = :sailing AND passengers_reserved + :n <= passenger_capacity ...
+    RETURNING id
+
+The UPDATE takes a row lock held until the booking transaction commits, so
+two requests for the last cabin of a sailing are serialized on that row
+only (other sailings are unaffected) and the second one fails fast with
+SoldOutError instead of overbooking. The reservation commits or rolls back
+together with the booking; what was reserved is stored on the booking
+(extra_data["inventory"]) so expiry and cancellation release exactly that.
+
+Capacity is seeded from the operator's availability in the search cache
+when a sailing is first booked; if the sailing is not cached its capacity
+stays NULL (not enforced) and reservations are only counted.
+"""
+
+import logging
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, Optional
+
+from sqlalchemy import and_, case, func, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.sailing_inventory import SailingInventory
+
+logger = logging.getLogger(__name__)
+
+RESOURCES = ("passengers", "vehicles", "cabins")
+
+# Cabin types that are not counted as cabins (see adjust_availability_from_bookings)
+SEAT_TYPES = ("deck", "seat", "reclining_seat")
+
+
+class SoldOutError(Exception):
+    """Not enough capacity left on a sailing for a booking."""
+
+    def __init__(self, sailing_id: str, resource: str, available: int, requested: int):
+        self.sailing_id = sailing_id
+        self.resource = resource
+        self.available = available
+        self.requested = requested
+        super().__init__(
+            f"Sold out: only {available} {resource} left on sailing {sailing_id} "
+            f"({requested} requested)"
+        )
+
+
+def _reserved_column(resource: str):
+    return SailingInventory.__table__.c[f"{resource}_reserved"]
+
+
+def _capacity_column(resource: str):
+    return SailingInventory.__table__.c[f"{resource[:-1]}_capacity"]
+
+
+class InventoryService:
+    """Reserve and release per-sailing capacity for bookings."""
+
+    def operator_capacity(
+        self,
+        operator: Optional[str],
+        sailing_id: str,
+        departure_port: Optional[str],
+        arrival_port: Optional[str],
+        departure_date: Optional[date]
+    ) -> Dict[str, Optional[int]]:
+        """
+        Capacity of a sailing from the cached operator sailings, if present.
+
+        Returns:
+            Dict of passengers/vehicles/cabins capacity (None when unknown)
+        """
+        capacity: Dict[str, Optional[int]] = dict.fromkeys(RESOURCES)
+        if not (operator and departure_port and arrival_port and departure_date):
+            return capacity
+
+        try:
+            from app.services.cache_service import cache_service
+            from app.services.ferry_service import operator_sailing_params
+
+            sailings = cache_service.get_operator_sailings(operator_sailing_params(
+                operator.lower(), departure_port, arrival_port, departure_date
+            )) or []
+        except Exception as e:
+            logger.warning(f"⚠️ Could not read operator availability for {sailing_id}: {e}")
+            return capacity
+
+        for sailing in sailings:
+            if sailing.get("sailing_id") != sailing_id:
+                continue
+            spaces = sailing.get("available_spaces") or {}
+            capacity["passengers"] = spaces.get("passengers")
+            capacity["vehicles"] = spaces.get("vehicles")
+            cabins = [
+                cabin.get("available", 0)
+                for cabin in sailing.get("cabin_types") or []
+                if cabin.get("type") not in SEAT_TYPES
+            ]
+            capacity["cabins"] = sum(cabins) if cabins else None
+            break
+        return capacity
+
+    def _existing_reservations(self, db: Session, sailing_id: str) -> Dict[str, int]:
+        """Passengers, vehicles and cabins held by active bookings made before inventory tracking."""
+        from app.models.booking import Booking, BookingCabin, BookingStatusEnum, JourneyTypeEnum
+
+        active = Booking.status.in_([BookingStatusEnum.PENDING, BookingStatusEnum.CONFIRMED])
+        on_sailing = or_(Booking.sailing_id == sailing_id, Booking.return_sailing_id == sailing_id)
+        passengers, vehicles = db.execute(
+            select(
+                func.coalesce(func.sum(Booking.total_passengers), 0),
+                func.coalesce(func.sum(Booking.total_vehicles), 0)
+            ).where(active, on_sailing)
+        ).one()
+        cabins = db.execute(
+            select(func.coalesce(func.sum(BookingCabin.quantity), 0))
+            .join(Booking, Booking.id == BookingCabin.booking_id)
+            .where(
+                active,
+                or_(
+                    and_(BookingCabin.journey_type == JourneyTypeEnum.OUTBOUND, Booking.sailing_id == sailing_id),
+                    and_(BookingCabin.journey_type == JourneyTypeEnum.RETURN, Booking.return_sailing_id == sailing_id)
+                )
+            )
+        ).scalar()
+        return {"passengers": int(passengers), "vehicles": int(vehicles), "cabins": int(cabins)}
+
+    def ensure_sailing(
+        self,
+        db: Session,
+        sailing_id: str,
+        operator: Optional[str],
+        capacity: Dict[str, Optional[int]]
+    ) -> None:
+        """Create the sailing's inventory row if missing (INSERT ... ON CONFLICT DO NOTHING)."""
+        if db.query(SailingInventory.id).filter(SailingInventory.sailing_id == sailing_id).first():
+            return
+
+        reserved = self._existing_reservations(db, sailing_id)
+        row = {
+            "sailing_id": sailing_id,
+            "operator": operator,
+            "passenger_capacity": capacity.get("passengers"),
+            "vehicle_capacity": capacity.get("vehicles"),
+            "cabin_capacity": capacity.get("cabins"),
+            "passengers_reserved": reserved["passengers"],
+            "vehicles_reserved": reserved["vehicles"],
+            "cabins_reserved": reserved["cabins"],
+            "created_at": datetime.utcnow(),
+            "updated_at": datetime.utcnow(),
+        }
+
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            try:
+                with db.begin_nested():
+                    db.add(SailingInventory(**row))
+            except IntegrityError:
+                pass
+            return
+
+        table = SailingInventory.__table__
+        db.execute(insert(table).values(row).on_conflict_do_nothing(index_elements=[table.c.sailing_id]))
+        logger.info(f"📦 Inventory tracking started for sailing {sailing_id}: {capacity}")
+
+    def reserve(
+        self,
+        db: Session,
+        sailing_id: str,
+        passengers: int = 0,
+        vehicles: int = 0,
+        cabins: int = 0
+    ) -> Dict[str, int]:
+        """
+        Atomically reserve capacity on a sailing (within the caller's transaction).
+
+        The sailing's inventory row must exist (see ensure_sailing). The row
+        stays locked until the caller commits or rolls back.
+
+        Returns:
+            The reservation, to be released with release()
+
+        Raises:
+            SoldOutError: Not enough passengers, vehicles or cabins left
+        """
+        requested = {"passengers": passengers, "vehicles": vehicles, "cabins": cabins}
+        table = SailingInventory.__table__
+
+        conditions = [table.c.sailing_id == sailing_id]
+        for resource, amount in requested.items():
+            if amount > 0:
+                capacity = _capacity_column(resource)
+                conditions.append(or_(capacity.is_(None), _reserved_column(resource) + amount <= capacity))
+
+        statement = (
+            update(table)
+            .where(*conditions)
+            .values(
+                passengers_reserved=table.c.passengers_reserved + passengers,
+                vehicles_reserved=table.c.vehicles_reserved + vehicles,
+                cabins_reserved=table.c.cabins_reserved + cabins,
+                updated_at=datetime.utcnow()
+            )
+            .returning(table.c.id)
+        )
+        if db.execute(statement).first() is None:
+            self._raise_sold_out(db, sailing_id, requested)
+        return requested
+
+    def _raise_sold_out(self, db: Session, sailing_id: str, requested: Dict[str, int]) -> None:
+        inventory = db.query(SailingInventory).filter(SailingInventory.sailing_id == sailing_id).first()
+        if inventory is None:
+            raise ValueError(f"No inventory row for sailing {sailing_id}")
+        for resource, amount in requested.items():
+            capacity = getattr(inventory, f"{resource[:-1]}_capacity")
+            reserved = getattr(inventory, f"{resource}_reserved")
+            if amount > 0 and capacity is not None and reserved + amount > capacity:
+                logger.info(f"🚫 Sold out: {sailing_id} {resource} {reserved}+{amount} > {capacity}")
+                raise SoldOutError(sailing_id, resource, max(0, capacity - reserved), amount)
+        raise SoldOutError(sailing_id, "places", 0, sum(requested.values()))
+
+    def reserve_booking(
+        self,
+        db: Session,
+        legs: Iterable[Dict[str, Any]]
+    ) -> Dict[str, Dict[str, int]]:
+        """
+        Reserve every leg of a booking.
+
+        Args:
+            legs: Dicts with sailing_id, operator, departure_port, arrival_port,
+                departure_time, passengers, vehicles and cabins
+
+        Returns:
+            Reservations by sailing ID (stored as extra_data["inventory"])
+        """
+        reservations: Dict[str, Dict[str, int]] = {}
+        # Fixed order so bookings covering the same two sailings lock them alike
+        for leg in sorted(legs, key=lambda leg: leg["sailing_id"]):
+            sailing_id = leg["sailing_id"]
+            departure_time = leg.get("departure_time")
+            self.ensure_sailing(db, sailing_id, leg.get("operator"), self.operator_capacity(
+                leg.get("operator"),
+                sailing_id,
+                leg.get("departure_port"),
+                leg.get("arrival_port"),
+                departure_time.date() if departure_time else None
+            ))
+            reservation = self.reserve(
+                db, sailing_id, leg.get("passengers", 0), leg.get("vehicles", 0), leg.get("cabins", 0)
+            )
+            previous = reservations.get(sailing_id)
+            if previous:
+                reservation = {r: previous[r] + reservation[r] for r in RESOURCES}
+            reservations[sailing_id] = reservation
+        return reservations
+
+    def reserve_cabins(self, db: Session, booking, cabins: int, return_leg: bool = False) -> None:
+        """
+        Reserve cabins added to an existing booking and record them on it.
+
+        The added cabins are merged into extra_data["inventory"], so expiry
+        and cancellation release them with the rest of the booking.
+
+        Raises:
+            SoldOutError: Not enough cabins left on the leg's sailing
+        """
+        sailing_id = booking.return_sailing_id if return_leg else booking.sailing_id
+        if not sailing_id or cabins <= 0:
+            return
+
+        if return_leg:
+            leg = {
+                "sailing_id": sailing_id,
+                "operator": booking.return_operator or booking.operator,
+                "departure_port": booking.return_departure_port,
+                "arrival_port": booking.return_arrival_port,
+                "departure_time": booking.return_departure_time,
+            }
+        else:
+            leg = {
+                "sailing_id": sailing_id,
+                "operator": booking.operator,
+                "departure_port": booking.departure_port,
+                "arrival_port": booking.arrival_port,
+                "departure_time": booking.departure_time,
+            }
+        added = self.reserve_booking(db, [{**leg, "cabins": cabins}])
+
+        extra_data = dict(booking.extra_data or {})
+        reservation = {
+            reserved_sailing: dict(amounts)
+            for reserved_sailing, amounts in (extra_data.get("inventory") or {}).items()
+        }
+        for reserved_sailing, amounts in added.items():
+            current = reservation.get(reserved_sailing) or {}
+            reservation[reserved_sailing] = {
+                resource: int(current.get(resource, 0)) + amounts[resource] for resource in RESOURCES
+            }
+        extra_data["inventory"] = reservation
+        booking.extra_data = extra_data
+
+    def release(self, db: Session, reservations: Iterable[Optional[Dict[str, Dict[str, int]]]]) -> int:
+        """
+        Release reservations (within the caller's transaction), one UPDATE per sailing.
+
+        Args:
+            reservations: extra_data["inventory"] values of the released bookings
+
+        Returns:
+            Number of sailings updated
+        """
+        totals: Dict[str, Dict[str, int]] = {}
+        for reservation in reservations:
+            for sailing_id, amounts in (reservation or {}).items():
+                total = totals.setdefault(sailing_id, dict.fromkeys(RESOURCES, 0))
+                for resource in RESOURCES:
+                    total[resource] += int(amounts.get(resource, 0))
+
+        table = SailingInventory.__table__
+        for sailing_id, amounts in totals.items():
+            db.execute(
+                update(table)
+                .where(table.c.sailing_id == sailing_id)
+                .values(
+                    updated_at=datetime.utcnow(),
+                    **{
+                        f"{resource}_reserved": case(
+                            (_reserved_column(resource) < amounts[resource], 0),
+                            else_=_reserved_column(resource) - amounts[resource]
+                        )
+                        for resource in RESOURCES
+                    }
+                )
+            )
+        return len(totals)
+
+    def release_booking(self, db: Session, booking) -> None:
+        """Release a booking's reservation once (clears extra_data["inventory"])."""
+        extra_data = dict(booking.extra_data or {})
+        reservation = extra_data.pop("inventory", None)
+        if not reservation:
+            return
+        self.release(db, [reservation])
+        booking.extra_data = extra_data
+
+
+# Global inventory service instance
+inventory_service = InventoryService()
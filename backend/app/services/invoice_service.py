@@ -2,6 +2,7 @@
 Invoice generation service for creating PDF invoices.
 """
 import os
+import functools
 import io
 from datetime import datetime
 from typing import Dict, Any, Optional
@@ -13,8 +14,13 @@ from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, Tabl
 from reportlab.lib.enums import TA_CENTER, TA_RIGHT, TA_LEFT
 import logging
 
+from app.services.document_cache import document_cache
+
 logger = logging.getLogger(__name__)
 
+# Built once per process: styles are only read while rendering
+_sample_styles = functools.lru_cache(maxsize=None)(getSampleStyleSheet)
+
 
 class InvoiceService:
     """Service for generating PDF invoices."""
@@ -26,6 +32,70 @@ class InvoiceService:
         self.company_phone = os.getenv("COMPANY_PHONE", "+216 71 123 456")
         self.company_tax_id = os.getenv("COMPANY_TAX_ID", "TN123456789")
 
+    def _company(self) -> list:
+        return [self.company_name, self.company_address, self.company_email,
+                self.company_phone, self.company_tax_id]
+
+    def invoice_cache_key(
+        self,
+        booking: Dict[str, Any],
+        payment: Dict[str, Any],
+        passengers: list = None,
+        vehicles: list = None,
+        meals: list = None
+    ) -> str:
+        """Document cache key covering everything generate_invoice renders."""
+        return document_cache.key(
+            "invoice",
+            company=self._company(),
+            booking=booking,
+            payment=payment,
+            passengers=passengers or [],
+            vehicles=vehicles or [],
+            meals=meals or [],
+        )
+
+    def get_invoice(
+        self,
+        booking: Dict[str, Any],
+        payment: Dict[str, Any],
+        passengers: list = None,
+        vehicles: list = None,
+        meals: list = None
+    ) -> bytes:
+        """generate_invoice through the document cache: rendered once per booking version."""
+        return document_cache.get_or_render(
+            self.invoice_cache_key(booking, payment, passengers, vehicles, meals),
+            lambda: self.generate_invoice(booking, payment, passengers, vehicles, meals),
+        )
+
+    def cabin_upgrade_invoice_cache_key(
+        self,
+        booking: Dict[str, Any],
+        cabin_data: Dict[str, Any],
+        payment: Dict[str, Any]
+    ) -> str:
+        """Document cache key covering everything generate_cabin_upgrade_invoice renders."""
+        return document_cache.key(
+            "cabin_upgrade_invoice",
+            company=self._company(),
+            booking=booking,
+            cabin_data=cabin_data,
+            payment=payment,
+        )
+
+    def get_cabin_upgrade_invoice(
+        self,
+        booking: Dict[str, Any],
+        cabin_data: Dict[str, Any],
+        payment: Dict[str, Any]
+    ) -> bytes:
+        """generate_cabin_upgrade_invoice through the document cache."""
+        return document_cache.get_or_render(
+            self.cabin_upgrade_invoice_cache_key(booking, cabin_data, payment),
+            lambda: self.generate_cabin_upgrade_invoice(booking, cabin_data, payment),
+        )
+
     def generate_invoice(
         self,
         booking: Dict[str, Any],
@@ -58,7 +128,7 @@ class InvoiceService:
         )
 
         # Get styles
-        styles = getSampleStyleSheet()
+        styles = _sample_styles()
 
         # Custom styles
         title_style = ParagraphStyle(
@@ -539,7 +609,7 @@ class InvoiceService:
         )
 
         # Get styles
-        styles = getSampleStyleSheet()
+        styles = _sample_styles()
 
         # Custom styles
         title_style = ParagraphStyle(
@@ -0,0 +1,139 @@
+"""
+Off-event-loop PDF rendering.
+
+ReportLab renders (and the QR code in e-tickets) are CPU-bound: run inline
+in an async endpoint they block every other request for the whole render.
+render_pdf() runs them in a bounded ProcessPoolExecutor instead, so the
+event loop keeps serving while up to PDF_RENDER_PROCESSES documents render
+in parallel, outside the GIL.
+
+Worker processes are spawned (not forked from the threaded server) and
+pre-warmed by rendering a sample e-ticket and invoice: ReportLab, fonts,
+QR/PIL code and the cached style sheets are loaded before the first real
+request. The pool is started at application startup and restarted if a
+worker dies. With PDF_RENDER_PROCESSES=0 renders go to the default thread
+pool instead (keeps the loop free, but renders share the GIL).
+
+Celery tasks keep rendering inline: they already run in worker processes.
+"""
+
+import asyncio
+import functools
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+from threading import Lock
+from typing import Optional
+
+from app.config import settings
+from app.tracing import span
+
+logger = logging.getLogger(__name__)
+
+KINDS = ("eticket", "invoice", "cabin_upgrade_invoice")
+
+_executor: Optional[ProcessPoolExecutor] = None
+_lock = Lock()
+
+
+def _render(kind: str, kwargs: dict) -> bytes:
+    """Render a document in the current process (runs in pool workers)."""
+    from app.services.eticket_service import eticket_service
+    from app.services.invoice_service import invoice_service
+
+    renderers = {
+        "eticket": eticket_service.generate_eticket,
+        "invoice": invoice_service.generate_invoice,
+        "cabin_upgrade_invoice": invoice_service.generate_cabin_upgrade_invoice,
+    }
+    return renderers[kind](**kwargs)
+
+
+def _warm_worker() -> None:
+    """Pool initializer: render sample documents so the first request is not cold."""
+    departure = datetime.now() + timedelta(days=1)
+    booking = {
+        "booking_reference": "WARMUP",
+        "departure_port": "Tunis",
+        "arrival_port": "Marseille",
+        "departure_time": departure.isoformat(),
+        "arrival_time": (departure + timedelta(hours=20)).isoformat(),
+        "status": "CONFIRMED",
+    }
+    try:
+        _render("eticket", {"booking": booking, "passengers": [{"first_name": "A", "last_name": "B"}]})
+        _render("invoice", {"booking": {**booking, "departure_time": departure}, "payment": {}})
+    except Exception as e:
+        logger.warning(f"⚠️ PDF worker warm-up failed: {e}")
+
+
+def _ping() -> bool:
+    return True
+
+
+def get_executor() -> Optional[ProcessPoolExecutor]:
+    """The render pool, created on first use (None when processes are disabled)."""
+    global _executor
+    with _lock:
+        if _executor is None and settings.PDF_RENDER_PROCESSES > 0:
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.PDF_RENDER_PROCESSES,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_warm_worker,
+            )
+            logger.info(f"🖨️ PDF render pool started ({settings.PDF_RENDER_PROCESSES} processes)")
+        return _executor
+
+
+def start() -> None:
+    """Start and pre-warm every pool worker (called at application startup)."""
+    executor = get_executor()
+    if executor is not None:
+        for _ in range(settings.PDF_RENDER_PROCESSES):
+            executor.submit(_ping)
+
+
+def shutdown() -> None:
+    """Stop the pool (called at application shutdown)."""
+    global _executor
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def _discard(executor: ProcessPoolExecutor) -> None:
+    global _executor
+    with _lock:
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def render_pdf(kind: str, **kwargs) -> bytes:
+    """
+    Render a document without blocking the event loop.
+
+    Args:
+        kind: "eticket", "invoice" or "cabin_upgrade_invoice"
+        **kwargs: Arguments of the matching generate_* service method
+
+    Returns:
+        bytes: PDF file content
+    """
+    if kind not in KINDS:
+        raise ValueError(f"Unknown document kind: {kind}")
+
+    loop = asyncio.get_running_loop()
+    with span(f"render.{kind}", "render"):
+        executor = get_executor()
+        if executor is None:
+            return await loop.run_in_executor(None, functools.partial(_render, kind, kwargs))
+        try:
+            return await loop.run_in_executor(executor, _render, kind, kwargs)
+        except BrokenProcessPool:
+            logger.error("❌ PDF render pool broken, restarting it")
+            _discard(executor)
+            return await loop.run_in_executor(get_executor(), _render, kind, kwargs)
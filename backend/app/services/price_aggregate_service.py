@@ -0,0 +1,420 @@
+"""
+Price Aggregate Service
+
+Maintains RoutePriceAggregate rows: rolling per-route price aggregates that
+record_price_snapshot_task updates incrementally as it writes snapshots.
+Readers get O(1) summaries (mean, stddev, min/max, weekday and lead-time
+averages, recent trend window) without scanning price_history.
+
+A periodic full rebuild from price_history corrects any drift, e.g. from
+concurrent writers or history removed by the retention cleanup.
+"""
+
+import logging
+import math
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.price_history import PriceHistory, RoutePriceAggregate
+
+logger = logging.getLogger(__name__)
+
+# Number of most recent snapshots kept for trend/momentum/demand analysis
+RECENT_SNAPSHOTS = 14
+
+# Daily buckets older than this are pruned (covers the 30/60/90-day windows)
+DAILY_BUCKET_DAYS = 90
+
+# Days-to-departure buckets (same ranges as the prediction model)
+LEAD_TIME_BUCKETS = (
+    (0, 3),
+    (4, 7),
+    (8, 14),
+    (15, 30),
+    (31, 60),
+    (61, 90),
+    (91, 365),
+)
+
+# Rows fetched per round trip during a full rebuild
+REBUILD_BATCH_SIZE = 5000
+
+# Columns read from price_history to fold a snapshot
+SNAPSHOT_COLUMNS = (
+    PriceHistory.recorded_at,
+    PriceHistory.departure_date,
+    PriceHistory.days_until_departure,
+    PriceHistory.day_of_week,
+    PriceHistory.lowest_price,
+    PriceHistory.available_passengers,
+)
+
+
+def lead_time_bucket(days: Optional[int]) -> Optional[str]:
+    """Return the lead-time bucket label ("0-3", "4-7", ...) for a day count."""
+    if days is None:
+        return None
+    for min_days, max_days in LEAD_TIME_BUCKETS:
+        if min_days <= days <= max_days:
+            return f"{min_days}-{max_days}"
+    return None
+
+
+def _naive(value: datetime) -> datetime:
+    """Drop tzinfo so stored and compared timestamps are all naive UTC."""
+    return value.replace(tzinfo=None) if value.tzinfo is not None else value
+
+
+def _mean(count: int, total: float) -> Optional[float]:
+    return total / count if count else None
+
+
+def _stddev(count: int, total: float, total_sq: float) -> Optional[float]:
+    """Population standard deviation from running sums."""
+    if not count:
+        return None
+    mean = total / count
+    return math.sqrt(max(0.0, total_sq / count - mean * mean))
+
+
+@dataclass
+class PriceWindow:
+    """Aggregates over a trailing window of daily buckets."""
+    snapshots: int
+    count: int
+    mean: Optional[float]
+    stddev: Optional[float]
+    min_price: Optional[float]
+    max_price: Optional[float]
+
+
+@dataclass
+class RoutePriceSummary:
+    """Read-only view of a route's rolling aggregates."""
+    route_id: str
+    snapshot_count: int
+    price_count: int
+    price_sum: float
+    price_sum_sq: float
+    min_price: Optional[float]
+    max_price: Optional[float]
+    min_price_date: Optional[date]
+    max_price_date: Optional[date]
+    last_price: Optional[float]
+    last_recorded_at: Optional[datetime]
+    weekday_buckets: Dict[int, List[float]] = field(default_factory=dict)
+    lead_time_buckets: Dict[str, List[float]] = field(default_factory=dict)
+    daily_buckets: Dict[str, List[float]] = field(default_factory=dict)
+    recent: List[Tuple[datetime, Optional[float], Optional[int]]] = field(default_factory=list)
+
+    @classmethod
+    def from_aggregate(cls, aggregate: RoutePriceAggregate) -> "RoutePriceSummary":
+        return cls(
+            route_id=aggregate.route_id,
+            snapshot_count=aggregate.snapshot_count or 0,
+            price_count=aggregate.price_count or 0,
+            price_sum=aggregate.price_sum or 0.0,
+            price_sum_sq=aggregate.price_sum_sq or 0.0,
+            min_price=aggregate.min_price,
+            max_price=aggregate.max_price,
+            min_price_date=aggregate.min_price_date,
+            max_price_date=aggregate.max_price_date,
+            last_price=aggregate.last_price,
+            last_recorded_at=aggregate.last_recorded_at,
+            weekday_buckets={int(k): v for k, v in (aggregate.weekday_buckets or {}).items()},
+            lead_time_buckets=dict(aggregate.lead_time_buckets or {}),
+            daily_buckets=dict(aggregate.daily_buckets or {}),
+            recent=[
+                (datetime.fromisoformat(recorded), price, available)
+                for recorded, price, available in (aggregate.recent_snapshots or [])
+            ],
+        )
+
+    @property
+    def mean(self) -> Optional[float]:
+        return _mean(self.price_count, self.price_sum)
+
+    @property
+    def stddev(self) -> Optional[float]:
+        return _stddev(self.price_count, self.price_sum, self.price_sum_sq)
+
+    def window(self, days: int, now: Optional[datetime] = None) -> PriceWindow:
+        """
+        Aggregate the daily buckets recorded in the last `days` days.
+
+        Windows have day granularity: the whole first day is included.
+        """
+        return self.window_since(_naive(now or datetime.utcnow()) - timedelta(days=days))
+
+    def window_since(self, cutoff: datetime) -> PriceWindow:
+        """Aggregate the daily buckets recorded on or after cutoff's date."""
+        first_day = cutoff.date().isoformat()
+        snapshots = count = 0
+        total = total_sq = 0.0
+        lows, highs = [], []
+
+        for day, bucket in self.daily_buckets.items():
+            if day < first_day:
+                continue
+            day_snapshots, day_count, day_sum, day_sum_sq, day_min, day_max = bucket
+            snapshots += day_snapshots
+            count += day_count
+            total += day_sum
+            total_sq += day_sum_sq
+            if day_min is not None:
+                lows.append(day_min)
+                highs.append(day_max)
+
+        return PriceWindow(
+            snapshots=snapshots,
+            count=count,
+            mean=_mean(count, total),
+            stddev=_stddev(count, total, total_sq),
+            min_price=min(lows) if lows else None,
+            max_price=max(highs) if highs else None,
+        )
+
+    def recent_since(self, cutoff: datetime) -> List[Tuple[datetime, Optional[float], Optional[int]]]:
+        """Recent snapshots (newest first) recorded at or after cutoff."""
+        return [snapshot for snapshot in self.recent if snapshot[0] >= cutoff]
+
+    def weekday_averages(self) -> Dict[int, float]:
+        """Average price per departure weekday (0=Monday)."""
+        return {
+            weekday: bucket[1] / bucket[0]
+            for weekday, bucket in sorted(self.weekday_buckets.items())
+            if bucket[0]
+        }
+
+    def lead_time_averages(self) -> Dict[str, float]:
+        """Average price per days-to-departure bucket."""
+        return {
+            label: bucket[1] / bucket[0]
+            for label, bucket in self.lead_time_buckets.items()
+            if bucket[0]
+        }
+
+    def weekday_weekend_averages(self) -> Tuple[Optional[float], Optional[float]]:
+        """Average price of weekday (Mon-Fri) and weekend (Sat-Sun) departures."""
+        weekday = [self.weekday_buckets[d] for d in range(0, 5) if d in self.weekday_buckets]
+        weekend = [self.weekday_buckets[d] for d in (5, 6) if d in self.weekday_buckets]
+        return (
+            _mean(sum(b[0] for b in weekday), sum(b[1] for b in weekday)),
+            _mean(sum(b[0] for b in weekend), sum(b[1] for b in weekend)),
+        )
+
+
+class _RunningAggregate:
+    """Mutable aggregate state that snapshots are folded into."""
+
+    def __init__(self, aggregate: Optional[RoutePriceAggregate] = None):
+        aggregate = aggregate or RoutePriceAggregate()
+        self.snapshot_count = aggregate.snapshot_count or 0
+        self.price_count = aggregate.price_count or 0
+        self.price_sum = aggregate.price_sum or 0.0
+        self.price_sum_sq = aggregate.price_sum_sq or 0.0
+        self.min_price = aggregate.min_price
+        self.max_price = aggregate.max_price
+        self.min_price_date = aggregate.min_price_date
+        self.max_price_date = aggregate.max_price_date
+        self.last_price = aggregate.last_price
+        self.last_recorded_at = aggregate.last_recorded_at
+        # Copy JSON values so the ORM sees new objects on write-back
+        self.weekday_buckets = {k: list(v) for k, v in (aggregate.weekday_buckets or {}).items()}
+        self.lead_time_buckets = {k: list(v) for k, v in (aggregate.lead_time_buckets or {}).items()}
+        self.daily_buckets = {k: list(v) for k, v in (aggregate.daily_buckets or {}).items()}
+        self.recent = [list(s) for s in (aggregate.recent_snapshots or [])]
+
+    def add(self, snapshot: Any) -> None:
+        """Fold one price_history snapshot (ORM object or row) into the totals."""
+        recorded_at = _naive(snapshot.recorded_at)
+        price = snapshot.lowest_price or None  # Zero prices are treated as missing
+        day = recorded_at.date().isoformat()
+
+        self.snapshot_count += 1
+        daily = self.daily_buckets.setdefault(day, [0, 0, 0.0, 0.0, None, None])
+        daily[0] += 1
+
+        if price is not None:
+            self.price_count += 1
+            self.price_sum += price
+            self.price_sum_sq += price * price
+
+            if self.min_price is None or price < self.min_price:
+                self.min_price = price
+                self.min_price_date = snapshot.departure_date
+            if self.max_price is None or price > self.max_price:
+                self.max_price = price
+                self.max_price_date = snapshot.departure_date
+
+            daily[1] += 1
+            daily[2] += price
+            daily[3] += price * price
+            daily[4] = price if daily[4] is None else min(daily[4], price)
+            daily[5] = price if daily[5] is None else max(daily[5], price)
+
+            weekday = snapshot.day_of_week
+            if weekday is None and snapshot.departure_date is not None:
+                weekday = snapshot.departure_date.weekday()
+            if weekday is not None:
+                _add_to_bucket(self.weekday_buckets, str(weekday), price)
+
+            lead_time = lead_time_bucket(snapshot.days_until_departure)
+            if lead_time is not None:
+                _add_to_bucket(self.lead_time_buckets, lead_time, price)
+
+        if self.last_recorded_at is None or recorded_at >= self.last_recorded_at:
+            self.last_recorded_at = recorded_at
+            self.last_price = price
+
+        self.recent.insert(0, [recorded_at.isoformat(), price, snapshot.available_passengers])
+        # Stable sort keeps the newest insert first among equal timestamps
+        self.recent = sorted(self.recent, key=lambda s: s[0], reverse=True)[:RECENT_SNAPSHOTS]
+
+    def prune(self, now: datetime) -> None:
+        """Drop daily buckets that fell out of the retention window."""
+        first_day = (_naive(now) - timedelta(days=DAILY_BUCKET_DAYS)).date().isoformat()
+        self.daily_buckets = {
+            day: bucket for day, bucket in self.daily_buckets.items() if day >= first_day
+        }
+
+    def write_to(self, aggregate: RoutePriceAggregate) -> None:
+        aggregate.snapshot_count = self.snapshot_count
+        aggregate.price_count = self.price_count
+        aggregate.price_sum = self.price_sum
+        aggregate.price_sum_sq = self.price_sum_sq
+        aggregate.min_price = self.min_price
+        aggregate.max_price = self.max_price
+        aggregate.min_price_date = self.min_price_date
+        aggregate.max_price_date = self.max_price_date
+        aggregate.last_price = self.last_price
+        aggregate.last_recorded_at = self.last_recorded_at
+        aggregate.weekday_buckets = self.weekday_buckets
+        aggregate.lead_time_buckets = self.lead_time_buckets
+        aggregate.daily_buckets = self.daily_buckets
+        aggregate.recent_snapshots = self.recent
+
+
+def _add_to_bucket(buckets: Dict[str, List[float]], key: str, price: float) -> None:
+    bucket = buckets.setdefault(key, [0, 0.0, 0.0])
+    bucket[0] += 1
+    bucket[1] += price
+    bucket[2] += price * price
+
+
+class PriceAggregateService:
+    """Service for maintaining and reading rolling route price aggregates."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_summary(self, route_id: str) -> Optional[RoutePriceSummary]:
+        """Get the aggregate summary for a route, or None if not built yet."""
+        return self.get_summaries([route_id]).get(route_id)
+
+    def get_summaries(self, route_ids: List[str]) -> Dict[str, RoutePriceSummary]:
+        """Get aggregate summaries for several routes in a single query."""
+        if not route_ids:
+            return {}
+        aggregates = self.db.query(RoutePriceAggregate).filter(
+            RoutePriceAggregate.route_id.in_(route_ids)
+        ).all()
+        return {a.route_id: RoutePriceSummary.from_aggregate(a) for a in aggregates}
+
+    def record_snapshots(
+        self,
+        snapshots: Iterable[PriceHistory],
+        now: Optional[datetime] = None,
+    ) -> int:
+        """
+        Fold newly written snapshots into their routes' aggregates.
+
+        Does not commit, so the caller can commit the aggregates together
+        with the price_history rows they were computed from.
+
+        Returns:
+            Number of route aggregates updated
+        """
+        now = now or datetime.utcnow()
+
+        by_route: Dict[str, List[PriceHistory]] = {}
+        for snapshot in snapshots:
+            by_route.setdefault(snapshot.route_id, []).append(snapshot)
+        if not by_route:
+            return 0
+
+        existing = {
+            a.route_id: a
+            for a in self.db.query(RoutePriceAggregate).filter(
+                RoutePriceAggregate.route_id.in_(list(by_route))
+            )
+        }
+
+        for route_id, route_snapshots in by_route.items():
+            aggregate = existing.get(route_id)
+            if aggregate is None:
+                aggregate = RoutePriceAggregate(route_id=route_id)
+                self.db.add(aggregate)
+
+            running = _RunningAggregate(aggregate)
+            for snapshot in route_snapshots:
+                running.add(snapshot)
+            running.prune(now)
+            running.write_to(aggregate)
+
+        # Flush so later calls in the same transaction find new rows
+        self.db.flush()
+        return len(by_route)
+
+    def rebuild(self, route_ids: List[str], now: Optional[datetime] = None) -> int:
+        """
+        Recompute aggregates from price_history, replacing the stored totals.
+
+        History is streamed per route in recorded_at order, through the same
+        fold used for incremental updates.
+
+        Returns:
+            Number of routes rebuilt
+        """
+        now = now or datetime.utcnow()
+
+        existing = {
+            a.route_id: a
+            for a in self.db.query(RoutePriceAggregate).filter(
+                RoutePriceAggregate.route_id.in_(route_ids)
+            )
+        }
+
+        rebuilt = 0
+        for route_id in route_ids:
+            running = _RunningAggregate()
+            rows = self.db.execute(
+                select(*SNAPSHOT_COLUMNS)
+                .where(PriceHistory.route_id == route_id)
+                .order_by(PriceHistory.recorded_at, PriceHistory.id)
+                .execution_options(yield_per=REBUILD_BATCH_SIZE)
+            )
+            for row in rows:
+                running.add(row)
+
+            aggregate = existing.get(route_id)
+            if running.snapshot_count == 0:
+                if aggregate is not None:
+                    self.db.delete(aggregate)
+                continue
+
+            if aggregate is None:
+                aggregate = RoutePriceAggregate(route_id=route_id)
+                self.db.add(aggregate)
+
+            running.prune(now)
+            running.write_to(aggregate)
+            aggregate.rebuilt_at = _naive(now)
+            rebuilt += 1
+
+        self.db.commit()
+        return rebuilt
@@ -0,0 +1,245 @@
+"""
+Price History Partition Management
+
+Maintains monthly range partitions of the price_history table on PostgreSQL.
+The table is partitioned on recorded_at (see the partition_price_history
+Alembic migration), so retention is enforced by dropping whole monthly
+partitions instead of running large DELETE statements.
+
+On databases without native partitioning (SQLite in development and tests)
+every operation is a no-op and callers fall back to row-level cleanup.
+"""
+
+import logging
+import re
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "price_history"
+DEFAULT_PARTITION = "price_history_default"
+
+# Keep the last 180 days of snapshots (same retention as the old DELETE cleanup)
+DEFAULT_RETENTION_DAYS = 180
+
+# Always have the current month plus this many future months ready
+DEFAULT_MONTHS_AHEAD = 3
+
+_PARTITION_NAME_RE = re.compile(r"^price_history_y(\d{4})m(\d{2})$")
+
+
+def month_start(day: date) -> date:
+    """Return the first day of the month containing `day`."""
+    return date(day.year, day.month, 1)
+
+
+def add_months(day: date, months: int) -> date:
+    """Return the first day of the month `months` after the month of `day`."""
+    index = day.year * 12 + (day.month - 1) + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    """Return the partition table name for a month, e.g. price_history_y2025m01."""
+    return f"{PARENT_TABLE}_y{month.year}m{month.month:02d}"
+
+
+def parse_partition_name(name: str) -> Optional[date]:
+    """Return the month covered by a partition name, or None for foreign tables."""
+    match = _PARTITION_NAME_RE.match(name)
+    if not match:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+
+@dataclass
+class PartitionInfo:
+    """A monthly price_history partition and its recorded_at range."""
+    name: str
+    range_start: date
+    range_end: date  # Exclusive upper bound (first day of next month)
+
+
+class PriceHistoryPartitionService:
+    """
+    Service for managing monthly price_history partitions.
+
+    Partition bounds follow PostgreSQL range semantics: FROM is inclusive,
+    TO is exclusive, so a month partition covers [first day, next first day).
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def is_supported(self) -> bool:
+        """Check whether the bound database supports native partitioning."""
+        return self.db.get_bind().dialect.name == "postgresql"
+
+    def is_partitioned(self) -> bool:
+        """Check whether price_history has been converted to a partitioned table."""
+        if not self.is_supported():
+            return False
+
+        row = self.db.execute(
+            text(
+                "SELECT 1 FROM pg_partitioned_table pt "
+                "JOIN pg_class c ON c.oid = pt.partrelid "
+                "WHERE c.relname = :table"
+            ),
+            {"table": PARENT_TABLE},
+        ).first()
+        return row is not None
+
+    def list_partitions(self) -> List[PartitionInfo]:
+        """List monthly partitions ordered by range start (default partition excluded)."""
+        if not self.is_partitioned():
+            return []
+
+        rows = self.db.execute(
+            text(
+                "SELECT child.relname FROM pg_inherits i "
+                "JOIN pg_class parent ON parent.oid = i.inhparent "
+                "JOIN pg_class child ON child.oid = i.inhrelid "
+                "WHERE parent.relname = :table"
+            ),
+            {"table": PARENT_TABLE},
+        ).all()
+
+        partitions = []
+        for (name,) in rows:
+            month = parse_partition_name(name)
+            if month is None:
+                continue
+            partitions.append(PartitionInfo(
+                name=name,
+                range_start=month,
+                range_end=add_months(month, 1),
+            ))
+
+        partitions.sort(key=lambda p: p.range_start)
+        return partitions
+
+    def ensure_future_partitions(
+        self,
+        months_ahead: int = DEFAULT_MONTHS_AHEAD,
+        today: Optional[date] = None,
+    ) -> List[str]:
+        """
+        Create partitions for the current month and the next `months_ahead` months.
+
+        Returns:
+            Names of partitions that were created by this call
+        """
+        if not self.is_partitioned():
+            return []
+
+        today = today or datetime.utcnow().date()
+        existing = {p.name for p in self.list_partitions()}
+        created = []
+
+        for offset in range(0, months_ahead + 1):
+            month = add_months(month_start(today), offset)
+            name = partition_name(month)
+            if name in existing:
+                continue
+
+            self.db.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {PARENT_TABLE} "
+                f"FOR VALUES FROM ('{month.isoformat()}') "
+                f"TO ('{add_months(month, 1).isoformat()}')"
+            ))
+            created.append(name)
+            logger.info(f"📦 Created price_history partition {name}")
+
+        self.db.commit()
+        return created
+
+    def drop_expired_partitions(
+        self,
+        retention_days: int = DEFAULT_RETENTION_DAYS,
+        today: Optional[date] = None,
+    ) -> List[str]:
+        """
+        Drop partitions whose whole range is older than the retention window.
+
+        A month is only dropped once its exclusive upper bound is on or before
+        the cutoff, so no row younger than `retention_days` is ever removed.
+
+        Returns:
+            Names of partitions that were dropped
+        """
+        if not self.is_partitioned():
+            return []
+
+        today = today or datetime.utcnow().date()
+        cutoff = today - timedelta(days=retention_days)
+        dropped = []
+
+        for partition in self.list_partitions():
+            if partition.range_end > cutoff:
+                continue
+
+            # Detach first so the parent's lock is held only briefly
+            self.db.execute(text(
+                f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {partition.name}"
+            ))
+            self.db.execute(text(f"DROP TABLE IF EXISTS {partition.name}"))
+            dropped.append(partition.name)
+            logger.info(f"🗑️ Dropped expired price_history partition {partition.name}")
+
+        self.db.commit()
+        return dropped
+
+    def verify_pruning(self, route_id: str, days_back: int = 60) -> Dict[str, Any]:
+        """
+        Check that the prediction history query only scans recent partitions.
+
+        Runs EXPLAIN on the same recorded_at window used by
+        PricePredictionService._get_price_history and reports which
+        partitions the planner kept. The window is open-ended, so future
+        months and the default partition are always scanned; pruning only
+        requires that no partition entirely older than the cutoff is.
+        """
+        if not self.is_partitioned():
+            return {"partitioned": False}
+
+        cutoff = datetime.utcnow() - timedelta(days=days_back)
+        plan = self.db.execute(
+            text(
+                f"EXPLAIN (FORMAT JSON) SELECT * FROM {PARENT_TABLE} "
+                "WHERE route_id = :route_id AND recorded_at >= :cutoff "
+                "ORDER BY recorded_at DESC"
+            ),
+            {"route_id": route_id, "cutoff": cutoff},
+        ).scalar()
+
+        scanned = _collect_relation_names(plan)
+        partitions = self.list_partitions()
+        expired = {p.name for p in partitions if p.range_end <= cutoff.date()}
+
+        return {
+            "partitioned": True,
+            "partitions_total": len(partitions),
+            "partitions_scanned": sorted(scanned),
+            "expired_scanned": sorted(expired & scanned),
+            "pruned": not (expired & scanned),
+        }
+
+
+def _collect_relation_names(plan: Any) -> set:
+    """Collect all 'Relation Name' values from an EXPLAIN (FORMAT JSON) plan."""
+    names = set()
+    if isinstance(plan, dict):
+        if "Relation Name" in plan:
+            names.add(plan["Relation Name"])
+        for value in plan.values():
+            names |= _collect_relation_names(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            names |= _collect_relation_names(item)
+    return names
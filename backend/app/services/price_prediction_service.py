@@ -7,7 +7,7 @@ and provide booking recommendations to users.
 
 import numpy as np
 from datetime import datetime, date, timedelta
-from typing import Optional, List, Dict, Tuple, Any
+from typing import Optional, List, Dict, Tuple, Any, Iterable
 from dataclasses import dataclass
 from enum import Enum
 import logging
@@ -23,6 +23,7 @@ from app.models.price_history import (
     PriceTrendEnum,
     BookingRecommendationEnum,
 )
+from app.services.price_aggregate_service import PriceAggregateService, RoutePriceSummary
 
 logger = logging.getLogger(__name__)
 
@@ -55,6 +56,71 @@ class PriceInsight:
     best_booking_window: str
     seasonal_insight: str
     savings_opportunity: Optional[float]
+    cheapest_day_of_week: Optional[int] = None  # 0=Monday
+    most_expensive_day: Optional[int] = None
+    weekend_premium: Optional[float] = None  # Weekend vs weekday average, e.g. 0.12
+
+
+@dataclass
+class RouteHistory:
+    """
+    Price history for one route as column arrays, newest record first.
+
+    Missing prices and availabilities are stored as NaN. `count` and
+    `mean_price` describe the whole history window; the arrays may hold only
+    its most recent records when built from a RoutePriceSummary.
+    """
+    recorded_at: np.ndarray  # datetime64[us]
+    lowest_price: np.ndarray  # float64
+    available_passengers: np.ndarray  # float64
+    count: int
+    mean_price: Optional[float]  # Mean of non-zero prices in the window
+
+    def __len__(self) -> int:
+        return self.count
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple[datetime, Optional[float], Optional[int]]]) -> "RouteHistory":
+        """Build from (recorded_at, lowest_price, available_passengers) rows."""
+        recorded_at, prices, availability = [], [], []
+        for recorded, price, available in rows:
+            if recorded is not None and recorded.tzinfo is not None:
+                recorded = recorded.replace(tzinfo=None)
+            recorded_at.append(recorded)
+            prices.append(np.nan if price is None else price)
+            availability.append(np.nan if available is None else available)
+
+        lowest_price = np.array(prices, dtype=np.float64)
+        valid = _valid_prices(lowest_price)
+
+        return cls(
+            recorded_at=np.array(recorded_at, dtype="datetime64[us]"),
+            lowest_price=lowest_price,
+            available_passengers=np.array(availability, dtype=np.float64),
+            count=len(recorded_at),
+            mean_price=float(np.mean(valid)) if len(valid) else None,
+        )
+
+    @classmethod
+    def from_records(cls, history: List[PriceHistory]) -> "RouteHistory":
+        """Build from PriceHistory rows ordered newest first."""
+        return cls.from_rows(
+            (h.recorded_at, h.lowest_price, h.available_passengers) for h in history
+        )
+
+    @classmethod
+    def from_summary(cls, summary: RoutePriceSummary, cutoff: datetime) -> "RouteHistory":
+        """Build from rolling aggregates for the window starting at cutoff."""
+        history = cls.from_rows(summary.recent_since(cutoff))
+        window = summary.window_since(cutoff)
+        history.count = window.snapshots
+        history.mean_price = window.mean
+        return history
+
+
+def _valid_prices(prices: np.ndarray) -> np.ndarray:
+    """Drop missing and zero prices (same rule as `if h.lowest_price`)."""
+    return prices[~np.isnan(prices) & (prices != 0)]
 
 
 class PricePredictionService:
@@ -117,6 +183,15 @@ class PricePredictionService:
         6: 1.05,   # Sunday: moderate
     }
 
+    # Order in which factors are combined (matches _calculate_prediction_factors)
+    FACTOR_ORDER = (
+        'days_to_departure',
+        'seasonality',
+        'day_of_week',
+        'trend_momentum',
+        'demand',
+    )
+
     def __init__(self, db: Session):
         self.db = db
 
@@ -138,7 +213,7 @@ class PricePredictionService:
             PredictionResult with prediction and recommendation
         """
         # Get historical data
-        history = self._get_price_history(route_id, departure_date)
+        history = self._get_route_history(route_id)
         stats = self._get_route_statistics(route_id)
 
         # Calculate base price
@@ -189,6 +264,137 @@ class PricePredictionService:
             factors={k: round(v, 3) for k, v in factors.items()},
         )
 
+    def predict_batch(
+        self,
+        route_ids: List[str],
+        dates: List[date],
+    ) -> Dict[str, List[PredictionResult]]:
+        """
+        Predict prices for every route and date in one pass.
+
+        Loads each route's history and statistics once (two queries in
+        total) and computes the date-dependent factors as array operations
+        over all dates. Results match predict_price without a current price.
+
+        Args:
+            route_ids: Route identifiers to predict for
+            dates: Departure dates to predict for
+
+        Returns:
+            Mapping of route_id to predictions, one per date in `dates` order
+        """
+        if not route_ids or not dates:
+            return {route_id: [] for route_id in route_ids}
+
+        histories = self._get_route_history_batch(route_ids)
+        stats_by_route = self._get_route_statistics_batch(route_ids)
+
+        # Date-dependent factors, shared by every route
+        today = date.today()
+        ordinals = np.array([d.toordinal() for d in dates], dtype=np.int64)
+        days_until = ordinals - today.toordinal()
+        months = np.array([d.month for d in dates], dtype=np.int64)
+        weekdays = np.array([d.weekday() for d in dates], dtype=np.int64)
+
+        date_factors = {
+            'days_to_departure': self._days_to_departure_factors(days_until),
+            'seasonality': self._seasonality_factors(months),
+            'day_of_week': self._day_of_week_factors(weekdays),
+        }
+
+        predictions: Dict[str, List[PredictionResult]] = {}
+        for route_id in route_ids:
+            history = histories.get(route_id) or RouteHistory.from_rows([])
+            stats = stats_by_route.get(route_id)
+
+            base_price = self._calculate_base_price(history, stats, None)
+            factors = {
+                **date_factors,
+                'trend_momentum': np.full(len(dates), self._calculate_trend_momentum(history)),
+                'demand': np.full(len(dates), self._calculate_demand_factor(history)),
+            }
+
+            predicted = self._apply_factor_arrays(base_price, factors)
+            confidence = self._calculate_confidence(history, stats)
+            trend, trend_strength = self._analyze_trend(history)
+
+            volatility = stats.price_volatility_30d if stats else base_price * 0.1
+            predicted_low = np.maximum(0, predicted - volatility)
+            predicted_high = predicted + volatility
+
+            results = []
+            for i, departure_date in enumerate(dates):
+                predicted_price = float(predicted[i])
+                recommendation, savings, reason = self._generate_recommendation(
+                    current_price=predicted_price,
+                    predicted_price=predicted_price,
+                    trend=trend,
+                    confidence=confidence,
+                    departure_date=departure_date,
+                    stats=stats,
+                )
+
+                results.append(PredictionResult(
+                    predicted_price=round(predicted_price, 2),
+                    predicted_low=round(float(predicted_low[i]), 2),
+                    predicted_high=round(float(predicted_high[i]), 2),
+                    confidence_score=round(confidence, 2),
+                    price_trend=trend,
+                    trend_strength=round(trend_strength, 2),
+                    booking_recommendation=recommendation,
+                    potential_savings=round(savings, 2) if savings else 0,
+                    recommendation_reason=reason,
+                    factors={
+                        name: round(float(factors[name][i]), 3)
+                        for name in self.FACTOR_ORDER
+                    },
+                ))
+
+            predictions[route_id] = results
+
+        return predictions
+
+    def _get_route_history(
+        self,
+        route_id: str,
+        summary: Optional[RoutePriceSummary] = None,
+        days_back: int = 60
+    ) -> RouteHistory:
+        """
+        Get the route's recent history window.
+
+        Reads the rolling aggregates when they exist and only scans
+        price_history for routes whose aggregates have not been built yet.
+        """
+        summary = summary or PriceAggregateService(self.db).get_summary(route_id)
+        if summary is not None:
+            cutoff = datetime.utcnow() - timedelta(days=days_back)
+            return RouteHistory.from_summary(summary, cutoff)
+
+        return RouteHistory.from_records(
+            self._get_price_history(route_id, date.today(), days_back)
+        )
+
+    def _get_route_history_batch(
+        self,
+        route_ids: List[str],
+        days_back: int = 60
+    ) -> Dict[str, RouteHistory]:
+        """Get history windows for several routes, scanning only unaggregated ones."""
+        cutoff = datetime.utcnow() - timedelta(days=days_back)
+        summaries = PriceAggregateService(self.db).get_summaries(route_ids)
+
+        histories = {
+            route_id: RouteHistory.from_summary(summary, cutoff)
+            for route_id, summary in summaries.items()
+        }
+
+        missing = [route_id for route_id in route_ids if route_id not in summaries]
+        if missing:
+            histories.update(self._get_price_history_batch(missing, days_back))
+
+        return histories
+
     def _get_price_history(
         self,
         route_id: str,
@@ -205,15 +411,51 @@ class PricePredictionService:
             )
         ).order_by(PriceHistory.recorded_at.desc()).all()
 
+    def _get_price_history_batch(
+        self,
+        route_ids: List[str],
+        days_back: int = 60
+    ) -> Dict[str, RouteHistory]:
+        """Get historical prices for several routes in a single query."""
+        cutoff = datetime.utcnow() - timedelta(days=days_back)
+
+        rows = self.db.query(
+            PriceHistory.route_id,
+            PriceHistory.recorded_at,
+            PriceHistory.lowest_price,
+            PriceHistory.available_passengers,
+        ).filter(
+            and_(
+                PriceHistory.route_id.in_(route_ids),
+                PriceHistory.recorded_at >= cutoff,
+            )
+        ).order_by(PriceHistory.route_id, PriceHistory.recorded_at.desc()).all()
+
+        rows_by_route: Dict[str, List[Tuple]] = {}
+        for route_id, recorded_at, lowest_price, available in rows:
+            rows_by_route.setdefault(route_id, []).append((recorded_at, lowest_price, available))
+
+        return {
+            route_id: RouteHistory.from_rows(route_rows)
+            for route_id, route_rows in rows_by_route.items()
+        }
+
     def _get_route_statistics(self, route_id: str) -> Optional[RouteStatistics]:
         """Get pre-computed route statistics."""
         return self.db.query(RouteStatistics).filter(
             RouteStatistics.route_id == route_id
         ).first()
 
+    def _get_route_statistics_batch(self, route_ids: List[str]) -> Dict[str, RouteStatistics]:
+        """Get pre-computed statistics for several routes in a single query."""
+        stats = self.db.query(RouteStatistics).filter(
+            RouteStatistics.route_id.in_(route_ids)
+        ).all()
+        return {s.route_id: s for s in stats}
+
     def _calculate_base_price(
         self,
-        history: List[PriceHistory],
+        history: RouteHistory,
         stats: Optional[RouteStatistics],
         current_price: Optional[float]
     ) -> float:
@@ -224,10 +466,8 @@ class PricePredictionService:
         if stats and stats.avg_price_30d:
             return stats.avg_price_30d
 
-        if history:
-            prices = [h.lowest_price for h in history if h.lowest_price]
-            if prices:
-                return np.mean(prices)
+        if history.mean_price is not None:
+            return history.mean_price
 
         # Default fallback
         return 85.0
@@ -235,7 +475,7 @@ class PricePredictionService:
     def _calculate_prediction_factors(
         self,
         departure_date: date,
-        history: List[PriceHistory],
+        history: RouteHistory,
         stats: Optional[RouteStatistics],
         current_price: Optional[float],
     ) -> Dict[str, float]:
@@ -271,17 +511,39 @@ class PricePredictionService:
                 return factor
         return 1.0
 
-    def _calculate_trend_momentum(self, history: List[PriceHistory]) -> float:
+    def _days_to_departure_factors(self, days: np.ndarray) -> np.ndarray:
+        """Vectorized _get_days_to_departure_factor."""
+        max_days = max(hi for _, hi in self.DAYS_TO_DEPARTURE_FACTORS)
+        table = np.ones(max_days + 1)
+        for (min_days, hi), factor in self.DAYS_TO_DEPARTURE_FACTORS.items():
+            table[min_days:hi + 1] = factor
+
+        factors = np.ones(len(days))
+        in_range = (days >= 0) & (days <= max_days)
+        factors[in_range] = table[days[in_range]]
+        return factors
+
+    def _seasonality_factors(self, months: np.ndarray) -> np.ndarray:
+        """Vectorized monthly seasonality lookup."""
+        table = np.array([1.0] + [self.MONTHLY_SEASONALITY.get(m, 1.0) for m in range(1, 13)])
+        return table[months]
+
+    def _day_of_week_factors(self, weekdays: np.ndarray) -> np.ndarray:
+        """Vectorized day-of-week lookup."""
+        table = np.array([self.DAY_OF_WEEK_FACTORS.get(d, 1.0) for d in range(7)])
+        return table[weekdays]
+
+    def _calculate_trend_momentum(self, history: RouteHistory) -> float:
         """Calculate price trend momentum from recent history."""
         if len(history) < 3:
             return 1.0
 
-        # Get prices from last 7 days
-        recent = sorted(history[:7], key=lambda h: h.recorded_at)
-        if len(recent) < 2:
+        # Get prices from last 7 days (oldest first)
+        order = np.argsort(history.recorded_at[:7], kind="stable")
+        if len(order) < 2:
             return 1.0
 
-        prices = [h.lowest_price for h in recent if h.lowest_price]
+        prices = _valid_prices(history.lowest_price[:7][order])
         if len(prices) < 2:
             return 1.0
 
@@ -292,22 +554,20 @@ class PricePredictionService:
         if first_price > 0:
             pct_change = (last_price - first_price) / first_price
             # Convert to factor (cap at ±10%)
-            return 1.0 + max(-0.10, min(0.10, pct_change))
+            return 1.0 + max(-0.10, min(0.10, float(pct_change)))
 
         return 1.0
 
-    def _calculate_demand_factor(self, history: List[PriceHistory]) -> float:
+    def _calculate_demand_factor(self, history: RouteHistory) -> float:
         """Calculate demand factor based on availability trends."""
-        if not history:
+        if not len(history):
             return 1.0
 
         # Average availability from recent records
-        availabilities = [
-            h.available_passengers for h in history[:10]
-            if h.available_passengers is not None
-        ]
+        recent = history.available_passengers[:10]
+        availabilities = recent[~np.isnan(recent)]
 
-        if not availabilities:
+        if not len(availabilities):
             return 1.0
 
         avg_availability = np.mean(availabilities)
@@ -339,9 +599,24 @@ class PricePredictionService:
         # Apply combined factor to base price
         return base_price * (1.0 + combined_factor)
 
+    def _apply_factor_arrays(self, base_price: float, factors: Dict[str, np.ndarray]) -> np.ndarray:
+        """Vectorized _apply_factors over arrays of factor values."""
+        combined_factor = np.zeros(len(next(iter(factors.values()))))
+        total_weight = 0.0
+
+        for factor_name in self.FACTOR_ORDER:
+            weight = self.FACTOR_WEIGHTS.get(factor_name, 0.1)
+            combined_factor += (factors[factor_name] - 1.0) * weight
+            total_weight += weight
+
+        if total_weight > 0:
+            combined_factor = combined_factor / total_weight
+
+        return base_price * (1.0 + combined_factor)
+
     def _calculate_confidence(
         self,
-        history: List[PriceHistory],
+        history: RouteHistory,
         stats: Optional[RouteStatistics]
     ) -> float:
         """Calculate prediction confidence based on data quality."""
@@ -361,22 +636,23 @@ class PricePredictionService:
             confidence += 0.1
 
         # Recent data available
-        if history and history[0].recorded_at > datetime.utcnow() - timedelta(hours=24):
+        recent_cutoff = np.datetime64(datetime.utcnow() - timedelta(hours=24), "us")
+        if len(history.recorded_at) and history.recorded_at[0] > recent_cutoff:
             confidence += 0.1
 
         return min(0.95, confidence)
 
     def _analyze_trend(
         self,
-        history: List[PriceHistory]
+        history: RouteHistory
     ) -> Tuple[PriceTrendEnum, float]:
         """Analyze price trend from history."""
         if len(history) < 5:
             return PriceTrendEnum.STABLE, 0.0
 
-        # Get prices over last 14 days
-        recent = sorted(history[:14], key=lambda h: h.recorded_at)
-        prices = [h.lowest_price for h in recent if h.lowest_price]
+        # Get prices over last 14 days (oldest first)
+        order = np.argsort(history.recorded_at[:14], kind="stable")
+        prices = _valid_prices(history.lowest_price[:14][order])
 
         if len(prices) < 3:
             return PriceTrendEnum.STABLE, 0.0
@@ -466,23 +742,39 @@ class PricePredictionService:
         route_id: str,
         current_price: Optional[float] = None
     ) -> PriceInsight:
-        """Get comprehensive price insights for a route."""
+        """
+        Get comprehensive price insights for a route.
+
+        Reads RouteStatistics and the rolling price aggregates; price_history
+        is only scanned for routes whose aggregates have not been built yet.
+        """
         stats = self._get_route_statistics(route_id)
-        history = self._get_price_history(route_id, date.today())
+        summary = PriceAggregateService(self.db).get_summary(route_id)
+        history = self._get_route_history(route_id, summary)
 
         # Calculate current metrics
         if current_price is None:
-            if history:
-                current_price = history[0].lowest_price
+            if len(history.recorded_at):
+                current_price = float(history.lowest_price[0])
             elif stats:
                 current_price = stats.avg_price_30d
             else:
                 current_price = 85.0
 
-        # Get stats values
-        avg_30d = stats.avg_price_30d if stats else current_price
-        min_30d = stats.min_price_30d if stats else current_price * 0.85
-        max_30d = stats.max_price_30d if stats else current_price * 1.15
+        # Get stats values, falling back to the rolling 30-day window
+        window = summary.window(30) if summary and not stats else None
+        if stats:
+            avg_30d = stats.avg_price_30d
+            min_30d = stats.min_price_30d
+            max_30d = stats.max_price_30d
+        elif window and window.count:
+            avg_30d = window.mean
+            min_30d = window.min_price
+            max_30d = window.max_price
+        else:
+            avg_30d = current_price
+            min_30d = current_price * 0.85
+            max_30d = current_price * 1.15
 
         # Calculate percentile
         price_range = max_30d - min_30d
@@ -525,6 +817,17 @@ class PricePredictionService:
         if current_price and min_30d and current_price > min_30d * 1.1:
             savings = current_price - min_30d
 
+        # Day-of-week patterns from the rolling aggregates
+        cheapest_day = most_expensive_day = weekend_premium = None
+        if summary:
+            weekday_averages = summary.weekday_averages()
+            if weekday_averages:
+                cheapest_day = min(weekday_averages, key=weekday_averages.get)
+                most_expensive_day = max(weekday_averages, key=weekday_averages.get)
+            weekday_avg, weekend_avg = summary.weekday_weekend_averages()
+            if weekday_avg and weekend_avg:
+                weekend_premium = round(weekend_avg / weekday_avg - 1, 3)
+
         return PriceInsight(
             current_price=round(current_price, 2),
             avg_price_30d=round(avg_30d, 2),
@@ -536,6 +839,9 @@ class PricePredictionService:
             best_booking_window=booking_window,
             seasonal_insight=seasonal,
             savings_opportunity=round(savings, 2) if savings else None,
+            cheapest_day_of_week=cheapest_day,
+            most_expensive_day=most_expensive_day,
+            weekend_premium=weekend_premium,
         )
 
     def save_prediction(
@@ -598,3 +904,84 @@ class PricePredictionService:
         self.db.refresh(db_prediction)
 
         return db_prediction
+
+    def save_predictions_batch(
+        self,
+        routes: List[Dict[str, str]],
+        dates: List[date],
+        predictions: Dict[str, List[PredictionResult]],
+    ) -> Tuple[int, int]:
+        """
+        Bulk upsert predictions produced by predict_batch.
+
+        Existing rows for the routes and dates are loaded in one query, then
+        new and changed rows are written with bulk insert/update mappings.
+
+        Args:
+            routes: Route dicts with route_id, departure_port and arrival_port
+            dates: Dates the predictions were made for (same order as predict_batch)
+            predictions: Output of predict_batch
+
+        Returns:
+            Tuple of (created, updated) row counts
+        """
+        route_ids = [route["route_id"] for route in routes]
+        if not route_ids or not dates:
+            return 0, 0
+
+        existing = {
+            (route_id, prediction_date): prediction_id
+            for prediction_id, route_id, prediction_date in self.db.query(
+                PricePrediction.id,
+                PricePrediction.route_id,
+                PricePrediction.prediction_date,
+            ).filter(
+                and_(
+                    PricePrediction.route_id.in_(route_ids),
+                    PricePrediction.prediction_date >= min(dates),
+                    PricePrediction.prediction_date <= max(dates),
+                )
+            ).all()
+        }
+
+        now = datetime.utcnow()
+        inserts = []
+        updates = []
+
+        for route in routes:
+            route_id = route["route_id"]
+            for prediction_date, prediction in zip(dates, predictions.get(route_id, [])):
+                values = {
+                    "predicted_price": prediction.predicted_price,
+                    "predicted_low": prediction.predicted_low,
+                    "predicted_high": prediction.predicted_high,
+                    "current_price": None,
+                    "confidence_score": prediction.confidence_score,
+                    "price_trend": prediction.price_trend.value,
+                    "trend_strength": prediction.trend_strength,
+                    "booking_recommendation": prediction.booking_recommendation.value,
+                    "potential_savings": prediction.potential_savings,
+                    "recommendation_reason": prediction.recommendation_reason,
+                    "prediction_factors": prediction.factors,
+                    "created_at": now,
+                }
+
+                prediction_id = existing.get((route_id, prediction_date))
+                if prediction_id is not None:
+                    updates.append({"id": prediction_id, **values})
+                else:
+                    inserts.append({
+                        "route_id": route_id,
+                        "departure_port": route["departure_port"],
+                        "arrival_port": route["arrival_port"],
+                        "prediction_date": prediction_date,
+                        **values,
+                    })
+
+        if inserts:
+            self.db.bulk_insert_mappings(PricePrediction, inserts)
+        if updates:
+            self.db.bulk_update_mappings(PricePrediction, updates)
+        self.db.commit()
+
+        return len(inserts), len(updates)
@@ -0,0 +1,228 @@
+"""
+Route Statistics Service
+
+Computes RouteStatistics for all tracked routes with a single grouped SQL
+query over price_history and upserts the results in one statement.
+"""
+
+import logging
+import math
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import and_, func, select
+from sqlalchemy.orm import Session
+
+from app.models.price_history import PriceHistory, RouteStatistics
+
+logger = logging.getLogger(__name__)
+
+# Columns filled from price_history aggregates. A NULL aggregate (no data in
+# the window) keeps the previously stored value instead of clearing it.
+AGGREGATE_COLUMNS = (
+    "avg_price_30d",
+    "min_price_30d",
+    "max_price_30d",
+    "price_volatility_30d",
+    "avg_price_90d",
+    "min_price_90d",
+    "max_price_90d",
+    "all_time_low",
+    "all_time_low_date",
+    "all_time_high",
+    "all_time_high_date",
+    "weekday_avg_price",
+    "weekend_avg_price",
+)
+
+# Booking pattern defaults (mock data until real booking analytics exist)
+BOOKING_PATTERN_DEFAULTS = {
+    "best_booking_window_start": 21,
+    "best_booking_window_end": 14,
+    "typical_advance_days": 18,
+    "cheapest_day_of_week": 1,  # Tuesday
+    "most_expensive_day": 5,    # Saturday
+}
+
+
+class RouteStatisticsService:
+    """Service for computing and storing aggregated route statistics."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def compute_statistics(
+        self,
+        route_ids: List[str],
+        now: Optional[datetime] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Compute statistics for all routes in one grouped query.
+
+        Windows are expressed with aggregate FILTER clauses; the all-time
+        low/high dates come from row_number() ranks in the same statement.
+        Zero and missing prices are ignored, as in the original per-route
+        Python computation.
+
+        Returns:
+            Mapping of route_id to RouteStatistics column values
+        """
+        if not route_ids:
+            return {}
+
+        now = (now or datetime.utcnow()).replace(tzinfo=None)
+        cutoff_30d = now - timedelta(days=30)
+        cutoff_90d = now - timedelta(days=90)
+
+        history = PriceHistory.__table__
+        ranked = select(
+            history.c.route_id,
+            history.c.recorded_at,
+            history.c.lowest_price,
+            history.c.highest_price,
+            history.c.departure_date,
+            history.c.is_weekend,
+            func.row_number().over(
+                partition_by=history.c.route_id,
+                order_by=history.c.lowest_price.asc(),
+            ).label("low_rank"),
+            func.row_number().over(
+                partition_by=history.c.route_id,
+                order_by=history.c.highest_price.desc().nulls_last(),
+            ).label("high_rank"),
+        ).where(history.c.route_id.in_(route_ids)).subquery("ranked")
+
+        price = ranked.c.lowest_price
+        valid = and_(price.isnot(None), price != 0)
+        in_30d = and_(valid, ranked.c.recorded_at >= cutoff_30d)
+        in_90d = and_(valid, ranked.c.recorded_at >= cutoff_90d)
+        weekday = and_(valid, ranked.c.is_weekend == False)  # noqa: E712
+        weekend = and_(valid, ranked.c.is_weekend == True)  # noqa: E712
+        is_low = ranked.c.low_rank == 1
+        is_high = ranked.c.high_rank == 1
+
+        query = select(
+            ranked.c.route_id,
+            func.avg(price).filter(in_30d).label("avg_30d"),
+            func.min(price).filter(in_30d).label("min_30d"),
+            func.max(price).filter(in_30d).label("max_30d"),
+            func.avg(price * price).filter(in_30d).label("avg_sq_30d"),
+            func.avg(price).filter(in_90d).label("avg_90d"),
+            func.min(price).filter(in_90d).label("min_90d"),
+            func.max(price).filter(in_90d).label("max_90d"),
+            func.avg(price).filter(weekday).label("weekday_avg"),
+            func.avg(price).filter(weekend).label("weekend_avg"),
+            func.min(price).filter(is_low).label("all_time_low"),
+            func.min(ranked.c.departure_date).filter(is_low).label("all_time_low_date"),
+            func.max(ranked.c.highest_price).filter(is_high).label("all_time_high"),
+            func.min(ranked.c.departure_date).filter(is_high).label("all_time_high_date"),
+        ).group_by(ranked.c.route_id)
+
+        statistics = {}
+        for row in self.db.execute(query):
+            volatility = None
+            if row.avg_30d is not None:
+                # Population standard deviation from E[x²] - E[x]²
+                variance = max(0.0, float(row.avg_sq_30d) - float(row.avg_30d) ** 2)
+                volatility = round(math.sqrt(variance), 2)
+
+            statistics[row.route_id] = {
+                "avg_price_30d": _round(row.avg_30d),
+                "min_price_30d": row.min_30d,
+                "max_price_30d": row.max_30d,
+                "price_volatility_30d": volatility,
+                "avg_price_90d": _round(row.avg_90d),
+                "min_price_90d": row.min_90d,
+                "max_price_90d": row.max_90d,
+                "all_time_low": row.all_time_low,
+                "all_time_low_date": row.all_time_low_date,
+                "all_time_high": row.all_time_high,
+                "all_time_high_date": row.all_time_high_date,
+                "weekday_avg_price": _round(row.weekday_avg),
+                "weekend_avg_price": _round(row.weekend_avg),
+            }
+
+        return statistics
+
+    def refresh(self, routes: List[Dict[str, str]], now: Optional[datetime] = None) -> int:
+        """
+        Recompute and upsert statistics for the given routes.
+
+        Args:
+            routes: Route dicts with route_id, departure_port and arrival_port
+            now: Reference time for the 30/90-day windows
+
+        Returns:
+            Number of routes written
+        """
+        statistics = self.compute_statistics([r["route_id"] for r in routes], now)
+        updated_at = (now or datetime.utcnow()).replace(tzinfo=None)
+
+        rows = []
+        for route in routes:
+            aggregates = statistics.get(route["route_id"], {})
+            rows.append({
+                "route_id": route["route_id"],
+                "departure_port": route["departure_port"],
+                "arrival_port": route["arrival_port"],
+                "updated_at": updated_at,
+                **{column: aggregates.get(column) for column in AGGREGATE_COLUMNS},
+                **BOOKING_PATTERN_DEFAULTS,
+            })
+
+        self._upsert(rows)
+        self.db.commit()
+        return len(rows)
+
+    def _upsert(self, rows: List[Dict[str, Any]]) -> None:
+        """Insert or update RouteStatistics rows in a single statement."""
+        if not rows:
+            return
+
+        dialect = self.db.get_bind().dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            self._upsert_orm(rows)
+            return
+
+        table = RouteStatistics.__table__
+        stmt = insert(table).values(rows)
+
+        update_columns = {
+            column: stmt.excluded[column]
+            for column in ("departure_port", "arrival_port", "updated_at", *BOOKING_PATTERN_DEFAULTS)
+        }
+        for column in AGGREGATE_COLUMNS:
+            update_columns[column] = func.coalesce(stmt.excluded[column], table.c[column])
+
+        self.db.execute(stmt.on_conflict_do_update(
+            index_elements=[table.c.route_id],
+            set_=update_columns,
+        ))
+
+    def _upsert_orm(self, rows: List[Dict[str, Any]]) -> None:
+        """Row-by-row fallback for databases without ON CONFLICT support."""
+        existing = {
+            s.route_id: s
+            for s in self.db.query(RouteStatistics).filter(
+                RouteStatistics.route_id.in_([r["route_id"] for r in rows])
+            )
+        }
+
+        for row in rows:
+            stats = existing.get(row["route_id"])
+            if not stats:
+                self.db.add(RouteStatistics(**row))
+                continue
+            for column, value in row.items():
+                if column in AGGREGATE_COLUMNS and value is None:
+                    continue
+                setattr(stats, column, value)
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    """Round an aggregate to cents, keeping NULLs."""
+    return round(float(value), 2) if value is not None else None
@@ -0,0 +1,196 @@
+"""
+Redis stream ingestion of Stripe webhook events.
+
+The webhook endpoint only verifies the signature, drops event IDs it has
+already accepted (Stripe retries the same event until it gets a 2xx) and
+appends the event to a Redis stream. A Celery consumer
+(tasks/payment_tasks.process_webhook_stream_task) reads the stream through
+a consumer group in small batches, loads the batch's payments and bookings
+in two queries and commits once per batch.
+
+Events are sharded into STRIPE_WEBHOOK_SHARDS streams by booking ID (from
+the payment intent metadata, falling back to the intent ID), and each shard
+is drained by one consumer at a time under a Redis lock, so the events of a
+booking are applied in the order they were received. Entries are acked
+only after their batch commits; a consumer that dies leaves them pending
+and the next drain of the shard re-reads them first.
+"""
+
+import json
+import logging
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.services.cache_service import cache_service
+
+logger = logging.getLogger(__name__)
+
+STREAM_PREFIX = "stripe:webhook_events"
+DEAD_LETTER_STREAM = "stripe:webhook_events:dead"
+SEEN_PREFIX = "stripe:webhook_seen"
+CONSUMER_GROUP = "payment-workers"
+LOCK_SECONDS = 300  # Celery hard time limit
+DEAD_LETTER_MAXLEN = 10000
+
+
+class WebhookStreamService:
+    """Dedupe, append and consume Stripe webhook events on Redis streams."""
+
+    def __init__(self, cache=cache_service):
+        self.cache = cache
+        self._groups_created = set()
+
+    @property
+    def redis(self):
+        return self.cache.redis_client
+
+    def is_available(self) -> bool:
+        return self.cache.is_available()
+
+    def shard_count(self) -> int:
+        return max(1, settings.STRIPE_WEBHOOK_SHARDS)
+
+    def stream_key(self, shard: int) -> str:
+        return f"{STREAM_PREFIX}:{shard}"
+
+    def shard_for(self, payment_intent_id: str, event_data: Dict[str, Any]) -> int:
+        """Shard of an event: all events of one booking land on the same stream."""
+        partition_key = (event_data.get("metadata") or {}).get("booking_id") or payment_intent_id
+        return zlib.crc32(str(partition_key).encode()) % self.shard_count()
+
+    def mark_seen(self, event_id: str) -> bool:
+        """Record an event ID; False if it was already accepted."""
+        key = f"{SEEN_PREFIX}:{event_id}"
+        return bool(self.redis.set(key, "1", nx=True, ex=settings.STRIPE_WEBHOOK_DEDUPE_TTL_SECONDS))
+
+    def forget(self, event_id: str) -> None:
+        """Drop an event ID so a Stripe retry is accepted again."""
+        self.redis.delete(f"{SEEN_PREFIX}:{event_id}")
+
+    def append(
+        self,
+        event_id: Optional[str],
+        event_type: str,
+        payment_intent_id: str,
+        event_data: Dict[str, Any]
+    ) -> int:
+        """
+        Append an event to its shard's stream.
+
+        Returns:
+            The shard the event was appended to
+        """
+        shard = self.shard_for(payment_intent_id, event_data)
+        self.redis.xadd(
+            self.stream_key(shard),
+            {
+                "event_id": event_id or "",
+                "event_type": event_type,
+                "payment_intent_id": payment_intent_id,
+                "data": json.dumps(event_data),
+            },
+            maxlen=settings.STRIPE_WEBHOOK_STREAM_MAXLEN,
+            approximate=True,
+        )
+        return shard
+
+    def _ensure_group(self, stream: str) -> None:
+        if stream in self._groups_created:
+            return
+        try:
+            self.redis.xgroup_create(stream, CONSUMER_GROUP, id="0", mkstream=True)
+        except Exception as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        self._groups_created.add(stream)
+
+    def read_batch(self, shard: int, count: int) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Next entries of a shard: its pending (delivered, unacked) entries first, then new ones.
+
+        Returns:
+            (entry_id, event) tuples in stream order
+        """
+        stream = self.stream_key(shard)
+        self._ensure_group(stream)
+        consumer = f"shard-{shard}"
+
+        entries = []
+        for start in ("0", ">"):
+            while True:
+                response = self.redis.xreadgroup(CONSUMER_GROUP, consumer, {stream: start}, count=count)
+                read = [
+                    (entry_id, fields)
+                    for _, stream_entries in response or []
+                    for entry_id, fields in stream_entries
+                ]
+                entries = [(entry_id, fields) for entry_id, fields in read if fields]
+
+                # Pending entries trimmed from the stream come back empty and
+                # can never be processed: ack them so they leave the pending
+                # list instead of filling every re-read of it
+                trimmed = [entry_id for entry_id, fields in read if not fields]
+                if not trimmed:
+                    break
+                self.redis.xack(stream, CONSUMER_GROUP, *trimmed)
+                logger.warning(f"⚠️ Acked {len(trimmed)} trimmed pending webhook entries on {stream}")
+                if entries:
+                    break
+            if entries:
+                break
+        return [
+            (entry_id, {
+                "event_id": fields.get("event_id") or None,
+                "event_type": fields["event_type"],
+                "payment_intent_id": fields["payment_intent_id"],
+                "event_data": json.loads(fields["data"]),
+            })
+            for entry_id, fields in entries
+        ]
+
+    def ack(self, shard: int, entry_ids: List[str]) -> None:
+        """Acknowledge and delete processed entries."""
+        if not entry_ids:
+            return
+        stream = self.stream_key(shard)
+        pipe = self.redis.pipeline()
+        pipe.xack(stream, CONSUMER_GROUP, *entry_ids)
+        pipe.xdel(stream, *entry_ids)
+        pipe.execute()
+
+    def dead_letter(self, event: Dict[str, Any], error: str) -> None:
+        """Keep an event that could not be processed for inspection."""
+        self.redis.xadd(
+            DEAD_LETTER_STREAM,
+            {
+                "event_id": event.get("event_id") or "",
+                "event_type": event["event_type"],
+                "payment_intent_id": event["payment_intent_id"],
+                "data": json.dumps(event["event_data"]),
+                "error": error[:500],
+            },
+            maxlen=DEAD_LETTER_MAXLEN,
+            approximate=True,
+        )
+
+    def acquire_shard(self, shard: int) -> bool:
+        """Take the shard's consumer lock; if busy, ask the holder to drain again."""
+        if self.redis.set(f"{STREAM_PREFIX}:{shard}:lock", "1", nx=True, ex=LOCK_SECONDS):
+            return True
+        self.redis.set(f"{STREAM_PREFIX}:{shard}:rerun", "1", ex=LOCK_SECONDS)
+        return False
+
+    def release_shard(self, shard: int) -> bool:
+        """
+        Release the shard's consumer lock.
+
+        Returns:
+            True if another drain was requested meanwhile
+        """
+        self.redis.delete(f"{STREAM_PREFIX}:{shard}:lock")
+        return bool(self.redis.getdel(f"{STREAM_PREFIX}:{shard}:rerun"))
+
+
+# Global webhook stream service instance
+webhook_stream_service = WebhookStreamService()
@@ -14,6 +14,8 @@ __all__ = [
     "send_email_verification_task",
     # Payment tasks
     "process_payment_webhook_task",
+    "process_webhook_stream_task",
+    "drain_webhook_streams_task",
     "verify_payment_status_task",
     # Booking tasks
     "check_ferry_availability_task",
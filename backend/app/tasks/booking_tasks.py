@@ -225,6 +225,199 @@ def cancel_booking_with_operator_task(
         raise
 
 
+EXPIRY_REASON = "Booking expired - payment not received within 30 minutes"
+
+
+def _expire_batch(db, now: datetime, limit: int) -> list:
+    """
+    Cancel up to `limit` expired PENDING bookings in one UPDATE ... RETURNING.
+
+    Rows are claimed with FOR UPDATE SKIP LOCKED (PostgreSQL) so overlapping
+    runs or concurrent payments never wait on each other, and the status is
+    re-checked by the UPDATE itself so a booking paid meanwhile is left alone.
+    Reserved inventory is released in the same transaction.
+    """
+    from sqlalchemy import select, update
+    from app.models.booking import Booking, BookingStatusEnum
+
+    expired_ids = (
+        select(Booking.id)
+        .where(
+            Booking.status == BookingStatusEnum.PENDING,
+            Booking.expires_at != None,
+            Booking.expires_at < now,
+        )
+        .order_by(Booking.expires_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    statement = (
+        update(Booking)
+        .where(Booking.id.in_(expired_ids), Booking.status == BookingStatusEnum.PENDING)
+        .values(
+            status=BookingStatusEnum.CANCELLED,
+            cancellation_reason=EXPIRY_REASON,
+            cancelled_at=now,
+        )
+        .returning(
+            Booking.id,
+            Booking.booking_reference,
+            Booking.sailing_id,
+            Booking.operator,
+            Booking.departure_port,
+            Booking.arrival_port,
+            Booking.departure_time,
+            Booking.arrival_time,
+            Booking.vessel_name,
+            Booking.contact_first_name,
+            Booking.contact_last_name,
+            Booking.contact_email,
+            Booking.total_passengers,
+            Booking.total_vehicles,
+            Booking.total_amount,
+            Booking.cabin_id,
+            Booking.return_cabin_id,
+            Booking.extra_data,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    rows = db.execute(statement).all()
+    _release_reservations(db, rows)
+    db.commit()
+    _invalidate_read_models(rows)
+    return rows
+
+
+def _invalidate_read_models(rows: list) -> None:
+    """Drop the cached detail responses of bookings changed by a set-based UPDATE."""
+    from app.services.booking_read_cache import booking_read_cache
+
+    booking_read_cache.invalidate_many((row.id, row.booking_reference) for row in rows)
+
+
+def _release_reservations(db, rows: list) -> None:
+    """Give back the inventory reserved by expired bookings, in the expiry transaction."""
+    from sqlalchemy import update
+    from app.models.booking import Booking
+    from app.services.inventory_service import inventory_service
+
+    reserved = [row for row in rows if (row.extra_data or {}).get("inventory")]
+    if not reserved:
+        return
+    inventory_service.release(db, [row.extra_data["inventory"] for row in reserved])
+    db.execute(
+        update(Booking).execution_options(synchronize_session=False),
+        [
+            {"id": row.id, "extra_data": {k: v for k, v in row.extra_data.items() if k != "inventory"}}
+            for row in reserved
+        ]
+    )
+
+
+def _release_expired_inventory(db, rows: list) -> int:
+    """
+    Publish freed capacity once per affected sailing.
+
+    Cabins come from booking_cabins in one grouped query, falling back to the
+    legacy cabin_id fields for bookings without booking_cabins rows.
+
+    Returns:
+        Number of sailings released
+    """
+    from sqlalchemy import func
+    from app.models.booking import BookingCabin
+    from app.services.cache_service import cache_service
+    from app.tasks.availability_sync_tasks import publish_availability_now
+
+    cabins_by_booking = dict(
+        db.query(BookingCabin.booking_id, func.sum(BookingCabin.quantity))
+        .filter(BookingCabin.booking_id.in_([row.id for row in rows]))
+        .group_by(BookingCabin.booking_id)
+        .all()
+    )
+
+    sailings: Dict[str, Dict[str, Any]] = {}
+    for row in rows:
+        ferry_id = row.sailing_id or f"{row.operator}-{row.booking_reference}"
+        sailing = sailings.setdefault(ferry_id, {
+            "sailing_id": row.sailing_id,
+            "route": f"{row.departure_port}-{row.arrival_port}",
+            "departure_time": row.departure_time.isoformat() if row.departure_time else "",
+            "passengers_freed": 0,
+            "vehicles_freed": 0,
+            "cabins_freed": 0,
+            "booking_references": [],
+        })
+        cabins = cabins_by_booking.get(row.id)
+        if cabins is None:
+            cabins = int(row.cabin_id is not None) + int(row.return_cabin_id is not None)
+        sailing["passengers_freed"] += row.total_passengers or 0
+        sailing["vehicles_freed"] += row.total_vehicles or 0
+        sailing["cabins_freed"] += int(cabins)
+        sailing["booking_references"].append(row.booking_reference)
+
+    for ferry_id, sailing in sailings.items():
+        try:
+            if sailing["sailing_id"]:
+                cache_service.invalidate_sailing_availability(sailing["sailing_id"])
+            publish_availability_now(
+                route=sailing["route"],
+                ferry_id=ferry_id,
+                departure_time=sailing["departure_time"],
+                availability={
+                    "change_type": "bookings_expired",
+                    "passengers_freed": sailing["passengers_freed"],
+                    "vehicles_freed": sailing["vehicles_freed"],
+                    "cabins_freed": sailing["cabins_freed"],
+                    "booking_references": sailing["booking_references"],
+                },
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to release inventory for sailing {ferry_id}: {str(e)}")
+
+    return len(sailings)
+
+
+def _queue_expiry_emails(rows: list, now: datetime) -> int:
+    """
+    Hand the cancellation emails for a batch to the email queue as one group.
+
+    Returns:
+        Number of emails queued
+    """
+    from celery import group
+    from app.tasks.email_tasks import send_cancellation_email_task
+
+    signatures = [
+        send_cancellation_email_task.s(
+            booking_data={
+                'booking_reference': row.booking_reference,
+                'departure_port': row.departure_port,
+                'arrival_port': row.arrival_port,
+                'operator': row.operator,
+                'vessel_name': row.vessel_name,
+                'departure_time': row.departure_time.isoformat() if row.departure_time else None,
+                'arrival_time': row.arrival_time.isoformat() if row.arrival_time else None,
+                'contact_first_name': row.contact_first_name,
+                'contact_last_name': row.contact_last_name,
+                'contact_email': row.contact_email,
+                'total_passengers': row.total_passengers,
+                'total_vehicles': row.total_vehicles,
+                'total_amount': float(row.total_amount),
+                'cancellation_reason': EXPIRY_REASON,
+                'cancelled_at': now.isoformat(),
+            },
+            to_email=row.contact_email,
+        )
+        for row in rows
+        if row.contact_email
+    ]
+    if signatures:
+        group(signatures).apply_async()
+    return len(signatures)
+
+
 @shared_task(
     name="app.tasks.booking_tasks.expire_old_bookings",
     bind=True,
@@ -235,94 +428,79 @@ def expire_old_bookings_task(self):
     """
     Periodic task to expire pending bookings that haven't been paid.
 
-    This task:
-    1. Finds all PENDING bookings that have passed their expiration time
-    2. Updates their status to CANCELLED
-    3. Sends cancellation notification emails
+    This task, in batches of BOOKING_EXPIRY_BATCH_SIZE:
+    1. Cancels expired PENDING bookings with one set-based UPDATE ... RETURNING
+    2. Releases the freed inventory once per affected sailing
+    3. Queues the cancellation emails as one group
+
+    Stops starting new batches after BOOKING_EXPIRY_TIME_BUDGET_SECONDS, so a
+    backlog after an outage is drained over several runs instead of hitting
+    the task time limit.
 
     Runs every minute to ensure timely expiration.
     Previously ran as a cron job, migrated to Celery Beat for better monitoring.
     """
+    import time
+    from app.config import settings
     from app.database import SessionLocal
-    from app.models.booking import Booking, BookingStatusEnum
-    from app.services.email_service import email_service
 
     db = SessionLocal()
 
     try:
         logger.info("🔍 Starting booking expiration check...")
 
-        # Get current time
         now = datetime.now(timezone.utc)
+        deadline = time.monotonic() + settings.BOOKING_EXPIRY_TIME_BUDGET_SECONDS
+        batch_size = settings.BOOKING_EXPIRY_BATCH_SIZE
 
-        # Find all pending bookings that have expired
-        expired_bookings = db.query(Booking).filter(
-            Booking.status == BookingStatusEnum.PENDING,
-            Booking.expires_at != None,
-            Booking.expires_at < now
-        ).all()
+        expired_count = 0
+        emails_queued = 0
+        sailings_released = 0
+        batches = 0
+
+        while True:
+            rows = _expire_batch(db, now, batch_size)
+            if not rows:
+                break
+            batches += 1
+            expired_count += len(rows)
+            logger.info(f"⏰ Expired {len(rows)} booking(s) in batch {batches}")
+
+            try:
+                sailings_released += _release_expired_inventory(db, rows)
+            except Exception as e:
+                logger.error(f"❌ Failed to release inventory for expired bookings: {str(e)}")
+
+            try:
+                emails_queued += _queue_expiry_emails(rows, now)
+            except Exception as e:
+                logger.error(f"❌ Failed to queue expiry emails: {str(e)}")
+
+            if len(rows) < batch_size:
+                break
+            if time.monotonic() >= deadline:
+                logger.warning(f"⚠️ Expiry time budget used after {expired_count} booking(s), continuing next run")
+                break
 
-        if not expired_bookings:
+        if not expired_count:
             logger.info("✅ No expired bookings found")
             return {
                 'status': 'success',
                 'expired_count': 0,
-                'emails_sent': 0
+                'emails_queued': 0
             }
 
-        expired_count = 0
-        emails_sent = 0
-
-        for booking in expired_bookings:
-            logger.info(f"⏰ Expiring booking {booking.booking_reference}")
-
-            # Update booking status
-            booking.status = BookingStatusEnum.CANCELLED
-            booking.cancellation_reason = "Booking expired - payment not received within 30 minutes"
-            booking.cancelled_at = now
-            expired_count += 1
-
-            # Send cancellation email asynchronously
-            try:
-                booking_data = {
-                    'booking_reference': booking.booking_reference,
-                    'departure_port': booking.departure_port,
-                    'arrival_port': booking.arrival_port,
-                    'operator': booking.operator,
-                    'vessel_name': booking.vessel_name,
-                    'departure_time': booking.departure_time.isoformat() if booking.departure_time else None,
-                    'arrival_time': booking.arrival_time.isoformat() if booking.arrival_time else None,
-                    'contact_first_name': booking.contact_first_name,
-                    'contact_last_name': booking.contact_last_name,
-                    'contact_email': booking.contact_email,
-                    'total_passengers': booking.total_passengers,
-                    'total_vehicles': booking.total_vehicles,
-                    'total_amount': float(booking.total_amount),
-                    'cancellation_reason': booking.cancellation_reason,
-                    'cancelled_at': booking.cancelled_at.isoformat() if booking.cancelled_at else None,
-                }
-
-                if email_service.send_cancellation_confirmation(
-                    booking_data=booking_data,
-                    to_email=booking.contact_email
-                ):
-                    emails_sent += 1
-                    logger.info(f"  ✅ Sent cancellation email to {booking.contact_email}")
-                else:
-                    logger.warning(f"  ⚠️ Failed to send email to {booking.contact_email}")
-
-            except Exception as email_error:
-                logger.error(f"  ❌ Email error for {booking.booking_reference}: {str(email_error)}")
-
-        # Commit all changes
-        db.commit()
-
-        logger.info(f"✅ Expired {expired_count} pending booking(s), sent {emails_sent} email(s)")
+        logger.info(
+            f"✅ Expired {expired_count} pending booking(s) in {batches} batch(es), "
+            f"released {sailings_released} sailing(s), queued {emails_queued} email(s)"
+        )
 
         return {
             'status': 'success',
             'expired_count': expired_count,
-            'emails_sent': emails_sent,
+            'emails_queued': emails_queued,
+            'sailings_released': sailings_released,
+            'batches': batches,
             'checked_at': now.isoformat()
         }
 
@@ -336,6 +514,73 @@ def expire_old_bookings_task(self):
         db.close()
 
 
+BOOKING_EVENTS_CHANNEL = "bookings:events"
+
+
+def _complete_batch(db, now: datetime, cutoff: datetime, limit: int) -> list:
+    """
+    Move up to `limit` past CONFIRMED bookings to COMPLETED in one UPDATE ... RETURNING.
+
+    A booking is past once its last leg departed before the cutoff: the
+    return departure for round trips (the outbound one when the return time
+    is unknown), the outbound departure otherwise. Each branch can use the
+    partial indexes on confirmed bookings' departure times.
+    """
+    from sqlalchemy import and_, or_, select, update
+    from app.models.booking import Booking, BookingStatusEnum
+
+    past_ids = (
+        select(Booking.id)
+        .where(
+            Booking.status == BookingStatusEnum.CONFIRMED,
+            or_(
+                and_(Booking.is_round_trip == False, Booking.departure_time < cutoff),
+                and_(Booking.is_round_trip == True, Booking.return_departure_time < cutoff),
+                and_(
+                    Booking.is_round_trip == True,
+                    Booking.return_departure_time == None,
+                    Booking.departure_time < cutoff,
+                ),
+            ),
+        )
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    statement = (
+        update(Booking)
+        .where(Booking.id.in_(past_ids), Booking.status == BookingStatusEnum.CONFIRMED)
+        .values(status=BookingStatusEnum.COMPLETED, updated_at=now)
+        .returning(Booking.id, Booking.booking_reference, Booking.user_id, Booking.sailing_id)
+        .execution_options(synchronize_session=False)
+    )
+    rows = db.execute(statement).all()
+    db.commit()
+    _invalidate_read_models(rows)
+    return rows
+
+
+def _publish_booking_event(event: str, payload: Dict[str, Any]) -> bool:
+    """
+    Publish one booking lifecycle event on the bookings:events Redis channel.
+
+    Follow-up work (review requests, statistics, inventory) subscribes to
+    this channel instead of being done per booking inside the task.
+    """
+    import json
+    import os
+    import redis
+
+    try:
+        redis_url = os.getenv("REDIS_URL", "redis://localhost:6399/2")
+        r = redis.from_url(redis_url, decode_responses=True)
+        r.publish(BOOKING_EVENTS_CHANNEL, json.dumps({"event": event, **payload}))
+        return True
+    except Exception as e:
+        logger.warning(f"⚠️ Failed to publish {event} event: {str(e)}")
+        return False
+
+
 @celery_app.task(
     name="app.tasks.booking_tasks.complete_past_bookings",
     bind=True,
@@ -346,17 +591,21 @@ def complete_past_bookings_task(self):
     """
     Periodic task to mark confirmed bookings as completed after departure.
 
-    This task:
-    1. Finds all CONFIRMED bookings where departure_time has passed
-    2. Updates their status to COMPLETED
-    3. Also handles round-trip bookings (waits for return journey to complete)
+    Bookings whose last leg departed more than 2 hours ago are moved from
+    CONFIRMED to COMPLETED by set-based UPDATEs of BOOKING_COMPLETION_BATCH_SIZE
+    rows (round trips wait for the return journey). The completed bookings
+    are then published as a single "bookings_completed" event, and the run
+    duration and row count are recorded as metrics.
 
     Runs every hour to update booking statuses.
     """
+    import time
+    from app.api.v1.metrics import record_booking_maintenance
+    from app.config import settings
     from app.database import SessionLocal
-    from app.models.booking import Booking, BookingStatusEnum
 
     db = SessionLocal()
+    started = time.perf_counter()
 
     try:
         logger.info("🔍 Starting past bookings completion check...")
@@ -364,62 +613,38 @@ def complete_past_bookings_task(self):
         # Get current time with some buffer (2 hours after departure)
         now = datetime.now(timezone.utc)
         cutoff_time = now - timedelta(hours=2)
-
-        # Find confirmed bookings where:
-        # - For one-way: departure_time has passed
-        # - For round-trip: return_departure_time has passed (or departure_time if no return)
-        completed_count = 0
-
-        # One-way bookings: departure has passed
-        one_way_bookings = db.query(Booking).filter(
-            Booking.status == BookingStatusEnum.CONFIRMED,
-            Booking.is_round_trip == False,
-            Booking.departure_time != None,
-            Booking.departure_time < cutoff_time
-        ).all()
-
-        for booking in one_way_bookings:
-            logger.info(f"✅ Completing one-way booking {booking.booking_reference}")
-            booking.status = BookingStatusEnum.COMPLETED
-            booking.updated_at = now
-            completed_count += 1
-
-        # Round-trip bookings: return departure has passed
-        round_trip_bookings = db.query(Booking).filter(
-            Booking.status == BookingStatusEnum.CONFIRMED,
-            Booking.is_round_trip == True,
-            Booking.return_departure_time != None,
-            Booking.return_departure_time < cutoff_time
-        ).all()
-
-        for booking in round_trip_bookings:
-            logger.info(f"✅ Completing round-trip booking {booking.booking_reference}")
-            booking.status = BookingStatusEnum.COMPLETED
-            booking.updated_at = now
-            completed_count += 1
-
-        # Round-trip bookings without return time: use outbound departure
-        round_trip_no_return = db.query(Booking).filter(
-            Booking.status == BookingStatusEnum.CONFIRMED,
-            Booking.is_round_trip == True,
-            Booking.return_departure_time == None,
-            Booking.departure_time != None,
-            Booking.departure_time < cutoff_time
-        ).all()
-
-        for booking in round_trip_no_return:
-            logger.info(f"✅ Completing round-trip booking (no return time) {booking.booking_reference}")
-            booking.status = BookingStatusEnum.COMPLETED
-            booking.updated_at = now
-            completed_count += 1
-
-        db.commit()
-
-        logger.info(f"✅ Completed {completed_count} past booking(s)")
+        batch_size = settings.BOOKING_COMPLETION_BATCH_SIZE
+
+        completed = []
+        while True:
+            rows = _complete_batch(db, now, cutoff_time, batch_size)
+            completed.extend(rows)
+            if len(rows) < batch_size:
+                break
+
+        if completed:
+            _publish_booking_event("bookings_completed", {
+                "count": len(completed),
+                "bookings": [
+                    {
+                        "id": row.id,
+                        "booking_reference": row.booking_reference,
+                        "user_id": row.user_id,
+                        "sailing_id": row.sailing_id,
+                    }
+                    for row in completed
+                ],
+                "completed_at": now.isoformat(),
+            })
+
+        duration = time.perf_counter() - started
+        record_booking_maintenance("complete_past_bookings", duration, len(completed))
+        logger.info(f"✅ Completed {len(completed)} past booking(s) in {duration:.2f}s")
 
         return {
             'status': 'success',
-            'completed_count': completed_count,
+            'completed_count': len(completed),
+            'duration_seconds': round(duration, 3),
             'checked_at': now.isoformat()
         }
 
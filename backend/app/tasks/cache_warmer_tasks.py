@@ -0,0 +1,63 @@
+"""
+Celery tasks for keeping popular ferry search results warm in Redis.
+"""
+import asyncio
+import logging
+from celery import shared_task
+
+from app.config import settings
+from app.services.cache_warmer_service import CacheWarmerService
+from app.services.ferry_service import FerryService
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(
+    name="app.tasks.cache_warmer_tasks.warm_search_cache",
+    bind=True
+)
+def warm_search_cache_task(self):
+    """
+    Refresh the most requested search caches before they expire.
+
+    This task:
+    1. Ranks route/dates and date-price windows by recent search and booking volume
+    2. Re-runs searches whose ferry_search/date_prices entry is missing or about to expire
+    3. Stops once the per-cycle operator-call budget is spent
+
+    Skipped when another cycle still holds the warmer lock or Redis is down.
+    """
+    if not settings.CACHE_WARMER_ENABLED:
+        return {"status": "skipped", "reason": "disabled"}
+
+    warmer = CacheWarmerService(FerryService())
+    if not warmer.acquire_lock():
+        logger.info("Cache warmer already running or Redis unavailable, skipping")
+        return {"status": "skipped", "reason": "locked"}
+
+    try:
+        logger.info("🔥 Warming popular search caches...")
+
+        report = asyncio.run(warmer.warm(
+            top_searches=settings.CACHE_WARMER_TOP_SEARCHES,
+            top_date_prices=settings.CACHE_WARMER_TOP_DATE_PRICES,
+            operator_call_budget=settings.CACHE_WARMER_OPERATOR_CALL_BUDGET,
+            refresh_before=settings.CACHE_WARMER_REFRESH_BEFORE_SECONDS,
+        ))
+
+        logger.info(
+            f"✅ Cache warming complete: {report.searches_refreshed} searches, "
+            f"{report.date_prices_refreshed} date windows, {report.operator_calls} operator calls"
+        )
+
+        return {"status": "success", **report.to_dict()}
+
+    except Exception as e:
+        logger.error(f"Error warming search cache: {str(e)}", exc_info=True)
+        raise
+    finally:
+        warmer.release_lock()
+
+
+# Aliases for celery beat schedule
+warm_search_cache = warm_search_cache_task
@@ -176,7 +176,7 @@ def send_payment_success_email_task(
                 logger.info(f"📄 Generating invoice PDF for booking {booking_data.get('booking_reference')}")
 
                 # Generate PDF in worker process
-                pdf_content = invoice_service.generate_invoice(
+                pdf_content = invoice_service.get_invoice(
                     booking=booking_data,
                     payment=payment_data,
                     passengers=passengers or [],
@@ -280,7 +280,7 @@ def send_cabin_upgrade_confirmation_email_task(
         logger.info(f"Sending cabin upgrade confirmation email to {to_email} for booking {booking_data.get('booking_reference')}")
 
         # Generate separate cabin upgrade invoice
-        pdf_content = invoice_service.generate_cabin_upgrade_invoice(
+        pdf_content = invoice_service.get_cabin_upgrade_invoice(
             booking=booking_data,
             cabin_data=cabin_data,
             payment=payment_data
@@ -4,14 +4,17 @@ Celery tasks for payment processing and webhook handling.
 These tasks handle Stripe webhooks and payment verification asynchronously.
 """
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
 from datetime import datetime
 from celery import Task
 from sqlalchemy.orm import Session
 from app.celery_app import celery_app
+from app.config import settings
 from app.database import SessionLocal
 from app.models.booking import Booking, BookingStatusEnum
 from app.models.payment import Payment, PaymentStatusEnum
+from app.services.booking_read_cache import booking_read_cache
+from app.services.inventory_service import inventory_service
 from app.tasks.email_tasks import (
     send_payment_success_email_task,
     send_payment_failed_email_task,
@@ -34,6 +37,120 @@ class PaymentTask(Task):
     retry_jitter = True
 
 
+def apply_payment_event(
+    db: Session,
+    event_type: str,
+    event_data: Dict[str, Any],
+    payment: Payment,
+    booking: Booking
+) -> Tuple[Dict[str, Any], List[Tuple[Task, Dict[str, Any]]]]:
+    """
+    Apply one Stripe payment event to its payment and booking (no commit).
+
+    Returns:
+        The event result and the email tasks (task, kwargs) to queue once committed
+    """
+    if event_type == "payment_intent.succeeded":
+        logger.info(f"✅ Payment succeeded for booking {booking.booking_reference}")
+
+        # Update payment status
+        payment.status = PaymentStatusEnum.COMPLETED
+        payment.processed_at = datetime.utcnow()
+
+        # Update booking status
+        booking.status = BookingStatusEnum.CONFIRMED
+        booking.updated_at = datetime.utcnow()
+
+        # Prepare data for email
+        booking_data = {
+            "id": booking.id,
+            "booking_reference": booking.booking_reference,
+            "operator": booking.operator,
+            "departure_port": booking.departure_port,
+            "arrival_port": booking.arrival_port,
+            "departure_time": booking.departure_time.isoformat() if booking.departure_time else None,
+            "arrival_time": booking.arrival_time.isoformat() if booking.arrival_time else None,
+            "vessel_name": booking.vessel_name,
+            "contact_email": booking.contact_email,
+            "contact_first_name": booking.contact_first_name,
+            "contact_last_name": booking.contact_last_name,
+            "total_passengers": booking.total_passengers,
+            "total_vehicles": booking.total_vehicles,
+            "total_amount": float(booking.total_amount) if booking.total_amount else 0,
+            "currency": booking.currency or "EUR",
+            "base_url": os.getenv("BASE_URL", "http://localhost:3001")
+        }
+
+        payment_data = {
+            "amount": float(payment.amount) if payment.amount else 0,
+            "currency": payment.currency,
+            "payment_method": payment.payment_method,
+            "card_last_four": payment.card_last_four,
+            "card_brand": payment.card_brand,
+        }
+
+        # Email task (decoupled from payment processing)
+        emails = [(send_payment_success_email_task, {
+            "booking_data": booking_data,
+            "payment_data": payment_data,
+            "to_email": booking.contact_email
+        })]
+        return {
+            "status": "success",
+            "booking_reference": booking.booking_reference,
+            "payment_id": payment.id
+        }, emails
+
+    elif event_type == "payment_intent.payment_failed":
+        logger.warning(f"⚠️ Payment failed for booking {booking.booking_reference}")
+
+        # Update payment status
+        payment.status = PaymentStatusEnum.FAILED
+        failure_data = event_data.get("last_payment_error", {})
+        payment.failure_code = failure_data.get("code")
+        payment.failure_message = failure_data.get("message")
+
+        # Keep booking in PENDING status (user can retry)
+        booking.status = BookingStatusEnum.PENDING
+        booking.updated_at = datetime.utcnow()
+
+        # Send payment failed email
+        emails = [(send_payment_failed_email_task, {
+            "booking_data": {
+                "booking_reference": booking.booking_reference,
+                "contact_email": booking.contact_email,
+            },
+            "error_message": payment.failure_message or "Payment processing failed",
+            "to_email": booking.contact_email
+        })]
+        return {
+            "status": "failed",
+            "booking_reference": booking.booking_reference,
+            "error": payment.failure_message
+        }, emails
+
+    elif event_type == "payment_intent.canceled":
+        logger.info(f"Payment canceled for booking {booking.booking_reference}")
+
+        payment.status = PaymentStatusEnum.CANCELLED
+        booking.status = BookingStatusEnum.CANCELLED
+        booking.updated_at = datetime.utcnow()
+        inventory_service.release_booking(db, booking)
+
+        return {
+            "status": "canceled",
+            "booking_reference": booking.booking_reference
+        }, []
+
+    logger.info(f"Unhandled event type: {event_type}")
+    return {"status": "ignored", "event_type": event_type}, []
+
+
+def _queue_emails(emails: List[Tuple[Task, Dict[str, Any]]]) -> None:
+    for task, kwargs in emails:
+        task.delay(**kwargs)
+
+
 @celery_app.task(
     base=PaymentTask,
     name="app.tasks.payment_tasks.process_payment_webhook",
@@ -46,7 +163,10 @@ def process_payment_webhook_task(
     event_data: Dict[str, Any]
 ):
     """
-    Process Stripe payment webhook events asynchronously.
+    Process one Stripe payment webhook event.
+
+    Used when the webhook stream is unavailable and for events of a stream
+    batch that failed as a whole (see process_webhook_stream_task).
 
     Args:
         event_type: Stripe event type (e.g., 'payment_intent.succeeded')
@@ -77,123 +197,160 @@ def process_payment_webhook_task(
             logger.error(f"Booking not found for payment {payment.id}")
             return {"status": "error", "message": "Booking not found"}
 
-        # Handle different event types
-        if event_type == "payment_intent.succeeded":
-            logger.info(f"✅ Payment succeeded for booking {booking.booking_reference}")
-
-            # Update payment status
-            payment.status = PaymentStatusEnum.COMPLETED
-            payment.processed_at = datetime.utcnow()
-
-            # Update booking status
-            booking.status = BookingStatusEnum.CONFIRMED
-            booking.updated_at = datetime.utcnow()
-
-            db.commit()
-            db.refresh(payment)
-            db.refresh(booking)
-
-            # Prepare data for email
-            booking_data = {
-                "id": booking.id,
-                "booking_reference": booking.booking_reference,
-                "operator": booking.operator,
-                "departure_port": booking.departure_port,
-                "arrival_port": booking.arrival_port,
-                "departure_time": booking.departure_time.isoformat() if booking.departure_time else None,
-                "arrival_time": booking.arrival_time.isoformat() if booking.arrival_time else None,
-                "vessel_name": booking.vessel_name,
-                "contact_email": booking.contact_email,
-                "contact_first_name": booking.contact_first_name,
-                "contact_last_name": booking.contact_last_name,
-                "total_passengers": booking.total_passengers,
-                "total_vehicles": booking.total_vehicles,
-                "total_amount": float(booking.total_amount) if booking.total_amount else 0,
-                "currency": booking.currency or "EUR",
-                "base_url": os.getenv("BASE_URL", "http://localhost:3001")
-            }
-
-            payment_data = {
-                "amount": float(payment.amount) if payment.amount else 0,
-                "currency": payment.currency,
-                "payment_method": payment.payment_method,
-                "card_last_four": payment.card_last_four,
-                "card_brand": payment.card_brand,
-            }
-
-            # Trigger async email task (decoupled from payment processing)
-            send_payment_success_email_task.delay(
-                booking_data=booking_data,
-                payment_data=payment_data,
-                to_email=booking.contact_email
-            )
-
-            logger.info(f"✅ Payment webhook processed successfully. Email task queued.")
-            return {
-                "status": "success",
-                "booking_reference": booking.booking_reference,
-                "payment_id": payment.id
-            }
+        result, emails = apply_payment_event(db, event_type, event_data, payment, booking)
+        booking_key = (booking.id, booking.booking_reference)
+        db.commit()
+        booking_read_cache.invalidate(*booking_key)
+        _queue_emails(emails)
+        return result
 
-        elif event_type == "payment_intent.payment_failed":
-            logger.warning(f"⚠️ Payment failed for booking {booking.booking_reference}")
+    except Exception as e:
+        logger.error(f"❌ Error processing payment webhook: {str(e)}")
+        db.rollback()
+        raise
 
-            # Update payment status
-            payment.status = PaymentStatusEnum.FAILED
-            failure_data = event_data.get("last_payment_error", {})
-            payment.failure_code = failure_data.get("code")
-            payment.failure_message = failure_data.get("message")
+    finally:
+        db.close()
 
-            # Keep booking in PENDING status (user can retry)
-            booking.status = BookingStatusEnum.PENDING
-            booking.updated_at = datetime.utcnow()
 
-            db.commit()
+def _process_event_batch(db: Session, events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Apply a batch of stream events in order with one commit.
 
-            # Send payment failed email
-            booking_data = {
-                "booking_reference": booking.booking_reference,
-                "contact_email": booking.contact_email,
-            }
+    Payments are loaded in one query by intent ID and their bookings in a
+    second one; an object shared by several events sees them in order.
+    """
+    intent_ids = {event["payment_intent_id"] for event in events}
+    payments = {
+        payment.stripe_payment_intent_id: payment
+        for payment in db.query(Payment).filter(Payment.stripe_payment_intent_id.in_(intent_ids))
+    }
+    booking_ids = {payment.booking_id for payment in payments.values()}
+    bookings = {
+        booking.id: booking
+        for booking in db.query(Booking).filter(Booking.id.in_(booking_ids))
+    } if booking_ids else {}
+
+    results = []
+    emails = []
+    for event in events:
+        payment = payments.get(event["payment_intent_id"])
+        if not payment:
+            logger.error(f"Payment not found for intent {event['payment_intent_id']}")
+            results.append({"status": "error", "message": "Payment not found"})
+            continue
+        booking = bookings.get(payment.booking_id)
+        if not booking:
+            logger.error(f"Booking not found for payment {payment.id}")
+            results.append({"status": "error", "message": "Booking not found"})
+            continue
+        result, event_emails = apply_payment_event(
+            db, event["event_type"], event["event_data"], payment, booking
+        )
+        results.append(result)
+        emails.extend(event_emails)
+
+    booking_keys = [(booking.id, booking.booking_reference) for booking in bookings.values()]
+    db.commit()
+    booking_read_cache.invalidate_many(booking_keys)
+    _queue_emails(emails)
+    return results
+
+
+def _process_events_individually(shard: int, events: List[Dict[str, Any]]) -> int:
+    """
+    Process a failed batch event by event; events that still fail are dead-lettered.
 
-            send_payment_failed_email_task.delay(
-                booking_data=booking_data,
-                error_message=payment.failure_message or "Payment processing failed",
-                to_email=booking.contact_email
+    Database connection errors are raised instead, leaving the batch pending
+    for the retry rather than dead-lettering every event during an outage.
+    """
+    from sqlalchemy.exc import OperationalError
+    from app.services.webhook_stream_service import webhook_stream_service
+
+    failed = 0
+    for event in events:
+        try:
+            process_payment_webhook_task.run(
+                event_type=event["event_type"],
+                payment_intent_id=event["payment_intent_id"],
+                event_data=event["event_data"]
             )
+        except OperationalError:
+            raise
+        except Exception as e:
+            failed += 1
+            logger.error(f"❌ Webhook event {event['event_id']} failed on shard {shard}, dead-lettered: {e}")
+            webhook_stream_service.dead_letter(event, str(e))
+    return failed
+
+
+def drain_webhook_shard(shard: int) -> Dict[str, int]:
+    """Process a shard's stream in batches until it is empty (one consumer per shard)."""
+    from app.services.webhook_stream_service import webhook_stream_service
+
+    processed = batches = failed = 0
+    while True:
+        if not webhook_stream_service.acquire_shard(shard):
+            return {"processed": processed, "batches": batches, "failed": failed, "busy": 1}
+        try:
+            while True:
+                entries = webhook_stream_service.read_batch(shard, settings.STRIPE_WEBHOOK_BATCH_SIZE)
+                if not entries:
+                    break
+                events = [event for _, event in entries]
+                db: Session = SessionLocal()
+                try:
+                    _process_event_batch(db, events)
+                except Exception as e:
+                    db.rollback()
+                    logger.warning(f"⚠️ Webhook batch of {len(events)} failed on shard {shard}, retrying per event: {e}")
+                    failed += _process_events_individually(shard, events)
+                finally:
+                    db.close()
+                webhook_stream_service.ack(shard, [entry_id for entry_id, _ in entries])
+                processed += len(entries)
+                batches += 1
+        finally:
+            rerun = webhook_stream_service.release_shard(shard)
+        if not rerun:
+            break
+
+    if processed:
+        logger.info(f"✅ Processed {processed} webhook event(s) in {batches} batch(es) on shard {shard}")
+    return {"processed": processed, "batches": batches, "failed": failed, "busy": 0}
 
-            logger.info(f"Payment failure processed. Email task queued.")
-            return {
-                "status": "failed",
-                "booking_reference": booking.booking_reference,
-                "error": payment.failure_message
-            }
-
-        elif event_type == "payment_intent.canceled":
-            logger.info(f"Payment canceled for booking {booking.booking_reference}")
 
-            payment.status = PaymentStatusEnum.CANCELLED
-            booking.status = BookingStatusEnum.CANCELLED
-            booking.updated_at = datetime.utcnow()
+@celery_app.task(
+    base=PaymentTask,
+    name="app.tasks.payment_tasks.process_webhook_stream",
+    bind=True
+)
+def process_webhook_stream_task(self, shard: int):
+    """Drain one webhook stream shard; queued by the webhook endpoint after each append."""
+    return drain_webhook_shard(shard)
 
-            db.commit()
 
-            return {
-                "status": "canceled",
-                "booking_reference": booking.booking_reference
-            }
+@celery_app.task(
+    name="app.tasks.payment_tasks.drain_webhook_streams",
+    bind=True
+)
+def drain_webhook_streams_task(self):
+    """
+    Periodically drain every shard.
 
-        else:
-            logger.info(f"Unhandled event type: {event_type}")
-            return {"status": "ignored", "event_type": event_type}
+    Catches events whose drain request was lost and entries left pending by
+    a consumer that died.
+    """
+    from app.services.webhook_stream_service import webhook_stream_service
 
-    except Exception as e:
-        logger.error(f"❌ Error processing payment webhook: {str(e)}")
-        db.rollback()
-        raise
+    if not webhook_stream_service.is_available():
+        return {"status": "skipped", "reason": "redis unavailable"}
 
-    finally:
-        db.close()
+    totals = {"processed": 0, "batches": 0, "failed": 0, "busy": 0}
+    for shard in range(webhook_stream_service.shard_count()):
+        for key, value in drain_webhook_shard(shard).items():
+            totals[key] += value
+    return {"status": "success", **totals}
 
 
 @celery_app.task(
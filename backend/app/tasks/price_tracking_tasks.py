@@ -4,7 +4,6 @@ Generates mock data with realistic patterns for price predictions and insights.
 """
 import logging
 import random
-import math
 from datetime import datetime, timezone, timedelta, date
 from typing import List, Dict, Any, Optional
 from celery import shared_task
@@ -14,12 +13,16 @@ from app.database import SessionLocal
 from app.models.price_history import (
     PriceHistory,
     PricePrediction,
-    RouteStatistics,
     FareCalendarCache,
-    PriceTrendEnum,
-    BookingRecommendationEnum,
 )
 from app.services.price_prediction_service import PricePredictionService
+from app.services.route_statistics_service import RouteStatisticsService
+from app.services.fare_calendar_service import FareCalendarService
+from app.services.price_aggregate_service import PriceAggregateService
+from app.services.price_history_partitions import (
+    PriceHistoryPartitionService,
+    DEFAULT_RETENTION_DAYS,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -146,6 +149,7 @@ def record_price_snapshot_task(self):
     1. Iterates through all tracked routes
     2. Records price snapshots for the next 90 days
     3. Stores data for historical analysis and predictions
+    4. Folds the new snapshots into the rolling route price aggregates
 
     Runs every 4-6 hours to capture price changes.
     """
@@ -156,6 +160,9 @@ def record_price_snapshot_task(self):
         now = datetime.now(timezone.utc)
         today = now.date()
         records_created = 0
+        new_records: List[PriceHistory] = []
+        # New per-day prices for incremental fare calendar refresh
+        calendar_updates: Dict[str, Dict[date, Dict[str, Any]]] = {}
 
         # Record prices for each route
         for route in TRACKED_ROUTES:
@@ -226,11 +233,31 @@ def record_price_snapshot_task(self):
                 )
 
                 db.add(price_record)
+                new_records.append(price_record)
                 records_created += 1
 
+                calendar_updates.setdefault(route_id, {})[departure_date] = {
+                    "price": price_record.lowest_price,
+                    "highest": price_record.highest_price,
+                    "ferries": price_record.num_ferries,
+                    "available_passengers": price_record.available_passengers,
+                }
+
+        # Update aggregates in the same transaction as the snapshots
+        PriceAggregateService(db).record_snapshots(new_records, now)
+
         db.commit()
         logger.info(f"✅ Price snapshot complete: {records_created} records created")
 
+        # Patch only the fare calendar days that received new snapshots
+        calendar_service = FareCalendarService(db)
+        for route_id, day_prices in calendar_updates.items():
+            try:
+                calendar_service.apply_snapshots(route_id, day_prices)
+            except Exception as e:
+                logger.error(f"Error refreshing fare calendar for {route_id}: {e}")
+                db.rollback()
+
         return {"status": "success", "records_created": records_created}
 
     except Exception as e:
@@ -252,7 +279,8 @@ def generate_predictions_task(self):
     Generate AI-powered price predictions for all routes.
 
     Uses historical data to predict future prices and provide
-    booking recommendations.
+    booking recommendations. All routes and dates are predicted in one
+    batch and written with bulk inserts/updates.
     """
     db = SessionLocal()
     try:
@@ -260,85 +288,26 @@ def generate_predictions_task(self):
 
         prediction_service = PricePredictionService(db)
         today = datetime.now().date()
-        predictions_created = 0
 
-        for route in TRACKED_ROUTES:
-            route_id = route["route_id"]
-            departure_port = route["departure_port"]
-            arrival_port = route["arrival_port"]
+        # Generate predictions for the next 60 days
+        prediction_dates = [today + timedelta(days=day_offset) for day_offset in range(0, 60)]
+        route_ids = [route["route_id"] for route in TRACKED_ROUTES]
 
-            # Generate predictions for the next 60 days
-            for day_offset in range(0, 60):
-                prediction_date = today + timedelta(days=day_offset)
+        predictions = prediction_service.predict_batch(route_ids, prediction_dates)
+        predictions_created, predictions_updated = prediction_service.save_predictions_batch(
+            TRACKED_ROUTES, prediction_dates, predictions
+        )
 
-                try:
-                    # Check for existing prediction
-                    existing = db.query(PricePrediction).filter(
-                        and_(
-                            PricePrediction.route_id == route_id,
-                            PricePrediction.prediction_date == prediction_date
-                        )
-                    ).first()
-
-                    # Get prediction from service
-                    prediction_result = prediction_service.predict_price(
-                        route_id=route_id,
-                        departure_date=prediction_date
-                    )
-                    # Convert PredictionResult to dict for compatibility
-                    prediction_data = {
-                        "predicted_price": prediction_result.predicted_price,
-                        "predicted_low": prediction_result.predicted_low,
-                        "predicted_high": prediction_result.predicted_high,
-                        "confidence": prediction_result.confidence_score,
-                        "trend": prediction_result.price_trend.value if hasattr(prediction_result.price_trend, 'value') else prediction_result.price_trend,
-                        "recommendation": prediction_result.booking_recommendation.value if hasattr(prediction_result.booking_recommendation, 'value') else prediction_result.booking_recommendation,
-                        "recommendation_reason": prediction_result.recommendation_reason,
-                        "potential_savings": prediction_result.potential_savings,
-                        "factors": prediction_result.factors,
-                    }
-
-                    if existing:
-                        # Update existing prediction
-                        existing.predicted_price = prediction_data.get("predicted_price", 0)
-                        existing.predicted_low = prediction_data.get("predicted_low")
-                        existing.predicted_high = prediction_data.get("predicted_high")
-                        existing.current_price = prediction_data.get("current_price")
-                        existing.confidence_score = prediction_data.get("confidence", 0.7)
-                        existing.price_trend = prediction_data.get("trend", PriceTrendEnum.STABLE.value)
-                        existing.booking_recommendation = prediction_data.get("recommendation", BookingRecommendationEnum.NEUTRAL.value)
-                        existing.recommendation_reason = prediction_data.get("recommendation_reason")
-                        existing.potential_savings = prediction_data.get("potential_savings")
-                        existing.prediction_factors = prediction_data.get("factors")
-                    else:
-                        # Create new prediction
-                        prediction = PricePrediction(
-                            route_id=route_id,
-                            departure_port=departure_port,
-                            arrival_port=arrival_port,
-                            prediction_date=prediction_date,
-                            predicted_price=prediction_data.get("predicted_price", 0),
-                            predicted_low=prediction_data.get("predicted_low"),
-                            predicted_high=prediction_data.get("predicted_high"),
-                            current_price=prediction_data.get("current_price"),
-                            confidence_score=prediction_data.get("confidence", 0.7),
-                            price_trend=prediction_data.get("trend", PriceTrendEnum.STABLE.value),
-                            booking_recommendation=prediction_data.get("recommendation", BookingRecommendationEnum.NEUTRAL.value),
-                            recommendation_reason=prediction_data.get("recommendation_reason"),
-                            potential_savings=prediction_data.get("potential_savings"),
-                            prediction_factors=prediction_data.get("factors"),
-                        )
-                        db.add(prediction)
-                        predictions_created += 1
+        logger.info(
+            f"✅ Prediction generation complete: {predictions_created} new, "
+            f"{predictions_updated} updated predictions"
+        )
 
-                except Exception as e:
-                    logger.error(f"Error generating prediction for {route_id} on {prediction_date}: {e}")
-                    continue
-
-        db.commit()
-        logger.info(f"✅ Prediction generation complete: {predictions_created} new predictions")
-
-        return {"status": "success", "predictions_created": predictions_created}
+        return {
+            "status": "success",
+            "predictions_created": predictions_created,
+            "predictions_updated": predictions_updated,
+        }
 
     except Exception as e:
         logger.error(f"Error generating predictions: {str(e)}", exc_info=True)
@@ -358,141 +327,53 @@ def update_route_statistics_task(self):
     """
     Update aggregated route statistics for dashboard insights.
 
-    Computes 30-day, 90-day, and all-time statistics for each route.
+    Computes 30-day, 90-day, and all-time statistics for all routes in a
+    single grouped query and upserts them in one statement.
     """
     db = SessionLocal()
     try:
         logger.info("📈 Updating route statistics...")
 
-        now = datetime.now(timezone.utc)
-        today = now.date()
-        routes_updated = 0
+        routes_updated = RouteStatisticsService(db).refresh(TRACKED_ROUTES)
 
-        for route in TRACKED_ROUTES:
-            route_id = route["route_id"]
-            departure_port = route["departure_port"]
-            arrival_port = route["arrival_port"]
-
-            try:
-                # Get or create route statistics
-                stats = db.query(RouteStatistics).filter(
-                    RouteStatistics.route_id == route_id
-                ).first()
-
-                if not stats:
-                    stats = RouteStatistics(
-                        route_id=route_id,
-                        departure_port=departure_port,
-                        arrival_port=arrival_port,
-                    )
-                    db.add(stats)
-
-                # Calculate 30-day statistics
-                thirty_days_ago = today - timedelta(days=30)
-                prices_30d = db.query(PriceHistory.lowest_price).filter(
-                    and_(
-                        PriceHistory.route_id == route_id,
-                        PriceHistory.recorded_at >= thirty_days_ago
-                    )
-                ).all()
-
-                if prices_30d:
-                    prices = [p[0] for p in prices_30d if p[0]]
-                    if prices:
-                        stats.avg_price_30d = round(sum(prices) / len(prices), 2)
-                        stats.min_price_30d = min(prices)
-                        stats.max_price_30d = max(prices)
-                        # Standard deviation for volatility
-                        mean = stats.avg_price_30d
-                        variance = sum((p - mean) ** 2 for p in prices) / len(prices)
-                        stats.price_volatility_30d = round(math.sqrt(variance), 2)
-
-                # Calculate 90-day statistics
-                ninety_days_ago = today - timedelta(days=90)
-                prices_90d = db.query(PriceHistory.lowest_price).filter(
-                    and_(
-                        PriceHistory.route_id == route_id,
-                        PriceHistory.recorded_at >= ninety_days_ago
-                    )
-                ).all()
-
-                if prices_90d:
-                    prices = [p[0] for p in prices_90d if p[0]]
-                    if prices:
-                        stats.avg_price_90d = round(sum(prices) / len(prices), 2)
-                        stats.min_price_90d = min(prices)
-                        stats.max_price_90d = max(prices)
-
-                # All-time low/high
-                all_time = db.query(
-                    PriceHistory.lowest_price,
-                    PriceHistory.departure_date
-                ).filter(
-                    PriceHistory.route_id == route_id
-                ).order_by(PriceHistory.lowest_price.asc()).first()
-
-                if all_time:
-                    stats.all_time_low = all_time[0]
-                    stats.all_time_low_date = all_time[1]
-
-                all_time_high = db.query(
-                    PriceHistory.highest_price,
-                    PriceHistory.departure_date
-                ).filter(
-                    PriceHistory.route_id == route_id
-                ).order_by(PriceHistory.highest_price.desc()).first()
-
-                if all_time_high:
-                    stats.all_time_high = all_time_high[0]
-                    stats.all_time_high_date = all_time_high[1]
-
-                # Day of week averages
-                weekday_prices = db.query(PriceHistory.lowest_price).filter(
-                    and_(
-                        PriceHistory.route_id == route_id,
-                        PriceHistory.is_weekend == False
-                    )
-                ).all()
-
-                weekend_prices = db.query(PriceHistory.lowest_price).filter(
-                    and_(
-                        PriceHistory.route_id == route_id,
-                        PriceHistory.is_weekend == True
-                    )
-                ).all()
+        logger.info(f"✅ Route statistics updated: {routes_updated} routes")
 
-                if weekday_prices:
-                    prices = [p[0] for p in weekday_prices if p[0]]
-                    if prices:
-                        stats.weekday_avg_price = round(sum(prices) / len(prices), 2)
+        return {"status": "success", "routes_updated": routes_updated}
 
-                if weekend_prices:
-                    prices = [p[0] for p in weekend_prices if p[0]]
-                    if prices:
-                        stats.weekend_avg_price = round(sum(prices) / len(prices), 2)
+    except Exception as e:
+        logger.error(f"Error updating route statistics: {str(e)}", exc_info=True)
+        db.rollback()
+        raise
+    finally:
+        db.close()
 
-                # Best booking window (mock data for now)
-                stats.best_booking_window_start = 21
-                stats.best_booking_window_end = 14
-                stats.typical_advance_days = 18
 
-                # Cheapest day of week (Tuesday typically)
-                stats.cheapest_day_of_week = 1  # Tuesday
-                stats.most_expensive_day = 5    # Saturday
+@shared_task(
+    name="app.tasks.price_tracking_tasks.rebuild_price_aggregates",
+    bind=True,
+    max_retries=3,
+    default_retry_delay=300
+)
+def rebuild_price_aggregates_task(self):
+    """
+    Rebuild rolling route price aggregates from price_history.
 
-                routes_updated += 1
+    record_price_snapshot_task updates the aggregates incrementally; this
+    daily full rebuild corrects drift and drops history removed by cleanup.
+    """
+    db = SessionLocal()
+    try:
+        logger.info("🔁 Rebuilding route price aggregates...")
 
-            except Exception as e:
-                logger.error(f"Error updating stats for {route_id}: {e}")
-                continue
+        route_ids = [route["route_id"] for route in TRACKED_ROUTES]
+        routes_rebuilt = PriceAggregateService(db).rebuild(route_ids)
 
-        db.commit()
-        logger.info(f"✅ Route statistics updated: {routes_updated} routes")
+        logger.info(f"✅ Price aggregates rebuilt: {routes_rebuilt} routes")
 
-        return {"status": "success", "routes_updated": routes_updated}
+        return {"status": "success", "routes_rebuilt": routes_rebuilt}
 
     except Exception as e:
-        logger.error(f"Error updating route statistics: {str(e)}", exc_info=True)
+        logger.error(f"Error rebuilding price aggregates: {str(e)}", exc_info=True)
         db.rollback()
         raise
     finally:
@@ -509,20 +390,22 @@ def update_fare_calendar_cache_task(self):
     """
     Update fare calendar cache for quick retrieval.
 
-    Pre-computes monthly calendar data to avoid expensive queries.
+    Rebuilds the per-person month grids for the next 3 months from the
+    latest price_history snapshots. The /prices/calendar endpoint serves
+    these grids and scales them by passenger count.
     """
     db = SessionLocal()
     try:
         logger.info("📅 Updating fare calendar cache...")
 
-        now = datetime.now(timezone.utc)
+        now = datetime.utcnow()
         today = now.date()
+        calendar_service = FareCalendarService(db)
         caches_updated = 0
 
         # Generate cache for next 3 months
         for route in TRACKED_ROUTES:
             route_id = route["route_id"]
-            base_price = BASE_PRICES.get(route_id, 100)
 
             for month_offset in range(0, 3):
                 # Calculate year/month
@@ -532,101 +415,11 @@ def update_fare_calendar_cache_task(self):
                     target_month -= 12
                     target_year += 1
 
-                year_month = f"{target_year}-{target_month:02d}"
-
                 try:
-                    # Check for existing cache
-                    cache = db.query(FareCalendarCache).filter(
-                        and_(
-                            FareCalendarCache.route_id == route_id,
-                            FareCalendarCache.year_month == year_month,
-                            FareCalendarCache.passengers == 1
-                        )
-                    ).first()
-
-                    # Generate calendar data
-                    calendar_data = {}
-                    month_prices = []
-
-                    # Days in month
-                    if target_month == 12:
-                        next_month = date(target_year + 1, 1, 1)
-                    else:
-                        next_month = date(target_year, target_month + 1, 1)
-                    first_day = date(target_year, target_month, 1)
-                    days_in_month = (next_month - first_day).days
-
-                    for day in range(1, days_in_month + 1):
-                        departure_date = date(target_year, target_month, day)
-
-                        # Skip past dates
-                        if departure_date < today:
-                            continue
-
-                        days_until = (departure_date - today).days
-                        day_of_week = departure_date.weekday()
-
-                        price = _generate_mock_price(
-                            base_price,
-                            departure_date,
-                            days_until,
-                            day_of_week,
-                            add_random=False  # Consistent for cache
-                        )
-
-                        # Determine trend based on price level
-                        avg_price = base_price * 1.1
-                        if price < avg_price * 0.9:
-                            trend = "falling"
-                        elif price > avg_price * 1.1:
-                            trend = "rising"
-                        else:
-                            trend = "stable"
-
-                        calendar_data[str(day)] = {
-                            "price": price,
-                            "available": True,
-                            "ferries": random.randint(2, 4),
-                            "trend": trend,
-                        }
-                        month_prices.append(price)
-
-                    if not month_prices:
-                        continue
-
-                    # Calculate monthly summary
-                    month_lowest = min(month_prices)
-                    month_highest = max(month_prices)
-                    month_average = sum(month_prices) / len(month_prices)
-                    cheapest_date = min(calendar_data.keys(), key=lambda d: calendar_data[d]["price"])
-
-                    if cache:
-                        # Update existing cache
-                        cache.calendar_data = calendar_data
-                        cache.month_lowest = month_lowest
-                        cache.month_highest = month_highest
-                        cache.month_average = round(month_average, 2)
-                        cache.cheapest_date = int(cheapest_date)
-                        cache.expires_at = now + timedelta(hours=4)
-                    else:
-                        # Create new cache
-                        cache = FareCalendarCache(
-                            route_id=route_id,
-                            year_month=year_month,
-                            passengers=1,
-                            calendar_data=calendar_data,
-                            month_lowest=month_lowest,
-                            month_highest=month_highest,
-                            month_average=round(month_average, 2),
-                            cheapest_date=int(cheapest_date),
-                            expires_at=now + timedelta(hours=4),
-                        )
-                        db.add(cache)
-
-                    caches_updated += 1
-
+                    if calendar_service.refresh_month(route_id, target_year, target_month, now=now):
+                        caches_updated += 1
                 except Exception as e:
-                    logger.error(f"Error caching {route_id} {year_month}: {e}")
+                    logger.error(f"Error caching {route_id} {target_year}-{target_month:02d}: {e}")
                     continue
 
         db.commit()
@@ -650,18 +443,22 @@ def cleanup_old_price_data_task(self):
     """
     Cleanup old price history data to manage database size.
 
-    Keeps last 180 days of data for analysis.
+    Keeps last 180 days of data for analysis. When price_history is
+    partitioned, expired months are dropped by
+    maintain_price_history_partitions_task instead of deleted row by row.
     """
     db = SessionLocal()
     try:
         logger.info("🧹 Cleaning up old price data...")
 
-        cleanup_date = datetime.now(timezone.utc) - timedelta(days=180)
+        cleanup_date = datetime.now(timezone.utc) - timedelta(days=DEFAULT_RETENTION_DAYS)
 
-        # Delete old price history
-        deleted_history = db.query(PriceHistory).filter(
-            PriceHistory.recorded_at < cleanup_date
-        ).delete()
+        # Delete old price history (only needed without partitioning)
+        deleted_history = 0
+        if not PriceHistoryPartitionService(db).is_partitioned():
+            deleted_history = db.query(PriceHistory).filter(
+                PriceHistory.recorded_at < cleanup_date
+            ).delete()
 
         # Delete old predictions
         deleted_predictions = db.query(PricePrediction).filter(
@@ -692,6 +489,54 @@ def cleanup_old_price_data_task(self):
         db.close()
 
 
+@shared_task(
+    name="app.tasks.price_tracking_tasks.maintain_price_history_partitions",
+    bind=True
+)
+def maintain_price_history_partitions_task(self):
+    """
+    Manage monthly price_history partitions.
+
+    This task:
+    1. Pre-creates partitions for the current and next few months
+    2. Drops partitions older than the retention window
+    3. Checks that prediction queries are pruned to recent partitions
+
+    No-op when the database does not use a partitioned price_history.
+    """
+    db = SessionLocal()
+    try:
+        logger.info("📦 Maintaining price history partitions...")
+
+        partition_service = PriceHistoryPartitionService(db)
+        if not partition_service.is_partitioned():
+            logger.info("price_history is not partitioned, skipping partition maintenance")
+            return {"status": "skipped", "reason": "not_partitioned"}
+
+        created = partition_service.ensure_future_partitions()
+        dropped = partition_service.drop_expired_partitions()
+
+        pruning = partition_service.verify_pruning(TRACKED_ROUTES[0]["route_id"])
+        if not pruning.get("pruned"):
+            logger.warning(f"⚠️ Prediction query is not pruning partitions: {pruning}")
+
+        logger.info(f"✅ Partition maintenance complete: {len(created)} created, {len(dropped)} dropped")
+
+        return {
+            "status": "success",
+            "created_partitions": created,
+            "dropped_partitions": dropped,
+            "pruning": pruning,
+        }
+
+    except Exception as e:
+        logger.error(f"Error maintaining price history partitions: {str(e)}", exc_info=True)
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
 def _is_holiday(check_date: date) -> bool:
     """
     Check if a date is a holiday (simplified for mock data).
@@ -721,5 +566,7 @@ def _is_holiday(check_date: date) -> bool:
 record_price_snapshot = record_price_snapshot_task
 generate_predictions = generate_predictions_task
 update_route_statistics = update_route_statistics_task
+rebuild_price_aggregates = rebuild_price_aggregates_task
 update_fare_calendar_cache = update_fare_calendar_cache_task
 cleanup_old_price_data = cleanup_old_price_data_task
+maintain_price_history_partitions = maintain_price_history_partitions_task
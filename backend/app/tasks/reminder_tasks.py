@@ -5,12 +5,14 @@ These tasks check for upcoming departures and send reminder emails
 24 hours and 2 hours before departure with E-Ticket attachments.
 """
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Dict, Any, Optional, List
 from celery import Task
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, exists, literal, select, union_all
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import joinedload
 from app.celery_app import celery_app
+from app.config import settings
 from app.database import SessionLocal
 from app.models import Booking, BookingReminder, ReminderTypeEnum
 from app.models.booking import BookingStatusEnum
@@ -19,6 +21,12 @@ from app.services.eticket_service import eticket_service
 
 logger = logging.getLogger(__name__)
 
+# Reminder label -> (type, how long before departure it is sent)
+REMINDERS = {
+    "24h": (ReminderTypeEnum.REMINDER_24H, timedelta(hours=24)),
+    "2h": (ReminderTypeEnum.REMINDER_2H, timedelta(hours=2)),
+}
+
 
 class ReminderTask(Task):
     """Base task for reminder processing with retry logic."""
@@ -28,6 +36,11 @@ class ReminderTask(Task):
     retry_backoff_max = 600  # 10 minutes
     retry_jitter = True
 
+    @property
+    def retries_exhausted(self) -> bool:
+        """True on the last attempt autoretry makes before giving up."""
+        return self.request.retries >= self.retry_kwargs["max_retries"]
+
 
 def datetime_to_str(dt) -> Optional[str]:
     """Convert datetime to ISO string."""
@@ -116,146 +129,226 @@ def record_reminder(
     booking_id: int,
     reminder_type: ReminderTypeEnum,
     journey_type: str,
-    email: str,
+    email: Optional[str],
     success: bool,
     eticket_attached: bool = False,
     error_message: str = None
 ):
-    """Record that a reminder was sent."""
-    reminder = BookingReminder(
-        booking_id=booking_id,
-        reminder_type=reminder_type,
-        journey_type=journey_type,
-        sent_to_email=email,
-        success=success,
-        eticket_attached=eticket_attached,
-        error_message=error_message
-    )
-    db.add(reminder)
+    """
+    Record the outcome of a reminder on its (claimed) row.
+
+    With email=None the address stored by the claim is kept.
+    """
+    reminder = db.query(BookingReminder).filter(
+        and_(
+            BookingReminder.booking_id == booking_id,
+            BookingReminder.reminder_type == reminder_type,
+            BookingReminder.journey_type == journey_type
+        )
+    ).first()
+    if reminder is None:
+        reminder = BookingReminder(
+            booking_id=booking_id,
+            reminder_type=reminder_type,
+            journey_type=journey_type,
+            sent_to_email="unknown"
+        )
+        db.add(reminder)
+
+    if email is not None:
+        reminder.sent_to_email = email
+    reminder.success = success
+    reminder.eticket_attached = eticket_attached
+    reminder.error_message = error_message
+    reminder.sent_at = datetime.utcnow()
     db.commit()
 
 
-@celery_app.task(
-    base=ReminderTask,
-    name="app.tasks.reminder_tasks.check_departure_reminders",
-    bind=True
-)
-def check_departure_reminders(self):
-    """
-    Periodic task to check for upcoming departures and send reminder emails.
+def release_reminder(db, booking_id: int, reminder_type: ReminderTypeEnum, journey_type: str):
+    """Delete a claim so the next scan schedules the reminder again."""
+    db.query(BookingReminder).filter(
+        and_(
+            BookingReminder.booking_id == booking_id,
+            BookingReminder.reminder_type == reminder_type,
+            BookingReminder.journey_type == journey_type,
+            BookingReminder.success == False
+        )
+    ).delete(synchronize_session=False)
+    db.commit()
 
-    Runs periodically (configured in beat schedule) to find:
-    - Bookings with departures 24 hours away (send 24h reminder)
-    - Bookings with departures 2 hours away (send 2h reminder)
 
-    Also handles return journeys for round-trip bookings.
-    """
-    db = SessionLocal()
-    try:
-        now = datetime.utcnow()
+def _as_utc(dt: datetime) -> datetime:
+    """Timezone-aware UTC datetime (SQLite returns naive values)."""
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt.astimezone(timezone.utc)
 
-        # Time windows for reminders (with some buffer)
-        window_24h_start = now + timedelta(hours=23, minutes=30)
-        window_24h_end = now + timedelta(hours=24, minutes=30)
 
-        window_2h_start = now + timedelta(hours=1, minutes=45)
-        window_2h_end = now + timedelta(hours=2, minutes=15)
+def find_reminder_candidates(db, now: datetime) -> list:
+    """
+    All reminders due soon that have no booking_reminders row yet.
 
-        logger.info(f"Checking for departure reminders at {now}")
-        logger.info(f"24h window: {window_24h_start} - {window_24h_end}")
-        logger.info(f"2h window: {window_2h_start} - {window_2h_end}")
+    Both reminder types and both legs are fetched in one UNION ALL query with
+    an anti-join (NOT EXISTS) against booking_reminders. A reminder is due
+    soon when its send time is at most REMINDER_LATE_GRACE_SECONDS past and
+    at most REMINDER_LOOKAHEAD_SECONDS ahead (and the leg has not departed).
 
-        # Get confirmed bookings with upcoming outbound departures (24h)
-        outbound_24h = db.query(Booking).options(
-            joinedload(Booking.passengers),
-            joinedload(Booking.vehicles)
-        ).filter(
-            and_(
+    Returns:
+        Rows of (booking_id, contact_email, reminder_type label, journey_type, departs_at)
+    """
+    lookahead = timedelta(seconds=settings.REMINDER_LOOKAHEAD_SECONDS)
+    grace = timedelta(seconds=settings.REMINDER_LATE_GRACE_SECONDS)
+    legs = (
+        ("outbound", Booking.departure_time),
+        ("return", Booking.return_departure_time),
+    )
+
+    selects = []
+    for label, (reminder_type, offset) in REMINDERS.items():
+        for journey_type, departs_at in legs:
+            already_claimed = exists().where(
+                BookingReminder.booking_id == Booking.id,
+                BookingReminder.reminder_type == reminder_type,
+                BookingReminder.journey_type == journey_type
+            )
+            conditions = [
                 Booking.status == BookingStatusEnum.CONFIRMED,
-                Booking.departure_time >= window_24h_start,
-                Booking.departure_time <= window_24h_end
+                departs_at > now,
+                departs_at >= now - grace + offset,
+                departs_at <= now + lookahead + offset,
+                ~already_claimed
+            ]
+            if journey_type == "return":
+                conditions.append(Booking.is_round_trip == True)
+            selects.append(
+                select(
+                    Booking.id.label("booking_id"),
+                    Booking.contact_email.label("contact_email"),
+                    literal(label).label("reminder_type"),
+                    literal(journey_type).label("journey_type"),
+                    departs_at.label("departs_at")
+                ).where(*conditions)
             )
-        ).all()
 
-        logger.info(f"Found {len(outbound_24h)} bookings for 24h outbound reminder")
+    return db.execute(union_all(*selects)).all()
 
-        for booking in outbound_24h:
-            if not was_reminder_sent(db, booking.id, ReminderTypeEnum.REMINDER_24H, "outbound"):
-                send_departure_reminder_email.delay(
-                    booking_id=booking.id,
-                    reminder_type="24h",
-                    journey_type="outbound"
-                )
 
-        # Get confirmed bookings with upcoming outbound departures (2h)
-        outbound_2h = db.query(Booking).filter(
-            and_(
-                Booking.status == BookingStatusEnum.CONFIRMED,
-                Booking.departure_time >= window_2h_start,
-                Booking.departure_time <= window_2h_end
-            )
-        ).all()
+def claim_reminders(db, candidates: list, now: datetime) -> list:
+    """
+    Atomically claim reminders with INSERT ... ON CONFLICT DO NOTHING.
 
-        logger.info(f"Found {len(outbound_2h)} bookings for 2h outbound reminder")
+    Only rows this call inserted are returned, so overlapping scans never
+    schedule the same reminder twice.
 
-        for booking in outbound_2h:
-            if not was_reminder_sent(db, booking.id, ReminderTypeEnum.REMINDER_2H, "outbound"):
-                send_departure_reminder_email.delay(
-                    booking_id=booking.id,
-                    reminder_type="2h",
-                    journey_type="outbound"
-                )
+    Returns:
+        Claimed (booking_id, reminder_type, journey_type, scheduled_for) rows
+    """
+    if not candidates:
+        return []
 
-        # Get confirmed round-trip bookings with upcoming return departures (24h)
-        return_24h = db.query(Booking).filter(
-            and_(
-                Booking.status == BookingStatusEnum.CONFIRMED,
-                Booking.is_round_trip == True,
-                Booking.return_departure_time >= window_24h_start,
-                Booking.return_departure_time <= window_24h_end
-            )
-        ).all()
+    rows = [
+        {
+            "booking_id": c.booking_id,
+            "reminder_type": REMINDERS[c.reminder_type][0],
+            "journey_type": c.journey_type,
+            "sent_to_email": c.contact_email,
+            "scheduled_for": _as_utc(c.departs_at) - REMINDERS[c.reminder_type][1],
+            "sent_at": now,
+            "success": False,
+            "eticket_attached": False,
+        }
+        for c in candidates
+    ]
 
-        logger.info(f"Found {len(return_24h)} bookings for 24h return reminder")
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return _claim_reminders_orm(db, rows)
+
+    table = BookingReminder.__table__
+    stmt = insert(table).values(rows).on_conflict_do_nothing(
+        index_elements=[table.c.booking_id, table.c.reminder_type, table.c.journey_type]
+    ).returning(table.c.booking_id, table.c.reminder_type, table.c.journey_type, table.c.scheduled_for)
+    claimed = db.execute(stmt).all()
+    db.commit()
+    return claimed
 
-        for booking in return_24h:
-            if not was_reminder_sent(db, booking.id, ReminderTypeEnum.REMINDER_24H, "return"):
-                send_departure_reminder_email.delay(
-                    booking_id=booking.id,
-                    reminder_type="24h",
-                    journey_type="return"
-                )
 
-        # Get confirmed round-trip bookings with upcoming return departures (2h)
-        return_2h = db.query(Booking).filter(
-            and_(
-                Booking.status == BookingStatusEnum.CONFIRMED,
-                Booking.is_round_trip == True,
-                Booking.return_departure_time >= window_2h_start,
-                Booking.return_departure_time <= window_2h_end
+def _claim_reminders_orm(db, rows: List[Dict[str, Any]]) -> list:
+    """Row-by-row fallback for databases without ON CONFLICT support."""
+    claimed = []
+    for row in rows:
+        try:
+            with db.begin_nested():
+                db.add(BookingReminder(**row))
+            claimed.append(
+                (row["booking_id"], row["reminder_type"], row["journey_type"], row["scheduled_for"])
             )
-        ).all()
+        except IntegrityError:
+            continue
+    db.commit()
+    return claimed
+
+
+@celery_app.task(
+    base=ReminderTask,
+    name="app.tasks.reminder_tasks.check_departure_reminders",
+    bind=True
+)
+def check_departure_reminders(self):
+    """
+    Periodic task to schedule departure reminder emails.
+
+    Finds every 24h and 2h reminder (outbound and return legs) due within
+    REMINDER_LOOKAHEAD_SECONDS in one query, claims them in booking_reminders
+    and schedules each send with a Celery ETA at the exact reminder time
+    (departure minus 24h / 2h). Reminders missed by up to
+    REMINDER_LATE_GRACE_SECONDS (e.g. worker downtime) are sent immediately.
+    """
+    db = SessionLocal()
+    try:
+        now = datetime.now(timezone.utc)
+        logger.info(f"Checking for departure reminders at {now}")
+
+        candidates = find_reminder_candidates(db, now)
+        departures = {
+            (c.booking_id, c.reminder_type, c.journey_type): datetime_to_str(c.departs_at)
+            for c in candidates
+        }
+        claimed = claim_reminders(db, candidates, now)
 
-        logger.info(f"Found {len(return_2h)} bookings for 2h return reminder")
+        labels = {reminder_type: label for label, (reminder_type, _) in REMINDERS.items()}
+        counts = {"outbound_24h": 0, "outbound_2h": 0, "return_24h": 0, "return_2h": 0}
+        scheduled = 0
 
-        for booking in return_2h:
-            if not was_reminder_sent(db, booking.id, ReminderTypeEnum.REMINDER_2H, "return"):
-                send_departure_reminder_email.delay(
-                    booking_id=booking.id,
-                    reminder_type="2h",
-                    journey_type="return"
+        for booking_id, reminder_type, journey_type, scheduled_for in claimed:
+            label = labels[reminder_type]
+            try:
+                send_departure_reminder_email.apply_async(
+                    kwargs={
+                        "booking_id": booking_id,
+                        "reminder_type": label,
+                        "journey_type": journey_type,
+                        "departure_time": departures.get((booking_id, label, journey_type)),
+                    },
+                    eta=max(_as_utc(scheduled_for), now)
                 )
+                scheduled += 1
+                counts[f"{journey_type}_{label}"] += 1
+            except Exception as e:
+                logger.error(f"Failed to schedule {label} reminder for booking {booking_id}: {str(e)}")
+                release_reminder(db, booking_id, reminder_type, journey_type)
 
-        total_reminders = len(outbound_24h) + len(outbound_2h) + len(return_24h) + len(return_2h)
-        logger.info(f"Reminder check complete. Queued {total_reminders} potential reminders")
+        logger.info(
+            f"Reminder check complete. {len(candidates)} due, scheduled {scheduled} reminders"
+        )
 
         return {
             "status": "success",
             "checked_at": now.isoformat(),
-            "outbound_24h": len(outbound_24h),
-            "outbound_2h": len(outbound_2h),
-            "return_24h": len(return_24h),
-            "return_2h": len(return_2h),
+            "scheduled": scheduled,
+            **counts,
         }
 
     except Exception as e:
@@ -275,6 +368,7 @@ def send_departure_reminder_email(
     booking_id: int,
     reminder_type: str,  # "24h" or "2h"
     journey_type: str,  # "outbound" or "return"
+    departure_time: Optional[str] = None,
 ):
     """
     Send departure reminder email for a specific booking.
@@ -283,6 +377,9 @@ def send_departure_reminder_email(
         booking_id: The booking ID
         reminder_type: "24h" or "2h"
         journey_type: "outbound" or "return"
+        departure_time: Departure the reminder was scheduled for; if the
+            leg has been rescheduled since, the claim is released so the
+            next scan schedules it for the new time
     """
     db = SessionLocal()
     try:
@@ -306,6 +403,27 @@ def send_departure_reminder_email(
             logger.info(f"Reminder already sent for booking {booking_id} ({reminder_type}, {journey_type})")
             return {"status": "skipped", "message": "Reminder already sent"}
 
+        if booking.status != BookingStatusEnum.CONFIRMED:
+            logger.info(f"Booking {booking_id} no longer confirmed, skipping {reminder_type} reminder")
+            record_reminder(
+                db=db,
+                booking_id=booking_id,
+                reminder_type=reminder_type_enum,
+                journey_type=journey_type,
+                email=booking.contact_email,
+                success=False,
+                error_message="Booking no longer confirmed"
+            )
+            return {"status": "skipped", "message": "Booking not confirmed"}
+
+        leg_departure = (
+            booking.return_departure_time if journey_type == "return" else booking.departure_time
+        )
+        if departure_time and datetime_to_str(leg_departure) != departure_time:
+            logger.info(f"Departure changed for booking {booking_id}, rescheduling {reminder_type} reminder")
+            release_reminder(db, booking_id, reminder_type_enum, journey_type)
+            return {"status": "skipped", "message": "Departure changed"}
+
         # Convert booking to dict
         booking_data = booking_to_dict(booking)
         passengers = passengers_to_list(booking.passengers)
@@ -316,7 +434,7 @@ def send_departure_reminder_email(
         if reminder_type == "24h":
             try:
                 logger.info(f"Generating E-Ticket for booking {booking.booking_reference}")
-                eticket_pdf = eticket_service.generate_eticket(
+                eticket_pdf = eticket_service.get_eticket(
                     booking=booking_data,
                     passengers=passengers,
                     vehicles=vehicles
@@ -369,21 +487,29 @@ def send_departure_reminder_email(
     except Exception as e:
         logger.error(f"Error sending reminder for booking {booking_id}: {str(e)}")
 
-        # Record failed attempt
         try:
+            db.rollback()
             reminder_type_enum = (
                 ReminderTypeEnum.REMINDER_24H if reminder_type == "24h"
                 else ReminderTypeEnum.REMINDER_2H
             )
-            record_reminder(
-                db=db,
-                booking_id=booking_id,
-                reminder_type=reminder_type_enum,
-                journey_type=journey_type,
-                email="unknown",
-                success=False,
-                error_message=str(e)
-            )
+            if self.retries_exhausted:
+                # Give the reminder back to the scan, which skips claimed rows
+                logger.warning(
+                    f"⚠️ {reminder_type} reminder for booking {booking_id} failed after retries, releasing claim"
+                )
+                release_reminder(db, booking_id, reminder_type_enum, journey_type)
+            else:
+                # Record failed attempt (the claim keeps the address it was sent to)
+                record_reminder(
+                    db=db,
+                    booking_id=booking_id,
+                    reminder_type=reminder_type_enum,
+                    journey_type=journey_type,
+                    email=None,
+                    success=False,
+                    error_message=str(e)
+                )
         except:
             pass
 
@@ -423,7 +549,7 @@ def send_manual_reminder(self, booking_id: int, include_eticket: bool = True):
         eticket_pdf = None
         if include_eticket:
             try:
-                eticket_pdf = eticket_service.generate_eticket(
+                eticket_pdf = eticket_service.get_eticket(
                     booking=booking_data,
                     passengers=passengers,
                     vehicles=vehicles
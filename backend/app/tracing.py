@@ -0,0 +1,373 @@
+"""
+In-process request tracing with per-stage timings.
+
+A trace is started per HTTP request (middleware in main.py) or Celery task
+(signals in celery_app.py) and kept in a contextvar, so spans opened anywhere
+below it - including in tasks created with asyncio.gather and in threadpool
+endpoints - attach to it without passing anything around. Each span belongs
+to a stage (cache, db, operator, serialize, ...).
+
+When a trace finishes:
+- per-stage wall time is computed (overlapping spans of a stage, such as
+  concurrent operator calls, are counted once) for the Server-Timing header
+  and the maritime_stage_duration_seconds histogram
+- spans are handed to the configured exporter: "file" writes OpenTelemetry-
+  style JSON lines locally (works offline), "otel" replays them through the
+  OpenTelemetry API so any configured SDK exporter receives them
+
+Usage:
+    with span("operator.search", stage="operator", operator="ctn"):
+        ...
+
+    @traced("cache")
+    def get_ferry_search(self, params): ...
+"""
+
+import contextvars
+from abc import ABC, abstractmethod
+import functools
+import inspect
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_current_trace: contextvars.ContextVar[Optional["Trace"]] = contextvars.ContextVar("current_trace", default=None)
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+
+
+@dataclass(slots=True)
+class Span:
+    """A timed operation inside a trace."""
+    name: str
+    stage: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    start_ns: int
+    end_ns: int = 0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1_000_000
+
+    def to_otel(self) -> Dict[str, Any]:
+        """Render like the OpenTelemetry SDK's span JSON."""
+        return {
+            "name": self.name,
+            "context": {"trace_id": f"0x{self.trace_id}", "span_id": f"0x{self.span_id}"},
+            "parent_id": f"0x{self.parent_id}" if self.parent_id else None,
+            "start_time": _iso(self.start_ns),
+            "end_time": _iso(self.end_ns),
+            "attributes": {"stage": self.stage, **self.attributes},
+            "status": {"status_code": "ERROR" if self.error else "OK", "description": self.error},
+        }
+
+
+@dataclass
+class Trace:
+    """All spans of one request or task."""
+    name: str
+    trace_id: str = field(default_factory=lambda: secrets.token_hex(16))
+    root: Optional[Span] = None
+    spans: List[Span] = field(default_factory=list)
+
+    def stage_timings(self) -> Dict[str, float]:
+        """Wall-clock milliseconds per stage; overlapping spans count once."""
+        intervals: Dict[str, List[Tuple[int, int]]] = {}
+        for s in self.spans:
+            if s is not self.root and s.end_ns:
+                intervals.setdefault(s.stage, []).append((s.start_ns, s.end_ns))
+        timings = {}
+        for stage, spans in intervals.items():
+            total, covered_until = 0, 0
+            for start, end in sorted(spans):
+                start = max(start, covered_until)
+                if end > start:
+                    total += end - start
+                    covered_until = end
+            timings[stage] = total / 1_000_000
+        return timings
+
+    def server_timing(self) -> str:
+        """Server-Timing header value: one entry per stage plus the total."""
+        entries = [f"{stage};dur={ms:.2f}" for stage, ms in sorted(self.stage_timings().items())]
+        if self.root and self.root.end_ns:
+            entries.append(f"total;dur={self.root.duration_ms:.2f}")
+        return ", ".join(entries)
+
+
+def _iso(ns: int) -> str:
+    return datetime.fromtimestamp(ns / 1_000_000_000, tz=timezone.utc).isoformat()
+
+
+def _now_ns() -> int:
+    return time.time_ns()
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+class span:
+    """Context manager recording a span in the current trace (no-op without one)."""
+
+    __slots__ = ("name", "stage", "attributes", "_span", "_token")
+
+    def __init__(self, name: str, stage: Optional[str] = None, **attributes):
+        self.name = name
+        self.stage = stage or name.split(".", 1)[0]
+        self.attributes = attributes
+        self._span = None
+        self._token = None
+
+    def __enter__(self) -> Optional[Span]:
+        trace = _current_trace.get()
+        if trace is None:
+            return None
+        parent = _current_span.get()
+        self._span = Span(
+            name=self.name,
+            stage=self.stage,
+            trace_id=trace.trace_id,
+            span_id=secrets.token_hex(8),
+            parent_id=parent.span_id if parent else None,
+            start_ns=_now_ns(),
+            attributes=self.attributes,
+        )
+        trace.spans.append(self._span)
+        self._token = _current_span.set(self._span)
+        return self._span
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if self._span is not None:
+            self._span.end_ns = _now_ns()
+            if exc_type is not None:
+                self._span.error = exc_type.__name__
+            _current_span.reset(self._token)
+        return False
+
+
+def traced(stage: str, name: Optional[str] = None) -> Callable:
+    """Decorator recording each call of a sync or async function as a span."""
+    def decorator(func: Callable) -> Callable:
+        span_name = name or f"{stage}.{func.__name__}"
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if _current_trace.get() is None:
+                    return await func(*args, **kwargs)
+                with span(span_name, stage):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current_trace.get() is None:
+                return func(*args, **kwargs)
+            with span(span_name, stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def record_span(name: str, stage: str, start_ns: int, end_ns: int, **attributes) -> None:
+    """Record an already finished span (used by event hooks that cannot wrap)."""
+    trace = _current_trace.get()
+    if trace is None:
+        return
+    parent = _current_span.get()
+    trace.spans.append(Span(
+        name=name,
+        stage=stage,
+        trace_id=trace.trace_id,
+        span_id=secrets.token_hex(8),
+        parent_id=parent.span_id if parent else None,
+        start_ns=start_ns,
+        end_ns=end_ns,
+        attributes=attributes,
+    ))
+
+
+def start_trace(name: str, **attributes) -> Optional[Tuple[Trace, contextvars.Token, contextvars.Token]]:
+    """Start a trace with a root span; returns a handle for finish_trace."""
+    if not settings.TRACING_ENABLED:
+        return None
+    trace = Trace(name=name)
+    trace.root = Span(
+        name=name,
+        stage="total",
+        trace_id=trace.trace_id,
+        span_id=secrets.token_hex(8),
+        parent_id=None,
+        start_ns=_now_ns(),
+        attributes=attributes,
+    )
+    trace.spans.append(trace.root)
+    return trace, _current_trace.set(trace), _current_span.set(trace.root)
+
+
+def finish_trace(handle, operation: Optional[str] = None, error: Optional[str] = None) -> Optional[Trace]:
+    """End the trace started by start_trace, record stage metrics and export it."""
+    if handle is None:
+        return None
+    trace, trace_token, span_token = handle
+    trace.root.end_ns = _now_ns()
+    trace.root.error = error
+    _current_span.reset(span_token)
+    _current_trace.reset(trace_token)
+
+    try:
+        from app.api.v1.metrics import record_stage
+        operation = operation or trace.name
+        for stage, ms in trace.stage_timings().items():
+            record_stage(stage, operation, ms / 1000)
+        record_stage("total", operation, trace.root.duration_ms / 1000)
+    except Exception as e:
+        logger.debug(f"Failed to record stage metrics: {e}")
+
+    exporter = get_exporter()
+    if exporter is not None:
+        try:
+            exporter.export(trace.spans)
+        except Exception as e:
+            logger.warning(f"⚠️ Span export failed: {e}")
+    return trace
+
+
+# Exporters
+
+class SpanExporter(ABC):
+    """Receives the spans of each finished trace."""
+
+    @abstractmethod
+    def export(self, spans: List[Span]) -> None:
+        pass
+
+
+class InMemorySpanExporter(SpanExporter):
+    """Keeps exported spans in memory (tests, debugging)."""
+
+    def __init__(self):
+        self.spans: List[Span] = []
+
+    def export(self, spans: List[Span]) -> None:
+        self.spans.extend(spans)
+
+    def clear(self) -> None:
+        self.spans.clear()
+
+
+class JsonFileSpanExporter(SpanExporter):
+    """Appends spans as OpenTelemetry-style JSON lines to a local file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def export(self, spans: List[Span]) -> None:
+        lines = "".join(json.dumps(s.to_otel(), default=str) + "\n" for s in spans)
+        with self._lock, open(self.path, "a") as f:
+            f.write(lines)
+
+
+class OpenTelemetrySpanExporter(SpanExporter):
+    """
+    Replays spans through the OpenTelemetry API.
+
+    Whatever tracer provider and exporter the process configured (OTLP,
+    console, ...) receives them with their original timings and nesting.
+    Without an SDK the API tracer is a no-op.
+    """
+
+    def __init__(self):
+        from opentelemetry import trace as otel_trace
+        self._otel = otel_trace
+        self._tracer = otel_trace.get_tracer("app.tracing")
+
+    def export(self, spans: List[Span]) -> None:
+        contexts = {}
+        # Parents start before their children, so their context exists first
+        for s in sorted(spans, key=lambda s: s.start_ns):
+            parent = contexts.get(s.parent_id)
+            otel_span = self._tracer.start_span(
+                s.name,
+                context=self._otel.set_span_in_context(parent) if parent else None,
+                start_time=s.start_ns,
+                attributes={"stage": s.stage, **{k: str(v) for k, v in s.attributes.items()}},
+            )
+            if s.error:
+                otel_span.set_status(self._otel.Status(self._otel.StatusCode.ERROR, s.error))
+            otel_span.end(end_time=s.end_ns)
+            contexts[s.span_id] = otel_span
+
+
+_exporter: Optional[SpanExporter] = None
+_exporter_configured = False
+
+
+def set_exporter(exporter: Optional[SpanExporter]) -> None:
+    """Replace the exporter (tests, or custom exporters at startup)."""
+    global _exporter, _exporter_configured
+    _exporter = exporter
+    _exporter_configured = True
+
+
+def get_exporter() -> Optional[SpanExporter]:
+    """The exporter selected by TRACING_EXPORTER, created on first use."""
+    global _exporter, _exporter_configured
+    if not _exporter_configured:
+        _exporter_configured = True
+        try:
+            if settings.TRACING_EXPORTER == "file":
+                _exporter = JsonFileSpanExporter(settings.TRACING_EXPORT_PATH)
+            elif settings.TRACING_EXPORTER == "otel":
+                _exporter = OpenTelemetrySpanExporter()
+        except ImportError:
+            logger.warning("opentelemetry-api not installed, span export disabled")
+        except Exception as e:
+            logger.error(f"Failed to configure span exporter: {e}")
+    return _exporter
+
+
+# SQLAlchemy
+
+def instrument_sqlalchemy(engine) -> None:
+    """Record every statement executed on engine as a "db" span."""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if _current_trace.get() is not None:
+            conn.info.setdefault("tracing_start_ns", []).append(_now_ns())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("tracing_start_ns")
+        if starts and _current_trace.get() is not None:
+            operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "QUERY"
+            record_span(f"db.{operation.lower()}", "db", starts.pop(), _now_ns(), statement=statement[:200])
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context):
+        conn = exception_context.connection
+        starts = conn.info.get("tracing_start_ns") if conn is not None else None
+        if starts:
+            start_ns = starts.pop()
+            if _current_trace.get() is not None:
+                record_span("db.error", "db", start_ns, _now_ns())
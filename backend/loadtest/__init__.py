@@ -0,0 +1,3 @@
+"""
+Load-testing harness: an operator API simulator and an asyncio load driver.
+"""
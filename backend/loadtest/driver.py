@@ -0,0 +1,249 @@
+"""
+Asyncio load driver for the booking funnel.
+
+Each virtual user repeatedly runs the scenario
+
+    search -> select -> book -> payment intent -> Stripe webhook
+
+against a running API. Only a fraction of searches (--book-ratio) continue to
+booking, like real look-to-book traffic. The webhook is signed with
+--webhook-secret exactly like Stripe signs it, so it goes through the real
+/api/v1/webhooks/stripe verification. For realistic operator and Stripe
+latency run the API against loadtest.operator_simulator.
+
+Prints p50/p95/p99 and throughput per step, optionally writes the JSON report
+(--report) and compares it with a previous one (--baseline); the exit code is
+1 when a regression beyond --tolerance is found.
+
+Run with: python -m loadtest.driver --base-url http://localhost:8010 --users 50 --duration 120
+          [--report reports/run.json] [--baseline reports/baseline.json]
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import random
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import List, Optional, Tuple
+
+import httpx
+
+from loadtest.report import LatencyRecorder, compare, format_summary, load_report, save_report
+
+DEFAULT_ROUTES = "TUNIS-GENOA,GENOA-TUNIS,TUNIS-MARSEILLE,MARSEILLE-TUNIS,TUNIS-CIVITAVECCHIA,TUNIS-PALERMO"
+
+
+@dataclass
+class ScenarioConfig:
+    """Traffic shape for the virtual users."""
+    routes: List[Tuple[str, str]]
+    days_ahead: Tuple[int, int] = (7, 90)
+    book_ratio: float = 0.2
+    think_time: float = 1.0  # Mean seconds between a user's steps
+    webhook_secret: str = "whsec_development_secret"
+
+
+def stripe_signature(payload: bytes, secret: str, timestamp: Optional[int] = None) -> str:
+    """Build a Stripe-Signature header value for a webhook payload."""
+    timestamp = timestamp or int(time.time())
+    signed = f"{timestamp}.".encode() + payload
+    signature = hmac.new(secret.encode(), signed, hashlib.sha256).hexdigest()
+    return f"t={timestamp},v1={signature}"
+
+
+def select_sailing(results: List[dict], party_size: int) -> Optional[dict]:
+    """Pick the cheapest sailing with room for the party, like most users do."""
+    candidates = [
+        r for r in results
+        if (r.get("available_spaces") or {}).get("passengers", 0) >= party_size
+    ]
+    if not candidates:
+        return None
+    return min(candidates, key=lambda r: (r.get("prices") or {}).get("adult", float("inf")))
+
+
+class VirtualUser:
+    """One simulated customer walking through the booking funnel."""
+
+    def __init__(self, client: httpx.AsyncClient, recorder: LatencyRecorder,
+                 config: ScenarioConfig, rng: random.Random):
+        self.client = client
+        self.recorder = recorder
+        self.config = config
+        self.rng = rng
+
+    async def request(self, step: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        """Send a request and record its latency; returns None when it failed."""
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.recorder.record(step, time.perf_counter() - started, ok=False)
+            return None
+        ok = response.status_code < 400
+        self.recorder.record(step, time.perf_counter() - started, response.status_code, ok)
+        return response if ok else None
+
+    async def think(self) -> None:
+        if self.config.think_time > 0:
+            await asyncio.sleep(self.rng.expovariate(1 / self.config.think_time))
+
+    async def run_scenario(self) -> None:
+        departure_port, arrival_port = self.rng.choice(self.config.routes)
+        departure_date = date.today() + timedelta(days=self.rng.randint(*self.config.days_ahead))
+        adults = self.rng.choice((1, 1, 2, 2, 2, 3, 4))
+
+        response = await self.request("search", "POST", "/api/v1/ferries/search", json={
+            "departure_port": departure_port,
+            "arrival_port": arrival_port,
+            "departure_date": departure_date.isoformat(),
+            "adults": adults,
+        })
+        if response is None:
+            return self.recorder.abandon("search_failed")
+
+        sailing = select_sailing(response.json().get("results", []), adults)
+        if sailing is None:
+            return self.recorder.abandon("no_availability")
+        if self.rng.random() >= self.config.book_ratio:
+            return self.recorder.abandon("browse_only")
+        await self.think()
+
+        response = await self.request("book", "POST", "/api/v1/bookings/", json={
+            "sailing_id": sailing["sailing_id"],
+            "operator": sailing["operator"],
+            "passengers": [
+                {"type": "adult", "first_name": "Load", "last_name": f"Tester{n}"}
+                for n in range(adults)
+            ],
+            "contact_info": {
+                "email": f"loadtest+{uuid.uuid4().hex[:12]}@example.com",
+                "first_name": "Load",
+                "last_name": "Tester",
+            },
+            "departure_port": sailing["departure_port"],
+            "arrival_port": sailing["arrival_port"],
+            "departure_time": sailing["departure_time"],
+            "arrival_time": sailing["arrival_time"],
+            "vessel_name": sailing["vessel_name"],
+            "ferry_prices": sailing["prices"],
+        })
+        if response is None:
+            return self.recorder.abandon("book_failed")
+        booking = response.json()
+        await self.think()
+
+        response = await self.request("payment_intent", "POST", "/api/v1/payments/create-intent", json={
+            "booking_id": booking["id"],
+            "amount": booking["total_amount"],
+            "currency": "EUR",
+            "payment_method": "credit_card",
+        })
+        if response is None:
+            return self.recorder.abandon("payment_intent_failed")
+        intent = response.json()
+
+        payload = json.dumps({
+            "id": f"evt_load_{uuid.uuid4().hex[:24]}",
+            "object": "event",
+            "type": "payment_intent.succeeded",
+            "data": {"object": {
+                "id": intent["payment_intent_id"],
+                "object": "payment_intent",
+                "amount": int(round(intent["amount"] * 100)),
+                "currency": intent["currency"].lower(),
+                "status": "succeeded",
+                "metadata": {"booking_id": str(booking["id"])},
+            }},
+        }).encode()
+        response = await self.request("webhook", "POST", "/api/v1/webhooks/stripe", content=payload, headers={
+            "Content-Type": "application/json",
+            "Stripe-Signature": stripe_signature(payload, self.config.webhook_secret),
+        })
+        if response is None:
+            return self.recorder.abandon("webhook_failed")
+        self.recorder.complete()
+
+    async def run(self, deadline: float, start_delay: float) -> None:
+        await asyncio.sleep(start_delay)
+        while time.perf_counter() < deadline:
+            await self.run_scenario()
+            await self.think()
+
+
+async def run_load(base_url: str, users: int, duration: float, ramp_up: float,
+                   config: ScenarioConfig, timeout: float = 60.0, seed: int = 0) -> dict:
+    """Run the virtual users for `duration` seconds and return the JSON report."""
+    recorder = LatencyRecorder()
+    limits = httpx.Limits(max_connections=users, max_keepalive_connections=users)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        started = time.perf_counter()
+        deadline = started + duration
+        await asyncio.gather(*(
+            VirtualUser(client, recorder, config, random.Random(f"{seed}:{n}")).run(
+                deadline, ramp_up * n / users
+            )
+            for n in range(users)
+        ))
+        elapsed = time.perf_counter() - started
+    return recorder.summary(elapsed, users)
+
+
+def parse_routes(spec: str) -> List[Tuple[str, str]]:
+    """Parse "TUNIS-GENOA,GENOA-TUNIS" into port pairs."""
+    return [tuple(route.strip().split("-", 1)) for route in spec.split(",") if route.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--base-url", default="http://localhost:8010")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=60.0, help="Seconds")
+    parser.add_argument("--ramp-up", type=float, default=10.0, help="Seconds to start all users")
+    parser.add_argument("--think-time", type=float, default=1.0, help="Mean seconds between steps")
+    parser.add_argument("--book-ratio", type=float, default=0.2, help="Fraction of searches that book")
+    parser.add_argument("--routes", default=DEFAULT_ROUTES)
+    parser.add_argument("--webhook-secret", default=os.getenv("STRIPE_WEBHOOK_SECRET", "whsec_development_secret"))
+    parser.add_argument("--timeout", type=float, default=60.0, help="Client timeout in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--report", help="Write the JSON report to this path")
+    parser.add_argument("--baseline", help="Compare against this JSON report")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed fractional regression")
+    args = parser.parse_args()
+
+    config = ScenarioConfig(
+        routes=parse_routes(args.routes),
+        book_ratio=args.book_ratio,
+        think_time=args.think_time,
+        webhook_secret=args.webhook_secret,
+    )
+    print(f"🚀 {args.users} users against {args.base_url} for {args.duration:.0f}s")
+    report = asyncio.run(run_load(
+        args.base_url, args.users, args.duration, args.ramp_up, config, args.timeout, args.seed
+    ))
+    print(format_summary(report))
+
+    if args.report:
+        save_report(report, args.report)
+        print(f"\n📝 Report written to {args.report}")
+
+    if args.baseline:
+        regressions = compare(report, load_report(args.baseline), args.tolerance)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) against {args.baseline}:")
+            for regression in regressions:
+                print(f"  - {regression}")
+            sys.exit(1)
+        print(f"\n✅ No regression against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,371 @@
+"""
+Operator API simulator for load tests.
+
+Serves the endpoints the real CTNIntegration, GNVIntegration and Stripe
+clients call, with configurable latency distributions, error rates and
+timeouts, so the platform can be load tested against realistic operator
+behaviour instead of the instant MockFerryIntegration:
+
+- CTN under /ctn        CTN_API_KEY=sim CTN_BASE_URL=http://localhost:8900/ctn
+- GNV under /gnv        GNV_CLIENT_ID=sim GNV_BASE_URL=http://localhost:8900/gnv
+- Stripe under /stripe  STRIPE_API_BASE=http://localhost:8900/stripe
+
+(base URLs without a trailing slash; ENVIRONMENT must not be "development",
+which forces the mock integrations). Sailings are generated
+deterministically per operator, route and date, so a sailing returned by a
+search can be booked afterwards. GET /_stats returns request, error and
+timeout counts per endpoint.
+
+Latency specs are "lognormal:<median_ms>:<p99_ms>", "uniform:<min_ms>:<max_ms>"
+or "fixed:<ms>".
+
+Run with: python -m loadtest.operator_simulator [--port 8900] [--search-latency lognormal:400:2500]
+          [--error-rate 0.02] [--timeout-rate 0.005] [--hang-seconds 45]
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import asyncio
+import math
+import random
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Dict, List
+from urllib.parse import parse_qsl
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+# z-score of the 99th percentile of a standard normal distribution
+Z_99 = 2.3263
+
+CABIN_TYPES = [
+    ("interior", "Interior Cabin", 45.0),
+    ("exterior", "Exterior Cabin", 70.0),
+    ("suite", "Suite", 160.0),
+]
+
+
+@dataclass
+class LatencyProfile:
+    """Response latency distribution, in milliseconds."""
+    distribution: str = "fixed"
+    low_ms: float = 0.0
+    high_ms: float = 0.0
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyProfile":
+        """Parse "lognormal:<median>:<p99>", "uniform:<min>:<max>" or "fixed:<ms>"."""
+        name, *values = spec.split(":")
+        if name == "fixed" and len(values) == 1:
+            return cls("fixed", float(values[0]), float(values[0]))
+        if name in ("lognormal", "uniform") and len(values) == 2:
+            low, high = float(values[0]), float(values[1])
+            if high < low:
+                raise ValueError(f"Invalid latency spec {spec!r}: upper bound below lower bound")
+            return cls(name, low, high)
+        raise ValueError(f"Invalid latency spec {spec!r}")
+
+    def sample(self, rng: random.Random) -> float:
+        """Draw one latency in seconds."""
+        if self.distribution == "uniform":
+            return rng.uniform(self.low_ms, self.high_ms) / 1000
+        if self.distribution == "lognormal" and self.low_ms > 0 and self.high_ms > self.low_ms:
+            # low_ms is the median, high_ms the p99
+            sigma = math.log(self.high_ms / self.low_ms) / Z_99
+            return rng.lognormvariate(math.log(self.low_ms), sigma) / 1000
+        return self.low_ms / 1000
+
+
+@dataclass
+class SimulatorConfig:
+    """Latency and fault settings for the simulated operators."""
+    search_latency: LatencyProfile = field(default_factory=LatencyProfile)
+    booking_latency: LatencyProfile = field(default_factory=LatencyProfile)
+    payment_latency: LatencyProfile = field(default_factory=LatencyProfile)
+    error_rate: float = 0.0  # Fraction of requests answered with HTTP 503
+    timeout_rate: float = 0.0  # Fraction of requests that hang for hang_seconds
+    hang_seconds: float = 45.0  # Longer than the integrations' 30s client timeout
+    sailings_per_day: int = 4
+    seed: int = 0
+
+
+def build_sailings(config: SimulatorConfig, operator: str, departure_port: str,
+                   arrival_port: str, departure_date: date) -> List[dict]:
+    """Generate the same sailings for the same operator, route and date."""
+    rng = random.Random(f"{config.seed}:{operator}:{departure_port}:{arrival_port}:{departure_date}")
+    start = datetime.combine(departure_date, datetime.min.time()) + timedelta(hours=7)
+    spacing = timedelta(minutes=840 // max(config.sailings_per_day, 1))
+    sailings = []
+    for i in range(config.sailings_per_day):
+        departure = start + spacing * i
+        adult = round(rng.uniform(60, 180), 2)
+        sailings.append({
+            "id": f"{operator}-{departure_port}-{arrival_port}-{departure:%Y%m%d%H%M}",
+            "departure_port": departure_port,
+            "arrival_port": arrival_port,
+            "departure_time": departure,
+            "arrival_time": departure + timedelta(hours=rng.randint(10, 24)),
+            "vessel_name": f"{operator} Vessel {rng.randint(1, 6)}",
+            "adult": adult,
+            "child": round(adult / 2, 2),
+            "infant": 0.0,
+            "vehicle": round(rng.uniform(90, 220), 2),
+            "cabins": [
+                {"type": cabin_type, "name": name, "price": price, "available": rng.randint(0, 20)}
+                for cabin_type, name, price in CABIN_TYPES
+            ],
+            "passengers": rng.randint(0, 400),
+            "vehicles": rng.randint(0, 120),
+        })
+    return sailings
+
+
+def _ctn_sailing(sailing: dict) -> dict:
+    return {
+        "id": sailing["id"],
+        "departure_port": sailing["departure_port"],
+        "arrival_port": sailing["arrival_port"],
+        "departure_time": sailing["departure_time"].isoformat(),
+        "arrival_time": sailing["arrival_time"].isoformat(),
+        "vessel_name": sailing["vessel_name"],
+        "prices": {
+            "adult": sailing["adult"],
+            "child": sailing["child"],
+            "infant": sailing["infant"],
+            "vehicle": sailing["vehicle"],
+        },
+        "cabin_types": sailing["cabins"],
+        "available_spaces": {"passengers": sailing["passengers"], "vehicles": sailing["vehicles"]},
+    }
+
+
+def _gnv_viaggio(sailing: dict) -> dict:
+    return {
+        "id_viaggio": sailing["id"],
+        "porto_partenza": sailing["departure_port"],
+        "porto_arrivo": sailing["arrival_port"],
+        "orario_partenza": sailing["departure_time"].isoformat(),
+        "orario_arrivo": sailing["arrival_time"].isoformat(),
+        "nome_nave": sailing["vessel_name"],
+        "prezzi": {
+            "adulto": sailing["adult"],
+            "bambino": sailing["child"],
+            "neonato": sailing["infant"],
+            "veicolo": sailing["vehicle"],
+        },
+        "cabine": [
+            {"tipo": c["type"], "nome": c["name"], "prezzo": c["price"], "disponibile": c["available"]}
+            for c in sailing["cabins"]
+        ],
+        "posti_disponibili": sailing["passengers"],
+        "veicoli_disponibili": sailing["vehicles"],
+    }
+
+
+class SimulatedFault(Exception):
+    """Raised to answer a request with a simulated operator failure."""
+
+    def __init__(self, status_code: int, message: str):
+        super().__init__(message)
+        self.status_code = status_code
+        self.message = message
+
+
+class OperatorSimulator:
+    """Shared state for the simulated operators: RNG, counters and bookings."""
+
+    def __init__(self, config: SimulatorConfig):
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.stats: Dict[str, Counter] = {"requests": Counter(), "errors": Counter(), "timeouts": Counter()}
+        self.sailing_prices: Dict[str, float] = {}
+        self.bookings: Dict[str, dict] = {}
+
+    async def respond(self, endpoint: str, latency: LatencyProfile) -> None:
+        """Apply latency and fault injection for one request."""
+        self.stats["requests"][endpoint] += 1
+        roll = self.rng.random()
+        if roll < self.config.timeout_rate:
+            self.stats["timeouts"][endpoint] += 1
+            await asyncio.sleep(self.config.hang_seconds)
+            raise SimulatedFault(504, "Simulated operator timeout")
+        await asyncio.sleep(latency.sample(self.rng))
+        if roll < self.config.timeout_rate + self.config.error_rate:
+            self.stats["errors"][endpoint] += 1
+            raise SimulatedFault(503, "Simulated operator error")
+
+    def search(self, operator: str, departure_port: str, arrival_port: str, departure_date: str) -> List[dict]:
+        sailings = build_sailings(
+            self.config, operator, departure_port, arrival_port, date.fromisoformat(departure_date)
+        )
+        for sailing in sailings:
+            self.sailing_prices[sailing["id"]] = sailing["adult"]
+        return sailings
+
+    def book(self, operator: str, sailing_id: str, passengers: int) -> dict:
+        reference = f"{operator}{uuid.uuid4().hex[:10].upper()}"
+        booking = {
+            "reference": reference,
+            "sailing_id": sailing_id,
+            "status": "confirmed",
+            "total_amount": round(self.sailing_prices.get(sailing_id, 0.0) * max(passengers, 1), 2),
+        }
+        self.bookings[reference] = booking
+        return booking
+
+
+def create_app(config: SimulatorConfig) -> FastAPI:
+    """Build the simulator app for the given configuration."""
+    app = FastAPI(title="Operator Simulator")
+    simulator = OperatorSimulator(config)
+    app.state.simulator = simulator
+
+    @app.exception_handler(SimulatedFault)
+    async def simulated_fault_handler(request: Request, exc: SimulatedFault):
+        return JSONResponse(
+            status_code=exc.status_code,
+            content={"message": exc.message, "error_code": "SIMULATED_FAULT"},
+        )
+
+    # CTN
+
+    @app.post("/ctn/api/v1/search")
+    async def ctn_search(payload: dict):
+        await simulator.respond("ctn.search", config.search_latency)
+        sailings = simulator.search(
+            "CTN", payload["departure_port"], payload["arrival_port"], payload["departure_date"]
+        )
+        return {"sailings": [_ctn_sailing(s) for s in sailings]}
+
+    @app.post("/ctn/api/v1/bookings")
+    async def ctn_create_booking(payload: dict):
+        await simulator.respond("ctn.book", config.booking_latency)
+        booking = simulator.book("CTN", payload["sailing_id"], len(payload.get("passengers", [])))
+        return {
+            "booking_reference": booking["reference"],
+            "ctn_reference": booking["reference"],
+            "status": booking["status"],
+            "total_amount": booking["total_amount"],
+            "currency": "EUR",
+            "confirmation_number": booking["reference"],
+        }
+
+    @app.get("/ctn/api/v1/bookings/{reference}")
+    async def ctn_booking_status(reference: str):
+        await simulator.respond("ctn.status", config.booking_latency)
+        booking = simulator.bookings.get(reference)
+        if not booking:
+            return JSONResponse(status_code=404, content={"message": "Booking not found"})
+        return {"booking_reference": reference, "status": booking["status"]}
+
+    @app.delete("/ctn/api/v1/bookings/{reference}")
+    async def ctn_cancel_booking(reference: str):
+        await simulator.respond("ctn.cancel", config.booking_latency)
+        booking = simulator.bookings.get(reference)
+        if booking:
+            booking["status"] = "cancelled"
+        return {"cancelled": booking is not None}
+
+    # GNV
+
+    @app.post("/gnv/api/v2/ricerca-traghetti")
+    async def gnv_search(payload: dict):
+        await simulator.respond("gnv.search", config.search_latency)
+        sailings = simulator.search("GNV", payload["partenza"], payload["arrivo"], payload["data_partenza"])
+        return {"viaggi": [_gnv_viaggio(s) for s in sailings]}
+
+    @app.post("/gnv/api/v2/prenotazioni")
+    async def gnv_create_booking(payload: dict):
+        await simulator.respond("gnv.book", config.booking_latency)
+        booking = simulator.book("GNV", payload["id_viaggio"], len(payload.get("passeggeri", [])))
+        return {
+            "codice_prenotazione": booking["reference"],
+            "riferimento_gnv": booking["reference"],
+            "stato": booking["status"],
+            "importo_totale": booking["total_amount"],
+            "valuta": "EUR",
+            "numero_conferma": booking["reference"],
+        }
+
+    @app.get("/gnv/api/v2/prenotazioni/{reference}")
+    async def gnv_booking_status(reference: str):
+        await simulator.respond("gnv.status", config.booking_latency)
+        booking = simulator.bookings.get(reference)
+        if not booking:
+            return JSONResponse(status_code=404, content={"message": "Prenotazione non trovata"})
+        return {"codice_prenotazione": reference, "stato": booking["status"]}
+
+    @app.delete("/gnv/api/v2/prenotazioni/{reference}")
+    async def gnv_cancel_booking(reference: str):
+        await simulator.respond("gnv.cancel", config.booking_latency)
+        booking = simulator.bookings.get(reference)
+        if booking:
+            booking["status"] = "cancelled"
+        return {"cancellato": booking is not None}
+
+    # Stripe (form-encoded like the real API)
+
+    @app.post("/stripe/v1/payment_intents")
+    async def stripe_create_payment_intent(request: Request):
+        await simulator.respond("stripe.payment_intent", config.payment_latency)
+        form = dict(parse_qsl((await request.body()).decode()))
+        intent_id = f"pi_sim_{uuid.uuid4().hex[:24]}"
+        return {
+            "id": intent_id,
+            "object": "payment_intent",
+            "amount": int(form.get("amount", 0)),
+            "currency": form.get("currency", "eur"),
+            "client_secret": f"{intent_id}_secret_sim",
+            "status": "requires_payment_method",
+            "metadata": {
+                key[len("metadata["):-1]: value
+                for key, value in form.items()
+                if key.startswith("metadata[")
+            },
+        }
+
+    @app.get("/_stats")
+    async def stats():
+        return {name: dict(counter) for name, counter in simulator.stats.items()}
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--search-latency", default="lognormal:400:2500")
+    parser.add_argument("--booking-latency", default="lognormal:800:4000")
+    parser.add_argument("--payment-latency", default="lognormal:250:900")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--timeout-rate", type=float, default=0.0)
+    parser.add_argument("--hang-seconds", type=float, default=45.0)
+    parser.add_argument("--sailings-per-day", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    config = SimulatorConfig(
+        search_latency=LatencyProfile.parse(args.search_latency),
+        booking_latency=LatencyProfile.parse(args.booking_latency),
+        payment_latency=LatencyProfile.parse(args.payment_latency),
+        error_rate=args.error_rate,
+        timeout_rate=args.timeout_rate,
+        hang_seconds=args.hang_seconds,
+        sailings_per_day=args.sailings_per_day,
+        seed=args.seed,
+    )
+    print(f"🚢 Operator simulator on http://{args.host}:{args.port} "
+          f"(error rate {config.error_rate:.1%}, timeout rate {config.timeout_rate:.1%})")
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Latency recording, summaries and baseline comparison for load test runs.
+
+Reports are plain JSON so runs can be committed as baselines and compared
+in CI:
+
+    {
+        "duration_s": 120.0,
+        "users": 50,
+        "steps": {"search": {"count": ..., "p50_ms": ..., "p95_ms": ..., ...}},
+        "scenarios": {"completed": ..., "per_second": ...}
+    }
+"""
+
+import json
+import math
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+
+# Latency metrics compared against a baseline (higher is worse)
+LATENCY_METRICS = ("p50_ms", "p95_ms", "p99_ms")
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class LatencyRecorder:
+    """Collects per-step latencies, errors and completed scenarios."""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Counter = Counter()
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+        self.scenarios_completed = 0
+        self.scenarios_abandoned: Counter = Counter()
+
+    def record(self, step: str, seconds: float, status: Optional[int] = None, ok: bool = True) -> None:
+        """Record one request; status is None when it never got a response."""
+        self.samples[step].append(seconds * 1000)
+        self.statuses[step][str(status) if status is not None else "no_response"] += 1
+        if not ok:
+            self.errors[step] += 1
+
+    def abandon(self, reason: str) -> None:
+        """Record a scenario that stopped early (no availability, failed step, ...)."""
+        self.scenarios_abandoned[reason] += 1
+
+    def complete(self) -> None:
+        self.scenarios_completed += 1
+
+    def summary(self, duration_s: float, users: int) -> dict:
+        """Build the JSON report for a run of duration_s seconds."""
+        steps = {}
+        for step, samples in self.samples.items():
+            ordered = sorted(samples)
+            count = len(ordered)
+            steps[step] = {
+                "count": count,
+                "errors": self.errors[step],
+                "error_rate": round(self.errors[step] / count, 4) if count else 0.0,
+                "rps": round(count / duration_s, 2) if duration_s else 0.0,
+                "mean_ms": round(sum(ordered) / count, 2) if count else 0.0,
+                "p50_ms": round(percentile(ordered, 50), 2),
+                "p95_ms": round(percentile(ordered, 95), 2),
+                "p99_ms": round(percentile(ordered, 99), 2),
+                "max_ms": round(ordered[-1], 2) if ordered else 0.0,
+                "statuses": dict(self.statuses[step]),
+            }
+        return {
+            "duration_s": round(duration_s, 2),
+            "users": users,
+            "steps": steps,
+            "scenarios": {
+                "completed": self.scenarios_completed,
+                "per_second": round(self.scenarios_completed / duration_s, 3) if duration_s else 0.0,
+                "abandoned": dict(self.scenarios_abandoned),
+            },
+        }
+
+
+def compare(current: dict, baseline: dict, tolerance: float = 0.2,
+            error_rate_tolerance: float = 0.01) -> List[str]:
+    """
+    Compare a report against a baseline.
+
+    Returns a list of regressions: latency percentiles more than `tolerance`
+    (fractional) above the baseline, error rates more than
+    `error_rate_tolerance` above it, or throughput more than `tolerance`
+    below it. An empty list means no regression.
+    """
+    regressions = []
+    for step, base in baseline.get("steps", {}).items():
+        stats = current.get("steps", {}).get(step)
+        if stats is None:
+            regressions.append(f"{step}: missing from current run")
+            continue
+        for metric in LATENCY_METRICS:
+            if base[metric] and stats[metric] > base[metric] * (1 + tolerance):
+                regressions.append(
+                    f"{step} {metric}: {stats[metric]:.1f} vs baseline {base[metric]:.1f}"
+                )
+        if stats["error_rate"] > base["error_rate"] + error_rate_tolerance:
+            regressions.append(
+                f"{step} error_rate: {stats['error_rate']:.2%} vs baseline {base['error_rate']:.2%}"
+            )
+
+    base_throughput = baseline.get("scenarios", {}).get("per_second", 0)
+    throughput = current.get("scenarios", {}).get("per_second", 0)
+    if base_throughput and throughput < base_throughput * (1 - tolerance):
+        regressions.append(
+            f"scenarios per_second: {throughput:.2f} vs baseline {base_throughput:.2f}"
+        )
+    return regressions
+
+
+def format_summary(report: dict) -> str:
+    """Render a report as a text table."""
+    lines = [
+        f"Duration {report['duration_s']:.1f}s with {report['users']} users",
+        "",
+        f"  {'step':16s} {'count':>7s} {'err%':>6s} {'rps':>8s} {'p50':>8s} {'p95':>8s} {'p99':>8s} {'max':>8s}",
+    ]
+    for step, stats in report["steps"].items():
+        lines.append(
+            f"  {step:16s} {stats['count']:7d} {stats['error_rate'] * 100:6.2f} {stats['rps']:8.2f} "
+            f"{stats['p50_ms']:8.1f} {stats['p95_ms']:8.1f} {stats['p99_ms']:8.1f} {stats['max_ms']:8.1f}"
+        )
+    scenarios = report["scenarios"]
+    lines.append("")
+    lines.append(f"  Completed scenarios: {scenarios['completed']} ({scenarios['per_second']:.2f}/s)")
+    if scenarios["abandoned"]:
+        abandoned = ", ".join(f"{reason}={count}" for reason, count in sorted(scenarios["abandoned"].items()))
+        lines.append(f"  Abandoned: {abandoned}")
+    return "\n".join(lines)
+
+
+def load_report(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_report(report: dict, path: str) -> None:
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
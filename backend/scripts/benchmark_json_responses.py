@@ -0,0 +1,172 @@
+"""
+Benchmark JSON response serialization CPU on the largest API payloads.
+
+Serves the same payloads from two apps, one with FastAPI's default response
+class and one with FastJSONResponse as default_response_class, and reports
+CPU time per request for:
+- /ferries/search-sized FerrySearchResponse (500 sailings)
+- /bookings-sized BookingListResponse (100 bookings)
+- /prices/calendar FareCalendarResponse (31 days)
+- a dict endpoint (no response_model) with Decimal amounts, datetimes and
+  enums, returned as-is and returned as a FastJSONResponse
+
+Run with: python -m scripts.benchmark_json_responses [--rounds 200]
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import time
+from datetime import datetime, date, timedelta
+from decimal import Decimal
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1.prices import DayPrice, FareCalendarResponse
+from app.models.booking import BookingStatusEnum
+from app.responses import FastJSONResponse
+from app.schemas.booking import BookingListResponse, BookingResponse
+from app.schemas.ferry import FerrySearchResponse
+from app.services.ferry_integrations.base import FerryResult
+
+NOW = datetime.combine(date.today() + timedelta(days=30), datetime.min.time())
+
+
+def search_payload(count: int = 500) -> FerrySearchResponse:
+    results = [
+        FerryResult(
+            sailing_id=f"CTN_{i:05d}",
+            operator="CTN",
+            departure_port="TUNIS",
+            arrival_port="GENOA",
+            departure_time=NOW + timedelta(hours=i),
+            arrival_time=NOW + timedelta(hours=i + 20),
+            vessel_name="Carthage",
+            prices={"adult": 85.0, "child": 42.5, "infant": 0.0, "vehicle": 120.0},
+            cabin_types=[{"type": "interior", "name": "Interior", "price": 30.0, "available": 5}],
+            available_spaces={"passengers": 150, "vehicles": 40},
+        ).to_dict()
+        for i in range(count)
+    ]
+    return FerrySearchResponse(
+        results=results,
+        total_results=count,
+        search_params={"departure_port": "TUNIS", "arrival_port": "GENOA", "departure_date": NOW.date()},
+        operators_searched=["ctn"],
+    )
+
+
+def booking_payload(count: int = 100) -> BookingListResponse:
+    bookings = [
+        BookingResponse(
+            id=i,
+            booking_reference=f"MR{i:08d}",
+            status="confirmed",
+            sailing_id=f"CTN_{i:05d}",
+            operator="CTN",
+            departure_port="TUNIS",
+            arrival_port="GENOA",
+            departure_time=NOW + timedelta(days=i),
+            contact_email="guest@example.com",
+            contact_first_name="Guest",
+            contact_last_name="User",
+            total_passengers=2,
+            total_vehicles=0,
+            subtotal=170.0,
+            tax_amount=17.0,
+            total_amount=187.0,
+            currency="EUR",
+            cabin_supplement=0.0,
+            created_at=NOW,
+            passengers=[],
+            vehicles=[],
+        )
+        for i in range(count)
+    ]
+    return BookingListResponse(bookings=bookings, total_count=count, page=1, page_size=count, total_pages=1)
+
+
+def calendar_payload() -> FareCalendarResponse:
+    days = [
+        DayPrice(date=date(2026, 7, d).isoformat(), day=d, price=90.0 + d, lowest_price=90.0 + d, num_ferries=3)
+        for d in range(1, 32)
+    ]
+    return FareCalendarResponse(
+        route_id="TUNIS_GENOA", departure_port="TUNIS", arrival_port="GENOA",
+        year=2026, month=7, month_name="July", passengers=2, days=days,
+    )
+
+
+def dict_payload(count: int = 100) -> dict:
+    return {
+        "bookings": [
+            {
+                "id": i,
+                "status": BookingStatusEnum.CONFIRMED,
+                "total_amount": Decimal("187.00"),
+                "departure_time": NOW + timedelta(days=i),
+                "departure_date": (NOW + timedelta(days=i)).date(),
+            }
+            for i in range(count)
+        ]
+    }
+
+
+def build_app(**kwargs) -> FastAPI:
+    app = FastAPI(**kwargs)
+    search, bookings, calendar, raw = search_payload(), booking_payload(), calendar_payload(), dict_payload()
+
+    @app.get("/search", response_model=FerrySearchResponse)
+    def get_search():
+        return search
+
+    @app.get("/bookings", response_model=BookingListResponse)
+    def get_bookings():
+        return bookings
+
+    @app.get("/calendar", response_model=FareCalendarResponse)
+    def get_calendar():
+        return calendar
+
+    @app.get("/dict")
+    def get_dict():
+        return raw
+
+    @app.get("/dict-direct")
+    def get_dict_direct():
+        return FastJSONResponse(raw)
+
+    return app
+
+
+def cpu_per_request(client: TestClient, path: str, rounds: int) -> float:
+    """Process CPU milliseconds per request (including the test client)."""
+    client.get(path)  # Warm up
+    started = time.process_time()
+    for _ in range(rounds):
+        response = client.get(path)
+    assert response.status_code == 200, response.text
+    return (time.process_time() - started) * 1000 / rounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    clients = {
+        "default": TestClient(build_app()),
+        "orjson": TestClient(build_app(default_response_class=FastJSONResponse)),
+    }
+
+    print(f"CPU ms per request over {args.rounds} requests\n")
+    print(f"  {'endpoint':12s} {'default':>9s} {'orjson':>9s}")
+    for path in ("/search", "/bookings", "/calendar", "/dict", "/dict-direct"):
+        timings = {name: cpu_per_request(client, path, args.rounds) for name, client in clients.items()}
+        print(f"  {path:12s} {timings['default']:9.3f} {timings['orjson']:9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Benchmark memory and latency of serializing ferry search results.
+
+Compares, on a 500-sailing result set:
+- allocation of dict-backed result objects vs slotted FerryResult dataclasses
+- the previous response path (to_dict() -> FerrySearchResponse validation ->
+  JSON) vs the direct orjson path used by /ferries/search
+
+Run with: python -m scripts.benchmark_search_serialization [--sailings 500] [--rounds 50]
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import statistics
+import time
+import tracemalloc
+from datetime import datetime, date, timedelta
+
+import orjson
+
+from app.responses import FastJSONResponse
+from app.schemas.ferry import FerrySearchResponse
+from app.services.ferry_integrations.base import FerryResult
+
+
+class LegacyFerryResult:
+    """The previous dict-backed FerryResult (one __dict__ per instance)."""
+
+    def __init__(self, sailing_id, operator, departure_port, arrival_port, departure_time,
+                 arrival_time, vessel_name, prices, cabin_types=None, available_spaces=None):
+        self.sailing_id = sailing_id
+        self.operator = operator
+        self.departure_port = departure_port
+        self.arrival_port = arrival_port
+        self.departure_time = departure_time
+        self.arrival_time = arrival_time
+        self.vessel_name = vessel_name
+        self.prices = prices
+        self.cabin_types = cabin_types or []
+        self.available_spaces = available_spaces or {}
+
+    to_dict = FerryResult.to_dict
+
+
+SEARCH_PARAMS = {
+    "departure_port": "TUNIS",
+    "arrival_port": "GENOA",
+    "departure_date": (date.today() + timedelta(days=30)).isoformat(),
+    "adults": 2,
+    "children": 1,
+    "infants": 0,
+}
+
+
+def make_sailings(cls, count: int) -> list:
+    """Build a result set shaped like the mock integration's output."""
+    start = datetime.combine(date.today() + timedelta(days=30), datetime.min.time())
+    cabins = ["interior", "exterior", "balcony", "suite", "deck"]
+    return [
+        cls(
+            sailing_id=f"CTN_{i:05d}",
+            operator="CTN",
+            departure_port="TUNIS",
+            arrival_port="GENOA",
+            departure_time=start + timedelta(hours=i % 24),
+            arrival_time=start + timedelta(hours=i % 24 + 20),
+            vessel_name="Carthage",
+            prices={"adult": 85.0 + i % 40, "child": 42.5, "infant": 0.0, "vehicle": 120.0},
+            cabin_types=[
+                {"type": cabin, "name": cabin.title(), "price": 30.0 * (n + 1), "available": 5}
+                for n, cabin in enumerate(cabins)
+            ],
+            available_spaces={"passengers": 150, "vehicles": 40},
+        )
+        for i in range(count)
+    ]
+
+
+def pydantic_path(results: list) -> bytes:
+    """Previous path: dict copies, schema validation, then JSON encoding."""
+    response = FerrySearchResponse(
+        results=[r.to_dict() for r in results],
+        total_results=len(results),
+        search_params=SEARCH_PARAMS,
+        operators_searched=["ctn"],
+        search_time_ms=12.0,
+        cached=False,
+    )
+    return response.model_dump_json().encode()
+
+
+def orjson_path(results: list) -> bytes:
+    """Current path: dataclasses written straight to JSON bytes."""
+    return FastJSONResponse({
+        "results": results,
+        "total_results": len(results),
+        "search_params": SEARCH_PARAMS,
+        "operators_searched": ["ctn"],
+        "search_time_ms": 12.0,
+        "cached": False,
+    }).body
+
+
+def measure_allocation(func, *args) -> int:
+    """Peak bytes allocated while running func."""
+    tracemalloc.start()
+    try:
+        func(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def measure_latency(func, rounds: int, *args) -> dict:
+    """Wall-clock timings in milliseconds over several rounds."""
+    func(*args)  # Warm up
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        func(*args)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {
+        "median": statistics.median(timings),
+        "p95": timings[int(len(timings) * 0.95) - 1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sailings", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"Result set: {args.sailings} sailings, {args.rounds} rounds\n")
+
+    legacy_bytes = measure_allocation(make_sailings, LegacyFerryResult, args.sailings)
+    slotted_bytes = measure_allocation(make_sailings, FerryResult, args.sailings)
+    print("Result objects (peak allocation)")
+    print(f"  dict-backed:       {legacy_bytes / 1024:8.1f} KiB")
+    print(f"  slotted dataclass: {slotted_bytes / 1024:8.1f} KiB")
+
+    results = make_sailings(FerryResult, args.sailings)
+    assert orjson.loads(orjson_path(results))["total_results"] == args.sailings
+
+    print("\nResponse serialization")
+    for name, path in (("pydantic", pydantic_path), ("orjson", orjson_path)):
+        allocated = measure_allocation(path, results)
+        latency = measure_latency(path, args.rounds, results)
+        print(
+            f"  {name:9s} median {latency['median']:7.2f} ms  p95 {latency['p95']:7.2f} ms  "
+            f"peak alloc {allocated / 1024:8.1f} KiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Compare a pytest-benchmark run against the stored JSON baseline.
+
+Reads the --benchmark-json output of the micro-benchmark suite, compares each
+benchmark's median (or --metric) with the baseline and exits with status 1
+when any benchmark is slower by more than --threshold. With --save the run
+is written as the new baseline instead (trimmed to the stats we compare, so
+baseline diffs stay readable).
+
+Baselines are machine-specific: record and compare them on the same runner.
+
+Run with: python -m scripts.compare_benchmarks benchmark.json [--threshold 0.15] [--save]
+    (after: pytest tests/benchmarks --benchmark-json=benchmark.json)
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import json
+from typing import Dict, List, Tuple
+
+DEFAULT_BASELINE = os.path.abspath(os.path.join(
+    os.path.dirname(__file__), '..', 'tests', 'benchmarks', 'baselines', 'baseline.json'
+))
+STATS = ("min", "median", "mean", "stddev", "rounds")
+
+
+def load_run(path: str) -> dict:
+    """Load a pytest-benchmark JSON file or a trimmed baseline."""
+    with open(path) as f:
+        data = json.load(f)
+    if "results" in data:
+        return data
+    return {
+        "machine": {
+            "cpu": data.get("machine_info", {}).get("cpu", {}).get("brand_raw"),
+            "python": data.get("machine_info", {}).get("python_version"),
+        },
+        "commit": data.get("commit_info", {}).get("id"),
+        "results": {
+            bench["fullname"]: {stat: bench["stats"][stat] for stat in STATS}
+            for bench in data.get("benchmarks", [])
+        },
+    }
+
+
+def compare(current: dict, baseline: dict, metric: str = "median",
+            threshold: float = 0.15) -> Tuple[List[str], List[str]]:
+    """Return (regressions, report lines) for current against baseline."""
+    regressions, lines = [], []
+    results: Dict[str, dict] = current["results"]
+    for name, base in sorted(baseline["results"].items()):
+        stats = results.get(name)
+        if stats is None:
+            lines.append(f"  ?  {name}: missing from current run")
+            continue
+        change = stats[metric] / base[metric] - 1 if base[metric] else 0.0
+        marker = "✗" if change > threshold else "✓"
+        line = (
+            f"  {marker}  {name}: {stats[metric] * 1000:.3f} ms vs {base[metric] * 1000:.3f} ms "
+            f"({change:+.1%})"
+        )
+        lines.append(line)
+        if change > threshold:
+            regressions.append(line.strip())
+    for name in sorted(set(results) - set(baseline["results"])):
+        lines.append(f"  +  {name}: new, {results[name][metric] * 1000:.3f} ms")
+    return regressions, lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("current", help="pytest-benchmark JSON output")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--metric", default="median", choices=("min", "median", "mean"))
+    parser.add_argument("--threshold", type=float, default=0.15, help="Allowed fractional slowdown")
+    parser.add_argument("--save", action="store_true", help="Write the run as the new baseline")
+    args = parser.parse_args()
+
+    current = load_run(args.current)
+
+    if args.save:
+        with open(args.baseline, "w") as f:
+            json.dump(current, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"📝 Saved {len(current['results'])} benchmarks to {args.baseline}")
+        return
+
+    baseline = load_run(args.baseline)
+    regressions, lines = compare(current, baseline, args.metric, args.threshold)
+    print(f"Benchmark {args.metric} vs baseline (threshold {args.threshold:.0%})\n")
+    print("\n".join(lines))
+
+    if regressions:
+        print(f"\n❌ {len(regressions)} benchmark(s) regressed")
+        sys.exit(1)
+    print("\n✅ No regressions")
+
+
+if __name__ == "__main__":
+    main()
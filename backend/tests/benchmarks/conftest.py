@@ -0,0 +1,70 @@
+"""
+Fixtures for the micro-benchmark suite.
+
+Benchmarks only run when their directory (or a file in it) is passed on the
+command line, so the regular test run stays fast, and are skipped when
+pytest-benchmark is not installed:
+
+    pytest tests/benchmarks --benchmark-json=benchmark.json
+    python -m scripts.compare_benchmarks benchmark.json
+"""
+
+import asyncio
+import importlib.util
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+from app.services.ferry_integrations.base import FerryResult
+
+BENCHMARK_DIR = Path(__file__).parent
+HAS_PYTEST_BENCHMARK = importlib.util.find_spec("pytest_benchmark") is not None
+
+DEPARTURE = datetime.combine(date.today() + timedelta(days=30), datetime.min.time())
+
+
+def _requested(config) -> bool:
+    """Check whether the benchmark directory was named on the command line."""
+    for arg in config.args:
+        path = Path(arg.split("::")[0]).resolve()
+        if path == BENCHMARK_DIR or BENCHMARK_DIR in path.parents:
+            return True
+    return False
+
+
+def pytest_ignore_collect(collection_path, config):
+    if collection_path.suffix == ".py" and not (HAS_PYTEST_BENCHMARK and _requested(config)):
+        return True
+    return None
+
+
+@pytest.fixture
+def run_async():
+    """Run a coroutine to completion on a dedicated event loop (benchmark is sync)."""
+    loop = asyncio.new_event_loop()
+    yield loop.run_until_complete
+    loop.close()
+
+
+def make_search_results(count: int = 500) -> list:
+    """A result set shaped like a busy route search."""
+    cabins = ["interior", "exterior", "balcony", "suite", "deck"]
+    return [
+        FerryResult(
+            sailing_id=f"CTN_{i:05d}",
+            operator="CTN",
+            departure_port="TUNIS",
+            arrival_port="GENOA",
+            departure_time=DEPARTURE + timedelta(hours=i % 24),
+            arrival_time=DEPARTURE + timedelta(hours=i % 24 + 20),
+            vessel_name="Carthage",
+            prices={"adult": 85.0 + i % 40, "child": 42.5, "infant": 0.0, "vehicle": 120.0},
+            cabin_types=[
+                {"type": cabin, "name": cabin.title(), "price": 30.0 * (n + 1), "available": 5}
+                for n, cabin in enumerate(cabins)
+            ],
+            available_spaces={"passengers": 150, "vehicles": 40},
+        )
+        for i in range(count)
+    ]
@@ -0,0 +1,57 @@
+"""
+Benchmarks for booking responses and price predictions.
+"""
+
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.api.v1.bookings import booking_to_response
+from app.models.price_history import PriceHistory, RouteStatistics
+from app.services.price_prediction_service import PricePredictionService
+
+
+@pytest.fixture
+def route_history(db_session: Session) -> None:
+    """Thirty days of four-hourly snapshots for one route."""
+    now = datetime.utcnow()
+    for i in range(180):
+        price = 85.0 + (i % 12) * 1.5
+        db_session.add(PriceHistory(
+            route_id="marseille_tunis",
+            departure_port="marseille",
+            arrival_port="tunis",
+            recorded_at=now - timedelta(hours=4 * i),
+            departure_date=date.today() + timedelta(days=30),
+            price_adult=price,
+            lowest_price=price,
+            available_passengers=60 + i % 40,
+        ))
+    db_session.add(RouteStatistics(
+        route_id="marseille_tunis",
+        departure_port="marseille",
+        arrival_port="tunis",
+        avg_price_30d=92.0,
+        min_price_30d=85.0,
+        max_price_30d=101.5,
+        price_volatility_30d=5.0,
+    ))
+    db_session.commit()
+
+
+class TestBookingBenchmarks:
+    """Benchmark booking and pricing hot paths."""
+
+    def test_booking_to_response(self, benchmark, sample_booking_with_passengers):
+        """Benchmark converting a booking with passengers to BookingResponse."""
+        response = benchmark(booking_to_response, sample_booking_with_passengers)
+        assert len(response.passengers) == 2
+
+    def test_predict_price(self, benchmark, db_session: Session, route_history):
+        """Benchmark a single-date price prediction with route history."""
+        service = PricePredictionService(db_session)
+        departure = date.today() + timedelta(days=30)
+
+        result = benchmark(service.predict_price, "marseille_tunis", departure)
+        assert result.predicted_price > 0
@@ -0,0 +1,141 @@
+"""
+Benchmarks for PDF document generation.
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.config import settings
+from app.services import pdf_renderer
+from app.services.eticket_service import eticket_service
+from app.services.invoice_service import invoice_service
+
+DEPARTURE = datetime.now() + timedelta(days=14)
+
+BOOKING = {
+    "id": 1,
+    "booking_reference": "MR-BENCH001",
+    "operator": "CTN",
+    "departure_port": "Tunis",
+    "arrival_port": "Marseille",
+    "departure_time": DEPARTURE,
+    "arrival_time": DEPARTURE + timedelta(hours=20),
+    "vessel_name": "Carthage",
+    "is_round_trip": False,
+    "contact_first_name": "Marie",
+    "contact_last_name": "Dupont",
+    "contact_email": "marie@example.com",
+    "contact_phone": "+33612345678",
+    "total_passengers": 4,
+    "total_vehicles": 1,
+    "subtotal": 600.00,
+    "tax_amount": 60.00,
+    "total_amount": 660.00,
+    "currency": "EUR",
+    "cabin_supplement": 0,
+    "status": "CONFIRMED",
+}
+
+PASSENGERS = [
+    {"passenger_type": "ADULT", "first_name": "Marie", "last_name": "Dupont", "final_price": 150.0},
+    {"passenger_type": "ADULT", "first_name": "Paul", "last_name": "Dupont", "final_price": 150.0},
+    {"passenger_type": "CHILD", "first_name": "Lucas", "last_name": "Dupont", "final_price": 75.0},
+    {"passenger_type": "INFANT", "first_name": "Emma", "last_name": "Dupont", "final_price": 0.0},
+]
+
+VEHICLES = [
+    {"vehicle_type": "CAR", "make": "Peugeot", "model": "308", "license_plate": "AB-123-CD", "final_price": 225.0},
+]
+
+PAYMENT = {
+    "payment_method": "credit_card",
+    "stripe_payment_intent_id": "pi_bench_123",
+    "stripe_charge_id": "ch_bench_123",
+    "card_brand": "visa",
+    "card_last_four": "4242",
+}
+
+
+CONCURRENT_DOWNLOADS = 50
+
+
+def _eticket_booking(i: int = 0) -> dict:
+    return {
+        **BOOKING,
+        "booking_reference": f"MR-BENCH{i:03d}",
+        "departure_time": DEPARTURE.isoformat(),
+        "arrival_time": (DEPARTURE + timedelta(hours=20)).isoformat(),
+    }
+
+
+async def _downloads_with_lag(render) -> float:
+    """Render CONCURRENT_DOWNLOADS e-tickets at once; return the worst event loop stall."""
+    lags = []
+    done = False
+
+    async def heartbeat():
+        while not done:
+            start = time.perf_counter()
+            await asyncio.sleep(0.005)
+            lags.append(time.perf_counter() - start - 0.005)
+
+    monitor = asyncio.create_task(heartbeat())
+    await asyncio.sleep(0)
+    pdfs = await asyncio.gather(*(render(i) for i in range(CONCURRENT_DOWNLOADS)))
+    done = True
+    await monitor
+    assert all(pdf.startswith(b"%PDF") for pdf in pdfs)
+    return max(lags, default=0.0)
+
+
+@pytest.fixture
+def render_pool(monkeypatch):
+    """A started, pre-warmed render pool."""
+    monkeypatch.setattr(settings, "PDF_RENDER_PROCESSES", 2)
+    pdf_renderer.shutdown()
+    pdf_renderer.start()
+    for future in [pdf_renderer.get_executor().submit(pdf_renderer._ping) for _ in range(2)]:
+        future.result()
+    yield
+    pdf_renderer.shutdown()
+
+
+class TestDocumentBenchmarks:
+    """Benchmark e-ticket and invoice rendering."""
+
+    def test_generate_eticket(self, benchmark):
+        """Benchmark rendering an e-ticket with QR code."""
+        booking = {
+            **BOOKING,
+            "departure_time": DEPARTURE.isoformat(),
+            "arrival_time": (DEPARTURE + timedelta(hours=20)).isoformat(),
+        }
+        pdf = benchmark(eticket_service.generate_eticket, booking, PASSENGERS, VEHICLES)
+        assert pdf.startswith(b"%PDF")
+
+    def test_generate_invoice(self, benchmark):
+        """Benchmark rendering an invoice."""
+        pdf = benchmark(invoice_service.generate_invoice, BOOKING, PAYMENT, PASSENGERS, VEHICLES)
+        assert pdf.startswith(b"%PDF")
+
+    def test_concurrent_etickets_inline(self, benchmark, run_async):
+        """Benchmark 50 simultaneous e-ticket downloads rendered on the event loop."""
+        async def render(i):
+            return eticket_service.generate_eticket(_eticket_booking(i), PASSENGERS, VEHICLES)
+
+        lag = benchmark.pedantic(lambda: run_async(_downloads_with_lag(render)), rounds=3)
+        benchmark.extra_info["max_loop_lag_seconds"] = lag
+
+    def test_concurrent_etickets_process_pool(self, benchmark, run_async, render_pool):
+        """Benchmark 50 simultaneous e-ticket downloads rendered in the process pool."""
+        async def render(i):
+            return await pdf_renderer.render_pdf(
+                "eticket", booking=_eticket_booking(i), passengers=PASSENGERS, vehicles=VEHICLES
+            )
+
+        lag = benchmark.pedantic(lambda: run_async(_downloads_with_lag(render)), rounds=3)
+        benchmark.extra_info["max_loop_lag_seconds"] = lag
+        assert lag < 0.1
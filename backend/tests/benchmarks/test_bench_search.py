@@ -0,0 +1,95 @@
+"""
+Benchmarks for the ferry search response path.
+"""
+
+import copy
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.api.v1.ferries import adjust_availability_from_bookings
+from app.models.booking import Booking, BookingCabin, BookingStatusEnum
+from app.schemas.ferry import FerrySearchResponse
+from app.services.cache_service import cache_service
+from tests.benchmarks.conftest import DEPARTURE, make_search_results
+from tests.conftest import TestSessionLocal
+
+SEARCH_PARAMS = {
+    "departure_port": "TUNIS",
+    "arrival_port": "GENOA",
+    "departure_date": DEPARTURE.date().isoformat(),
+    "return_date": None,
+    "adults": 2,
+    "children": 1,
+    "infants": 0,
+    "vehicles": [{"type": "car", "length": 4.5}],
+    "operators": None,
+}
+
+
+@pytest.fixture
+def booked_sailings(db_session: Session, sample_cabin):
+    """Pending and confirmed bookings, with cabins, on 100 of the 500 sailings."""
+    for i in range(0, 500, 5):
+        booking = Booking(
+            sailing_id=f"CTN_{i:05d}",
+            operator="CTN",
+            departure_port="TUNIS",
+            arrival_port="GENOA",
+            departure_time=DEPARTURE,
+            booking_reference=f"MRBENCH{i:05d}",
+            contact_email="bench@example.com",
+            contact_first_name="Bench",
+            contact_last_name="Mark",
+            total_passengers=2,
+            total_vehicles=1,
+            subtotal=Decimal("200.00"),
+            total_amount=Decimal("220.00"),
+            currency="EUR",
+            status=BookingStatusEnum.CONFIRMED if i % 2 else BookingStatusEnum.PENDING,
+        )
+        booking.booking_cabins.append(BookingCabin(
+            cabin_id=sample_cabin.id, quantity=2, unit_price=Decimal("60.00"), total_price=Decimal("120.00"),
+        ))
+        db_session.add(booking)
+    db_session.commit()
+
+
+class TestSearchBenchmarks:
+    """Benchmark search result serialization and merging."""
+
+    def test_to_dict_and_response_validation(self, benchmark):
+        """Benchmark to_dict() plus FerrySearchResponse validation of 500 results."""
+        results = make_search_results()
+
+        def build_response():
+            return FerrySearchResponse(
+                results=[r.to_dict() for r in results],
+                total_results=len(results),
+                search_params=SEARCH_PARAMS,
+                operators_searched=["ctn"],
+            )
+
+        response = benchmark(build_response)
+        assert response.total_results == 500
+
+    def test_adjust_availability_from_bookings(self, benchmark, run_async, booked_sailings):
+        """Benchmark merging platform bookings into 500 cached result dicts."""
+        cached = [r.to_dict() for r in make_search_results()]
+
+        with patch("app.database.SessionLocal", TestSessionLocal):
+            adjusted = benchmark.pedantic(
+                lambda results: run_async(adjust_availability_from_bookings(results)),
+                setup=lambda: ((copy.deepcopy(cached),), {}),
+                rounds=30,
+            )
+
+        assert adjusted[0]["available_spaces"]["passengers"] == 148
+        assert adjusted[1]["available_spaces"]["passengers"] == 150
+
+    def test_generate_cache_key(self, benchmark):
+        """Benchmark cache key generation for a search."""
+        key = benchmark(cache_service._generate_cache_key, "ferry_search", SEARCH_PARAMS)
+        assert key.startswith("ferry_search:")
@@ -0,0 +1,43 @@
+"""
+Benchmarks for the WebSocket availability broadcast loop.
+"""
+
+import pytest
+
+from app.websockets.manager import WebSocketManager
+
+
+class NullWebSocket:
+    """WebSocket stand-in whose sends cost nothing, so only the loop is measured."""
+
+    def __init__(self):
+        self.sent = 0
+
+    async def send_text(self, message: str):
+        self.sent += 1
+
+
+@pytest.fixture
+def manager():
+    """A manager with 1000 route subscribers and 100 "all" subscribers."""
+    manager = WebSocketManager(redis_url="redis://localhost:6379/15")
+    for i in range(1100):
+        client_id = f"client-{i}"
+        channel = "all" if i >= 1000 else "TUNIS-GENOA"
+        manager.active_connections[client_id] = NullWebSocket()
+        manager.client_channels[client_id] = {channel}
+        manager.subscriptions.setdefault(channel, set()).add(client_id)
+    return manager
+
+
+class TestWebSocketBenchmarks:
+    """Benchmark availability fan-out."""
+
+    def test_broadcast_to_subscribers(self, benchmark, run_async, manager):
+        """Benchmark broadcasting one availability update to 1100 clients."""
+        payload = {"ferry_id": "CTN_00001", "type": "booking_created", "passengers_booked": 2}
+
+        benchmark(lambda: run_async(manager._broadcast_to_subscribers("availability:TUNIS-GENOA", payload)))
+
+        assert manager.active_connections["client-0"].sent >= 1
+        assert manager.active_connections["client-1099"].sent >= 1
@@ -10,6 +10,7 @@ To run tests with in-memory SQLite (default, faster):
 
 import os
 import sys
+import tempfile
 
 # Add the backend directory to the path FIRST
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -68,6 +69,9 @@ set_env_if_empty("SMTP_PASSWORD", "testpassword")
 set_env_if_empty("FROM_EMAIL", "test@test.com")
 set_env_if_empty("FROM_NAME", "Test")
 set_env_if_empty("BASE_URL", "http://localhost:3001")
+set_env_if_empty("DOCUMENT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "maritime-test-documents"))
+set_env_if_empty("PDF_RENDER_PROCESSES", "0")  # Render in threads so tests can patch the services
+set_env_if_empty("BOOKING_READ_CACHE_ENABLED", "false")  # Booking IDs repeat across tests sharing a Redis
 set_env_if_empty("LOG_LEVEL", "INFO")
 set_env_if_empty("GOOGLE_CLIENT_ID", "test-google-client-id")
 set_env_if_empty("GOOGLE_CLIENT_SECRET", "test-google-client-secret")
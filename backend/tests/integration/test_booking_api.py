@@ -6,7 +6,7 @@ import pytest
 from datetime import datetime, timedelta
 from decimal import Decimal
 from fastapi.testclient import TestClient
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 
 from app.models.booking import BookingStatusEnum
 
@@ -70,6 +70,105 @@ class TestBookingCreation:
         assert response.status_code == 422
 
 
+class TestBookingInventory:
+    """Test inventory reservation at booking creation."""
+
+    def _booking_data(self, email: str) -> dict:
+        departure = datetime.utcnow() + timedelta(days=10)
+        return {
+            "sailing_id": "CTN-INV-001",
+            "operator": "CTN",
+            "departure_port": "Tunis",
+            "arrival_port": "Marseille",
+            "departure_time": departure.isoformat(),
+            "arrival_time": (departure + timedelta(hours=20)).isoformat(),
+            "contact_info": {"email": email, "first_name": "Marie", "last_name": "Dupont"},
+            "passengers": [
+                {"type": "adult", "first_name": "Marie", "last_name": "Dupont"},
+                {"type": "adult", "first_name": "Paul", "last_name": "Dupont"},
+            ],
+        }
+
+    def test_sold_out_sailing_returns_409(self, client: TestClient, db_session):
+        """Test a booking for more places than are left fails with a clear sold-out error."""
+        from app.models.booking import Booking
+        from app.models.sailing_inventory import SailingInventory
+
+        db_session.add(SailingInventory(
+            sailing_id="CTN-INV-001", operator="CTN",
+            passenger_capacity=3, passengers_reserved=0,
+        ))
+        db_session.commit()
+
+        with patch(
+            "app.api.v1.bookings.ferry_service.create_booking",
+            new_callable=AsyncMock,
+            return_value=MagicMock(operator_reference="CTN-REF-1"),
+        ):
+            first = client.post("/api/v1/bookings/", json=self._booking_data("first@example.com"))
+            second = client.post("/api/v1/bookings/", json=self._booking_data("second@example.com"))
+
+        assert first.status_code == 200
+        assert second.status_code == 409
+        assert "Sold out" in second.json()["message"]
+        db_session.expire_all()
+        inventory = db_session.query(SailingInventory).one()
+        assert inventory.passengers_reserved == 2
+        booking = db_session.query(Booking).filter(Booking.contact_email == "first@example.com").one()
+        assert booking.extra_data["inventory"] == {
+            "CTN-INV-001": {"passengers": 2, "vehicles": 0, "cabins": 0}
+        }
+
+    def test_refresh_with_own_pending_booking_on_full_sailing(self, client: TestClient, db_session):
+        """Test a contact whose pending booking took the last places gets it back, not a 409."""
+        from app.models.sailing_inventory import SailingInventory
+
+        db_session.add(SailingInventory(
+            sailing_id="CTN-INV-001", operator="CTN",
+            passenger_capacity=2, passengers_reserved=0,
+        ))
+        db_session.commit()
+        booking_data = self._booking_data("first@example.com")
+
+        with patch(
+            "app.api.v1.bookings.ferry_service.create_booking",
+            new_callable=AsyncMock,
+            return_value=MagicMock(operator_reference="CTN-REF-1"),
+        ):
+            first = client.post("/api/v1/bookings/", json=booking_data)
+            refreshed = client.post("/api/v1/bookings/", json=booking_data)
+            other = client.post("/api/v1/bookings/", json=self._booking_data("second@example.com"))
+
+        assert first.status_code == 200
+        assert refreshed.status_code == 200
+        assert refreshed.json()["id"] == first.json()["id"]
+        assert other.status_code == 409
+        db_session.expire_all()
+        assert db_session.query(SailingInventory).one().passengers_reserved == 2
+
+    @pytest.mark.parametrize("url", ["/api/v1/bookings/{id}/add-cabin", "/api/v1/cabins/booking/{id}/add"])
+    def test_added_cabin_reserves_inventory(self, client: TestClient, db_session, test_booking, sample_cabin, url):
+        """Test cabins added after booking take the last cabin once and are recorded for release."""
+        from app.models.sailing_inventory import SailingInventory
+
+        db_session.add(SailingInventory(
+            sailing_id="TEST-SAIL-001", operator="CTN",
+            cabin_capacity=2, cabins_reserved=1,
+        ))
+        db_session.commit()
+        body = {"cabin_id": sample_cabin.id, "quantity": 1, "journey_type": "outbound"}
+
+        first = client.post(url.format(id=test_booking.id), json=body)
+        second = client.post(url.format(id=test_booking.id), json=body)
+
+        assert first.status_code == 200
+        assert second.status_code == 409
+        assert "Sold out" in second.json()["message"]
+        db_session.expire_all()
+        assert db_session.query(SailingInventory).one().cabins_reserved == 2
+        assert test_booking.extra_data["inventory"]["TEST-SAIL-001"]["cabins"] == 1
+
+
 class TestBookingRetrieval:
     """Test booking retrieval endpoints."""
 
@@ -129,6 +228,283 @@ class TestBookingRetrieval:
         assert "bookings" in data or "items" in data or "data" in data
 
 
+class TestBookingListPagination:
+    """Test cursor pagination, totals and the summary view of booking lists."""
+
+    def _bookings(self, db_session, user_id, count: int):
+        """Bookings in pairs sharing a created_at, to exercise the id tie-break."""
+        from app.models.booking import Booking
+
+        base = datetime(2026, 10, 1, 12, 0, 0)
+        bookings = []
+        for i in range(count):
+            booking = Booking(
+                user_id=user_id,
+                sailing_id="CTN-LIST-001",
+                operator="CTN",
+                departure_port="Tunis",
+                arrival_port="Marseille",
+                departure_time=base + timedelta(days=30),
+                booking_reference=f"MR-LIST{i:04d}",
+                contact_email="testuser@example.com",
+                contact_first_name="Test",
+                contact_last_name="User",
+                total_passengers=1,
+                total_vehicles=0,
+                subtotal=Decimal("150.00"),
+                tax_amount=Decimal("15.00"),
+                total_amount=Decimal("165.00"),
+                currency="EUR",
+                status=BookingStatusEnum.CONFIRMED,
+                created_at=base + timedelta(minutes=i // 2),
+            )
+            db_session.add(booking)
+            bookings.append(booking)
+        db_session.commit()
+        return sorted(bookings, key=lambda b: (b.created_at, b.id), reverse=True)
+
+    def _walk(self, client, url, headers, **params):
+        pages = [client.get(url, headers=headers, params=params).json()]
+        while pages[-1]["next_cursor"]:
+            pages.append(client.get(
+                url, headers=headers, params={**params, "cursor": pages[-1]["next_cursor"]}
+            ).json())
+        return pages
+
+    def test_cursor_walk_returns_each_booking_once(
+        self, client: TestClient, auth_headers, db_session, test_user
+    ):
+        """Test following next_cursor visits every booking once, newest first."""
+        bookings = self._bookings(db_session, test_user.id, 7)
+
+        pages = self._walk(client, "/api/v1/bookings/", auth_headers, page_size=3)
+
+        assert [len(page["bookings"]) for page in pages] == [3, 3, 1]
+        assert [b["id"] for page in pages for b in page["bookings"]] == [b.id for b in bookings]
+        assert pages[0]["total_count"] == 7 and pages[0]["total_pages"] == 3
+        assert pages[1]["total_count"] is None
+
+    def test_page_numbers_still_supported(
+        self, client: TestClient, auth_headers, db_session, test_user
+    ):
+        """Test page-number requests page the same ordering."""
+        bookings = self._bookings(db_session, test_user.id, 5)
+
+        response = client.get("/api/v1/bookings/", headers=auth_headers, params={"page": 2, "page_size": 2})
+
+        data = response.json()
+        assert [b["id"] for b in data["bookings"]] == [b.id for b in bookings[2:4]]
+        assert data["next_cursor"]
+
+    def test_summary_view_skips_related_data(
+        self, client: TestClient, auth_headers, db_session, test_user
+    ):
+        """Test view=summary selects booking columns only and loads no relationships."""
+        from sqlalchemy import event
+        from tests.integration.conftest import TEST_ENGINE
+
+        self._bookings(db_session, test_user.id, 2)
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(TEST_ENGINE, "before_cursor_execute", record)
+        try:
+            response = client.get(
+                "/api/v1/bookings/", headers=auth_headers, params={"view": "summary", "total": "none"}
+            )
+        finally:
+            event.remove(TEST_ENGINE, "before_cursor_execute", record)
+
+        data = response.json()
+        assert response.status_code == 200
+        assert data["bookings"][0]["status"] == "CONFIRMED"
+        assert "passengers" not in data["bookings"][0]
+        booking_selects = [s for s in statements if "FROM bookings" in s]
+        assert len(booking_selects) == 1
+        assert "extra_data" not in booking_selects[0]
+        assert not any("booking_passengers" in s or "booking_cabins" in s for s in statements)
+
+    def test_estimated_total_capped(
+        self, client: TestClient, auth_headers, db_session, test_user
+    ):
+        """Test total=estimate stops counting at the cap and says so."""
+        self._bookings(db_session, test_user.id, 5)
+
+        with patch("app.api.pagination.settings.LIST_COUNT_ESTIMATE_CAP", 3):
+            capped = client.get("/api/v1/bookings/", headers=auth_headers, params={"total": "estimate"}).json()
+        exact = client.get("/api/v1/bookings/", headers=auth_headers, params={"total": "estimate"}).json()
+
+        assert (capped["total_count"], capped["total_is_estimate"]) == (3, True)
+        assert (exact["total_count"], exact["total_is_estimate"]) == (5, False)
+
+    def test_invalid_cursor_rejected(self, client: TestClient, auth_headers):
+        """Test a malformed cursor fails with 400."""
+        response = client.get("/api/v1/bookings/", headers=auth_headers, params={"cursor": "not-a-cursor"})
+
+        assert response.status_code == 400
+        assert response.json()["message"] == "Invalid cursor"
+
+    def test_admin_list_cursor_walk(
+        self, client: TestClient, admin_auth_headers, db_session, test_user
+    ):
+        """Test the admin booking list pages by cursor across all users."""
+        bookings = self._bookings(db_session, test_user.id, 5)
+
+        pages = self._walk(client, "/api/v1/admin/bookings", admin_auth_headers, limit=2)
+
+        assert [b["id"] for page in pages for b in page["bookings"]] == [b.id for b in bookings]
+        assert pages[0]["total"] == 5
+        assert pages[0]["bookings"][0]["status"] == "CONFIRMED"
+
+
+class TestBookingReadCache:
+    """Test the booking detail endpoints served from the read-model cache."""
+
+    @pytest.fixture
+    def read_cache(self):
+        """Enabled read cache on an in-memory Redis, used by the booking endpoints."""
+        from app.services.booking_read_cache import BookingReadCache
+        from tests.unit.test_services.test_booking_read_cache import FakeRedis
+
+        service = BookingReadCache(MagicMock(redis_client=FakeRedis()))
+        with patch("app.services.booking_read_cache.settings.BOOKING_READ_CACHE_ENABLED", True), \
+                patch("app.api.v1.bookings.booking_read_cache", service), \
+                patch("app.api.v1.cabins.booking_read_cache", service):
+            yield service
+
+    def _guest_booking(self, db_session, status=BookingStatusEnum.CONFIRMED, **kwargs):
+        from app.models.booking import Booking
+
+        booking = Booking(
+            sailing_id="CTN-001",
+            operator="CTN",
+            departure_port="Tunis",
+            arrival_port="Marseille",
+            departure_time=datetime.utcnow() + timedelta(days=7),
+            booking_reference="MR-READ001",
+            contact_email="guest@example.com",
+            contact_first_name="Guest",
+            contact_last_name="User",
+            total_passengers=1,
+            total_vehicles=0,
+            subtotal=Decimal("150.00"),
+            tax_amount=Decimal("15.00"),
+            total_amount=Decimal("165.00"),
+            currency="EUR",
+            status=status,
+            **kwargs,
+        )
+        db_session.add(booking)
+        db_session.commit()
+        return booking
+
+    def _statements(self, fn):
+        """Run fn and return its result and the SQL statements it executed."""
+        from sqlalchemy import event
+        from tests.integration.conftest import TEST_ENGINE
+
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(TEST_ENGINE, "before_cursor_execute", record)
+        try:
+            result = fn()
+        finally:
+            event.remove(TEST_ENGINE, "before_cursor_execute", record)
+        return result, statements
+
+    def test_repeated_read_is_one_redis_get(self, client, db_session, read_cache):
+        """Test a cached booking is served without touching the database."""
+        booking = self._guest_booking(db_session)
+        first = client.get(f"/api/v1/bookings/{booking.id}")
+        read_cache.redis.gets = 0
+
+        second, statements = self._statements(lambda: client.get(f"/api/v1/bookings/{booking.id}"))
+
+        assert second.status_code == first.status_code == 200
+        assert second.json() == first.json()
+        assert statements == []
+        assert read_cache.redis.gets == 1
+
+    def test_reference_reads_check_email(self, client, db_session, read_cache):
+        """Test cached reference reads still require the contact email."""
+        booking = self._guest_booking(db_session)
+        url = f"/api/v1/bookings/reference/{booking.booking_reference}"
+        assert client.get(url, params={"email": "guest@example.com"}).status_code == 200
+
+        wrong, statements = self._statements(lambda: client.get(url, params={"email": "other@example.com"}))
+        lookup = client.get(
+            f"/api/v1/bookings/lookup/{booking.booking_reference}", params={"email": "Guest@Example.com"}
+        )
+
+        assert wrong.status_code == 404
+        assert statements == []
+        assert lookup.status_code == 200
+        assert lookup.json()["booking_reference"] == "MR-READ001"
+
+    def test_cached_access_denied_to_other_users(self, client, db_session, read_cache, test_user):
+        """Test a cached booking owned by a user is not served to anonymous callers."""
+        booking = self._guest_booking(db_session, user_id=test_user.id)
+
+        assert client.get(f"/api/v1/bookings/{booking.id}").status_code == 403
+        assert read_cache.get_by_id(booking.id) is not None
+        assert client.get(f"/api/v1/bookings/{booking.id}").status_code == 403
+
+    def test_update_invalidates(self, client, db_session, read_cache, test_user, auth_headers):
+        """Test a write is visible on the next read."""
+        booking = self._guest_booking(db_session, user_id=test_user.id)
+        url = f"/api/v1/bookings/{booking.id}"
+        assert client.get(url, headers=auth_headers).json()["special_requests"] is None
+
+        update = client.put(url, json={"special_requests": "Window seat"}, headers=auth_headers)
+
+        assert update.status_code == 200
+        assert read_cache.get_by_id(booking.id) is None
+        assert client.get(url, headers=auth_headers).json()["special_requests"] == "Window seat"
+
+    def test_cabin_update_invalidates(self, client, db_session, read_cache, sample_cabin, admin_auth_headers):
+        """Test editing a cabin is visible on bookings that show it."""
+        booking = self._guest_booking(db_session, cabin_id=sample_cabin.id)
+        url = f"/api/v1/bookings/{booking.id}"
+        assert client.get(url).json()["cabin_name"] == "Inside Twin"
+
+        update = client.patch(
+            f"/api/v1/cabins/{sample_cabin.id}", json={"name": "Inside Twin Deluxe"}, headers=admin_auth_headers
+        )
+
+        assert update.status_code == 200
+        assert read_cache.get_by_id(booking.id) is None
+        assert client.get(url).json()["cabin_name"] == "Inside Twin Deluxe"
+
+    def test_operator_reference_invalidates(self, client, db_session, read_cache):
+        """Test a booking read before its operator reference was saved is not served stale."""
+        from app.models.booking import Booking
+
+        async def confirm_with_operator(**kwargs):
+            # A concurrent read caches the booking between the two commits
+            booking = db_session.query(Booking).filter(Booking.contact_email == "first@example.com").one()
+            read_cache.store(MagicMock(
+                id=booking.id, booking_reference=booking.booking_reference,
+                contact_email=booking.contact_email,
+                model_dump_json=MagicMock(return_value='{"operator_booking_reference":null}'),
+            ), user_id=None, guest_access=True)
+            return MagicMock(operator_reference="CTN-REF-1")
+
+        with patch("app.api.v1.bookings.ferry_service.create_booking", side_effect=confirm_with_operator):
+            created = client.post(
+                "/api/v1/bookings/", json=TestBookingInventory()._booking_data("first@example.com")
+            )
+
+        assert created.status_code == 200
+        booking_id = created.json()["id"]
+        assert read_cache.get_by_id(booking_id) is None
+        assert client.get(f"/api/v1/bookings/{booking_id}").json()["operator_booking_reference"] == "CTN-REF-1"
+
+
 class TestBookingCancellation:
     """Test booking cancellation endpoints."""
 
@@ -227,6 +603,32 @@ class TestBookingInvoice:
         assert response.status_code in [200, 400, 404]
 
 
+class TestBookingETicket:
+    """Test e-ticket downloads served from the document cache."""
+
+    def test_eticket_cached_and_revalidated(
+        self, client: TestClient, auth_headers, confirmed_booking, tmp_path
+    ):
+        """Test the PDF is rendered once, carries an ETag and revalidates with 304."""
+        from app.services.document_cache import document_cache
+        from app.services.eticket_service import eticket_service
+
+        url = f"/api/v1/bookings/{confirmed_booking.id}/eticket"
+        with patch.object(document_cache, "directory", str(tmp_path)), \
+                patch.object(eticket_service, "generate_eticket", wraps=eticket_service.generate_eticket) as render:
+            first = client.get(url, headers=auth_headers)
+            second = client.get(url, headers=auth_headers)
+            revalidated = client.get(url, headers={**auth_headers, "If-None-Match": first.headers["ETag"]})
+
+        assert first.status_code == 200
+        assert first.headers["content-type"] == "application/pdf"
+        assert first.content.startswith(b"%PDF")
+        assert second.content == first.content
+        assert second.headers["ETag"] == first.headers["ETag"]
+        assert revalidated.status_code == 304
+        assert render.call_count == 1
+
+
 class TestCancellationProtection:
     """Test cancellation protection feature (7-day restriction)."""
 
@@ -0,0 +1,156 @@
+"""
+Unit tests for Idempotency-Key handling on booking and payment creation.
+"""
+
+import hashlib
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from unittest.mock import MagicMock
+
+from app.idempotency import IdempotencyMiddleware, IdempotencyStore, match_route
+
+
+class FakeRedis:
+    """In-memory subset of the redis-py client used by the store."""
+
+    def __init__(self):
+        self.strings = {}
+        self.expiries = {}
+
+    def set(self, key, value, nx=False, ex=None, get=False):
+        existing = self.strings.get(key)
+        if nx and existing is not None:
+            return existing if get else None
+        self.strings[key] = value
+        self.expiries[key] = ex
+        return existing if get else True
+
+    def delete(self, key):
+        self.strings.pop(key, None)
+
+
+@pytest.fixture
+def redis():
+    return FakeRedis()
+
+
+@pytest.fixture
+def app(redis):
+    """Minimal app with an idempotent route that counts its executions."""
+    cache = MagicMock()
+    cache.redis_client = redis
+    app = FastAPI()
+    app.add_middleware(IdempotencyMiddleware, store=IdempotencyStore(cache))
+    app.state.calls = 0
+
+    @app.post("/api/v1/payments/create-intent")
+    async def create_intent(payload: dict):
+        app.state.calls += 1
+        if payload.get("fail"):
+            raise HTTPException(status_code=503, detail="Stripe unavailable")
+        return {"client_secret": f"pi_{app.state.calls}_secret", "amount": payload["amount"]}
+
+    @app.post("/api/v1/payments/other")
+    async def other():
+        app.state.calls += 1
+        return {"ok": True}
+
+    return app
+
+
+def _post(client, path="/api/v1/payments/create-intent", key="key-1", token="user-a", **payload):
+    headers = {"Authorization": f"Bearer {token}"}
+    if key is not None:
+        headers["Idempotency-Key"] = key
+    return client.post(path, json=payload or {"amount": 100}, headers=headers)
+
+
+class TestIdempotencyMiddleware:
+    """Test storing and replaying responses by Idempotency-Key."""
+
+    def test_retry_replays_stored_response(self, app, redis):
+        """Test a retried request gets the first response without re-running the endpoint."""
+        client = TestClient(app)
+
+        first = _post(client)
+        retry = _post(client)
+
+        assert app.state.calls == 1
+        assert retry.status_code == first.status_code == 200
+        assert retry.json() == first.json() == {"client_secret": "pi_1_secret", "amount": 100}
+        assert retry.headers["idempotent-replayed"] == "true"
+        assert "idempotent-replayed" not in first.headers
+        assert list(redis.expiries.values()) == [86400]
+
+    def test_keys_scoped_to_caller(self, app):
+        """Test the same key from another user runs separately."""
+        client = TestClient(app)
+
+        _post(client, token="user-a")
+        other = _post(client, token="user-b")
+
+        assert app.state.calls == 2
+        assert other.json()["client_secret"] == "pi_2_secret"
+
+    def test_different_body_rejected(self, app):
+        """Test reusing a key with a different request body fails with 422."""
+        client = TestClient(app)
+
+        _post(client, amount=100)
+        response = _post(client, amount=250)
+
+        assert response.status_code == 422
+        assert "different request body" in response.json()["message"]
+        assert app.state.calls == 1
+
+    def test_in_flight_request_gets_409(self, app, redis):
+        """Test a retry while the first request is still running is told to retry later."""
+        client = TestClient(app)
+        store = IdempotencyStore(MagicMock(redis_client=redis))
+        key = store.key("POST", "/api/v1/payments/create-intent", "Bearer user-a", "key-1")
+        fingerprint = hashlib.sha256(b'{"amount":100}').hexdigest()
+        assert store.claim(key, fingerprint) == (True, None)
+
+        response = _post(client)
+
+        assert response.status_code == 409
+        assert response.headers["retry-after"] == "1"
+        assert app.state.calls == 0
+
+    def test_server_error_not_stored(self, app, redis):
+        """Test a 5xx releases the key so the retry runs again."""
+        client = TestClient(app)
+
+        assert _post(client, fail=True).status_code == 503
+        assert redis.strings == {}
+        assert _post(client, fail=True).status_code == 503
+        assert app.state.calls == 2
+
+    def test_requests_without_key_or_other_routes_untouched(self, app, redis):
+        """Test only covered routes with the header are stored."""
+        client = TestClient(app)
+
+        _post(client, key=None)
+        _post(client, key=None)
+        _post(client, path="/api/v1/payments/other")
+
+        assert app.state.calls == 3
+        assert redis.strings == {}
+
+    def test_redis_unavailable_runs_request(self, app, redis):
+        """Test requests still run when Redis is down."""
+        redis.set = MagicMock(side_effect=ConnectionError("redis down"))
+        client = TestClient(app)
+
+        assert _post(client).status_code == 200
+        assert _post(client).status_code == 200
+        assert app.state.calls == 2
+
+    def test_covered_routes(self):
+        """Test booking, payment intent and modification confirmation are covered."""
+        assert match_route("POST", "/api/v1/bookings/") == "create_booking"
+        assert match_route("POST", "/api/v1/payments/create-intent") == "create_payment_intent"
+        assert match_route("POST", "/api/v1/bookings/42/modifications/q-1/confirm") == "confirm_modification"
+        assert match_route("GET", "/api/v1/bookings/") is None
+        assert match_route("POST", "/api/v1/bookings/42/cancel") is None
@@ -0,0 +1,48 @@
+"""
+Unit tests for the orjson response class.
+"""
+
+import numpy as np
+import orjson
+from datetime import datetime, date
+from decimal import Decimal
+from fastapi.encoders import jsonable_encoder
+from fastapi.testclient import TestClient
+
+from app.models.booking import BookingStatusEnum
+from app.responses import FastJSONResponse, PYDANTIC_JSON_FAST_PATH, DEFAULT_RESPONSE_CLASS
+from app.schemas.ferry import VehicleInfo, VehicleType
+
+
+class TestFastJSONResponse:
+    """Test FastJSONResponse rendering."""
+
+    def test_matches_jsonable_encoder(self):
+        """Test Decimal, datetime, date, enum and model values render like FastAPI's encoder."""
+        content = {
+            "total_amount": Decimal("187.50"),
+            "whole_amount": Decimal("200"),
+            "status": BookingStatusEnum.CONFIRMED,
+            "departure_time": datetime(2026, 6, 1, 19, 30),
+            "departure_date": date(2026, 6, 1),
+            "vehicle": VehicleInfo(type=VehicleType.CAR),
+        }
+
+        rendered = orjson.loads(FastJSONResponse(content).body)
+
+        assert rendered == orjson.loads(orjson.dumps(jsonable_encoder(content)))
+        assert rendered["whole_amount"] == 200 and isinstance(rendered["whole_amount"], int)
+
+    def test_numpy_and_non_string_keys(self):
+        """Test numpy values (price predictions) and date keys serialize."""
+        rendered = orjson.loads(FastJSONResponse({date(2026, 6, 1): np.float64(92.5)}).body)
+
+        assert rendered == {"2026-06-01": 92.5}
+
+    def test_app_keeps_pydantic_fast_path(self, client: TestClient):
+        """Test the app only overrides the response class when FastAPI lacks its JSON fast path."""
+        if PYDANTIC_JSON_FAST_PATH:
+            assert DEFAULT_RESPONSE_CLASS.value is not FastJSONResponse
+        else:
+            assert DEFAULT_RESPONSE_CLASS is FastJSONResponse
+        assert client.get("/health").status_code == 200
@@ -0,0 +1,122 @@
+"""
+Unit tests for request tracing and the Server-Timing header.
+"""
+
+import asyncio
+import json
+
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, text
+
+from app.tracing import (
+    InMemorySpanExporter,
+    JsonFileSpanExporter,
+    finish_trace,
+    instrument_sqlalchemy,
+    set_exporter,
+    span,
+    start_trace,
+    traced,
+)
+
+
+@traced("cache")
+def cached_lookup():
+    return "hit"
+
+
+@traced("operator")
+async def operator_call(delay: float):
+    await asyncio.sleep(delay)
+
+
+class TestTracing:
+    """Test spans, stage timings and exporters."""
+
+    def test_spans_nest_and_export(self):
+        """Test spans record parents, errors and reach the exporter."""
+        exporter = InMemorySpanExporter()
+        set_exporter(exporter)
+        try:
+            handle = start_trace("GET /test")
+            with span("db.query") as outer:
+                assert cached_lookup() == "hit"
+            try:
+                with span("operator.search", operator="ctn"):
+                    raise ValueError("boom")
+            except ValueError:
+                pass
+            trace = finish_trace(handle)
+        finally:
+            set_exporter(None)
+
+        names = [s.name for s in exporter.spans]
+        assert names == ["GET /test", "db.query", "cache.cached_lookup", "operator.search"]
+        assert exporter.spans[2].parent_id == outer.span_id
+        assert exporter.spans[3].error == "ValueError"
+        assert exporter.spans[3].attributes == {"operator": "ctn"}
+        assert set(trace.stage_timings()) == {"db", "cache", "operator"}
+
+    async def test_concurrent_spans_count_once(self):
+        """Test overlapping operator calls from gather add wall time, not the sum."""
+        handle = start_trace("POST /search")
+        await asyncio.gather(operator_call(0.05), operator_call(0.05), operator_call(0.05))
+        trace = finish_trace(handle)
+
+        assert len([s for s in trace.spans if s.stage == "operator"]) == 3
+        assert 45 <= trace.stage_timings()["operator"] < 120
+        assert "operator;dur=" in trace.server_timing()
+
+    def test_no_trace_is_noop(self):
+        """Test instrumented code runs untraced outside a request or task."""
+        with span("cache.get") as recorded:
+            assert cached_lookup() == "hit"
+        assert recorded is None
+
+    def test_sqlalchemy_statements_recorded(self):
+        """Test engine events record statements as db spans."""
+        engine = create_engine("sqlite://")
+        instrument_sqlalchemy(engine)
+
+        handle = start_trace("task")
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        trace = finish_trace(handle)
+
+        db_spans = [s for s in trace.spans if s.stage == "db"]
+        assert [s.name for s in db_spans] == ["db.select"]
+        assert db_spans[0].attributes["statement"] == "SELECT 1"
+
+    def test_json_file_exporter(self, tmp_path):
+        """Test the local exporter writes OpenTelemetry-style JSON lines."""
+        path = tmp_path / "traces" / "spans.jsonl"
+        set_exporter(JsonFileSpanExporter(str(path)))
+        try:
+            handle = start_trace("task")
+            with span("cache.get"):
+                pass
+            finish_trace(handle)
+        finally:
+            set_exporter(None)
+
+        lines = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [line["name"] for line in lines] == ["task", "cache.get"]
+        assert lines[1]["parent_id"] == lines[0]["context"]["span_id"]
+        assert lines[1]["attributes"]["stage"] == "cache"
+        assert lines[1]["status"]["status_code"] == "OK"
+
+
+class TestServerTimingHeader:
+    """Test the middleware's Server-Timing header and stage histograms."""
+
+    def test_server_timing_and_histogram(self, client: TestClient):
+        """Test responses carry Server-Timing and stages are labelled by route template."""
+        labels = {"stage": "total", "operation": "GET /health"}
+        before = REGISTRY.get_sample_value("maritime_stage_duration_seconds_count", labels) or 0
+
+        response = client.get("/health")
+
+        assert response.status_code == 200
+        assert "total;dur=" in response.headers["Server-Timing"]
+        assert REGISTRY.get_sample_value("maritime_stage_duration_seconds_count", labels) == before + 1
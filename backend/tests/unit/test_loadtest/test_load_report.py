@@ -0,0 +1,82 @@
+"""
+Unit tests for load test reporting and the driver's helpers.
+"""
+
+import stripe
+
+from loadtest.driver import parse_routes, select_sailing, stripe_signature
+from loadtest.report import LatencyRecorder, compare, percentile
+
+
+def _report(p95=100.0, error_rate=0.0, per_second=10.0):
+    return {
+        "steps": {"search": {"p50_ms": 50.0, "p95_ms": p95, "p99_ms": 150.0, "error_rate": error_rate}},
+        "scenarios": {"per_second": per_second},
+    }
+
+
+class TestLoadReport:
+    """Test latency summaries and baseline comparison."""
+
+    def test_percentiles(self):
+        """Test nearest-rank percentiles."""
+        values = [float(v) for v in range(1, 101)]
+
+        assert percentile(values, 50) == 50
+        assert percentile(values, 95) == 95
+        assert percentile(values, 99) == 99
+        assert percentile([], 99) == 0.0
+
+    def test_summary(self):
+        """Test the summary reports counts, error rate, throughput and percentiles."""
+        recorder = LatencyRecorder()
+        for ms in range(1, 101):
+            recorder.record("search", ms / 1000, 200)
+        recorder.record("book", 0.5, 503, ok=False)
+        recorder.complete()
+        recorder.abandon("browse_only")
+
+        report = recorder.summary(duration_s=10.0, users=5)
+
+        assert report["steps"]["search"]["count"] == 100
+        assert report["steps"]["search"]["rps"] == 10.0
+        assert report["steps"]["search"]["p99_ms"] == 99.0
+        assert report["steps"]["book"]["error_rate"] == 1.0
+        assert report["steps"]["book"]["statuses"] == {"503": 1}
+        assert report["scenarios"] == {"completed": 1, "per_second": 0.1, "abandoned": {"browse_only": 1}}
+
+    def test_compare_flags_regressions(self):
+        """Test latency, error-rate and throughput regressions beyond tolerance are reported."""
+        baseline = _report()
+
+        assert compare(_report(p95=115.0), baseline, tolerance=0.2) == []
+        regressions = compare(_report(p95=130.0, error_rate=0.05, per_second=7.0), baseline, tolerance=0.2)
+
+        assert len(regressions) == 3
+        assert regressions[0].startswith("search p95_ms")
+
+
+class TestDriverHelpers:
+    """Test scenario helpers of the load driver."""
+
+    def test_select_cheapest_sailing_with_room(self):
+        """Test selection skips sailings without room for the party."""
+        results = [
+            {"sailing_id": "a", "prices": {"adult": 50.0}, "available_spaces": {"passengers": 1}},
+            {"sailing_id": "b", "prices": {"adult": 90.0}, "available_spaces": {"passengers": 10}},
+            {"sailing_id": "c", "prices": {"adult": 70.0}, "available_spaces": {"passengers": 10}},
+        ]
+
+        assert select_sailing(results, 2)["sailing_id"] == "c"
+        assert select_sailing(results, 20) is None
+
+    def test_webhook_signature_verifies_with_stripe(self):
+        """Test the signed webhook passes Stripe's own verification."""
+        payload = b'{"id": "evt_1", "object": "event"}'
+        header = stripe_signature(payload, "whsec_test")
+
+        assert stripe.WebhookSignature.verify_header(payload.decode(), header, "whsec_test")
+
+    def test_parse_routes(self):
+        """Test route specs parse into port pairs."""
+        assert parse_routes("TUNIS-GENOA, GENOA-TUNIS") == [("TUNIS", "GENOA"), ("GENOA", "TUNIS")]
@@ -0,0 +1,107 @@
+"""
+Unit tests for the load-test operator simulator, driven by the real integrations.
+"""
+
+import random
+import statistics
+import httpx
+import pytest
+from datetime import date, timedelta
+
+from app.services.ferry_integrations.base import BookingRequest, FerryAPIError, SearchRequest
+from app.services.ferry_integrations.ctn import CTNIntegration
+from app.services.ferry_integrations.gnv import GNVIntegration
+from loadtest.operator_simulator import LatencyProfile, SimulatorConfig, create_app
+
+
+DEPARTURE = date.today() + timedelta(days=20)
+
+
+def _integration(cls, app, prefix):
+    """Point a real integration at the simulator app in-process."""
+    integration = cls(api_key="sim", base_url=f"http://simulator/{prefix}")
+    integration.session = httpx.AsyncClient(transport=httpx.ASGITransport(app=app))
+    return integration
+
+
+def _search_request():
+    return SearchRequest(departure_port="TUNIS", arrival_port="GENOA", departure_date=DEPARTURE, adults=2)
+
+
+class TestOperatorSimulator:
+    """Test the simulated CTN, GNV and Stripe endpoints."""
+
+    async def test_ctn_search_and_book(self):
+        """Test CTNIntegration parses simulated sailings and books one of them."""
+        app = create_app(SimulatorConfig(sailings_per_day=3))
+        ctn = _integration(CTNIntegration, app, "ctn")
+
+        results = await ctn.search_ferries(_search_request())
+        again = await ctn.search_ferries(_search_request())
+        confirmation = await ctn.create_booking(BookingRequest(
+            sailing_id=results[0].sailing_id,
+            passengers=[{"first_name": "Load", "last_name": "Tester"}],
+            contact_info={"email": "load@example.com"},
+        ))
+
+        assert len(results) == 3
+        assert [r.sailing_id for r in results] == [r.sailing_id for r in again]
+        assert all(r.departure_time.date() == DEPARTURE for r in results)
+        assert results[0].prices["child"] == pytest.approx(results[0].prices["adult"] / 2, abs=0.01)
+        assert confirmation.status == "confirmed"
+        assert confirmation.total_amount == results[0].prices["adult"]
+        assert (await ctn.get_booking_status(confirmation.operator_reference))["status"] == "confirmed"
+
+    async def test_gnv_search(self):
+        """Test GNVIntegration parses the Italian-keyed simulated response."""
+        app = create_app(SimulatorConfig(sailings_per_day=2))
+        gnv = _integration(GNVIntegration, app, "gnv")
+
+        results = await gnv.search_ferries(_search_request())
+
+        assert len(results) == 2
+        assert results[0].operator == "GNV"
+        assert {c["type"] for c in results[0].cabin_types} == {"interior", "exterior", "suite"}
+        assert "passengers" in results[0].available_spaces
+
+    async def test_error_rate_surfaces_as_api_error(self):
+        """Test injected errors reach the integration as FerryAPIError."""
+        app = create_app(SimulatorConfig(error_rate=1.0))
+        ctn = _integration(CTNIntegration, app, "ctn")
+
+        with pytest.raises(FerryAPIError):
+            await ctn.search_ferries(_search_request())
+
+        assert app.state.simulator.stats["errors"]["ctn.search"] == 1
+
+    async def test_stripe_payment_intent(self):
+        """Test the Stripe endpoint answers form-encoded intent creation."""
+        app = create_app(SimulatorConfig())
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://simulator") as client:
+            response = await client.post(
+                "/stripe/v1/payment_intents",
+                data={"amount": "18750", "currency": "eur", "metadata[booking_id]": "42"},
+            )
+
+        intent = response.json()
+        assert intent["object"] == "payment_intent"
+        assert intent["id"].startswith("pi_sim_")
+        assert intent["amount"] == 18750
+        assert intent["metadata"] == {"booking_id": "42"}
+
+    def test_lognormal_latency_matches_median_and_p99(self):
+        """Test lognormal latency samples hit the configured median and p99."""
+        profile = LatencyProfile.parse("lognormal:400:2500")
+        rng = random.Random(1)
+
+        samples = sorted(profile.sample(rng) * 1000 for _ in range(20000))
+
+        assert statistics.median(samples) == pytest.approx(400, rel=0.05)
+        assert samples[int(len(samples) * 0.99)] == pytest.approx(2500, rel=0.15)
+
+    def test_invalid_latency_spec(self):
+        """Test malformed latency specs are rejected."""
+        with pytest.raises(ValueError):
+            LatencyProfile.parse("lognormal:400")
+        with pytest.raises(ValueError):
+            LatencyProfile.parse("uniform:500:100")
@@ -0,0 +1,90 @@
+"""
+Unit tests for the booking detail read-model cache.
+"""
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from app.services.booking_read_cache import READ_MODEL_VERSION, TOMBSTONE, BookingReadCache
+
+
+class FakeRedis:
+    """In-memory subset of the redis-py client used by the read cache."""
+
+    def __init__(self):
+        self.strings = {}
+        self.expiries = {}
+        self.gets = 0
+
+    def get(self, key):
+        self.gets += 1
+        return self.strings.get(key)
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.strings:
+            return None
+        self.strings[key] = value
+        self.expiries[key] = ex
+        return True
+
+    def pipeline(self):
+        return self
+
+    def execute(self):
+        return []
+
+
+@pytest.fixture
+def read_cache():
+    """Enabled read cache on an in-memory Redis."""
+    with patch("app.services.booking_read_cache.settings.BOOKING_READ_CACHE_ENABLED", True):
+        yield BookingReadCache(MagicMock(redis_client=FakeRedis()))
+
+
+class TestBookingReadCache:
+    """Test storing, reading and invalidating cached booking responses."""
+
+    def _response(self, **overrides):
+        return MagicMock(
+            id=42, booking_reference="MR-READ001", contact_email="guest@example.com",
+            model_dump_json=MagicMock(return_value='{"id":42}'), **overrides,
+        )
+
+    def test_stored_under_id_and_reference(self, read_cache):
+        """Test one store serves reads by ID and by reference with the access facts."""
+        read_cache.store(self._response(), user_id=7, guest_access=False)
+
+        access, body = read_cache.get_by_reference("MR-READ001")
+        assert read_cache.get_by_id(42) == (access, body)
+        assert access == {"user_id": 7, "guest_access": False, "contact_email": "guest@example.com"}
+        assert body == '{"id":42}'
+        assert all(key.startswith(f"booking_read:v{READ_MODEL_VERSION}:") for key in read_cache.redis.strings)
+
+    def test_invalidation_blocks_stale_refill(self, read_cache):
+        """Test a fill racing a write cannot bring back the state read before it."""
+        read_cache.store(self._response(), user_id=None, guest_access=True)
+        read_cache.invalidate(42, "MR-READ001")
+        read_cache.store(self._response(), user_id=None, guest_access=True)
+
+        assert read_cache.get_by_id(42) is None
+        assert read_cache.get_by_reference("MR-READ001") is None
+        assert set(read_cache.redis.strings.values()) == {TOMBSTONE}
+        assert set(read_cache.redis.expiries.values()) == {10}
+
+    def test_redis_errors_are_misses(self, read_cache):
+        """Test a Redis outage falls back to the database instead of failing reads."""
+        read_cache.redis.get = MagicMock(side_effect=ConnectionError("redis down"))
+        read_cache.redis.set = MagicMock(side_effect=ConnectionError("redis down"))
+
+        assert read_cache.get_by_id(42) is None
+        read_cache.store(self._response(), user_id=None, guest_access=True)
+        read_cache.invalidate(42, "MR-READ001")
+
+    def test_can_view(self):
+        """Test cached access facts follow validate_booking_access."""
+        owned = {"user_id": 7, "guest_access": False}
+        assert BookingReadCache.can_view(owned, MagicMock(id=7, is_admin=False))
+        assert BookingReadCache.can_view(owned, MagicMock(id=8, is_admin=True))
+        assert not BookingReadCache.can_view(owned, MagicMock(id=8, is_admin=False))
+        assert not BookingReadCache.can_view(owned, None)
+        assert BookingReadCache.can_view({"user_id": None, "guest_access": True}, None)
@@ -0,0 +1,248 @@
+"""
+Unit tests for search demand tracking and the background cache warmer.
+"""
+
+import pytest
+from collections import defaultdict
+from datetime import datetime, date, timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+from app.services.cache_warmer_service import (
+    CacheWarmerService,
+    SearchDemandTracker,
+    route_date_key,
+)
+from app.services.ferry_service import search_cache_params
+
+
+NOW = datetime(2026, 6, 1, 12, 0)
+DEPARTURE = date(2026, 6, 10)
+
+
+class FakeRedis:
+    """In-memory subset of the redis-py client used by the tracker."""
+
+    def __init__(self):
+        self.zsets = defaultdict(dict)
+        self.hashes = defaultdict(dict)
+        self.strings = {}
+
+    def ping(self):
+        return True
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+    def zincrby(self, key, amount, member):
+        self.zsets[key][member] = self.zsets[key].get(member, 0) + amount
+
+    def hincrby(self, key, field, amount):
+        self.hashes[key][field] = self.hashes[key].get(field, 0) + amount
+
+    def hgetall(self, key):
+        return {field: str(count) for field, count in self.hashes.get(key, {}).items()}
+
+    def expire(self, key, seconds):
+        return True
+
+    def zunionstore(self, dest, keys):
+        union = {}
+        for key in keys:
+            for member, score in self.zsets.get(key, {}).items():
+                union[member] = union.get(member, 0) + score
+        self.zsets[dest] = union
+
+    def zrevrange(self, key, start, end, withscores=False):
+        ranked = sorted(self.zsets.get(key, {}).items(), key=lambda item: -item[1])
+        return ranked[start:end + 1]
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.strings:
+            return None
+        self.strings[key] = value
+        return True
+
+    def delete(self, key):
+        self.zsets.pop(key, None)
+        self.strings.pop(key, None)
+
+    def eval(self, script, numkeys, key, token):
+        # Only the warmer's compare-and-delete release script is supported
+        if self.strings.get(key) == token:
+            self.delete(key)
+            return 1
+        return 0
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+        return queue
+
+    def execute(self):
+        return [getattr(self.redis, name)(*args, **kwargs) for name, args, kwargs in self.calls]
+
+
+@pytest.fixture
+def cache():
+    cache = MagicMock()
+    cache.redis_client = FakeRedis()
+    cache.is_available.return_value = True
+    cache.get_ttl.return_value = -2
+    return cache
+
+
+@pytest.fixture
+def ferry_service():
+    service = MagicMock()
+    service.get_available_operators.return_value = ["ctn", "gnv"]
+    service.search_ferries = AsyncMock(return_value=[])
+    service.build_date_prices = AsyncMock(return_value={"date_prices": []})
+    return service
+
+
+def _search_params(departure_date=DEPARTURE, adults=1):
+    return search_cache_params("TUNIS", "GENOA", departure_date, adults=adults)
+
+
+def _date_prices_params(center_date=DEPARTURE):
+    return {
+        "departure_port": "TUNIS",
+        "arrival_port": "GENOA",
+        "center_date": center_date.isoformat(),
+        "days_before": 3,
+        "days_after": 3,
+        "adults": 1,
+        "children": 0,
+        "infants": 0,
+        "return_date": None,
+    }
+
+
+class TestSearchDemandTracker:
+    """Test demand counters and ranking."""
+
+    def test_ranks_route_dates_across_window(self, cache):
+        """Test searches from earlier hours count and bookings outweigh searches."""
+        tracker = SearchDemandTracker(cache)
+        other_day = DEPARTURE + timedelta(days=1)
+
+        for _ in range(3):
+            tracker.record_search(_search_params(), now=NOW - timedelta(hours=2))
+        tracker.record_booking("tunis", "genoa", other_day, now=NOW)
+
+        ranked = tracker.top_route_dates(10, now=NOW)
+
+        assert ranked[0][0] == route_date_key("TUNIS", "GENOA", other_day.isoformat())
+        assert ranked[1] == (route_date_key("TUNIS", "GENOA", DEPARTURE.isoformat()), 3)
+
+    def test_ignores_searches_outside_window(self, cache):
+        """Test hourly buckets older than the window are not ranked."""
+        tracker = SearchDemandTracker(cache)
+        tracker.record_search(_search_params(), now=NOW - timedelta(hours=tracker.window_hours + 1))
+
+        assert tracker.top_route_dates(10, now=NOW) == []
+
+    def test_vehicle_searches_not_recorded(self, cache):
+        """Test searches the warmer cannot replay are skipped."""
+        tracker = SearchDemandTracker(cache)
+        tracker.record_search({**_search_params(), "vehicles": 1}, now=NOW)
+
+        assert tracker.top_route_dates(10, now=NOW) == []
+
+    def test_top_variants_ordered_by_count(self, cache):
+        """Test the most searched passenger mix comes first."""
+        tracker = SearchDemandTracker(cache)
+        tracker.record_search(_search_params(adults=1), now=NOW)
+        tracker.record_search(_search_params(adults=2), now=NOW)
+        tracker.record_search(_search_params(adults=2), now=NOW)
+
+        variants = tracker.top_variants(route_date_key("TUNIS", "GENOA", DEPARTURE.isoformat()), 2)
+
+        assert [v["adults"] for v in variants] == [2, 1]
+
+
+class TestCacheWarmerService:
+    """Test warming cycles."""
+
+    async def test_refreshes_missing_entries(self, cache, ferry_service):
+        """Test missing search and date price entries are rebuilt and cached."""
+        tracker = SearchDemandTracker(cache)
+        tracker.record_search(_search_params(), now=NOW)
+        tracker.record_date_prices(_date_prices_params(), now=NOW)
+        warmer = CacheWarmerService(ferry_service, cache=cache, tracker=tracker)
+
+        report = await warmer.warm(10, 10, operator_call_budget=100, refresh_before=90, now=NOW)
+
+        assert report.searches_refreshed == 1
+        assert report.date_prices_refreshed == 1
+        assert report.operator_calls == 2 + 7 * 2
+        ferry_service.cache_search_results.assert_called_once_with(_search_params(), [])
+        # Refreshed from the operators, not from aging operator sailings
+        assert ferry_service.search_ferries.call_args.kwargs["refresh_operator_cache"] is True
+        cache.set_date_prices.assert_called_once()
+
+    async def test_skips_entries_with_remaining_ttl(self, cache, ferry_service):
+        """Test entries further than refresh_before from expiry are left alone."""
+        cache.get_ttl.return_value = 200
+        tracker = SearchDemandTracker(cache)
+        tracker.record_search(_search_params(), now=NOW)
+        warmer = CacheWarmerService(ferry_service, cache=cache, tracker=tracker)
+
+        report = await warmer.warm(10, 10, operator_call_budget=100, refresh_before=90, now=NOW)
+
+        assert report.searches_refreshed == 0
+        assert report.skipped_fresh == 1
+        ferry_service.search_ferries.assert_not_called()
+
+    async def test_stops_at_operator_call_budget(self, cache, ferry_service):
+        """Test the cycle stops before exceeding the operator-call budget."""
+        tracker = SearchDemandTracker(cache)
+        for offset in range(3):
+            tracker.record_search(_search_params(DEPARTURE + timedelta(days=offset)), now=NOW)
+        warmer = CacheWarmerService(ferry_service, cache=cache, tracker=tracker)
+
+        report = await warmer.warm(10, 10, operator_call_budget=5, refresh_before=90, now=NOW)
+
+        assert report.searches_refreshed == 2
+        assert report.operator_calls == 4
+        assert report.budget_exhausted is True
+
+    async def test_skips_past_dates(self, cache, ferry_service):
+        """Test route/dates that already departed are not refreshed."""
+        tracker = SearchDemandTracker(cache)
+        tracker.record_search(_search_params(NOW.date() - timedelta(days=1)), now=NOW)
+        warmer = CacheWarmerService(ferry_service, cache=cache, tracker=tracker)
+
+        report = await warmer.warm(10, 10, operator_call_budget=100, refresh_before=90, now=NOW)
+
+        assert report.searches_refreshed == 0
+        ferry_service.search_ferries.assert_not_called()
+
+    def test_lock_prevents_overlapping_cycles(self, cache, ferry_service):
+        """Test only one warmer holds the lock at a time."""
+        warmer = CacheWarmerService(ferry_service, cache=cache)
+
+        assert warmer.acquire_lock() is True
+        assert warmer.acquire_lock() is False
+        warmer.release_lock()
+        assert warmer.acquire_lock() is True
+
+    def test_expired_lock_is_not_released_from_next_holder(self, cache, ferry_service):
+        """Test a cycle that outlived its lock cannot release the next cycle's lock."""
+        slow = CacheWarmerService(ferry_service, cache=cache)
+        assert slow.acquire_lock() is True
+
+        cache.redis_client.strings.clear()  # Lock TTL expired
+        next_cycle = CacheWarmerService(ferry_service, cache=cache)
+        assert next_cycle.acquire_lock() is True
+
+        slow.release_lock()
+        assert next_cycle.acquire_lock() is False
+        next_cycle.release_lock()
+        assert slow.acquire_lock() is True
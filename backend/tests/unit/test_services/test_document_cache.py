@@ -0,0 +1,80 @@
+"""
+Unit tests for the content-addressed PDF document cache.
+"""
+
+import os
+from datetime import datetime
+
+from app.config import settings
+from app.services.document_cache import DocumentCache
+
+
+class TestDocumentCache:
+    """Test keys, storage, eviction and ETag matching."""
+
+    def test_key_tracks_inputs_not_ordering(self):
+        """Test equal inputs share a key whatever their order, and changes alter it."""
+        booking = {"booking_reference": "MR1", "departure_time": datetime(2026, 7, 1, 20, 0), "total": 120}
+        reordered = dict(reversed(list(booking.items())))
+
+        key = DocumentCache.key("eticket", booking=booking, passengers=[])
+
+        assert key.startswith("eticket-")
+        assert DocumentCache.key("eticket", passengers=[], booking=reordered) == key
+        assert DocumentCache.key("eticket", booking={**booking, "total": 130}, passengers=[]) != key
+        assert DocumentCache.key("invoice", booking=booking, passengers=[]) != key
+
+    def test_renders_once_per_key(self, tmp_path):
+        """Test a document is rendered on the first request and read back afterwards."""
+        cache = DocumentCache(directory=str(tmp_path), max_bytes=10_000)
+        renders = []
+
+        def render():
+            renders.append(1)
+            return b"%PDF-1.4 ticket"
+
+        key = cache.key("eticket", booking={"id": 1})
+        assert cache.get_or_render(key, render) == b"%PDF-1.4 ticket"
+        assert cache.get_or_render(key, render) == b"%PDF-1.4 ticket"
+
+        assert len(renders) == 1
+        assert os.path.exists(tmp_path / "eticket" / f"{key}.pdf")
+
+    def test_least_recently_used_evicted(self, tmp_path):
+        """Test exceeding the size limit evicts the least recently used documents."""
+        cache = DocumentCache(directory=str(tmp_path), max_bytes=350)
+        keys = [cache.key("invoice", booking={"id": i}) for i in range(3)]
+        for age, key in zip((300, 200, 100), keys):
+            cache.put(key, b"x" * 100)
+            path = cache._path(key)
+            os.utime(path, (os.path.getmtime(path) - age,) * 2)
+
+        assert cache.get(keys[0]) is not None  # Hit refreshes the oldest
+        cache.put(cache.key("invoice", booking={"id": 3}), b"x" * 100)
+
+        assert cache.get(keys[0]) is not None
+        assert cache.get(keys[1]) is None
+        assert cache.get(keys[2]) is None
+
+    def test_disabled_always_renders(self, tmp_path, monkeypatch):
+        """Test DOCUMENT_CACHE_ENABLED=False bypasses storage."""
+        monkeypatch.setattr(settings, "DOCUMENT_CACHE_ENABLED", False)
+        cache = DocumentCache(directory=str(tmp_path))
+        renders = []
+
+        for _ in range(2):
+            cache.get_or_render("eticket-abc", lambda: renders.append(1) or b"%PDF")
+
+        assert len(renders) == 2
+        assert list(tmp_path.iterdir()) == []
+
+    def test_etag_matching(self):
+        """Test If-None-Match accepts weak, strong, listed and wildcard tags."""
+        key = "eticket-abc"
+
+        assert DocumentCache.etag(key) == 'W/"eticket-abc"'
+        assert DocumentCache.etag_matches('W/"eticket-abc"', key)
+        assert DocumentCache.etag_matches('"other", "eticket-abc"', key)
+        assert DocumentCache.etag_matches("*", key)
+        assert not DocumentCache.etag_matches('W/"eticket-abd"', key)
+        assert not DocumentCache.etag_matches(None, key)
@@ -0,0 +1,159 @@
+"""
+Unit tests for precomputed fare calendar grids.
+"""
+
+from datetime import datetime, date, timedelta
+from sqlalchemy.orm import Session
+
+from app.models.price_history import FareCalendarCache, PriceHistory
+from app.services.fare_calendar_service import (
+    CALENDAR_CACHE_TTL,
+    FareCalendarService,
+    month_bounds,
+    summarize_grid,
+)
+from app.api.v1.prices import calendar_days_from_grid
+
+
+ROUTE_ID = "marseille_tunis"
+
+NOW = datetime(2025, 6, 5, 12, 0, 0)
+
+
+def _add_snapshot(db: Session, departure: date, hours_ago: int, price: float,
+                  available_passengers: int = 100) -> None:
+    db.add(PriceHistory(
+        route_id=ROUTE_ID,
+        departure_port="marseille",
+        arrival_port="tunis",
+        recorded_at=NOW - timedelta(hours=hours_ago),
+        departure_date=departure,
+        price_adult=price,
+        lowest_price=price,
+        highest_price=price + 30,
+        num_ferries=2,
+        available_passengers=available_passengers,
+    ))
+
+
+class TestHelpers:
+    """Test grid helper functions."""
+
+    def test_month_bounds_december(self):
+        """Test month bounds roll over into the next year."""
+        assert month_bounds(2025, 12) == (date(2025, 12, 1), date(2025, 12, 31))
+
+    def test_summarize_grid_trends(self):
+        """Test trend labels relative to the month average."""
+        grid = {
+            "10": {"price": 70.0},
+            "11": {"price": 100.0},
+            "12": {"price": 130.0},
+            "13": {"price": None},
+        }
+        summary = summarize_grid(grid)
+
+        assert summary == {
+            "month_lowest": 70.0,
+            "month_highest": 130.0,
+            "month_average": 100.0,
+            "cheapest_date": 10,
+        }
+        assert grid["10"]["trend"] == "falling"
+        assert grid["11"]["trend"] == "stable"
+        assert grid["12"]["trend"] == "rising"
+        assert "trend" not in grid["13"]
+
+
+class TestBuildMonth:
+    """Test building grids from price_history."""
+
+    def test_uses_latest_snapshot_and_skips_past_days(self, db_session: Session):
+        """Test each day uses its most recent snapshot and past days are dropped."""
+        _add_snapshot(db_session, date(2025, 6, 3), 1, 50.0)
+        _add_snapshot(db_session, date(2025, 6, 10), 48, 90.0)
+        _add_snapshot(db_session, date(2025, 6, 10), 2, 80.0)
+        _add_snapshot(db_session, date(2025, 6, 12), 2, 120.0, available_passengers=0)
+        _add_snapshot(db_session, date(2025, 7, 1), 2, 60.0)
+        db_session.commit()
+
+        grid = FareCalendarService(db_session).build_month(ROUTE_ID, 2025, 6, today=NOW.date())
+
+        assert set(grid) == {"10", "12"}
+        assert grid["10"]["price"] == 80.0
+        assert grid["10"]["highest"] == 110.0
+        assert grid["10"]["available"] is True
+        assert grid["12"]["available"] is False
+
+    def test_refresh_and_expiry(self, db_session: Session):
+        """Test refreshed grids are served until expires_at."""
+        _add_snapshot(db_session, date(2025, 6, 10), 2, 80.0)
+        db_session.commit()
+
+        service = FareCalendarService(db_session)
+        cache = service.refresh_month(ROUTE_ID, 2025, 6, now=NOW)
+        db_session.commit()
+
+        assert cache.month_lowest == 80.0
+        assert cache.cheapest_date == 10
+        assert service.get_month(ROUTE_ID, 2025, 6, now=NOW) is not None
+        assert service.get_month(ROUTE_ID, 2025, 6, now=NOW + CALENDAR_CACHE_TTL) is None
+
+    def test_refresh_empty_month(self, db_session: Session):
+        """Test months without snapshots are not stored."""
+        service = FareCalendarService(db_session)
+
+        assert service.refresh_month(ROUTE_ID, 2025, 8, now=NOW) is None
+        assert db_session.query(FareCalendarCache).count() == 0
+
+
+class TestApplySnapshots:
+    """Test incremental grid updates."""
+
+    def test_patches_only_affected_days(self, db_session: Session):
+        """Test new snapshots overwrite their days and keep the rest of the grid."""
+        _add_snapshot(db_session, date(2025, 6, 10), 2, 80.0)
+        _add_snapshot(db_session, date(2025, 6, 11), 2, 100.0)
+        db_session.commit()
+
+        service = FareCalendarService(db_session)
+        service.refresh_month(ROUTE_ID, 2025, 6, now=NOW)
+        db_session.commit()
+
+        written = service.apply_snapshots(ROUTE_ID, {
+            date(2025, 6, 11): {"price": 60.0, "highest": 90.0, "ferries": 3, "available_passengers": 40},
+            date(2025, 7, 2): {"price": 75.0, "highest": 75.0, "ferries": 1, "available_passengers": 10},
+        }, now=NOW)
+
+        assert written == 2
+        june = service.get_month(ROUTE_ID, 2025, 6, now=NOW)
+        assert june.calendar_data["10"]["price"] == 80.0
+        assert june.calendar_data["11"]["price"] == 60.0
+        assert june.calendar_data["11"]["ferries"] == 3
+        assert june.month_lowest == 60.0
+        assert june.cheapest_date == 11
+
+        july = service.get_month(ROUTE_ID, 2025, 7, now=NOW)
+        assert july.calendar_data == {"2": {
+            "price": 75.0, "highest": 75.0, "available": True, "ferries": 1, "trend": "stable",
+        }}
+
+
+class TestCalendarDaysFromGrid:
+    """Test converting cached grids into calendar days."""
+
+    def test_scales_prices_by_passengers(self):
+        """Test per-person grid prices are multiplied by party size."""
+        grid = {"10": {"price": 80.0, "available": True, "ferries": 2, "trend": "falling"}}
+
+        days = calendar_days_from_grid(grid, 2025, 6, passengers=3)
+
+        assert len(days) == 30
+        day = days[9]
+        assert day.day == 10
+        assert day.price == 240.0
+        assert day.available is True
+        assert day.num_ferries == 2
+        assert day.trend == "falling"
+        assert days[0].price is None
+        assert days[0].available is False
@@ -0,0 +1,130 @@
+"""
+Unit tests for date-range ferry searches and the min-price grid.
+"""
+
+import asyncio
+from datetime import datetime, date, timedelta
+from typing import List
+from unittest.mock import patch
+
+from app.services.ferry_integrations.base import (
+    BaseFerryIntegration,
+    FerryAPIError,
+    FerryResult,
+    SearchRequest,
+)
+from app.services.ferry_service import FerryService, search_cache_params
+
+
+START = date.today() + timedelta(days=10)
+
+
+class FakeIntegration(BaseFerryIntegration):
+    """Integration that records concurrency and fails on selected days."""
+
+    date_range_concurrency = 2
+
+    def __init__(self, failing_days=()):
+        super().__init__()
+        self.failing_days = set(failing_days)
+        self.searched_days: List[date] = []
+        self.active = 0
+        self.max_active = 0
+
+    async def search_ferries(self, search_request: SearchRequest) -> List[FerryResult]:
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(0.01)
+            self.searched_days.append(search_request.departure_date)
+            if search_request.departure_date in self.failing_days:
+                raise FerryAPIError("operator unavailable")
+            departure = datetime.combine(search_request.departure_date, datetime.min.time())
+            return [FerryResult(
+                sailing_id=f"FAKE-{search_request.departure_date.isoformat()}",
+                operator="Fake",
+                departure_port=search_request.departure_port,
+                arrival_port=search_request.arrival_port,
+                departure_time=departure,
+                arrival_time=departure + timedelta(hours=20),
+                vessel_name="Test",
+                prices={"adult": 50.0 + search_request.departure_date.day},
+            )]
+        finally:
+            self.active -= 1
+
+    async def create_booking(self, booking_request):
+        raise NotImplementedError
+
+    async def get_booking_status(self, booking_reference):
+        raise NotImplementedError
+
+    async def cancel_booking(self, booking_reference, reason=None):
+        raise NotImplementedError
+
+
+class TestSearchDateRange:
+    """Test the default per-day implementation on BaseFerryIntegration."""
+
+    async def test_bounded_concurrency_and_failed_days(self):
+        """Test per-day searches respect the limit and failed days are omitted."""
+        failing = START + timedelta(days=2)
+        integration = FakeIntegration(failing_days=[failing])
+        request = SearchRequest(departure_port="TUNIS", arrival_port="GENOA", departure_date=START)
+
+        results = await integration.search_date_range(request, START, START + timedelta(days=5))
+
+        assert sorted(integration.searched_days) == [START + timedelta(days=i) for i in range(6)]
+        assert integration.max_active <= 2
+        assert failing not in results
+        assert len(results) == 5
+        assert results[START][0].sailing_id == f"FAKE-{START.isoformat()}"
+        # The caller's request is left untouched
+        assert request.departure_date == START
+
+    async def test_empty_range(self):
+        """Test an inverted range searches nothing."""
+        integration = FakeIntegration()
+        request = SearchRequest(departure_port="TUNIS", arrival_port="GENOA", departure_date=START)
+
+        assert await integration.search_date_range(request, START, START - timedelta(days=1)) == {}
+        assert integration.searched_days == []
+
+
+class TestMinPriceGrid:
+    """Test FerryService.get_min_price_grid."""
+
+    async def test_uses_cache_and_fills_missing_days(self):
+        """Test cached days are not re-fetched and fetched days are cached."""
+        integration = FakeIntegration()
+        service = FerryService(use_mock=True)
+        service.integrations = {"fake": integration}
+
+        cached_day = START + timedelta(days=1)
+        cached_params = search_cache_params("TUNIS", "GENOA", cached_day)
+
+        def get_ferry_search(params):
+            if params == cached_params:
+                return {"results": [{"prices": {"adult": 10.0}}, {"prices": {"adult": 0}}]}
+            return None
+
+        with patch("app.services.cache_service.cache_service.get_ferry_search", side_effect=get_ferry_search), \
+             patch("app.services.cache_service.cache_service.set_ferry_search") as set_cache:
+            grid = await service.get_min_price_grid("TUNIS", "GENOA", START, START + timedelta(days=2))
+
+        assert grid[cached_day] == {"lowest_price": 10.0, "num_ferries": 2, "available": True}
+        assert grid[START]["lowest_price"] == 50.0 + START.day
+        assert cached_day not in integration.searched_days
+        assert set_cache.call_count == 2
+        written_params = {call.args[0]["departure_date"] for call in set_cache.call_args_list}
+        assert written_params == {START.isoformat(), (START + timedelta(days=2)).isoformat()}
+
+    async def test_merges_operators(self):
+        """Test per-day results from several operators are combined."""
+        service = FerryService(use_mock=True)
+        service.integrations = {"a": FakeIntegration(), "b": FakeIntegration(failing_days=[START])}
+
+        results = await service.search_date_range("TUNIS", "GENOA", START, START + timedelta(days=1))
+
+        assert len(results[START]) == 1
+        assert len(results[START + timedelta(days=1)]) == 2
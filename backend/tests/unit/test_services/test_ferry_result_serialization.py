@@ -0,0 +1,76 @@
+"""
+Unit tests for the slotted ferry integration models and their JSON output.
+"""
+
+import orjson
+from datetime import datetime, date, timedelta
+
+from app.responses import FastJSONResponse
+from app.schemas.ferry import FerrySearchResponse
+from app.services.ferry_integrations.base import FerryResult, SearchRequest
+
+
+DEPARTURE = datetime.combine(date.today() + timedelta(days=10), datetime.min.time()).replace(hour=19)
+
+
+def _result(**overrides):
+    values = dict(
+        sailing_id="CTN_1",
+        operator="CTN",
+        departure_port="TUNIS",
+        arrival_port="GENOA",
+        departure_time=DEPARTURE,
+        arrival_time=DEPARTURE + timedelta(hours=20),
+        vessel_name="Carthage",
+        prices={"adult": 85.0, "child": 42.5, "infant": 0.0},
+        cabin_types=[{"type": "interior", "name": "Interior Cabin", "price": 30.0, "available": 8}],
+        available_spaces={"passengers": 120, "vehicles": 40},
+    )
+    values.update(overrides)
+    return FerryResult(**values)
+
+
+class TestFerryIntegrationModels:
+    """Test the slotted dataclass models."""
+
+    def test_models_are_slotted(self):
+        """Test instances carry no per-instance __dict__."""
+        assert not hasattr(_result(), "__dict__")
+        assert not hasattr(SearchRequest("TUNIS", "GENOA", DEPARTURE.date()), "__dict__")
+
+    def test_defaults_match_previous_constructors(self):
+        """Test None collections and the reversed return route defaults."""
+        request = SearchRequest("TUNIS", "GENOA", DEPARTURE.date())
+        result = _result(cabin_types=None, available_spaces=None)
+
+        assert (request.return_departure_port, request.return_arrival_port) == ("GENOA", "TUNIS")
+        assert request.vehicles == []
+        assert result.cabin_types == [] and result.available_spaces == {}
+
+    def test_dict_round_trip(self):
+        """Test from_dict rebuilds what to_dict produced."""
+        result = _result()
+        assert FerryResult.from_dict(result.to_dict()) == result
+
+
+class TestSearchResponseSerialization:
+    """Test the direct orjson search response path."""
+
+    def test_orjson_output_matches_pydantic_path(self):
+        """Test dataclasses serialize to results equal to the validated schema's."""
+        results = [_result(), _result(sailing_id="CTN_2", available_spaces=None)]
+        payload = {
+            "results": results,
+            "total_results": 2,
+            "search_params": {"departure_port": "TUNIS", "arrival_port": "GENOA", "departure_date": DEPARTURE.date()},
+            "operators_searched": ["ctn"],
+            "search_time_ms": 5.0,
+            "cached": False,
+        }
+
+        body = orjson.loads(FastJSONResponse(payload).body)
+        validated = FerrySearchResponse(**{**payload, "results": [r.to_dict() for r in results]})
+
+        # Only optional keys left at their defaults (e.g. cabin capacity) are omitted
+        assert FerrySearchResponse(**body).results == validated.results
+        assert body["results"][0]["departure_time"] == DEPARTURE.isoformat()
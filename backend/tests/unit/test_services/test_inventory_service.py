@@ -0,0 +1,209 @@
+"""
+Unit tests for sailing inventory reservations.
+"""
+
+import pytest
+from datetime import datetime, timedelta
+from decimal import Decimal
+from unittest.mock import patch
+from sqlalchemy.orm import Session
+
+from app.models.booking import Booking, BookingStatusEnum
+from app.models.sailing_inventory import SailingInventory
+from app.services.inventory_service import InventoryService, SoldOutError
+
+
+DEPARTURE = datetime.now() + timedelta(days=7)
+
+CACHED_SAILINGS = [{
+    "sailing_id": "CTN-001",
+    "operator": "CTN",
+    "available_spaces": {"passengers": 10, "vehicles": 2},
+    "cabin_types": [
+        {"type": "deck", "available": 200},
+        {"type": "interior", "available": 2},
+        {"type": "exterior", "available": 1},
+    ],
+}]
+
+
+def _leg(sailing_id: str = "CTN-001", passengers: int = 2, vehicles: int = 1, cabins: int = 1) -> dict:
+    return {
+        "sailing_id": sailing_id,
+        "operator": "CTN",
+        "departure_port": "Tunis",
+        "arrival_port": "Marseille",
+        "departure_time": DEPARTURE,
+        "passengers": passengers,
+        "vehicles": vehicles,
+        "cabins": cabins,
+    }
+
+
+@pytest.fixture
+def service():
+    """Inventory service reading capacity from a mocked operator cache."""
+    with patch(
+        "app.services.cache_service.cache_service.get_operator_sailings",
+        return_value=CACHED_SAILINGS,
+    ) as get_sailings:
+        yield InventoryService(), get_sailings
+
+
+def _inventory(db_session: Session, sailing_id: str = "CTN-001") -> SailingInventory:
+    db_session.expire_all()
+    return db_session.query(SailingInventory).filter(SailingInventory.sailing_id == sailing_id).one()
+
+
+class TestReserve:
+    """Test conditional reservation of sailing capacity."""
+
+    def test_capacity_seeded_from_operator_cache(self, db_session: Session, service):
+        """Test the first booking creates the row with cached capacity and counts itself."""
+        inventory_service, get_sailings = service
+
+        reservation = inventory_service.reserve_booking(db_session, [_leg()])
+        db_session.commit()
+
+        assert reservation == {"CTN-001": {"passengers": 2, "vehicles": 1, "cabins": 1}}
+        assert get_sailings.call_args.args[0]["operator"] == "ctn"
+        inventory = _inventory(db_session)
+        assert (inventory.passenger_capacity, inventory.vehicle_capacity, inventory.cabin_capacity) == (10, 2, 3)
+        assert (inventory.passengers_reserved, inventory.vehicles_reserved, inventory.cabins_reserved) == (2, 1, 1)
+
+    def test_existing_bookings_counted_once(self, db_session: Session, service):
+        """Test bookings made before tracking started are included when the row is created."""
+        inventory_service, _ = service
+        db_session.add(Booking(
+            sailing_id="CTN-001", operator="CTN", departure_port="Tunis", arrival_port="Marseille",
+            departure_time=DEPARTURE, booking_reference="MR-OLD001", contact_email="old@example.com",
+            contact_first_name="Old", contact_last_name="Booking", total_passengers=3, total_vehicles=1,
+            subtotal=Decimal("100.00"), total_amount=Decimal("110.00"), status=BookingStatusEnum.CONFIRMED,
+        ))
+        db_session.commit()
+
+        inventory_service.reserve_booking(db_session, [_leg(cabins=0)])
+        inventory_service.reserve_booking(db_session, [_leg(passengers=1, vehicles=0, cabins=0)])
+        db_session.commit()
+
+        inventory = _inventory(db_session)
+        assert inventory.passengers_reserved == 6
+        assert inventory.vehicles_reserved == 2
+
+    def test_sold_out_raises_and_reserves_nothing(self, db_session: Session, service):
+        """Test a request over capacity fails with the scarce resource and changes no counts."""
+        inventory_service, _ = service
+        inventory_service.reserve_booking(db_session, [_leg(vehicles=2)])
+        db_session.commit()
+
+        with pytest.raises(SoldOutError) as exc_info:
+            inventory_service.reserve_booking(db_session, [_leg(vehicles=1)])
+        db_session.rollback()
+
+        assert exc_info.value.resource == "vehicles"
+        assert exc_info.value.available == 0
+        assert "Sold out" in str(exc_info.value)
+        inventory = _inventory(db_session)
+        assert (inventory.passengers_reserved, inventory.vehicles_reserved) == (2, 2)
+
+    def test_unknown_capacity_only_counts(self, db_session: Session, service):
+        """Test sailings missing from the cache are tracked without a limit."""
+        inventory_service, get_sailings = service
+        get_sailings.return_value = None
+
+        for _ in range(3):
+            inventory_service.reserve_booking(db_session, [_leg(passengers=50)])
+        db_session.commit()
+
+        inventory = _inventory(db_session)
+        assert inventory.passenger_capacity is None
+        assert inventory.passengers_reserved == 150
+
+
+class TestReserveCabins:
+    """Test cabins added to existing bookings go through the same reservation."""
+
+    def _booking(self, db_session: Session, reservation: dict) -> Booking:
+        booking = Booking(
+            sailing_id="CTN-001", operator="CTN", departure_port="Tunis", arrival_port="Marseille",
+            departure_time=DEPARTURE, booking_reference="MR-CAB001", contact_email="cab@example.com",
+            contact_first_name="Cab", contact_last_name="In", total_passengers=2,
+            subtotal=Decimal("100.00"), total_amount=Decimal("110.00"), status=BookingStatusEnum.CONFIRMED,
+            extra_data={"inventory": reservation},
+        )
+        db_session.add(booking)
+        db_session.commit()
+        return booking
+
+    def test_added_cabins_recorded_and_released(self, db_session: Session, service):
+        """Test added cabins are merged into the booking's reservation and released with it."""
+        inventory_service, _ = service
+        booking = self._booking(db_session, inventory_service.reserve_booking(db_session, [_leg()]))
+
+        inventory_service.reserve_cabins(db_session, booking, 2)
+        db_session.commit()
+
+        assert booking.extra_data["inventory"] == {"CTN-001": {"passengers": 2, "vehicles": 1, "cabins": 3}}
+        assert _inventory(db_session).cabins_reserved == 3
+
+        inventory_service.release_booking(db_session, booking)
+        db_session.commit()
+        assert _inventory(db_session).cabins_reserved == 0
+
+    def test_last_cabin_taken_once(self, db_session: Session, service):
+        """Test two additions racing for the last cabin cannot both succeed."""
+        inventory_service, _ = service
+        booking = self._booking(db_session, inventory_service.reserve_booking(db_session, [_leg(cabins=2)]))
+
+        inventory_service.reserve_cabins(db_session, booking, 1)
+        db_session.commit()
+        with pytest.raises(SoldOutError) as exc_info:
+            inventory_service.reserve_cabins(db_session, booking, 1)
+        db_session.rollback()
+
+        assert exc_info.value.resource == "cabins"
+        assert _inventory(db_session).cabins_reserved == 3
+        db_session.refresh(booking)
+        assert booking.extra_data["inventory"]["CTN-001"]["cabins"] == 3
+
+
+class TestRelease:
+    """Test releasing reservations on expiry and cancellation."""
+
+    def test_release_booking_once(self, db_session: Session, service):
+        """Test a booking's reservation is released and cleared so it cannot be released twice."""
+        inventory_service, _ = service
+        reservation = inventory_service.reserve_booking(db_session, [_leg(), _leg("GNV-002")])
+        booking = Booking(
+            sailing_id="CTN-001", operator="CTN", booking_reference="MR-REL001",
+            contact_email="rel@example.com", contact_first_name="Rel", contact_last_name="Ease",
+            total_passengers=2, subtotal=Decimal("100.00"), total_amount=Decimal("110.00"),
+            status=BookingStatusEnum.PENDING,
+            extra_data={"has_cancellation_protection": True, "inventory": reservation},
+        )
+        db_session.add(booking)
+        db_session.commit()
+
+        inventory_service.release_booking(db_session, booking)
+        inventory_service.release_booking(db_session, booking)
+        db_session.commit()
+
+        assert booking.extra_data == {"has_cancellation_protection": True}
+        for sailing_id in ("CTN-001", "GNV-002"):
+            inventory = _inventory(db_session, sailing_id)
+            assert (inventory.passengers_reserved, inventory.vehicles_reserved, inventory.cabins_reserved) == (0, 0, 0)
+
+    def test_release_never_goes_negative(self, db_session: Session, service):
+        """Test releasing more than is reserved clamps the counts at zero."""
+        inventory_service, _ = service
+        inventory_service.reserve_booking(db_session, [_leg()])
+
+        released = inventory_service.release(db_session, [
+            {"CTN-001": {"passengers": 2, "vehicles": 1, "cabins": 1}},
+            {"CTN-001": {"passengers": 5}},
+            None,
+        ])
+        db_session.commit()
+
+        assert released == 1
+        assert _inventory(db_session).passengers_reserved == 0
@@ -0,0 +1,167 @@
+"""
+Unit tests for hedged operator searches.
+"""
+
+import asyncio
+import pytest
+from datetime import datetime, date, timedelta
+from typing import List
+from unittest.mock import patch
+
+from app.config import settings
+from app.services.ferry_integrations.base import (
+    BaseFerryIntegration,
+    FerryAPIError,
+    FerryResult,
+    SearchRequest,
+)
+from app.services.ferry_integrations.hedging import HedgeBudget, hedge_budget, hedged
+from app.services.ferry_integrations.slo import operator_slo
+from app.services.ferry_service import FerryService
+
+
+DEPARTURE = date.today() + timedelta(days=15)
+
+
+class TailIntegration(BaseFerryIntegration):
+    """Integration whose calls take the scripted delays (and outcomes) in order."""
+
+    def __init__(self, delays, fail_first=False):
+        super().__init__()
+        self.operator_name = "Tail"
+        self.delays = list(delays)
+        self.fail_first = fail_first
+        self.started = 0
+        self.cancelled = 0
+
+    async def search_ferries(self, search_request: SearchRequest) -> List[FerryResult]:
+        call = self.started
+        self.started += 1
+        try:
+            await asyncio.sleep(self.delays[call])
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if call == 0 and self.fail_first:
+            raise FerryAPIError("primary failed")
+        departure = datetime.combine(search_request.departure_date, datetime.min.time())
+        return [FerryResult(
+            sailing_id=f"TAIL-{call}",
+            operator="Tail",
+            departure_port=search_request.departure_port,
+            arrival_port=search_request.arrival_port,
+            departure_time=departure,
+            arrival_time=departure + timedelta(hours=12),
+            vessel_name="Test",
+            prices={"adult": 80.0},
+        )]
+
+    async def create_booking(self, booking_request):
+        raise NotImplementedError
+
+    async def get_booking_status(self, booking_reference):
+        raise NotImplementedError
+
+    async def cancel_booking(self, booking_reference, reason=None):
+        raise NotImplementedError
+
+
+def _request():
+    return SearchRequest(departure_port="TUNIS", arrival_port="GENOA", departure_date=DEPARTURE)
+
+
+@pytest.fixture(autouse=True)
+def hedging(monkeypatch):
+    """Enable hedging with a 20ms p90 for the "Tail" operator and a funded budget."""
+    monkeypatch.setattr(settings, "OPERATOR_HEDGING_ENABLED", True)
+    monkeypatch.setattr(settings, "OPERATOR_TIMEOUT_MIN_SAMPLES", 10)
+    operator_slo.reset()
+    for _ in range(10):
+        operator_slo.record("Tail", "search", 0.02, "success")
+    hedge_budget.reset()
+    hedge_budget.tokens = 5
+    yield
+    operator_slo.reset()
+    hedge_budget.reset()
+
+
+class TestHedgedSearch:
+    """Test hedging decisions, winners and cancellation."""
+
+    async def test_slow_primary_is_hedged(self):
+        """Test a call past the p90 is raced and the loser cancelled and not recorded."""
+        integration = TailIntegration(delays=[1.0, 0.01])
+
+        results = await hedged("Tail", "search", lambda: integration.search_ferries(_request()))
+        await asyncio.sleep(0)
+
+        assert results[0].sailing_id == "TAIL-1"
+        assert integration.started == 2
+        assert integration.cancelled == 1
+        assert operator_slo.report("Tail", "search")["count"] == 11
+        assert hedge_budget.tokens == pytest.approx(4.05)
+
+    async def test_fast_primary_not_hedged(self):
+        """Test calls answering within the p90 start no second request."""
+        integration = TailIntegration(delays=[0.001])
+
+        results = await hedged("Tail", "search", lambda: integration.search_ferries(_request()))
+
+        assert results[0].sailing_id == "TAIL-0"
+        assert integration.started == 1
+
+    async def test_primary_error_waits_for_hedge(self):
+        """Test a primary failing after the hedge started does not end the race."""
+        integration = TailIntegration(delays=[0.05, 0.1], fail_first=True)
+
+        results = await hedged("Tail", "search", lambda: integration.search_ferries(_request()))
+
+        assert results[0].sailing_id == "TAIL-1"
+
+    async def test_budget_exhausted_waits_for_primary(self):
+        """Test no hedge is sent without budget."""
+        hedge_budget.tokens = 0
+        integration = TailIntegration(delays=[0.1, 0.01])
+
+        results = await hedged("Tail", "search", lambda: integration.search_ferries(_request()))
+
+        assert results[0].sailing_id == "TAIL-0"
+        assert integration.started == 1
+
+    async def test_disabled_or_unknown_operator_not_hedged(self, monkeypatch):
+        """Test hedging needs the flag and enough samples for the operator."""
+        integration = TailIntegration(delays=[0.1, 0.01])
+        await hedged("Other", "search", lambda: integration.search_ferries(_request()))
+
+        monkeypatch.setattr(settings, "OPERATOR_HEDGING_ENABLED", False)
+        await hedged("Tail", "search", lambda: integration.search_ferries(_request()))
+
+        assert integration.started == 2
+        assert integration.cancelled == 0
+
+    def test_budget_ratio(self):
+        """Test the budget allows one hedge per 1/ratio calls, up to the burst cap."""
+        budget = HedgeBudget(ratio=0.05, max_tokens=2)
+        for _ in range(19):
+            budget.deposit()
+        assert not budget.withdraw()
+        budget.deposit()
+        assert budget.withdraw()
+        for _ in range(1000):
+            budget.deposit()
+        assert budget.tokens == 2
+
+
+class TestFerryServiceHedging:
+    """Test FerryService searches go through the hedge."""
+
+    async def test_search_operator_hedges_uncached_search(self):
+        """Test _search_operator returns the hedge's results for a slow operator."""
+        service = FerryService(use_mock=True)
+        integration = TailIntegration(delays=[1.0, 0.01])
+
+        with patch("app.services.cache_service.cache_service.is_available", return_value=False):
+            results = await service._search_operator("tail", integration, _request())
+
+        assert [r.sailing_id for r in results] == ["TAIL-1"]
+        assert integration.started == 2
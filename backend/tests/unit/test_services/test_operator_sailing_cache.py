@@ -0,0 +1,203 @@
+"""
+Unit tests for the per-operator sailing cache used by FerryService searches.
+"""
+
+import json
+import orjson
+import pytest
+from datetime import datetime, date, timedelta
+from typing import List
+from unittest.mock import patch
+
+from app.services.ferry_integrations.base import (
+    BaseFerryIntegration,
+    FerryAPIError,
+    FerryResult,
+    SearchRequest,
+)
+from app.services.ferry_service import (
+    OPERATOR_SAILINGS_TTL,
+    SEARCH_CACHE_TTL,
+    FerryService,
+    search_cache_params,
+)
+
+
+DEPARTURE = date.today() + timedelta(days=10)
+
+
+class RecordingIntegration(BaseFerryIntegration):
+    """Integration that records the requests it receives."""
+
+    def __init__(self, operator="Fake", fail=False):
+        super().__init__()
+        self.operator = operator
+        self.fail = fail
+        self.requests: List[SearchRequest] = []
+
+    async def search_ferries(self, search_request: SearchRequest) -> List[FerryResult]:
+        self.requests.append(search_request)
+        if self.fail:
+            raise FerryAPIError("operator unavailable")
+        departure = datetime.combine(search_request.departure_date, datetime.min.time()).replace(hour=19)
+        return [
+            FerryResult(
+                sailing_id=f"{self.operator}-{seats}",
+                operator=self.operator,
+                departure_port=search_request.departure_port,
+                arrival_port=search_request.arrival_port,
+                departure_time=departure,
+                arrival_time=departure + timedelta(hours=20),
+                vessel_name="Test",
+                prices={"adult": 80.0, "child": 40.0, "infant": 0.0},
+                available_spaces={"passengers": seats},
+            )
+            for seats in (2, 100)
+        ]
+
+    async def create_booking(self, booking_request):
+        raise NotImplementedError
+
+    async def get_booking_status(self, booking_reference):
+        raise NotImplementedError
+
+    async def cancel_booking(self, booking_reference, reason=None):
+        raise NotImplementedError
+
+
+class SailingStore(dict):
+    """Cached sailings by key, with each entry's remaining TTL in ttls."""
+
+    def __init__(self):
+        super().__init__()
+        self.ttls = {}
+
+
+@pytest.fixture
+def operator_cache():
+    """Patch the Redis-backed operator sailing cache with a dict."""
+    store = SailingStore()
+
+    def get_sailings(params):
+        return store.get(json.dumps(params, sort_keys=True))
+
+    def set_sailings(params, sailings, ttl=300):
+        # Round-trip through JSON like Redis does
+        key = json.dumps(params, sort_keys=True)
+        store[key] = json.loads(orjson.dumps(sailings))
+        store.ttls[key] = ttl
+        return True
+
+    def get_sailings_ttl(params_list):
+        remaining = [
+            store.ttls[key] for key in (json.dumps(p, sort_keys=True) for p in params_list)
+            if key in store.ttls
+        ]
+        return min(remaining) if remaining else None
+
+    with patch("app.services.cache_service.cache_service.is_available", return_value=True), \
+         patch("app.services.cache_service.cache_service.get_operator_sailings", side_effect=get_sailings), \
+         patch("app.services.cache_service.cache_service.set_operator_sailings", side_effect=set_sailings), \
+         patch("app.services.cache_service.cache_service.get_operator_sailings_ttl", side_effect=get_sailings_ttl):
+        yield store
+
+
+def _service(**integrations):
+    service = FerryService(use_mock=True)
+    service.integrations = integrations
+    return service
+
+
+class TestOperatorSailingCache:
+    """Test search composition from per-operator cached sailings."""
+
+    async def test_passenger_mixes_share_operator_call(self, operator_cache):
+        """Test different passenger mixes and return dates reuse one operator call."""
+        integration = RecordingIntegration()
+        service = _service(fake=integration)
+
+        couple = await service.search_ferries("TUNIS", "GENOA", DEPARTURE, adults=2)
+        family = await service.search_ferries(
+            "TUNIS", "GENOA", DEPARTURE, return_date=DEPARTURE + timedelta(days=7), adults=2, children=1
+        )
+
+        assert len(integration.requests) == 1
+        assert integration.requests[0].adults == 1
+        assert integration.requests[0].return_date is None
+        assert [r.sailing_id for r in couple] == ["Fake-2", "Fake-100"]
+        # The 2-seat sailing cannot take a party of three
+        assert [r.sailing_id for r in family] == ["Fake-100"]
+        assert isinstance(family[0].departure_time, datetime)
+        assert family[0].prices == {"adult": 80.0, "child": 40.0, "infant": 0.0}
+
+    async def test_operator_filter_reuses_cache(self, operator_cache):
+        """Test an operator-filtered search is served from the all-operator entries."""
+        ctn, gnv = RecordingIntegration("CTN"), RecordingIntegration("GNV")
+        service = _service(ctn=ctn, gnv=gnv)
+
+        await service.search_ferries("TUNIS", "GENOA", DEPARTURE)
+        results = await service.search_ferries("TUNIS", "GENOA", DEPARTURE, operators=["gnv"])
+
+        assert len(ctn.requests) == 1
+        assert len(gnv.requests) == 1
+        assert {r.operator for r in results} == {"GNV"}
+
+    async def test_vehicle_searches_bypass_cache(self, operator_cache):
+        """Test vehicle searches always reach the operator with the full request."""
+        integration = RecordingIntegration()
+        service = _service(fake=integration)
+        vehicles = [{"type": "car", "length": 4.5}]
+
+        await service.search_ferries("TUNIS", "GENOA", DEPARTURE, vehicles=vehicles)
+        await service.search_ferries("TUNIS", "GENOA", DEPARTURE, vehicles=vehicles)
+
+        assert len(integration.requests) == 2
+        assert integration.requests[0].vehicles == vehicles
+        assert operator_cache == {}
+
+    async def test_failed_operator_not_cached(self, operator_cache):
+        """Test operator errors are not cached as empty results."""
+        integration = RecordingIntegration(fail=True)
+        service = _service(fake=integration)
+
+        assert await service.search_ferries("TUNIS", "GENOA", DEPARTURE) == []
+        assert await service.search_ferries("TUNIS", "GENOA", DEPARTURE) == []
+
+        assert len(integration.requests) == 2
+        assert operator_cache == {}
+
+    async def test_composed_search_expires_with_operator_entry(self, operator_cache):
+        """Test a search composed from aging sailings is cached only until they expire."""
+        ctn, gnv = RecordingIntegration("CTN"), RecordingIntegration("GNV")
+        service = _service(ctn=ctn, gnv=gnv)
+        cache_params = search_cache_params("TUNIS", "GENOA", DEPARTURE, adults=2)
+
+        await service.search_ferries("TUNIS", "GENOA", DEPARTURE)
+        assert service.search_cache_ttl(cache_params) == SEARCH_CACHE_TTL
+
+        # 280s later the sailings are still served, with 20s and 40s left
+        ctn_key, gnv_key = sorted(operator_cache.ttls, key=lambda key: "gnv" in key)
+        operator_cache.ttls[ctn_key] = OPERATOR_SAILINGS_TTL - 280
+        operator_cache.ttls[gnv_key] = OPERATOR_SAILINGS_TTL - 260
+        await service.search_ferries("TUNIS", "GENOA", DEPARTURE, adults=2)
+        assert len(ctn.requests) == 1
+
+        # Sailing age when composed plus ferry_search TTL never exceeds one operator TTL
+        ttl = service.search_cache_ttl(cache_params)
+        assert ttl == 20
+        assert 280 + ttl <= OPERATOR_SAILINGS_TTL
+        assert service.search_cache_ttl({**cache_params, "operators": ["gnv"]}) == 40
+        assert service.search_cache_ttl({**cache_params, "vehicles": 1}) == SEARCH_CACHE_TTL
+
+    async def test_refresh_bypasses_cached_sailings(self, operator_cache):
+        """Test a refreshing search queries the operator and re-caches for a full TTL."""
+        integration = RecordingIntegration()
+        service = _service(fake=integration)
+
+        await service.search_ferries("TUNIS", "GENOA", DEPARTURE)
+        (key,) = operator_cache.ttls
+        operator_cache.ttls[key] = 5
+        await service.search_ferries("TUNIS", "GENOA", DEPARTURE, refresh_operator_cache=True)
+
+        assert len(integration.requests) == 2
+        assert operator_cache.ttls[key] == OPERATOR_SAILINGS_TTL
@@ -0,0 +1,198 @@
+"""
+Unit tests for per-operator call metrics, SLO reports and adaptive timeouts.
+"""
+
+import httpx
+import pytest
+from datetime import date, timedelta
+from prometheus_client import REGISTRY
+
+from app.config import settings
+from app.services.ferry_integrations.base import FerryAPIError, SearchRequest
+from app.services.ferry_integrations.ctn import CTNIntegration
+from app.services.ferry_integrations.slo import OperatorSLOTracker, SLOTarget, operator_slo
+
+
+DEPARTURE = date.today() + timedelta(days=20)
+
+SAILING = {
+    "id": "CTN-1",
+    "departure_port": "TUNIS",
+    "arrival_port": "GENOA",
+    "departure_time": f"{DEPARTURE.isoformat()}T20:00:00",
+    "arrival_time": f"{(DEPARTURE + timedelta(days=1)).isoformat()}T18:00:00",
+    "vessel_name": "Carthage",
+    "prices": {"adult": 120.0, "child": 60.0, "infant": 0.0},
+}
+
+
+def _ctn(handler) -> CTNIntegration:
+    """CTNIntegration whose instrumented client answers with handler."""
+    ctn = CTNIntegration(api_key="test", base_url="http://ctn.test")
+    ctn.session = httpx.AsyncClient(
+        transport=httpx.MockTransport(handler),
+        event_hooks={"request": [ctn._on_request], "response": [ctn._on_response]},
+    )
+    return ctn
+
+
+def _search_request():
+    return SearchRequest(departure_port="TUNIS", arrival_port="GENOA", departure_date=DEPARTURE, adults=2)
+
+
+def _sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+@pytest.fixture(autouse=True)
+def reset_tracker():
+    operator_slo.reset()
+    yield
+    operator_slo.reset()
+
+
+class TestOperatorCallMetrics:
+    """Test BaseFerryIntegration records metrics for subclass calls."""
+
+    async def test_search_records_outcome_status_size_and_results(self):
+        """Test a successful search records latency, 2xx, body size and result count."""
+        body = {"sailings": [SAILING, {**SAILING, "id": "CTN-2"}]}
+        ctn = _ctn(lambda request: httpx.Response(200, json=body))
+        calls = _sample("maritime_operator_calls_total", operator="CTN", call="search", outcome="success")
+        responses = _sample("maritime_operator_http_responses_total", operator="CTN", call="search", status_class="2xx")
+        size = _sample("maritime_operator_response_bytes_sum", operator="CTN", call="search")
+        results = _sample("maritime_operator_search_results_sum", operator="CTN")
+
+        sailings = await ctn.search_ferries(_search_request())
+
+        assert len(sailings) == 2
+        assert _sample("maritime_operator_calls_total", operator="CTN", call="search", outcome="success") == calls + 1
+        assert _sample("maritime_operator_http_responses_total", operator="CTN", call="search", status_class="2xx") == responses + 1
+        assert _sample("maritime_operator_response_bytes_sum", operator="CTN", call="search") > size
+        assert _sample("maritime_operator_search_results_sum", operator="CTN") == results + 2
+        assert operator_slo.report("CTN", "search")["count"] == 1
+
+    async def test_error_status_counts_as_error(self):
+        """Test a 503 is recorded as a 5xx response and an error outcome."""
+        ctn = _ctn(lambda request: httpx.Response(503, json={"message": "down"}))
+        errors = _sample("maritime_operator_calls_total", operator="CTN", call="status", outcome="error")
+        server_errors = _sample("maritime_operator_http_responses_total", operator="CTN", call="status", status_class="5xx")
+
+        with pytest.raises(FerryAPIError):
+            await ctn.get_booking_status("REF1")
+
+        assert _sample("maritime_operator_calls_total", operator="CTN", call="status", outcome="error") == errors + 1
+        assert _sample("maritime_operator_http_responses_total", operator="CTN", call="status", status_class="5xx") == server_errors + 1
+
+    async def test_wrapped_timeout_counts_as_timeout(self):
+        """Test a client timeout is classified even when re-raised as FerryAPIError."""
+        def handler(request):
+            raise httpx.ReadTimeout("slow", request=request)
+
+        ctn = _ctn(handler)
+        timeouts = _sample("maritime_operator_calls_total", operator="CTN", call="search", outcome="timeout")
+
+        with pytest.raises(FerryAPIError):
+            await ctn.search_ferries(_search_request())
+
+        assert _sample("maritime_operator_calls_total", operator="CTN", call="search", outcome="timeout") == timeouts + 1
+        assert operator_slo.report("CTN", "search")["timeout_rate"] == 1.0
+
+    async def test_adaptive_timeout_applied_to_request(self, monkeypatch):
+        """Test requests carry the timeout derived from the observed p99."""
+        monkeypatch.setattr(settings, "OPERATOR_TIMEOUT_MIN_SAMPLES", 10)
+        monkeypatch.setattr(settings, "OPERATOR_TIMEOUT_MIN_SECONDS", 1.0)
+        for _ in range(20):
+            operator_slo.record("CTN", "search", 2.0, "success")
+        seen = []
+
+        def handler(request):
+            seen.append(request.extensions["timeout"]["read"])
+            return httpx.Response(200, json={"sailings": []})
+
+        await _ctn(handler).search_ferries(_search_request())
+
+        assert seen == [4.0]
+        assert _sample("maritime_operator_timeout_seconds", operator="CTN", call="search") == 4.0
+
+
+class TestOperatorSLOTracker:
+    """Test the rolling SLO report and timeout derivation."""
+
+    def test_report_availability_latency_and_budget(self):
+        """Test availability, percentiles, latency compliance and error budget."""
+        tracker = OperatorSLOTracker(window_seconds=60, targets={"search": SLOTarget(0.9, 1.0)})
+        for i in range(18):
+            tracker.record("GNV", "search", 0.5, "success", now=100)
+        tracker.record("GNV", "search", 2.0, "success", now=100)
+        tracker.record("GNV", "search", 5.0, "timeout", now=100)
+
+        report = tracker.report("GNV", "search", now=110)
+
+        assert report["count"] == 20
+        assert report["availability"] == 0.95
+        assert report["timeout_rate"] == 0.05
+        assert report["latency_seconds"]["p50"] == 0.5
+        assert report["latency_seconds"]["p99"] == 5.0
+        assert report["latency_compliance"] == 0.9
+        assert report["error_budget_remaining"] == pytest.approx(0.5)
+        assert report["availability_met"] and not report["latency_met"]
+        assert not report["slo_met"]
+
+    def test_window_drops_old_samples(self):
+        """Test samples older than the window leave the report."""
+        tracker = OperatorSLOTracker(window_seconds=60)
+        tracker.record("CTN", "book", 1.0, "error", now=0)
+        tracker.record("CTN", "book", 1.0, "success", now=50)
+
+        assert tracker.report("CTN", "book", now=55)["count"] == 2
+        assert tracker.report("CTN", "book", now=100)["availability"] == 1.0
+        assert tracker.snapshot(now=200) == {}
+
+    def test_timeout_clamped_and_reverted(self, monkeypatch):
+        """Test the timeout is p99 x multiplier, clamped, and static when timeouts pile up."""
+        monkeypatch.setattr(settings, "OPERATOR_TIMEOUT_MIN_SAMPLES", 10)
+        monkeypatch.setattr(settings, "OPERATOR_TIMEOUT_MIN_SECONDS", 5.0)
+        monkeypatch.setattr(settings, "OPERATOR_TIMEOUT_REFRESH_SECONDS", 0)
+        tracker = OperatorSLOTracker(window_seconds=600)
+
+        assert tracker.timeout_for("CTN", "search", 30.0, now=1) == 30.0  # Too few samples
+        for _ in range(10):
+            tracker.record("CTN", "search", 1.0, "success", now=1)
+        assert tracker.timeout_for("CTN", "search", 30.0, now=2) == 5.0  # Clamped to the minimum
+        for _ in range(10):
+            tracker.record("CTN", "search", 9.0, "success", now=3)
+        assert tracker.timeout_for("CTN", "search", 30.0, now=4) == 18.0
+        assert tracker.timeout_for("CTN", "search", 12.0, now=5) == 12.0  # Never above static
+        tracker.record("CTN", "search", 18.0, "timeout", now=6)
+        assert tracker.timeout_for("CTN", "search", 30.0, now=7) == 30.0  # Timeout rate above 2%
+
+    def test_timeout_static_when_disabled(self, monkeypatch):
+        """Test OPERATOR_ADAPTIVE_TIMEOUTS=False always returns the static timeout."""
+        monkeypatch.setattr(settings, "OPERATOR_ADAPTIVE_TIMEOUTS", False)
+        tracker = OperatorSLOTracker()
+        for _ in range(200):
+            tracker.record("CTN", "search", 0.1, "success")
+
+        assert tracker.timeout_for("CTN", "search", 30.0) == 30.0
+
+
+class TestOperatorSLOEndpoint:
+    """Test the admin SLO endpoint."""
+
+    def test_admin_slo_report(self, client):
+        """Test the endpoint returns per-operator reports for admins."""
+        from app.api.deps import get_admin_user
+        from app.main import app
+
+        operator_slo.record("CTN", "search", 0.4, "success")
+        app.dependency_overrides[get_admin_user] = lambda: object()
+        try:
+            response = client.get("/api/v1/admin/operators/slo")
+        finally:
+            app.dependency_overrides.pop(get_admin_user, None)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["operators"]["CTN"]["search"]["count"] == 1
+        assert data["operators"]["CTN"]["search"]["slo_met"] is True
@@ -0,0 +1,95 @@
+"""
+Unit tests for off-event-loop PDF rendering.
+"""
+
+import asyncio
+import time
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from app.config import settings
+from app.services import pdf_renderer
+from app.services.document_cache import DocumentCache
+
+
+DEPARTURE = datetime.now() + timedelta(days=7)
+
+BOOKING = {
+    "booking_reference": "MR-PDF001",
+    "departure_port": "Tunis",
+    "arrival_port": "Marseille",
+    "departure_time": DEPARTURE.isoformat(),
+    "arrival_time": (DEPARTURE + timedelta(hours=20)).isoformat(),
+    "status": "CONFIRMED",
+}
+
+PASSENGERS = [{"passenger_type": "ADULT", "first_name": "Marie", "last_name": "Dupont"}]
+
+
+@pytest.fixture
+def no_pool():
+    """Make sure no render pool outlives the test."""
+    pdf_renderer.shutdown()
+    yield
+    pdf_renderer.shutdown()
+
+
+class TestRenderPdf:
+    """Test rendering in the process pool and the thread fallback."""
+
+    async def test_process_pool_keeps_loop_responsive(self, monkeypatch, no_pool):
+        """Test a pool render returns the PDF while the event loop keeps running."""
+        monkeypatch.setattr(settings, "PDF_RENDER_PROCESSES", 1)
+        ticks = 0
+
+        async def heartbeat():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        monitor = asyncio.create_task(heartbeat())
+        start = time.perf_counter()
+        pdf = await pdf_renderer.render_pdf("eticket", booking=BOOKING, passengers=PASSENGERS)
+        elapsed = time.perf_counter() - start
+        monitor.cancel()
+
+        assert pdf.startswith(b"%PDF")
+        assert pdf_renderer.get_executor() is not None
+        # The loop ticked throughout the render (worker spawn included)
+        assert ticks >= elapsed / 0.01 * 0.5
+
+    async def test_thread_fallback(self, monkeypatch, no_pool):
+        """Test PDF_RENDER_PROCESSES=0 renders in the default thread pool."""
+        monkeypatch.setattr(settings, "PDF_RENDER_PROCESSES", 0)
+
+        with patch(
+            "app.services.eticket_service.eticket_service.generate_eticket",
+            return_value=b"%PDF-1.4 thread",
+        ) as generate:
+            pdf = await pdf_renderer.render_pdf("eticket", booking=BOOKING, passengers=PASSENGERS)
+
+        assert pdf == b"%PDF-1.4 thread"
+        generate.assert_called_once_with(booking=BOOKING, passengers=PASSENGERS)
+        assert pdf_renderer.get_executor() is None
+
+    async def test_unknown_kind_rejected(self):
+        """Test only the known document kinds can be rendered."""
+        with pytest.raises(ValueError):
+            await pdf_renderer.render_pdf("boarding_pass", booking=BOOKING)
+
+    async def test_cache_renders_async_once(self, tmp_path):
+        """Test get_or_render_async awaits the renderer only on a miss."""
+        cache = DocumentCache(directory=str(tmp_path), max_bytes=10_000)
+        renders = []
+
+        async def render():
+            renders.append(1)
+            return b"%PDF-1.4 ticket"
+
+        key = cache.key("eticket", booking={"id": 1})
+        assert await cache.get_or_render_async(key, render) == b"%PDF-1.4 ticket"
+        assert await cache.get_or_render_async(key, render) == b"%PDF-1.4 ticket"
+
+        assert len(renders) == 1
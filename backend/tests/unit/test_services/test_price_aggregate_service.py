@@ -0,0 +1,148 @@
+"""
+Unit tests for rolling route price aggregates.
+"""
+
+import math
+import pytest
+from datetime import datetime, date, timedelta
+from sqlalchemy.orm import Session
+
+from app.models.price_history import PriceHistory, RoutePriceAggregate
+from app.services.price_aggregate_service import (
+    RECENT_SNAPSHOTS,
+    PriceAggregateService,
+    lead_time_bucket,
+)
+from app.services.price_prediction_service import PricePredictionService
+
+
+ROUTE_ID = "marseille_tunis"
+
+
+def _snapshot(recorded_at: datetime, price: float, departure: date,
+              available: int = 100) -> PriceHistory:
+    return PriceHistory(
+        route_id=ROUTE_ID,
+        departure_port="marseille",
+        arrival_port="tunis",
+        recorded_at=recorded_at,
+        departure_date=departure,
+        days_until_departure=(departure - recorded_at.date()).days,
+        day_of_week=departure.weekday(),
+        price_adult=price,
+        lowest_price=price,
+        available_passengers=available,
+    )
+
+
+@pytest.fixture
+def snapshots(db_session: Session) -> list:
+    """Create 40 hourly snapshots departing on alternating weekdays/weekends."""
+    now = datetime.utcnow()
+    saturday = date.today() + timedelta(days=(5 - date.today().weekday()) % 7 + 14)
+    records = []
+    for i in range(40):
+        departure = saturday if i % 2 else saturday + timedelta(days=3)  # Sat / Tue
+        price = 90.0 + (10.0 if i % 2 else 0.0) + i * 0.5
+        records.append(_snapshot(now - timedelta(hours=i), price, departure, available=30 + i))
+    db_session.add_all(records)
+    db_session.commit()
+    return records
+
+
+class TestLeadTimeBucket:
+    """Test days-to-departure bucketing."""
+
+    def test_buckets(self):
+        """Test day counts map to the prediction model's ranges."""
+        assert lead_time_bucket(0) == "0-3"
+        assert lead_time_bucket(14) == "8-14"
+        assert lead_time_bucket(400) is None
+        assert lead_time_bucket(None) is None
+
+
+class TestRecordSnapshots:
+    """Test incremental aggregate updates."""
+
+    def test_incremental_matches_rebuild(self, db_session: Session, snapshots):
+        """Test folding snapshots one call at a time equals a full rebuild."""
+        service = PriceAggregateService(db_session)
+        for record in reversed(snapshots):
+            service.record_snapshots([record])
+        db_session.commit()
+        incremental = service.get_summary(ROUTE_ID)
+
+        assert service.rebuild([ROUTE_ID]) == 1
+        rebuilt = service.get_summary(ROUTE_ID)
+
+        assert incremental.snapshot_count == rebuilt.snapshot_count == 40
+        assert incremental.price_sum == pytest.approx(rebuilt.price_sum)
+        assert incremental.price_sum_sq == pytest.approx(rebuilt.price_sum_sq)
+        assert incremental.weekday_buckets == rebuilt.weekday_buckets
+        assert incremental.recent == rebuilt.recent
+        assert incremental.last_price == rebuilt.last_price == 90.0
+
+    def test_summary_values(self, db_session: Session, snapshots):
+        """Test summary statistics against values computed from the rows."""
+        service = PriceAggregateService(db_session)
+        service.record_snapshots(snapshots)
+        db_session.commit()
+
+        summary = service.get_summary(ROUTE_ID)
+        prices = [r.lowest_price for r in snapshots]
+        mean = sum(prices) / len(prices)
+
+        assert summary.mean == pytest.approx(mean)
+        assert summary.stddev == pytest.approx(
+            math.sqrt(sum((p - mean) ** 2 for p in prices) / len(prices))
+        )
+        assert summary.min_price == 90.0
+        assert summary.max_price == max(prices)
+        assert len(summary.recent) == RECENT_SNAPSHOTS
+        assert summary.recent[0][1] == 90.0
+
+        window = summary.window(30)
+        assert window.snapshots == 40
+        assert window.min_price == 90.0
+
+        weekday_avg, weekend_avg = summary.weekday_weekend_averages()
+        assert weekend_avg > weekday_avg
+        assert summary.weekday_averages()[5] == weekend_avg
+
+    def test_rebuild_drops_routes_without_history(self, db_session: Session):
+        """Test rebuilding a route with no history removes its aggregate."""
+        db_session.add(RoutePriceAggregate(route_id=ROUTE_ID, snapshot_count=3))
+        db_session.commit()
+
+        assert PriceAggregateService(db_session).rebuild([ROUTE_ID]) == 0
+        assert db_session.query(RoutePriceAggregate).count() == 0
+
+
+class TestPredictionReadsAggregates:
+    """Test PricePredictionService uses the aggregates."""
+
+    def test_prediction_matches_history_scan(self, db_session: Session, snapshots):
+        """Test predictions from aggregates equal those from scanning history."""
+        service = PricePredictionService(db_session)
+        target = date.today() + timedelta(days=20)
+        scanned = service.predict_price(ROUTE_ID, target)
+
+        PriceAggregateService(db_session).rebuild([ROUTE_ID])
+        aggregated = service.predict_price(ROUTE_ID, target)
+
+        assert aggregated.predicted_price == pytest.approx(scanned.predicted_price, abs=0.01)
+        assert aggregated.confidence_score == scanned.confidence_score
+        assert aggregated.price_trend == scanned.price_trend
+        assert aggregated.factors == scanned.factors
+
+    def test_insights_use_weekday_patterns(self, db_session: Session, snapshots):
+        """Test insights report weekday patterns and the 30-day window."""
+        PriceAggregateService(db_session).rebuild([ROUTE_ID])
+
+        insights = PricePredictionService(db_session).get_price_insights(ROUTE_ID)
+
+        assert insights.current_price == 90.0
+        assert insights.min_price_30d == 90.0
+        assert insights.cheapest_day_of_week == 1
+        assert insights.most_expensive_day == 5
+        assert insights.weekend_premium > 0
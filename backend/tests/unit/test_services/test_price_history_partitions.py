@@ -0,0 +1,118 @@
+"""
+Unit tests for price_history partition management.
+"""
+
+from datetime import date, datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+from sqlalchemy.orm import Session
+
+from app.services.price_history_partitions import (
+    PartitionInfo,
+    PriceHistoryPartitionService,
+    add_months,
+    month_start,
+    partition_name,
+    parse_partition_name,
+    _collect_relation_names,
+)
+
+
+class TestPartitionNaming:
+    """Test partition name and bound helpers."""
+
+    def test_month_start(self):
+        """Test any day maps to the first of its month."""
+        assert month_start(date(2025, 7, 19)) == date(2025, 7, 1)
+
+    def test_add_months_rolls_over_year(self):
+        """Test adding months across a year boundary."""
+        assert add_months(date(2025, 11, 15), 1) == date(2025, 12, 1)
+        assert add_months(date(2025, 11, 15), 2) == date(2026, 1, 1)
+        assert add_months(date(2025, 1, 1), -1) == date(2024, 12, 1)
+
+    def test_partition_name_round_trip(self):
+        """Test partition names encode and decode the month."""
+        name = partition_name(date(2025, 3, 1))
+        assert name == "price_history_y2025m03"
+        assert parse_partition_name(name) == date(2025, 3, 1)
+
+    def test_parse_ignores_foreign_tables(self):
+        """Test non-monthly partitions are not parsed."""
+        assert parse_partition_name("price_history_default") is None
+        assert parse_partition_name("price_history_legacy") is None
+
+
+class TestPartitionServiceFallback:
+    """Test the service is a no-op on databases without partitioning."""
+
+    def test_sqlite_is_not_supported(self, db_session: Session):
+        """Test SQLite is reported as unpartitioned."""
+        service = PriceHistoryPartitionService(db_session)
+        assert service.is_supported() is False
+        assert service.is_partitioned() is False
+
+    def test_maintenance_is_noop_on_sqlite(self, db_session: Session):
+        """Test partition maintenance does nothing without partitioning."""
+        service = PriceHistoryPartitionService(db_session)
+        assert service.list_partitions() == []
+        assert service.ensure_future_partitions(today=date(2025, 1, 1)) == []
+        assert service.drop_expired_partitions(today=date(2025, 1, 1)) == []
+        assert service.verify_pruning("marseille_tunis") == {"partitioned": False}
+
+
+class TestExplainPlanParsing:
+    """Test relation names are extracted from EXPLAIN JSON output."""
+
+    def test_collects_nested_relations(self):
+        """Test partitions under an Append node are all collected."""
+        plan = [{
+            "Plan": {
+                "Node Type": "Append",
+                "Plans": [
+                    {"Node Type": "Seq Scan", "Relation Name": "price_history_y2025m05"},
+                    {"Node Type": "Index Scan", "Relation Name": "price_history_y2025m06"},
+                ],
+            }
+        }]
+        assert _collect_relation_names(plan) == {
+            "price_history_y2025m05",
+            "price_history_y2025m06",
+        }
+
+
+class TestVerifyPruning:
+    """Test pruning is judged on partitions older than the query window."""
+
+    def _partitions(self):
+        today = datetime.utcnow().date()
+        months = [add_months(today, offset) for offset in (-4, -1, 0, 1)]
+        return [PartitionInfo(partition_name(m), m, add_months(m, 1)) for m in months]
+
+    def _verify(self, partitions, scanned_names):
+        plan = [{"Plan": {"Plans": [{"Relation Name": name} for name in scanned_names]}}]
+        db = MagicMock()
+        db.execute.return_value.scalar.return_value = plan
+        service = PriceHistoryPartitionService(db)
+        with patch.object(service, "is_partitioned", return_value=True), \
+                patch.object(service, "list_partitions", return_value=partitions):
+            return service.verify_pruning("marseille_tunis", days_back=60)
+
+    def test_recent_future_and_default_scans_are_pruned(self):
+        """Test scanning every partition the open-ended window can reach counts as pruned."""
+        partitions = self._partitions()
+        recent = [p.name for p in partitions[1:]] + ["price_history_default"]
+
+        result = self._verify(partitions, recent)
+        assert result["pruned"] is True
+        assert result["expired_scanned"] == []
+
+    def test_scanning_expired_partition_is_not_pruned(self):
+        """Test a partition wholly before the cutoff being scanned is reported."""
+        partitions = self._partitions()
+        old = partitions[0]
+        assert old.range_end <= (datetime.utcnow() - timedelta(days=60)).date()
+
+        result = self._verify(partitions, [p.name for p in partitions])
+        assert result["pruned"] is False
+        assert result["expired_scanned"] == [old.name]
@@ -0,0 +1,96 @@
+"""
+Unit tests for PricePredictionService batch prediction.
+"""
+
+import pytest
+from datetime import datetime, date, timedelta
+from sqlalchemy.orm import Session
+
+from app.models.price_history import PriceHistory, PricePrediction, RouteStatistics
+from app.services.price_prediction_service import PricePredictionService
+
+
+ROUTES = [
+    {"route_id": "marseille_tunis", "departure_port": "marseille", "arrival_port": "tunis"},
+    {"route_id": "genoa_tunis", "departure_port": "genoa", "arrival_port": "tunis"},
+]
+
+
+@pytest.fixture
+def price_history(db_session: Session) -> None:
+    """Create 30 hourly snapshots per route with a rising price."""
+    now = datetime.utcnow()
+    for route_index, route in enumerate(ROUTES):
+        for i in range(30):
+            price = 80.0 + route_index * 10 + i * 0.5
+            db_session.add(PriceHistory(
+                route_id=route["route_id"],
+                departure_port=route["departure_port"],
+                arrival_port=route["arrival_port"],
+                recorded_at=now - timedelta(hours=i),
+                departure_date=date.today() + timedelta(days=30),
+                price_adult=price,
+                lowest_price=price,
+                available_passengers=40 + i,
+            ))
+    db_session.add(RouteStatistics(
+        route_id="genoa_tunis",
+        departure_port="genoa",
+        arrival_port="tunis",
+        avg_price_30d=95.0,
+        min_price_30d=88.0,
+        max_price_30d=110.0,
+        price_volatility_30d=6.5,
+    ))
+    db_session.commit()
+
+
+class TestPredictBatch:
+    """Test predict_batch against single-date predict_price."""
+
+    def test_batch_matches_single_predictions(self, db_session: Session, price_history):
+        """Test every batch result equals the per-date prediction."""
+        service = PricePredictionService(db_session)
+        dates = [date.today() + timedelta(days=offset) for offset in range(0, 120, 7)]
+        route_ids = [route["route_id"] for route in ROUTES]
+
+        batch = service.predict_batch(route_ids, dates)
+
+        for route_id in route_ids:
+            assert len(batch[route_id]) == len(dates)
+            for departure_date, result in zip(dates, batch[route_id]):
+                assert result == service.predict_price(route_id, departure_date)
+
+    def test_batch_without_history_uses_fallback(self, db_session: Session):
+        """Test routes without history get the default base price."""
+        service = PricePredictionService(db_session)
+        target = date.today() + timedelta(days=20)
+
+        batch = service.predict_batch(["unknown_route"], [target])
+
+        assert batch["unknown_route"][0] == service.predict_price("unknown_route", target)
+
+    def test_empty_input(self, db_session: Session):
+        """Test empty dates produce empty result lists."""
+        service = PricePredictionService(db_session)
+        assert service.predict_batch(["marseille_tunis"], []) == {"marseille_tunis": []}
+
+
+class TestSavePredictionsBatch:
+    """Test bulk persistence of batch predictions."""
+
+    def test_inserts_then_updates(self, db_session: Session, price_history):
+        """Test first save inserts rows and second save updates them."""
+        service = PricePredictionService(db_session)
+        dates = [date.today() + timedelta(days=offset) for offset in range(5)]
+        predictions = service.predict_batch([r["route_id"] for r in ROUTES], dates)
+
+        assert service.save_predictions_batch(ROUTES, dates, predictions) == (10, 0)
+        assert service.save_predictions_batch(ROUTES, dates, predictions) == (0, 10)
+
+        stored = db_session.query(PricePrediction).filter(
+            PricePrediction.route_id == "genoa_tunis",
+            PricePrediction.prediction_date == dates[0],
+        ).one()
+        assert stored.predicted_price == predictions["genoa_tunis"][0].predicted_price
+        assert stored.departure_port == "genoa"
@@ -0,0 +1,117 @@
+"""
+Unit tests for SQL-side route statistics aggregation.
+"""
+
+import math
+import pytest
+from datetime import datetime, date, timedelta
+from sqlalchemy.orm import Session
+
+from app.models.price_history import PriceHistory, RouteStatistics
+from app.services.route_statistics_service import RouteStatisticsService
+
+
+ROUTES = [
+    {"route_id": "marseille_tunis", "departure_port": "marseille", "arrival_port": "tunis"},
+    {"route_id": "genoa_tunis", "departure_port": "genoa", "arrival_port": "tunis"},
+]
+
+NOW = datetime(2025, 6, 1, 12, 0, 0)
+
+
+def _add_snapshot(db: Session, route_id: str, days_ago: int, price: float, highest: float,
+                  departure: date, is_weekend: bool = False) -> None:
+    db.add(PriceHistory(
+        route_id=route_id,
+        departure_port=route_id.split("_")[0],
+        arrival_port="tunis",
+        recorded_at=NOW - timedelta(days=days_ago),
+        departure_date=departure,
+        price_adult=price,
+        lowest_price=price,
+        highest_price=highest,
+        is_weekend=is_weekend,
+    ))
+
+
+@pytest.fixture
+def marseille_history(db_session: Session) -> None:
+    """Create snapshots spread over the 30-day, 90-day and older windows."""
+    _add_snapshot(db_session, "marseille_tunis", 5, 80.0, 95.0, date(2025, 6, 10))
+    _add_snapshot(db_session, "marseille_tunis", 10, 90.0, 120.0, date(2025, 6, 14), is_weekend=True)
+    _add_snapshot(db_session, "marseille_tunis", 20, 100.0, 110.0, date(2025, 6, 20))
+    _add_snapshot(db_session, "marseille_tunis", 60, 70.0, 90.0, date(2025, 4, 5), is_weekend=True)
+    _add_snapshot(db_session, "marseille_tunis", 200, 60.0, 150.0, date(2024, 11, 30))
+    db_session.commit()
+
+
+class TestComputeStatistics:
+    """Test the grouped aggregation query."""
+
+    def test_window_statistics(self, db_session: Session, marseille_history):
+        """Test 30-day and 90-day windows only include their snapshots."""
+        stats = RouteStatisticsService(db_session).compute_statistics(["marseille_tunis"], NOW)
+        route = stats["marseille_tunis"]
+
+        assert route["avg_price_30d"] == 90.0
+        assert route["min_price_30d"] == 80.0
+        assert route["max_price_30d"] == 100.0
+        assert route["price_volatility_30d"] == round(math.sqrt(200 / 3), 2)
+
+        assert route["avg_price_90d"] == 85.0
+        assert route["min_price_90d"] == 70.0
+        assert route["max_price_90d"] == 100.0
+
+    def test_all_time_and_day_type(self, db_session: Session, marseille_history):
+        """Test all-time extremes carry their departure dates."""
+        route = RouteStatisticsService(db_session).compute_statistics(["marseille_tunis"], NOW)["marseille_tunis"]
+
+        assert route["all_time_low"] == 60.0
+        assert route["all_time_low_date"] == date(2024, 11, 30)
+        assert route["all_time_high"] == 150.0
+        assert route["all_time_high_date"] == date(2024, 11, 30)
+        assert route["weekday_avg_price"] == 80.0
+        assert route["weekend_avg_price"] == 80.0
+
+    def test_routes_without_history_are_absent(self, db_session: Session, marseille_history):
+        """Test routes with no snapshots produce no aggregate row."""
+        stats = RouteStatisticsService(db_session).compute_statistics(["genoa_tunis"], NOW)
+        assert stats == {}
+
+
+class TestRefresh:
+    """Test upserting statistics into RouteStatistics."""
+
+    def test_refresh_inserts_and_updates(self, db_session: Session, marseille_history):
+        """Test refresh creates rows once and updates them afterwards."""
+        service = RouteStatisticsService(db_session)
+
+        assert service.refresh(ROUTES, NOW) == 2
+        assert db_session.query(RouteStatistics).count() == 2
+
+        _add_snapshot(db_session, "marseille_tunis", 1, 50.0, 60.0, date(2025, 6, 3))
+        db_session.commit()
+        service.refresh(ROUTES, NOW)
+        db_session.expire_all()
+
+        marseille = db_session.query(RouteStatistics).filter_by(route_id="marseille_tunis").one()
+        assert marseille.min_price_30d == 50.0
+        assert marseille.all_time_low == 50.0
+        assert marseille.cheapest_day_of_week == 1
+        assert db_session.query(RouteStatistics).count() == 2
+
+    def test_refresh_keeps_values_when_window_is_empty(self, db_session: Session, marseille_history):
+        """Test a route without new data keeps its stored statistics."""
+        db_session.add(RouteStatistics(
+            route_id="genoa_tunis",
+            departure_port="genoa",
+            arrival_port="tunis",
+            avg_price_30d=99.0,
+        ))
+        db_session.commit()
+
+        RouteStatisticsService(db_session).refresh(ROUTES, NOW)
+        db_session.expire_all()
+
+        genoa = db_session.query(RouteStatistics).filter_by(route_id="genoa_tunis").one()
+        assert genoa.avg_price_30d == 99.0
@@ -0,0 +1,235 @@
+"""
+Unit tests for booking maintenance Celery tasks.
+"""
+
+import pytest
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from unittest.mock import patch, MagicMock
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.booking import Booking, BookingCabin, BookingStatusEnum
+from app.models.sailing_inventory import SailingInventory
+from app.tasks.booking_tasks import (
+    EXPIRY_REASON,
+    complete_past_bookings_task,
+    expire_old_bookings_task,
+)
+from tests.conftest import TestSessionLocal
+
+
+def _booking(db_session: Session, reference: str, sailing_id: str = "CTN-001",
+             expires_in: timedelta = timedelta(minutes=-5),
+             status: BookingStatusEnum = BookingStatusEnum.PENDING, **kwargs) -> Booking:
+    booking = Booking(
+        sailing_id=sailing_id,
+        operator="CTN",
+        departure_port="Tunis",
+        arrival_port="Marseille",
+        booking_reference=reference,
+        contact_email=f"{reference.lower()}@example.com",
+        contact_first_name="Test",
+        contact_last_name="User",
+        total_passengers=2,
+        total_vehicles=1,
+        subtotal=Decimal("150.00"),
+        total_amount=Decimal("165.00"),
+        status=status,
+        expires_at=datetime.now(timezone.utc) + expires_in,
+        **{"departure_time": datetime.now() + timedelta(days=7), **kwargs},
+    )
+    db_session.add(booking)
+    db_session.commit()
+    return booking
+
+
+@pytest.fixture
+def expiry_side_effects():
+    """Run the task against the test database and capture its side effects."""
+    with patch("app.database.SessionLocal", TestSessionLocal), \
+            patch("app.tasks.availability_sync_tasks.publish_availability_now") as publish, \
+            patch("app.services.cache_service.cache_service.invalidate_sailing_availability") as invalidate, \
+            patch("celery.group") as group:
+        yield MagicMock(publish=publish, invalidate=invalidate, group=group)
+
+
+class TestExpireOldBookings:
+    """Test set-based expiry of unpaid bookings."""
+
+    def test_expires_only_overdue_pending_bookings(self, db_session: Session, expiry_side_effects):
+        """Test overdue PENDING bookings are cancelled and the rest left alone."""
+        _booking(db_session, "MR-EXP001")
+        _booking(db_session, "MR-EXP002", sailing_id="GNV-002")
+        _booking(db_session, "MR-FRESH1", expires_in=timedelta(minutes=20))
+        _booking(db_session, "MR-PAID01", status=BookingStatusEnum.CONFIRMED)
+
+        result = expire_old_bookings_task.run()
+
+        assert result["expired_count"] == 2
+        assert result["sailings_released"] == 2
+        db_session.expire_all()
+        statuses = {b.booking_reference: b for b in db_session.query(Booking).all()}
+        assert statuses["MR-EXP001"].status == BookingStatusEnum.CANCELLED
+        assert statuses["MR-EXP001"].cancellation_reason == EXPIRY_REASON
+        assert statuses["MR-EXP001"].cancelled_at is not None
+        assert statuses["MR-FRESH1"].status == BookingStatusEnum.PENDING
+        assert statuses["MR-PAID01"].status == BookingStatusEnum.CONFIRMED
+
+    def test_inventory_released_once_per_sailing(self, db_session: Session, expiry_side_effects):
+        """Test freed capacity is summed per sailing, cabins from booking_cabins or legacy fields."""
+        first = _booking(db_session, "MR-EXP001")
+        _booking(db_session, "MR-EXP002", cabin_id=None, return_cabin_id=None)
+        db_session.add(BookingCabin(
+            booking_id=first.id, cabin_id=1, quantity=2,
+            unit_price=Decimal("50.00"), total_price=Decimal("100.00"),
+        ))
+        db_session.commit()
+
+        expire_old_bookings_task.run()
+
+        expiry_side_effects.invalidate.assert_called_once_with("CTN-001")
+        expiry_side_effects.publish.assert_called_once()
+        availability = expiry_side_effects.publish.call_args.kwargs["availability"]
+        assert availability["change_type"] == "bookings_expired"
+        assert availability["passengers_freed"] == 4
+        assert availability["vehicles_freed"] == 2
+        assert availability["cabins_freed"] == 2
+        assert sorted(availability["booking_references"]) == ["MR-EXP001", "MR-EXP002"]
+
+    def test_reservations_released_with_expiry(self, db_session: Session, expiry_side_effects):
+        """Test reserved inventory is given back and cleared from the expired bookings."""
+        reservation = {"CTN-001": {"passengers": 2, "vehicles": 1, "cabins": 0}}
+        db_session.add(SailingInventory(
+            sailing_id="CTN-001", operator="CTN", passenger_capacity=10,
+            passengers_reserved=6, vehicles_reserved=3, cabins_reserved=0,
+        ))
+        _booking(db_session, "MR-EXP001", extra_data={"inventory": reservation})
+        _booking(db_session, "MR-EXP002", extra_data={"inventory": reservation, "has_cancellation_protection": True})
+        _booking(db_session, "MR-LEGACY", extra_data=None)
+
+        expire_old_bookings_task.run()
+
+        db_session.expire_all()
+        inventory = db_session.query(SailingInventory).one()
+        assert (inventory.passengers_reserved, inventory.vehicles_reserved) == (2, 1)
+        extra = {b.booking_reference: b.extra_data for b in db_session.query(Booking).all()}
+        assert extra["MR-EXP001"] == {}
+        assert extra["MR-EXP002"] == {"has_cancellation_protection": True}
+
+    def test_emails_queued_as_one_group(self, db_session: Session, expiry_side_effects):
+        """Test each batch queues its cancellation emails as a single group."""
+        for i in range(3):
+            _booking(db_session, f"MR-EXP00{i}")
+
+        result = expire_old_bookings_task.run()
+
+        assert result["emails_queued"] == 3
+        expiry_side_effects.group.assert_called_once()
+        signatures = expiry_side_effects.group.call_args.args[0]
+        assert {s.kwargs["to_email"] for s in signatures} == {
+            "mr-exp000@example.com", "mr-exp001@example.com", "mr-exp002@example.com",
+        }
+        assert signatures[0].kwargs["booking_data"]["cancellation_reason"] == EXPIRY_REASON
+        expiry_side_effects.group.return_value.apply_async.assert_called_once()
+
+    def test_backlog_drained_in_batches(self, db_session: Session, expiry_side_effects, monkeypatch):
+        """Test a backlog is expired in bounded batches."""
+        monkeypatch.setattr(settings, "BOOKING_EXPIRY_BATCH_SIZE", 2)
+        for i in range(5):
+            _booking(db_session, f"MR-EXP00{i}")
+
+        result = expire_old_bookings_task.run()
+
+        assert result["expired_count"] == 5
+        assert result["batches"] == 3
+        assert expiry_side_effects.group.call_count == 3
+
+    def test_time_budget_leaves_rest_for_next_run(self, db_session: Session, expiry_side_effects, monkeypatch):
+        """Test no new batch starts once the time budget is used up."""
+        monkeypatch.setattr(settings, "BOOKING_EXPIRY_BATCH_SIZE", 2)
+        monkeypatch.setattr(settings, "BOOKING_EXPIRY_TIME_BUDGET_SECONDS", 0)
+        for i in range(5):
+            _booking(db_session, f"MR-EXP00{i}")
+
+        result = expire_old_bookings_task.run()
+
+        assert result["expired_count"] == 2
+        assert db_session.query(Booking).filter(Booking.status == BookingStatusEnum.PENDING).count() == 3
+
+    def test_nothing_to_expire(self, db_session: Session, expiry_side_effects):
+        """Test an empty run touches nothing."""
+        result = expire_old_bookings_task.run()
+
+        assert result["expired_count"] == 0
+        expiry_side_effects.publish.assert_not_called()
+        expiry_side_effects.group.assert_not_called()
+
+
+@pytest.fixture
+def completion_side_effects():
+    """Run the completion task against the test database and capture its event."""
+    with patch("app.database.SessionLocal", TestSessionLocal), \
+            patch("app.tasks.booking_tasks._publish_booking_event") as publish, \
+            patch("app.api.v1.metrics.record_booking_maintenance") as record:
+        yield MagicMock(publish=publish, record=record)
+
+
+class TestCompletePastBookings:
+    """Test set-based completion of past bookings."""
+
+    def _confirmed(self, db_session: Session, reference: str, departed: timedelta,
+                   returned: timedelta = None, round_trip: bool = False) -> Booking:
+        now = datetime.now(timezone.utc)
+        return _booking(
+            db_session, reference,
+            status=BookingStatusEnum.CONFIRMED,
+            expires_in=timedelta(days=1),
+            departure_time=now - departed,
+            is_round_trip=round_trip,
+            return_departure_time=now - returned if returned is not None else None,
+        )
+
+    def test_completes_only_finished_journeys(self, db_session: Session, completion_side_effects):
+        """Test one-way, round-trip and unknown-return bookings complete after their last leg."""
+        self._confirmed(db_session, "MR-ONEWAY", departed=timedelta(hours=3))
+        self._confirmed(db_session, "MR-RTDONE", departed=timedelta(days=5), returned=timedelta(hours=3), round_trip=True)
+        self._confirmed(db_session, "MR-RTNORT", departed=timedelta(hours=5), round_trip=True)
+        self._confirmed(db_session, "MR-RTAWAY", departed=timedelta(days=2), returned=timedelta(days=-2), round_trip=True)
+        self._confirmed(db_session, "MR-RECENT", departed=timedelta(hours=1))
+
+        result = complete_past_bookings_task.run()
+
+        assert result["completed_count"] == 3
+        db_session.expire_all()
+        statuses = {b.booking_reference: b.status for b in db_session.query(Booking).all()}
+        assert statuses["MR-ONEWAY"] == BookingStatusEnum.COMPLETED
+        assert statuses["MR-RTDONE"] == BookingStatusEnum.COMPLETED
+        assert statuses["MR-RTNORT"] == BookingStatusEnum.COMPLETED
+        assert statuses["MR-RTAWAY"] == BookingStatusEnum.CONFIRMED
+        assert statuses["MR-RECENT"] == BookingStatusEnum.CONFIRMED
+
+    def test_one_event_and_metrics_per_run(self, db_session: Session, completion_side_effects, monkeypatch):
+        """Test batched runs publish a single event and record duration and row count."""
+        monkeypatch.setattr(settings, "BOOKING_COMPLETION_BATCH_SIZE", 2)
+        for i in range(5):
+            self._confirmed(db_session, f"MR-DONE0{i}", departed=timedelta(hours=3))
+
+        complete_past_bookings_task.run()
+
+        completion_side_effects.publish.assert_called_once()
+        event, payload = completion_side_effects.publish.call_args.args
+        assert event == "bookings_completed"
+        assert payload["count"] == 5
+        assert {b["booking_reference"] for b in payload["bookings"]} == {f"MR-DONE0{i}" for i in range(5)}
+        task, duration, rows = completion_side_effects.record.call_args.args
+        assert (task, rows) == ("complete_past_bookings", 5)
+        assert duration >= 0
+
+    def test_no_event_when_nothing_completed(self, db_session: Session, completion_side_effects):
+        """Test an empty run publishes nothing but still records metrics."""
+        result = complete_past_bookings_task.run()
+
+        assert result["completed_count"] == 0
+        completion_side_effects.publish.assert_not_called()
+        completion_side_effects.record.assert_called_once()
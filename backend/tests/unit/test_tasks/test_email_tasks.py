@@ -305,7 +305,7 @@ class TestPaymentSuccessEmailTask:
         from app.tasks.email_tasks import send_payment_success_email_task
 
         mock_email_service.send_payment_confirmation.return_value = True
-        mock_invoice_service.generate_invoice.return_value = b"%PDF-1.4 fake pdf content"
+        mock_invoice_service.get_invoice.return_value = b"%PDF-1.4 fake pdf content"
 
         booking_data = {"booking_reference": "MR-INV123"}
         payment_data = {"amount": 450.00}
@@ -398,7 +398,7 @@ class TestCabinUpgradeEmailTask:
         from app.tasks.email_tasks import send_cabin_upgrade_confirmation_email_task
 
         mock_email_service.send_email_with_attachment.return_value = True
-        mock_invoice_service.generate_cabin_upgrade_invoice.return_value = b"%PDF cabin invoice"
+        mock_invoice_service.get_cabin_upgrade_invoice.return_value = b"%PDF cabin invoice"
 
         booking_data = {
             "booking_reference": "MR-CAB123",
@@ -422,7 +422,7 @@ class TestCabinUpgradeEmailTask:
         )
 
         assert result["status"] == "success"
-        mock_invoice_service.generate_cabin_upgrade_invoice.assert_called_once()
+        mock_invoice_service.get_cabin_upgrade_invoice.assert_called_once()
 
 
 class TestRetryFailedEmail:
@@ -0,0 +1,256 @@
+"""
+Unit tests for the Stripe webhook stream and its batch consumer.
+"""
+
+import itertools
+import pytest
+from collections import defaultdict
+from datetime import datetime, timedelta
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.api.v1.webhooks import _enqueue_event
+from app.models.booking import Booking, BookingStatusEnum
+from app.models.payment import Payment, PaymentMethodEnum, PaymentStatusEnum
+from app.services.webhook_stream_service import DEAD_LETTER_STREAM, WebhookStreamService
+from app.tasks.payment_tasks import drain_webhook_shard
+from tests.conftest import TEST_ENGINE, TestSessionLocal
+
+
+class FakeRedis:
+    """In-memory subset of the redis-py client used by the webhook stream."""
+
+    def __init__(self):
+        self.strings = {}
+        self.streams = defaultdict(list)
+        self.delivered = set()
+        self.pending = defaultdict(list)
+        self.ids = itertools.count(1)
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.strings:
+            return None
+        self.strings[key] = value
+        return True
+
+    def getdel(self, key):
+        return self.strings.pop(key, None)
+
+    def delete(self, key):
+        self.strings.pop(key, None)
+
+    def xadd(self, stream, fields, maxlen=None, approximate=True):
+        entry_id = f"{next(self.ids)}-0"
+        self.streams[stream].append((entry_id, dict(fields)))
+        return entry_id
+
+    def xgroup_create(self, stream, group, id="0", mkstream=False):
+        self.streams.setdefault(stream, [])
+
+    def xreadgroup(self, group, consumer, streams, count=None):
+        (stream, start), = streams.items()
+        if start == "0":
+            # Pending entries trimmed from the stream are returned without fields
+            present = dict(self.streams[stream])
+            entries = [(entry_id, present.get(entry_id)) for entry_id in self.pending[stream]]
+        else:
+            entries = [entry for entry in self.streams[stream] if entry[0] not in self.delivered]
+        entries = entries[:count]
+        for entry_id, _ in entries:
+            self.delivered.add(entry_id)
+            if entry_id not in self.pending[stream]:
+                self.pending[stream].append(entry_id)
+        return [[stream, entries]] if entries else []
+
+    def xack(self, stream, group, *entry_ids):
+        self.pending[stream] = [e for e in self.pending[stream] if e not in entry_ids]
+
+    def xdel(self, stream, *entry_ids):
+        self.streams[stream] = [e for e in self.streams[stream] if e[0] not in entry_ids]
+
+    def pipeline(self):
+        return self
+
+    def execute(self):
+        return []
+
+
+@pytest.fixture
+def stream():
+    """Webhook stream service on an in-memory Redis, with one shard."""
+    cache = MagicMock()
+    cache.redis_client = FakeRedis()
+    cache.is_available.return_value = True
+    service = WebhookStreamService(cache)
+    with patch("app.services.webhook_stream_service.webhook_stream_service", service), \
+            patch("app.tasks.payment_tasks.SessionLocal", TestSessionLocal), \
+            patch("app.tasks.payment_tasks.send_payment_success_email_task") as success_email, \
+            patch("app.tasks.payment_tasks.send_payment_failed_email_task") as failed_email, \
+            patch("app.tasks.payment_tasks.settings.STRIPE_WEBHOOK_SHARDS", 1):
+        service.success_email = success_email
+        service.failed_email = failed_email
+        yield service
+
+
+def _paid_booking(db_session: Session, reference: str, intent_id: str) -> Booking:
+    booking = Booking(
+        sailing_id="CTN-001",
+        operator="CTN",
+        departure_port="Tunis",
+        arrival_port="Marseille",
+        departure_time=datetime.utcnow() + timedelta(days=7),
+        booking_reference=reference,
+        contact_email=f"{reference.lower()}@example.com",
+        contact_first_name="Test",
+        contact_last_name="User",
+        total_passengers=1,
+        subtotal=Decimal("150.00"),
+        total_amount=Decimal("165.00"),
+        status=BookingStatusEnum.PENDING,
+    )
+    db_session.add(booking)
+    db_session.flush()
+    db_session.add(Payment(
+        booking_id=booking.id,
+        amount=Decimal("165.00"),
+        payment_method=PaymentMethodEnum.CREDIT_CARD,
+        stripe_payment_intent_id=intent_id,
+        net_amount=Decimal("160.00"),
+    ))
+    db_session.commit()
+    return booking
+
+
+def _event(service, event_type: str, intent_id: str, booking: Booking, event_id: str = None, **data):
+    return service.append(event_id, event_type, intent_id, {
+        "id": intent_id, "metadata": {"booking_id": str(booking.id)}, **data,
+    })
+
+
+class TestWebhookIngestion:
+    """Test de-duplication and sharding at the webhook endpoint."""
+
+    def test_duplicate_event_ids_dropped(self, stream):
+        """Test a Stripe retry of an accepted event is not appended again."""
+        with patch("app.tasks.payment_tasks.process_webhook_stream_task.delay") as kick:
+            first = _enqueue_event("evt_1", "payment_intent.succeeded", "pi_1", {"id": "pi_1"})
+            retry = _enqueue_event("evt_1", "payment_intent.succeeded", "pi_1", {"id": "pi_1"})
+
+        assert (first, retry) == ("streamed", "duplicate")
+        assert len(stream.redis.streams["stripe:webhook_events:0"]) == 1
+        kick.assert_called_once_with(0)
+
+    def test_falls_back_to_task_without_redis(self, stream):
+        """Test events are queued as individual tasks when the stream is unavailable."""
+        stream.cache.is_available.return_value = False
+        with patch("app.tasks.payment_tasks.process_payment_webhook_task.delay") as delay:
+            assert _enqueue_event("evt_1", "payment_intent.succeeded", "pi_1", {"id": "pi_1"}) == "queued"
+
+        delay.assert_called_once()
+
+    def test_events_of_a_booking_share_a_shard(self):
+        """Test sharding follows the booking ID, whatever the payment intent."""
+        service = WebhookStreamService(MagicMock())
+        with patch("app.services.webhook_stream_service.settings.STRIPE_WEBHOOK_SHARDS", 8):
+            shards = {
+                service.shard_for(intent_id, {"metadata": {"booking_id": "42"}})
+                for intent_id in ("pi_a", "pi_b", "pi_c", "pi_d")
+            }
+        assert len(shards) == 1
+
+
+class TestDrainWebhookShard:
+    """Test batched, ordered processing of the webhook stream."""
+
+    def test_batch_loaded_in_bulk_and_committed_once(self, db_session: Session, stream):
+        """Test a batch loads payments and bookings in two queries and commits once."""
+        bookings = [_paid_booking(db_session, f"MR-WH00{i}", f"pi_{i}") for i in range(3)]
+        for i, booking in enumerate(bookings):
+            _event(stream, "payment_intent.succeeded", f"pi_{i}", booking)
+
+        selects = []
+
+        def count_selects(conn, cursor, statement, *args):
+            if statement.startswith("SELECT"):
+                selects.append(statement)
+
+        event.listen(TEST_ENGINE, "before_cursor_execute", count_selects)
+        try:
+            with patch.object(Session, "commit", autospec=True, side_effect=Session.commit) as commit:
+                result = drain_webhook_shard(0)
+        finally:
+            event.remove(TEST_ENGINE, "before_cursor_execute", count_selects)
+
+        assert result["processed"] == 3
+        assert result["batches"] == 1
+        assert len(selects) == 2
+        assert commit.call_count == 1
+        db_session.expire_all()
+        assert {b.status for b in db_session.query(Booking).all()} == {BookingStatusEnum.CONFIRMED}
+        assert stream.success_email.delay.call_count == 3
+        assert stream.redis.streams["stripe:webhook_events:0"] == []
+
+    def test_events_of_a_booking_applied_in_order(self, db_session: Session, stream):
+        """Test a failure followed by a success for one booking ends confirmed."""
+        booking = _paid_booking(db_session, "MR-WH001", "pi_1")
+        _event(stream, "payment_intent.payment_failed", "pi_1", booking,
+               last_payment_error={"code": "card_declined", "message": "Card declined"})
+        _event(stream, "payment_intent.succeeded", "pi_1", booking)
+
+        drain_webhook_shard(0)
+
+        db_session.expire_all()
+        payment = db_session.query(Payment).one()
+        assert payment.status == PaymentStatusEnum.COMPLETED
+        assert db_session.get(Booking, booking.id).status == BookingStatusEnum.CONFIRMED
+
+    def test_pending_entries_reprocessed_after_crash(self, db_session: Session, stream):
+        """Test entries read by a consumer that died are processed by the next drain."""
+        booking = _paid_booking(db_session, "MR-WH001", "pi_1")
+        _event(stream, "payment_intent.succeeded", "pi_1", booking)
+        stream.read_batch(0, 10)  # Delivered, never acked
+
+        assert drain_webhook_shard(0)["processed"] == 1
+        db_session.expire_all()
+        assert db_session.get(Booking, booking.id).status == BookingStatusEnum.CONFIRMED
+
+    def test_trimmed_pending_entries_acked(self, db_session: Session, stream):
+        """Test pending entries trimmed from the stream do not hide the ones behind them."""
+        booking = _paid_booking(db_session, "MR-WH001", "pi_1")
+        for intent_id in ("pi_old1", "pi_old2", "pi_old3"):
+            _event(stream, "payment_intent.succeeded", intent_id, booking)
+        _event(stream, "payment_intent.succeeded", "pi_1", booking)
+        stream.read_batch(0, 10)  # Delivered, never acked
+        redis = stream.redis
+        redis.streams["stripe:webhook_events:0"] = redis.streams["stripe:webhook_events:0"][3:]  # MAXLEN trim
+
+        batch = stream.read_batch(0, 2)
+
+        assert [event["payment_intent_id"] for _, event in batch] == ["pi_1"]
+        assert redis.pending["stripe:webhook_events:0"] == [batch[0][0]]
+
+    def test_busy_shard_requests_rerun(self, db_session: Session, stream):
+        """Test a drain finding the shard locked leaves it to the holder."""
+        stream.acquire_shard(0)
+
+        assert drain_webhook_shard(0)["busy"] == 1
+        assert stream.release_shard(0) is True
+
+    def test_failing_event_dead_lettered(self, db_session: Session, stream):
+        """Test a batch that fails is retried per event and the failing one set aside."""
+        good = _paid_booking(db_session, "MR-WH001", "pi_1")
+        bad = _paid_booking(db_session, "MR-WH002", "pi_2")
+        _event(stream, "payment_intent.succeeded", "pi_1", good)
+        _event(stream, "payment_intent.payment_failed", "pi_2", bad, event_id="evt_bad",
+               last_payment_error="not-a-dict")
+
+        result = drain_webhook_shard(0)
+
+        assert result["failed"] == 1
+        dead = stream.redis.streams[DEAD_LETTER_STREAM]
+        assert [fields["event_id"] for _, fields in dead] == ["evt_bad"]
+        db_session.expire_all()
+        assert db_session.get(Booking, good.id).status == BookingStatusEnum.CONFIRMED
+        assert stream.redis.streams["stripe:webhook_events:0"] == []
@@ -0,0 +1,186 @@
+"""
+Unit tests for departure reminder scheduling.
+"""
+
+import pytest
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from unittest.mock import patch
+from sqlalchemy.orm import Session
+
+from app.models import Booking, BookingReminder, ReminderTypeEnum
+from app.models.booking import BookingStatusEnum
+from app.tasks.reminder_tasks import check_departure_reminders, send_departure_reminder_email
+from tests.conftest import TestSessionLocal
+
+
+NOW = datetime.now(timezone.utc)
+
+
+def _booking(db_session: Session, reference: str, departs_in: timedelta,
+             returns_in: timedelta = None,
+             status: BookingStatusEnum = BookingStatusEnum.CONFIRMED) -> Booking:
+    booking = Booking(
+        sailing_id="CTN-001",
+        operator="CTN",
+        departure_port="Tunis",
+        arrival_port="Marseille",
+        departure_time=NOW + departs_in,
+        is_round_trip=returns_in is not None,
+        return_departure_time=NOW + returns_in if returns_in is not None else None,
+        booking_reference=reference,
+        contact_email=f"{reference.lower()}@example.com",
+        contact_first_name="Test",
+        contact_last_name="User",
+        total_passengers=1,
+        subtotal=Decimal("150.00"),
+        total_amount=Decimal("165.00"),
+        status=status,
+    )
+    db_session.add(booking)
+    db_session.commit()
+    return booking
+
+
+@pytest.fixture
+def scheduled():
+    """Run the scan against the test database and capture scheduled sends."""
+    with patch("app.tasks.reminder_tasks.SessionLocal", TestSessionLocal), \
+            patch.object(send_departure_reminder_email, "apply_async") as apply_async:
+        yield apply_async
+
+
+def _sends(apply_async):
+    return {
+        (call.kwargs["kwargs"]["booking_id"], call.kwargs["kwargs"]["reminder_type"],
+         call.kwargs["kwargs"]["journey_type"]): call.kwargs["eta"]
+        for call in apply_async.call_args_list
+    }
+
+
+class TestCheckDepartureReminders:
+    """Test the single-query reminder scan, claims and ETAs."""
+
+    def test_schedules_both_windows_and_legs(self, db_session: Session, scheduled):
+        """Test due reminders for outbound and return legs are scheduled at the exact time."""
+        outbound = _booking(db_session, "MR-OUT24", departs_in=timedelta(hours=24, minutes=20))
+        soon = _booking(db_session, "MR-OUT2", departs_in=timedelta(hours=2, minutes=10))
+        round_trip = _booking(
+            db_session, "MR-RET24", departs_in=timedelta(days=5), returns_in=timedelta(hours=24, minutes=5)
+        )
+        _booking(db_session, "MR-LATER", departs_in=timedelta(days=3))
+        _booking(db_session, "MR-PEND", departs_in=timedelta(hours=24, minutes=20),
+                 status=BookingStatusEnum.PENDING)
+
+        result = check_departure_reminders.run()
+
+        sends = _sends(scheduled)
+        assert set(sends) == {
+            (outbound.id, "24h", "outbound"),
+            (soon.id, "2h", "outbound"),
+            (round_trip.id, "24h", "return"),
+        }
+        assert sends[(outbound.id, "24h", "outbound")] == pytest.approx(NOW + timedelta(minutes=20), abs=timedelta(seconds=1))
+        assert sends[(soon.id, "2h", "outbound")] == pytest.approx(NOW + timedelta(minutes=10), abs=timedelta(seconds=1))
+        assert result["scheduled"] == 3
+        assert result["return_24h"] == 1
+
+    def test_claimed_reminders_not_rescheduled(self, db_session: Session, scheduled):
+        """Test a second scan skips reminders the first one claimed."""
+        booking = _booking(db_session, "MR-OUT24", departs_in=timedelta(hours=24, minutes=20))
+
+        check_departure_reminders.run()
+        check_departure_reminders.run()
+
+        assert scheduled.call_count == 1
+        claim = db_session.query(BookingReminder).filter(BookingReminder.booking_id == booking.id).one()
+        assert claim.reminder_type == ReminderTypeEnum.REMINDER_24H
+        assert claim.success is False
+        assert claim.scheduled_for is not None
+
+    def test_late_reminder_sent_immediately(self, db_session: Session, scheduled):
+        """Test a reminder missed within the grace period is sent now."""
+        booking = _booking(db_session, "MR-LATE", departs_in=timedelta(hours=23, minutes=45))
+
+        check_departure_reminders.run()
+
+        eta = _sends(scheduled)[(booking.id, "24h", "outbound")]
+        assert abs(eta - datetime.now(timezone.utc)) < timedelta(seconds=5)
+
+    def test_failed_schedule_releases_claim(self, db_session: Session, scheduled):
+        """Test a claim is removed when the send could not be queued."""
+        _booking(db_session, "MR-OUT24", departs_in=timedelta(hours=24, minutes=20))
+        scheduled.side_effect = ConnectionError("broker down")
+
+        result = check_departure_reminders.run()
+
+        assert result["scheduled"] == 0
+        assert db_session.query(BookingReminder).count() == 0
+
+
+class TestSendDepartureReminder:
+    """Test the scheduled send re-checks the booking."""
+
+    def test_rescheduled_departure_releases_claim(self, db_session: Session, scheduled):
+        """Test a send for a moved departure is skipped and can be claimed again."""
+        booking = _booking(db_session, "MR-OUT24", departs_in=timedelta(hours=24, minutes=20))
+        check_departure_reminders.run()
+        scheduled_departure = scheduled.call_args.kwargs["kwargs"]["departure_time"]
+
+        booking.departure_time = NOW + timedelta(days=2)
+        db_session.commit()
+
+        with patch("app.tasks.reminder_tasks.email_service.send_departure_reminder") as send:
+            result = send_departure_reminder_email.run(
+                booking_id=booking.id, reminder_type="24h", journey_type="outbound",
+                departure_time=scheduled_departure,
+            )
+
+        assert result["status"] == "skipped"
+        send.assert_not_called()
+        assert db_session.query(BookingReminder).count() == 0
+
+    def test_send_marks_claim_successful(self, db_session: Session, scheduled):
+        """Test a successful send updates the claimed row instead of adding one."""
+        booking = _booking(db_session, "MR-OUT2", departs_in=timedelta(hours=2, minutes=10))
+        check_departure_reminders.run()
+
+        with patch("app.tasks.reminder_tasks.email_service.send_departure_reminder", return_value=True):
+            result = send_departure_reminder_email.run(**scheduled.call_args.kwargs["kwargs"])
+
+        assert result["status"] == "success"
+        db_session.expire_all()
+        reminder = db_session.query(BookingReminder).filter(BookingReminder.booking_id == booking.id).one()
+        assert reminder.success is True
+
+    def test_failed_send_keeps_claim_until_retries_exhausted(self, db_session: Session, scheduled):
+        """Test a failing send keeps its claim and address while retrying, then is rescheduled."""
+        booking = _booking(db_session, "MR-OUT2", departs_in=timedelta(hours=2, minutes=10))
+        check_departure_reminders.run()
+        send_kwargs = scheduled.call_args.kwargs["kwargs"]
+
+        with patch("app.tasks.reminder_tasks.email_service.send_departure_reminder", return_value=False):
+            with pytest.raises(Exception, match="Email sending failed"):
+                send_departure_reminder_email.run(**send_kwargs)
+
+            db_session.expire_all()
+            reminder = db_session.query(BookingReminder).filter(BookingReminder.booking_id == booking.id).one()
+            assert reminder.success is False
+            assert reminder.sent_to_email == "mr-out2@example.com"
+            assert reminder.error_message == "Email sending failed"
+
+            # Retries are still pending, so the scan must not schedule it again
+            scheduled.reset_mock()
+            check_departure_reminders.run()
+            assert _sends(scheduled) == {}
+
+            send_departure_reminder_email.push_request(retries=3)
+            try:
+                with pytest.raises(Exception, match="Email sending failed"):
+                    send_departure_reminder_email.run(**send_kwargs)
+            finally:
+                send_departure_reminder_email.pop_request()
+
+        assert db_session.query(BookingReminder).count() == 0
+        check_departure_reminders.run()
+        assert (booking.id, "2h", "outbound") in _sends(scheduled)